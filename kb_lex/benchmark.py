@@ -0,0 +1,1486 @@
+import argparse
+import contextlib
+from collections import Counter
+import glob
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.lexer import analyze, analyze_fast, analyze_parallel, analyze_to_stream
+from src.compiler import Compiler
+from src.parser import Parser, shared_parse_table
+from src.generated_parser import GeneratedParser
+from src.grammar import GRAMMAR, GrammarAnalysis
+from src.ast_nodes import iter_nodes, lower
+from src.instrumentation import ParseStatistics
+from src.parser import shared_coded_grammar
+from src.optimizer import OPTIMIZATION_LEVELS, fold_constants, optimize, peephole
+from src.rpn_interpreter import RPNInterpreter
+from src.slot_interpreter import SlotInterpreter
+from src.bytecode import read_bytecode
+from src.slot_resolution import resolve_slots
+from src.control_flow import ControlFlowGraph, Liveness, ReachingDefinitions, variable_accesses
+from src.register_ir import lower_to_registers
+from src.loop_invariants import hoist_loop_invariants
+from src.dead_stores import eliminate_dead_stores
+from src.type_inference import specialize_types
+from src.bounds_checks import eliminate_bounds_checks
+from src.rpn_analysis import is_temporary
+from src.register_vm import RegisterVM
+from src.superinstructions import execution_counts, fuse_superinstructions, ngram_profile
+
+
+# Допустимое число записей таблицы разбора: рост сверх него - регрессия
+# размера, которую нужно заметить (и при необходимости поднять порог)
+PARSE_TABLE_BUDGET = 150
+
+SAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_samples():
+    """Возвращает словарь {имя файла: исходный код} для всех .kb примеров"""
+    samples = {}
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.kb"))):
+        with open(path, 'r', encoding='utf-8') as file:
+            samples[os.path.basename(path)] = file.read()
+    return samples
+
+
+def generate_program(statements, seed=0):
+    """
+    Генерирует корректную программу на языке компиляции из заданного числа
+    операторов верхнего уровня: объявления, присваивания, массивы,
+    ограниченные циклы while и условные операторы.
+    """
+    rnd = random.Random(seed)
+    lines = ["int n;", "n = 10;", "int [n] arr;"]
+    variables = []
+
+    def expression(depth=0):
+        choice = rnd.randint(0, 5 if depth < 2 else 2)
+        if choice == 0 or not variables:
+            return str(rnd.randint(0, 99))
+        if choice == 1:
+            # Одиночный идентификатор в правой части присваивания интерпретатор
+            # принимает за левую часть, поэтому на верхнем уровне он не выдается
+            return rnd.choice(variables) if depth else f"{rnd.choice(variables)} + 0"
+        if choice == 2:
+            return f"arr[{rnd.randint(0, 9)}]"
+        operator = rnd.choice(["+", "-", "*"])
+        if choice == 5:
+            return f"({expression(depth + 1)} {operator} {expression(depth + 1)})"
+        return f"{expression(depth + 1)} {operator} {expression(depth + 1)}"
+
+    for number in range(statements):
+        kind = rnd.randint(0, 5)
+        if kind == 0 or len(variables) < 2:
+            name = f"v{number}"
+            lines.append(f"int {name};")
+            lines.append(f"{name} = {expression()};")
+            variables.append(name)
+        elif kind == 1:
+            lines.append(f"arr[{rnd.randint(0, 9)}] = {expression()};")
+        elif kind == 2:
+            counter = f"c{number}"
+            target = rnd.choice(variables)
+            lines.append(f"int {counter};")
+            lines.append(f"{counter} = 0;")
+            lines.append(f"while ({counter} < {rnd.randint(1, 5)}) {{")
+            lines.append(f"    {target} = {target} + {expression(1)};")
+            lines.append(f"    {counter} = {counter} + 1;")
+            lines.append("}")
+        elif kind == 3:
+            target = rnd.choice(variables)
+            lines.append(f"if ({expression(1)} < {expression(1)}) {{")
+            lines.append(f"    {target} = {expression()};")
+            lines.append("} else {")
+            lines.append(f"    output {expression(1)};")
+            lines.append("}")
+        else:
+            lines.append(f"output {expression()};")
+    return "\n".join(lines) + "\n"
+
+
+def generate_expression_program(statements, seed=0):
+    """
+    Генерирует программу из длинных арифметических и логических выражений:
+    присваивания, условия и вывод со всеми бинарными операторами, унарным
+    минусом, скобками и доступом к элементам массива.
+    """
+    rnd = random.Random(seed)
+    lines = ["int n;", "n = 10;", "int [n] arr;", "int a;", "a = 1;", "float b;", "b = 2.5;"]
+
+    def operand(depth):
+        choice = rnd.randint(0, 5 if depth < 3 else 2)
+        if choice == 0:
+            return str(rnd.randint(0, 99))
+        if choice == 1:
+            return rnd.choice(["a", "b", "n"])
+        if choice == 2:
+            return f"arr[{rnd.randint(0, 9)}]"
+        if choice == 3:
+            return f"~{operand(depth + 1)}"
+        return f"({expression(depth + 1, rnd.random() < 0.5)})"
+
+    def expression(depth, logical):
+        operators = ["+", "-", "*", "/", "<", ">", "?", "!", "&", "|"] if logical else ["+", "-", "*", "/"]
+        parts = [operand(depth)]
+        for _ in range(rnd.randint(1, 6)):
+            parts.append(rnd.choice(operators))
+            parts.append(operand(depth))
+        return " ".join(parts)
+
+    for _ in range(statements):
+        kind = rnd.randint(0, 3)
+        if kind == 0:
+            lines.append(f"a = {expression(0, False)};")
+        elif kind == 1:
+            lines.append(f"arr[{rnd.randint(0, 9)}] = {expression(0, False)};")
+        elif kind == 2:
+            lines.append(f"if ({expression(0, True)}) {{ output {expression(1, True)}; }}")
+        else:
+            lines.append(f"output {expression(0, True)};")
+    return "\n".join(lines) + "\n"
+
+
+def generate_source(target_size, seed=0):
+    """Генерирует одну корректную программу размером не меньше target_size символов"""
+    statements = max(target_size // 40, 1)
+    source = generate_program(statements, seed)
+    while len(source) < target_size:
+        statements *= 2
+        source = generate_program(statements, seed)
+    return source
+
+
+def best_time(function, *args, repeat=3):
+    """Минимальное время выполнения function(*args) за repeat запусков"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def token_tuples(tokens):
+    return [(t.token_type, t.value, t.line, t.position) for t in tokens]
+
+
+def bench_lexer(args):
+    """Сравнивает пропускную способность analyze и analyze_fast"""
+    for name, source in load_samples().items():
+        if token_tuples(analyze(source)) != token_tuples(analyze_fast(source)):
+            print(f"Ошибка: потоки лексем различаются для {name}")
+            return False
+
+    source = generate_source(int(args.size_mb * 1024 * 1024))
+    if token_tuples(analyze(source)) != token_tuples(analyze_fast(source)):
+        print("Ошибка: потоки лексем различаются для сгенерированного текста")
+        return False
+
+    megabytes = len(source) / (1024 * 1024)
+    print(f"Размер текста: {megabytes:.2f} МБ")
+    for engine in (analyze, analyze_fast):
+        elapsed = best_time(engine, source, repeat=args.repeat)
+        print(f"{engine.__name__:>14}: {elapsed:.3f} с, {megabytes / elapsed:.2f} МБ/с")
+    return True
+
+
+def list_memory_usage(tokens):
+    """Приблизительный объем памяти списка объектов Token в байтах"""
+    size = tokens.__sizeof__()
+    for token in tokens:
+        size += token.__sizeof__()
+        if not isinstance(token.value, str) or len(token.value) > 1:
+            size += token.value.__sizeof__()  # Короткие строки кэшируются интерпретатором
+    return size
+
+
+def bench_tokens(args):
+    """Сравнивает список Token и TokenStream по памяти и времени разбора"""
+    source = generate_source(int(args.size_mb * 1024 * 1024))
+    tokens = analyze_fast(source)
+    stream = analyze_to_stream(source)
+    if token_tuples(tokens) != token_tuples(stream):
+        print("Ошибка: TokenStream отличается от списка лексем")
+        return False
+    if Parser(tokens).parse()[0] != Parser(stream).parse()[0]:
+        print("Ошибка: ОПЗ по TokenStream отличается от ОПЗ по списку лексем")
+        return False
+
+    print(f"Лексем: {len(tokens)}")
+    print(f"Список Token: {list_memory_usage(tokens) / 1024 / 1024:.2f} МБ")
+    print(f"TokenStream:  {stream.memory_usage() / 1024 / 1024:.2f} МБ")
+    list_time = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    stream_time = best_time(lambda: Parser(stream).parse(), repeat=args.repeat)
+    print(f"Разбор по списку: {list_time:.3f} с, по TokenStream: {stream_time:.3f} с")
+    return True
+
+
+def peak_memory(function, *args):
+    """Пиковый объем памяти, выделенной при выполнении function(*args), в байтах"""
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_stream(args):
+    """Пиковая память compile против потокового compile_file"""
+    source = generate_source(int(args.size_mb * 1024 * 1024))
+    expected = Compiler().compile(source)
+    streamed = []
+    Compiler().compile_file(io.StringIO(source), rpn_sink=streamed.extend)
+    if streamed != expected:
+        print("Ошибка: потоковая ОПС отличается от compile")
+        return False
+
+    written = [0]
+
+    def count_sink(instructions):
+        written[0] += len(instructions)
+
+    full = peak_memory(lambda: Compiler().compile(io.StringIO(source).read()))
+    stream = peak_memory(lambda: Compiler().compile_file(io.StringIO(source), rpn_sink=count_sink))
+    print(f"Команд ОПС: {len(expected)}")
+    print(f"compile:      пик {full / 1024 / 1024:.2f} МБ")
+    print(f"compile_file: пик {stream / 1024 / 1024:.2f} МБ (без учета исходного текста в StringIO)")
+    return True
+
+
+def bench_parallel(args):
+    """Масштабирование analyze_parallel по числу процессов"""
+    source = generate_source(int(args.size_mb * 1024 * 1024))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.kb', delete=False) as file:
+        file.write(source)
+        path = file.name
+    try:
+        expected = token_tuples(analyze_fast(source))
+        max_workers = args.workers or os.cpu_count() or 1
+        if token_tuples(analyze_parallel(path, max_workers)) != expected:
+            print("Ошибка: параллельный разбор отличается от последовательного")
+            return False
+
+        megabytes = len(source) / (1024 * 1024)
+        print(f"Размер текста: {megabytes:.2f} МБ")
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            elapsed = best_time(lambda: analyze_parallel(path, workers, compact=True), repeat=args.repeat)
+            baseline = baseline or elapsed
+            print(f"процессов {workers:>2}: {elapsed:.3f} с, {megabytes / elapsed:.2f} МБ/с, "
+                  f"ускорение {baseline / elapsed:.2f}x")
+        return True
+    finally:
+        os.remove(path)
+
+
+def random_edit(source, rnd):
+    """
+    Случайная правка (start, end, text): чаще всего сохраняющая корректность
+    программы (замена числа, вставка или удаление оператора), иногда
+    произвольная вставка или удаление символов.
+    """
+    kind = rnd.randint(0, 5)
+    if kind == 0:
+        digits = [i for i, char in enumerate(source) if char.isdigit()]
+        if digits:
+            start = rnd.choice(digits)
+            return start, start + 1, str(rnd.randint(0, 99))
+    line_starts = [0] + [i + 1 for i, char in enumerate(source) if char == '\n']
+    if kind == 1:
+        start = rnd.choice(line_starts)
+        name = f"e{rnd.randint(0, 10 ** 6)}"
+        return start, start, rnd.choice([f"int {name};\n", "output n;\n", "n = n + 1;\n",
+                                          "while (n < 3) { n = n + 1; }\n",
+                                          "if (n > 1) { output n; }\n", "} else {\n"])
+    if kind == 2:
+        start = rnd.choice(line_starts)
+        end = source.find('\n', start)
+        return start, len(source) if end == -1 else end + 1, ""
+    start = rnd.randint(0, len(source))
+    if kind == 3:
+        return start, min(start + rnd.randint(1, 8), len(source)), ""
+    return start, start, rnd.choice(["1", "x", " ", ";", "\n", "(", "}", "+ 2", "~", "\t"])
+
+
+def timed_compile(function, *args):
+    """
+    Компилирует и возвращает (время, успех). Ошибка в тексте - обычный исход
+    случайной правки, а не ошибка измерения.
+    """
+    began = time.perf_counter()
+    try:
+        function(*args)
+    except (RuntimeError, SyntaxError, ValueError):
+        return time.perf_counter() - began, False
+    return time.perf_counter() - began, True
+
+
+def bench_incremental(args):
+    """
+    Время compile_edit против полной перекомпиляции на случайных правках.
+    Совпадение результатов проверяет test_incremental.py.
+    """
+    rnd = random.Random(args.seed)
+    source = generate_source(int(args.size_kb * 1024), args.seed)
+    compiler = Compiler()
+    compiler.compile(source)
+
+    def full(text):
+        Compiler().compile(text)
+
+    incremental_time = full_time = 0.0
+    undo = None
+    for _ in range(args.edits):
+        # Правка, сделавшая текст некорректным, обычно отменяется следующей
+        start, end, text = undo or random_edit(source, rnd)
+        undo = None
+        removed = source[start:end]
+        source = source[:start] + text + source[end:]
+        elapsed, _ = timed_compile(compiler.compile_edit, start, end, text)
+        incremental_time += elapsed
+        elapsed, compiled = timed_compile(full, source)
+        full_time += elapsed
+        if not compiled and rnd.random() < 0.7:
+            undo = (start, start + len(text), removed)
+
+    print(f"Правок: {args.edits}, размер текста: {len(source)} символов")
+    print(f"compile_edit: {incremental_time:.3f} с, полная перекомпиляция: {full_time:.3f} с")
+    return True
+
+
+def bench_constants(args):
+    """Скорость разбора числовых констант и статистика пула констант"""
+    rnd = random.Random(0)
+    values = [f"{rnd.randint(0, 99)}.{rnd.randint(0, 99)}" if rnd.random() < 0.5 else str(rnd.randint(0, 999))
+              for _ in range(args.count)]
+    source = f"float [] data = {{{', '.join(values)}}};\n"
+
+    tokens = analyze_fast(source)
+    converted = [token.value for token in tokens if not isinstance(token.value, str)]
+    expected = [float(value) if '.' in value else int(value) for value in values]
+    if converted != expected or [type(v) for v in converted] != [type(v) for v in expected]:
+        print("Ошибка: значения констант отличаются от int()/float()")
+        return False
+
+    compiler = Compiler(lexer_engine="fast")
+    elapsed = best_time(compiler.compile, source, repeat=args.repeat)
+    stats = compiler.get_constant_pool_stats()
+    print(f"Констант в инициализаторе: {args.count}, компиляция: {elapsed:.3f} с")
+    print(f"Пул констант: {stats['constants']} констант, {stats['unique']} различных, "
+          f"{stats['deduplicated']} повторов")
+    return True
+
+
+def bench_parse_table(args):
+    """Время компиляции маленьких программ: общая таблица разбора против перестроения"""
+    programs = [generate_program(5, seed) for seed in range(args.programs)]
+
+    def compile_shared():
+        for source in programs:
+            Parser(analyze_fast(source)).parse()
+
+    def compile_rebuilt():
+        # Как до появления общей таблицы: build_parse_table при каждом разборе
+        for source in programs:
+            parser = Parser(analyze_fast(source))
+            parser.build_parse_table()
+            parser.parse()
+
+    shared_parse_table()
+    rebuilt = best_time(compile_rebuilt, repeat=args.repeat) / len(programs)
+    shared = best_time(compile_shared, repeat=args.repeat) / len(programs)
+    print(f"Программ: {len(programs)}")
+    print(f"Перестроение таблицы: {rebuilt * 1e6:.1f} мкс на компиляцию")
+    print(f"Общая таблица:        {shared * 1e6:.1f} мкс на компиляцию ({rebuilt / shared:.2f}x)")
+    return True
+
+
+def bench_parser(args):
+    """Пропускная способность синтаксического анализатора (токенов в секунду)"""
+    tokens = analyze_fast(generate_source(int(args.size_mb * 1024 * 1024)))
+    elapsed = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    print(f"Лексем: {len(tokens)}, разбор: {elapsed:.3f} с, {len(tokens) / elapsed / 1e6:.2f} млн лексем/с")
+    return True
+
+
+def bench_generated_parser(args):
+    """Сгенерированный парсер рекурсивного спуска против табличного"""
+    success = True
+    for name, source in load_samples().items():
+        outcomes = []
+        for backend in ("table", "generated"):
+            try:
+                compiler = Compiler(parser_backend=backend)
+                outcomes.append((compiler.compile(source), compiler.symbol_table_after_parsing.symbols))
+            except Exception as e:
+                outcomes.append(repr(e))
+        if outcomes[0] != outcomes[1]:
+            print(f"{name}: ОПС сгенерированного парсера отличается")
+            success = False
+    print("ОПС на примерах .kb совпадает" if success else "Обнаружены расхождения")
+
+    tokens = analyze_fast(generate_source(int(args.size_mb * 1024 * 1024)))
+    table = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    generated = best_time(lambda: GeneratedParser(tokens).parse(), repeat=args.repeat)
+    print(f"Лексем: {len(tokens)}")
+    print(f"Табличный парсер:      {table:.3f} с, {len(tokens) / table / 1e6:.2f} млн лексем/с")
+    print(f"Сгенерированный парсер: {generated:.3f} с, {len(tokens) / generated / 1e6:.2f} млн лексем/с "
+          f"({table / generated:.2f}x)")
+    return success
+
+
+def bench_expressions(args):
+    """Разбор выражений сортировочной станцией против раскрытия нетерминалов по таблице"""
+    sources = list(load_samples().values())
+    sources += [generate_expression_program(50, seed) for seed in range(args.programs)]
+    success = True
+    for source in sources:
+        tokens = analyze_fast(source)
+        outcomes = []
+        for fast in (False, True):
+            try:
+                rpn, symbol_table = Parser(tokens, fast_expressions=fast).parse()
+                outcomes.append((rpn, symbol_table.symbols))
+            except Exception as e:
+                outcomes.append(repr(e))
+        if outcomes[0] != outcomes[1]:
+            print(f"ОПС отличается для программы:\n{source[:200]}")
+            success = False
+    print(f"Программ проверено: {len(sources)}, ОПС " + ("совпадает" if success else "различается"))
+
+    statements = max(int(args.size_mb * 1024 * 1024) // 120, 1)
+    tokens = analyze_fast(generate_expression_program(statements, args.seed))
+    table = best_time(lambda: Parser(tokens, fast_expressions=False).parse(), repeat=args.repeat)
+    fast = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    print(f"Лексем: {len(tokens)}")
+    print(f"Раскрытие по таблице:   {table:.3f} с, {len(tokens) / table / 1e6:.2f} млн лексем/с")
+    print(f"Сортировочная станция: {fast:.3f} с, {len(tokens) / fast / 1e6:.2f} млн лексем/с ({table / fast:.2f}x)")
+    return success
+
+
+def retained_memory(function, *args):
+    """Результат function(*args) и объем памяти, которую он удерживает, в байтах"""
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_ast(args):
+    """Дерево разбора: совпадение ОПС после понижения, память на узел и время"""
+    sources = list(load_samples().values())
+    sources += [generate_program(50, seed) for seed in range(args.programs)]
+    sources += [generate_expression_program(50, seed) for seed in range(args.programs)]
+    success = True
+    for source in sources:
+        outcomes = []
+        for options in ({}, {"build_ast": True}, {"build_ast": True, "parser_backend": "generated"}):
+            try:
+                compiler = Compiler(**options)
+                outcomes.append((compiler.compile(source), compiler.symbol_table_after_parsing.symbols))
+            except Exception as e:
+                outcomes.append(repr(e))
+        if outcomes[1] != outcomes[0] or outcomes[2] != outcomes[0]:
+            print(f"ОПС из дерева отличается для программы:\n{source[:200]}")
+            success = False
+    print(f"Программ проверено: {len(sources)}, ОПС " + ("совпадает" if success else "различается"))
+
+    tokens = analyze_fast(generate_source(int(args.size_mb * 1024 * 1024), args.seed))
+    (program, _), tree_memory = retained_memory(lambda: Parser(tokens, build_ast=True).parse())
+    (rpn, _), rpn_memory = retained_memory(lambda: Parser(tokens).parse())
+    nodes = {}
+    for node in iter_nodes(program):
+        count, size = nodes.get(node.__class__.__name__, (0, 0))
+        nodes[node.__class__.__name__] = (count + 1, size + sys.getsizeof(node))
+    total = sum(count for count, _ in nodes.values())
+    print(f"Лексем: {len(tokens)}, команд ОПС: {len(rpn)}, узлов дерева: {total}")
+    for name, (count, size) in sorted(nodes.items(), key=lambda item: -item[1][0]):
+        print(f"  {name:20} {count:8} узлов, {size / count:.0f} байт на узел")
+    print(f"Дерево: {tree_memory / 1024 / 1024:.2f} МБ, {tree_memory / total:.1f} байт на узел "
+          f"(вместе со списками блоков и значениями)")
+    print(f"ОПС:    {rpn_memory / 1024 / 1024:.2f} МБ")
+
+    direct = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    tree = best_time(lambda: Parser(tokens, build_ast=True).parse(), repeat=args.repeat)
+    lowering = best_time(lower, program, repeat=args.repeat)
+    print(f"Разбор в ОПС:    {direct:.3f} с")
+    print(f"Разбор в дерево: {tree:.3f} с, понижение в ОПС: {lowering:.3f} с")
+    return success
+
+
+def bench_instrumentation(args):
+    """Стоимость счетчиков анализа: разбор без них, со счетчиками и совпадение ОПС"""
+    success = True
+    for name, source in load_samples().items():
+        outcomes = []
+        for instrument in (False, True):
+            try:
+                outcomes.append(Compiler(instrument=instrument).compile(source))
+            except Exception as e:
+                outcomes.append(repr(e))
+        if outcomes[0] != outcomes[1]:
+            print(f"{name}: ОПС со счетчиками отличается")
+            success = False
+    print("ОПС на примерах .kb совпадает" if success else "Обнаружены расхождения")
+
+    tokens = analyze_fast(generate_source(int(args.size_mb * 1024 * 1024)))
+    plain = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    counted = best_time(lambda: Parser(tokens, statistics=ParseStatistics(shared_coded_grammar())).parse(),
+                        repeat=args.repeat)
+    print(f"Лексем: {len(tokens)}")
+    print(f"Разбор без счетчиков: {plain:.3f} с")
+    print(f"Разбор со счетчиками: {counted:.3f} с ({counted / plain:.2f}x)")
+    return success
+
+
+# Входные данные для операторов input при выполнении примеров
+SAMPLE_INPUT = [3, 1, 2, 3, 4, 5]
+
+
+def run_rpn(rpn, input_values=SAMPLE_INPUT, interpreter_class=RPNInterpreter):
+    """
+    Выполняет ОПС (или SlotProgram для SlotInterpreter) без консоли: input
+    берет значения из input_values. Возвращает (вывод, таблица символов)
+    или repr ошибки выполнения.
+    """
+    interpreter = interpreter_class()
+    interpreter.set_input_values(input_values)
+    stdin = sys.stdin
+    sys.stdin = io.StringIO("")  # input() сразу получает EOF
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return interpreter.interpret(rpn)
+    except Exception as e:
+        return repr(e)
+    finally:
+        sys.stdin = stdin
+
+
+def visible_result(result):
+    """Результат run_rpn без временных переменных оптимизаций в таблице символов"""
+    if isinstance(result, str):
+        return result
+    output, symbol_table = result
+    return output, {name: value for name, value in symbol_table.items() if not is_temporary(name)}
+
+
+def bench_optimize(args):
+    """Оптимизация ОПС: одинаковое поведение программ, размер ОПС и время выполнения"""
+    sources = list(load_samples().values())
+    sources += [generate_program(40, seed) for seed in range(args.programs)]
+    sources += [generate_expression_program(20, seed) for seed in range(args.programs)]
+    success = True
+    sizes = [0] * len(OPTIMIZATION_LEVELS)
+    for source in sources:
+        try:
+            rpn = Compiler().compile(source)
+        except Exception:
+            continue
+        expected = run_rpn(rpn)
+        for level in OPTIMIZATION_LEVELS:
+            optimized = optimize(rpn, level)
+            sizes[level] += len(optimized)
+            if visible_result(run_rpn(optimized)) != expected:
+                print(f"Уровень {level}: поведение программы изменилось:\n{source[:200]}")
+                success = False
+    print(f"Программ проверено: {len(sources)}, поведение " + ("совпадает" if success else "различается"))
+    for level, size in enumerate(sizes):
+        print(f"  уровень {level}: {size} команд ОПС ({size / sizes[0]:.1%})")
+
+    source = generate_source(int(args.size_mb * 1024 * 1024), args.seed)
+    rpn = Compiler().compile(source)
+    baseline = None
+    for level in OPTIMIZATION_LEVELS:
+        elapsed = best_time(optimize, rpn, level, repeat=args.repeat)
+        optimized = optimize(rpn, level)
+        run = best_time(run_rpn, optimized, repeat=args.repeat)
+        baseline = baseline or run
+        print(f"Уровень {level}: оптимизация {elapsed:.3f} с, {len(optimized)} команд, "
+              f"выполнение {run:.3f} с ({baseline / run:.2f}x)")
+    return success
+
+
+def executed_count(rpn, input_values=SAMPLE_INPUT, interpreter_class=RPNInterpreter):
+    """Число команд, выполненных RPNInterpreter (до ошибки, если она возникла)"""
+    interpreter = interpreter_class()
+    interpreter.set_input_values(input_values)
+    stdin = sys.stdin
+    sys.stdin = io.StringIO("")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.interpret(rpn)
+    except Exception:
+        pass
+    finally:
+        sys.stdin = stdin
+    return interpreter.executed_count
+
+
+def bench_peephole(args):
+    """Оконная оптимизация на примерах .kb: удаленные и невыполняемые команды"""
+    success = True
+    applied = Counter()
+    total = [0, 0, 0, 0]
+    print(f"{'Пример':20} {'команд':>15} {'выполнено':>17}")
+    for name, source in load_samples().items():
+        try:
+            rpn = Compiler().compile(source)
+        except Exception:
+            continue
+        # Свертка констант первой: условия-константы становятся переходами
+        folded = fold_constants(rpn)
+        optimized = peephole(folded, applied=applied)
+        if run_rpn(optimized) != run_rpn(folded):
+            print(f"{name}: поведение программы изменилось")
+            success = False
+        sizes = len(folded), len(optimized)
+        executed = executed_count(folded), executed_count(optimized)
+        for position, value in enumerate(sizes + executed):
+            total[position] += value
+        print(f"{name:20} {sizes[0]:>6} -> {sizes[1]:<6} {executed[0]:>7} -> {executed[1]:<7}")
+    print(f"{'Всего':20} {total[0]:>6} -> {total[1]:<6} {total[2]:>7} -> {total[3]:<7}")
+    print(f"Удалено команд: {total[0] - total[1]}, выполнено меньше на {total[2] - total[3]}")
+    for rule, count in applied.most_common():
+        print(f"  {rule:25} {count}")
+
+    source = generate_source(int(args.size_mb * 1024 * 1024), args.seed)
+    rpn = fold_constants(Compiler().compile(source))
+    elapsed = best_time(peephole, rpn, repeat=args.repeat)
+    optimized = peephole(rpn)
+    print(f"Сгенерированная программа: {len(rpn)} -> {len(optimized)} команд, выполнено "
+          f"{executed_count(rpn)} -> {executed_count(optimized)}, оптимизация {elapsed:.3f} с")
+    return success
+
+
+def bench_licm(args):
+    """Вынос инвариантов циклов на примерах .kb: вынесенные выражения и выполненные команды"""
+    sources = dict(load_samples())
+    sources["sort"] = sort_program(args.size)
+    sources["bubble_sort"] = bubble_sort_program(args.size)
+    sources["nested_loops"] = nested_loop_program(args.size)
+    success = True
+    total = [0, 0, 0]
+    print(f"{'Пример':20} {'вынесено':>8} {'выполнено':>17}")
+    for name, source in sources.items():
+        try:
+            rpn = fold_constants(Compiler().compile(source))
+        except Exception:
+            continue
+        hoisted = []
+        optimized = hoist_loop_invariants(rpn, hoisted)
+        if visible_result(run_rpn(optimized)) != run_rpn(rpn):
+            print(f"{name}: поведение программы изменилось")
+            success = False
+        executed = executed_count(rpn), executed_count(optimized)
+        total[0] += len(hoisted)
+        total[1] += executed[0]
+        total[2] += executed[1]
+        print(f"{name:20} {len(hoisted):>8} {executed[0]:>7} -> {executed[1]:<7}")
+        for expression in hoisted:
+            print(f"{'':22}{' '.join(map(str, expression))}")
+    print(f"{'Всего':20} {total[0]:>8} {total[1]:>7} -> {total[2]:<7}")
+    print(f"Выполнено меньше на {total[1] - total[2]} команд ({1 - total[2] / total[1]:.1%})")
+
+    rpn = fold_constants(Compiler().compile(generate_source(int(args.size_mb * 1024 * 1024), args.seed)))
+    elapsed = best_time(hoist_loop_invariants, rpn, repeat=args.repeat)
+    hoisted = []
+    hoist_loop_invariants(rpn, hoisted)
+    print(f"Сгенерированная программа: {len(rpn)} команд, вынесено {len(hoisted)} выражений "
+          f"за {elapsed:.3f} с")
+    return success
+
+
+def bench_dead_stores(args):
+    """Удаление мертвых записей на примерах .kb: удаленные операторы, выполненные команды и память"""
+    sources = dict(load_samples())
+    sources["template"] = template_program(args.statements, args.seed)
+    success = True
+    removed = Counter()
+    total = [0, 0, 0, 0]
+    print(f"{'Пример':20} {'выполнено':>17} {'пик памяти, КБ':>19}")
+    for name, source in sources.items():
+        try:
+            rpn = fold_constants(Compiler().compile(source))
+        except Exception:
+            continue
+        expected = run_rpn(rpn)
+        # Таблица символов сохраняется: поведение должно совпасть полностью
+        if run_rpn(eliminate_dead_stores(rpn)) != expected:
+            print(f"{name}: поведение программы изменилось (с таблицей символов)")
+            success = False
+        optimized = eliminate_dead_stores(rpn, keep_symbol_table=False, removed=removed)
+        result = run_rpn(optimized)
+        # Без таблицы символов совпадают вывод и ошибка выполнения
+        if (result if isinstance(result, str) else result[0]) != (expected if isinstance(expected, str)
+                                                                 else expected[0]):
+            print(f"{name}: вывод программы изменился")
+            success = False
+        executed = executed_count(rpn), executed_count(optimized)
+        memory = peak_memory(run_rpn, rpn), peak_memory(run_rpn, optimized)
+        for position, value in enumerate(executed + memory):
+            total[position] += value
+        print(f"{name:20} {executed[0]:>7} -> {executed[1]:<7} {memory[0] / 1024:>8.1f} -> {memory[1] / 1024:<8.1f}")
+    print(f"{'Всего':20} {total[0]:>7} -> {total[1]:<7} {total[2] / 1024:>8.1f} -> {total[3] / 1024:<8.1f}")
+    print(f"Выполнено меньше на {total[0] - total[1]} команд ({1 - total[1] / total[0]:.1%}), "
+          f"пик памяти меньше на {1 - total[3] / total[2]:.1%}")
+    for kind, count in removed.most_common():
+        print(f"  {kind:25} {count}")
+
+    rpn = fold_constants(Compiler().compile(template_program(args.statements, args.seed)))
+    elapsed = best_time(eliminate_dead_stores, rpn, False, repeat=args.repeat)
+    optimized = eliminate_dead_stores(rpn, keep_symbol_table=False)
+    before = best_time(run_rpn, rpn, repeat=args.repeat)
+    after = best_time(run_rpn, optimized, repeat=args.repeat)
+    print(f"Шаблонная программа: {len(rpn)} -> {len(optimized)} команд, оптимизация {elapsed:.3f} с, "
+          f"выполнение {before:.3f} -> {after:.3f} с ({before / after:.2f}x)")
+    return success
+
+
+def sort_program(size):
+    """Сортировка обменом массива из size элементов, как в test1.kb"""
+    return f"""int n;
+n = {size};
+int [n] arr;
+int i;
+int j;
+int temp;
+i = 0;
+while (i < n) {{
+    arr[i] = n - i;
+    i = i + 1;
+}}
+i = 0;
+while (i < n) {{
+    j = i + 1;
+    while (j < n) {{
+        if (arr[j] < arr[i]) {{
+            temp = arr[i];
+            arr[i] = arr[j];
+            arr[j] = temp;
+        }}
+        j = j + 1;
+    }}
+    i = i + 1;
+}}
+output arr[0];
+"""
+
+
+def template_program(statements, seed=0):
+    """
+    Программа, как из шаблонов: рядом с нужными вычислениями объявляются
+    массивы и переменные, которые только записываются, но не читаются.
+    """
+    rnd = random.Random(seed)
+    lines = ["int n;", "n = 1000;", "int [n] data;", "int sum;", "sum = 0;"]
+    for number in range(statements):
+        kind = rnd.randint(0, 4)
+        if kind == 0:
+            lines.append(f"int [n] scratch{number};")
+            lines.append(f"scratch{number}[{rnd.randint(0, 9)}] = {rnd.randint(0, 99)};")
+        elif kind == 1:
+            lines.append(f"int unused{number};")
+            lines.append(f"unused{number} = sum * {rnd.randint(1, 9)} + {rnd.randint(0, 99)};")
+        elif kind == 2:
+            counter = f"c{number}"
+            lines.append(f"int {counter};")
+            lines.append(f"int steps{number};")
+            lines.append(f"{counter} = 0;")
+            lines.append(f"steps{number} = 0;")
+            lines.append(f"while ({counter} < 5) {{")
+            lines.append(f"    data[{counter}] = data[{counter}] + {rnd.randint(1, 9)};")
+            lines.append(f"    steps{number} = steps{number} + 1;")
+            lines.append(f"    {counter} = {counter} + 1;")
+            lines.append("}")
+        elif kind == 3:
+            lines.append(f"sum = sum + data[{rnd.randint(0, 9)}];")
+        else:
+            lines.append("output sum;")
+    return "\n".join(lines) + "\n"
+
+
+def bubble_sort_program(size):
+    """Сортировка пузырьком: граница внутреннего цикла n - i - 1 не меняется в нем"""
+    return f"""int n;
+n = {size};
+int [n] arr;
+int i;
+int j;
+int temp;
+i = 0;
+while (i < n) {{
+    arr[i] = n - i;
+    i = i + 1;
+}}
+i = 0;
+while (i < n - 1) {{
+    j = 0;
+    while (j < n - i - 1) {{
+        if (arr[j] > arr[j + 1]) {{
+            temp = arr[j];
+            arr[j] = arr[j + 1];
+            arr[j + 1] = temp;
+        }}
+        j = j + 1;
+    }}
+    i = i + 1;
+}}
+output arr[0];
+"""
+
+
+def nested_loop_program(size):
+    """Вложенные циклы с арифметикой: size * size итераций без массивов"""
+    return f"""int n;
+n = {size};
+int i;
+int j;
+int sum;
+sum = 0;
+i = 0;
+while (i < n) {{
+    j = 0;
+    while (j < n) {{
+        sum = sum + i * j - (i - j);
+        j = j + 1;
+    }}
+    i = i + 1;
+}}
+output sum;
+"""
+
+
+def series_program(size):
+    """Сумма ряда 1/1 + 1/2 + ... с числами float: size * size слагаемых"""
+    return f"""int n;
+n = {size * size};
+int k;
+float x;
+float sum;
+sum = 0.0;
+x = 1.0;
+k = 0;
+while (k < n) {{
+    sum = sum + 1.0 / x;
+    x = x + 1.0;
+    k = k + 1;
+}}
+output sum;
+"""
+
+
+def bench_types(args):
+    """Команды с типами int/float: сколько поставлено и время выполнения на всех исполнителях"""
+    sources = dict(load_samples())
+    sources.update({
+        "sort": sort_program(args.size),
+        "bubble_sort": bubble_sort_program(args.size),
+        "nested_loops": nested_loop_program(args.size),
+        "series": series_program(args.size),
+    })
+    success = True
+    counts = Counter()
+    print(f"{'Пример':20} {'команд':>7} {'с типами':>9}")
+    for name, source in sources.items():
+        try:
+            rpn = optimize(Compiler().compile(source), 2)
+        except Exception:
+            continue
+        specialized = []
+        typed = specialize_types(rpn, specialized)
+        expected = run_rpn(rpn)
+        program = resolve_slots(typed)
+        results = [run_rpn(typed)]
+        if program is not None:
+            results.append(run_rpn(fuse_superinstructions(program), interpreter_class=SlotInterpreter))
+            results.append(run_rpn(lower_to_registers(program), interpreter_class=RegisterVM))
+        if any(result != expected for result in results):
+            print(f"{name}: поведение программы изменилось")
+            success = False
+        counts.update(specialized)
+        print(f"{name:20} {len(rpn):>7} {len(specialized):>9}")
+    for instruction, count in counts.most_common():
+        print(f"  {instruction:20} {count}")
+
+    for name in ("sort", "nested_loops", "series"):
+        rpn = optimize(Compiler().compile(sources[name]), 2)
+        typed = specialize_types(rpn)
+        times = []
+        for code in (rpn, typed):
+            program = resolve_slots(code)
+            times.append((best_time(run_rpn, code, repeat=args.repeat),
+                          best_time(run_rpn, fuse_superinstructions(program), SAMPLE_INPUT, SlotInterpreter,
+                                    repeat=args.repeat),
+                          best_time(run_rpn, lower_to_registers(program), SAMPLE_INPUT, RegisterVM,
+                                    repeat=args.repeat)))
+        print(f"{name}: " + ", ".join(f"{backend} {before:.3f} -> {after:.3f} с ({before / after:.2f}x)"
+                                      for backend, before, after in zip(("ОПС", "слоты", "регистры"), *times)))
+    return success
+
+
+def bench_bounds(args):
+    """Снятие проверок границ массивов: доказанные обращения и время выполнения на всех исполнителях"""
+    sources = dict(load_samples())
+    sources.update({
+        "sort": sort_program(args.size),
+        "bubble_sort": bubble_sort_program(args.size),
+        "template": template_program(args.size),
+    })
+    success = True
+    total = [0, 0]
+    print(f"{'Пример':20} {'обращений':>9} {'без проверок':>13}")
+    for name, source in sources.items():
+        try:
+            rpn = optimize(Compiler().compile(source), 2)
+        except Exception:
+            continue
+        eliminated = []
+        unchecked = eliminate_bounds_checks(rpn, eliminated)
+        expected = run_rpn(rpn)
+        program = resolve_slots(unchecked)
+        results = [run_rpn(unchecked)]
+        if program is not None:
+            results.append(run_rpn(fuse_superinstructions(program), interpreter_class=SlotInterpreter))
+            results.append(run_rpn(lower_to_registers(program), interpreter_class=RegisterVM))
+        if any(result != expected for result in results):
+            print(f"{name}: поведение программы изменилось")
+            success = False
+        accesses = sum(instruction in ("ARRAY_INDEX", "ARRAY_ASSIGN") for instruction in rpn)
+        total[0] += accesses
+        total[1] += len(eliminated)
+        print(f"{name:20} {accesses:>9} {len(eliminated):>13}")
+    print(f"{'Всего':20} {total[0]:>9} {total[1]:>13}")
+
+    for name in ("sort", "bubble_sort"):
+        rpn = optimize(Compiler().compile(sources[name]), 2)
+        unchecked = eliminate_bounds_checks(rpn)
+        times = []
+        for code in (rpn, unchecked):
+            program = resolve_slots(code)
+            times.append((best_time(run_rpn, code, repeat=args.repeat),
+                          best_time(run_rpn, fuse_superinstructions(program), SAMPLE_INPUT, SlotInterpreter,
+                                    repeat=args.repeat),
+                          best_time(run_rpn, lower_to_registers(program), SAMPLE_INPUT, RegisterVM,
+                                    repeat=args.repeat)))
+        print(f"{name}: " + ", ".join(f"{backend} {before:.3f} -> {after:.3f} с ({before / after:.2f}x)"
+                                      for backend, before, after in zip(("ОПС", "слоты", "регистры"), *times)))
+    return success
+
+
+def bench_slots(args):
+    """Выполнение по слотам переменных против выполнения ОПС с именами"""
+    sources = list(load_samples().values())
+    sources += [generate_program(40, seed) for seed in range(args.programs)]
+    success = True
+    resolved = compiled = 0
+    for source in sources:
+        try:
+            rpn = Compiler().compile(source)
+        except Exception:
+            continue
+        compiled += 1
+        program = resolve_slots(rpn)
+        if program is None:
+            continue
+        resolved += 1
+        if run_rpn(program, interpreter_class=SlotInterpreter) != run_rpn(rpn):
+            print(f"Выполнение по слотам отличается:\n{source[:200]}")
+            success = False
+    print(f"Переведено в слоты {resolved} программ из {compiled}, поведение " +
+          ("совпадает" if success else "различается"))
+
+    rpn = Compiler().compile(sort_program(args.size))
+    resolve = best_time(resolve_slots, rpn, repeat=args.repeat)
+    program = resolve_slots(rpn)
+    names = best_time(run_rpn, rpn, repeat=args.repeat)
+    slots = best_time(run_rpn, program, SAMPLE_INPUT, SlotInterpreter, repeat=args.repeat)
+    print(f"Сортировка {args.size} элементов: перевод в слоты {resolve * 1000:.2f} мс, "
+          f"выполнение с именами {names:.3f} с, по слотам {slots:.3f} с ({names / slots:.2f}x)")
+    return success
+
+
+def bench_superinstructions(args):
+    """Частые последовательности команд SlotProgram и выигрыш от суперкоманд"""
+    sources = list(load_samples().values()) + [sort_program(args.size)]
+    sources += [generate_program(40, seed) for seed in range(args.programs)]
+    profile = Counter()
+    success = True
+    for source in sources:
+        try:
+            program = resolve_slots(Compiler().compile(source))
+        except Exception:
+            continue
+        if program is None:
+            continue
+        profile.update(ngram_profile(program, execution_counts(program, SAMPLE_INPUT), args.lengths))
+        fused = fuse_superinstructions(program)
+        if (run_rpn(fused, interpreter_class=SlotInterpreter) !=
+                run_rpn(program, interpreter_class=SlotInterpreter)):
+            print(f"Суперкоманды меняют выполнение:\n{source[:200]}")
+            success = False
+    print("Поведение с суперкомандами " + ("совпадает" if success else "различается"))
+
+    print("Последовательности команд по числу выполнений:")
+    for length in args.lengths:
+        top = [(ngram, count) for ngram, count in profile.most_common() if len(ngram) == length][:args.top]
+        print(f"  по {length}:")
+        for ngram, count in top:
+            print(f"    {count:>10} {' '.join(ngram)}")
+
+    program = resolve_slots(Compiler().compile(sort_program(args.size)))
+    fused = fuse_superinstructions(program)
+    interpreter = SlotInterpreter()
+    interpreter.set_input_values(list(SAMPLE_INPUT))
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(program)
+        plain_count = interpreter.executed_count
+        interpreter.interpret(fused)
+    plain = best_time(run_rpn, program, SAMPLE_INPUT, SlotInterpreter, repeat=args.repeat)
+    superinstructions = best_time(run_rpn, fused, SAMPLE_INPUT, SlotInterpreter, repeat=args.repeat)
+    print(f"Сортировка {args.size} элементов: выполнено команд {plain_count} -> {interpreter.executed_count}, "
+          f"время {plain:.3f} с -> {superinstructions:.3f} с ({plain / superinstructions:.2f}x)")
+    return success
+
+
+def bench_registers(args):
+    """Регистровая машина против стековой на примерах и программах с циклами"""
+    sources = list(load_samples().values()) + [generate_program(40, seed) for seed in range(args.programs)]
+    success = True
+    lowered = compiled = 0
+    for source in sources:
+        try:
+            rpn = Compiler().compile(source)
+        except Exception:
+            continue
+        compiled += 1
+        program = resolve_slots(rpn)
+        registers = program and lower_to_registers(program)
+        if registers is None:
+            continue
+        lowered += 1
+        if run_rpn(registers, interpreter_class=RegisterVM) != run_rpn(rpn):
+            print(f"Регистровая машина выполняет программу иначе:\n{source[:200]}")
+            success = False
+    print(f"Переведено в регистры {lowered} программ из {compiled}, поведение " +
+          ("совпадает" if success else "различается"))
+
+    for title, source in ((f"Сортировка {args.size} элементов", sort_program(args.size)),
+                          (f"Вложенные циклы {args.size}x{args.size}", nested_loop_program(args.size))):
+        rpn = Compiler().compile(source)
+        slots = fuse_superinstructions(resolve_slots(rpn))
+        registers = lower_to_registers(resolve_slots(rpn))
+        counts = []
+        for program, interpreter_class in ((slots, SlotInterpreter), (registers, RegisterVM)):
+            interpreter = interpreter_class()
+            with contextlib.redirect_stdout(io.StringIO()):
+                interpreter.interpret(program)
+            counts.append(interpreter.executed_count)
+        names = best_time(run_rpn, rpn, repeat=args.repeat)
+        stack = best_time(run_rpn, slots, SAMPLE_INPUT, SlotInterpreter, repeat=args.repeat)
+        register = best_time(run_rpn, registers, SAMPLE_INPUT, RegisterVM, repeat=args.repeat)
+        print(f"{title}: команд стековой машины {counts[0]}, регистровой {counts[1]}; "
+              f"ОПС {names:.3f} с, стековая {stack:.3f} с, регистровая {register:.3f} с "
+              f"({stack / register:.2f}x к стековой, {names / register:.2f}x к ОПС)")
+    return success
+
+
+def nested_blocks_program(depth):
+    """Программа из depth вложенных друг в друга while и if"""
+    opening = []
+    for level in range(depth):
+        if level % 2:
+            opening.append(f"if (x > {level}) {{ x = x - 1;")
+        else:
+            opening.append("while (i < n) { i = i + 1;")
+    return ("int x; int i; int n; n = 3;\n" + "\n".join(opening) + "\noutput x;\n" +
+            "}\n" * depth + "output i;\n")
+
+
+def analyze_control_flow(rpn):
+    """Граф, доминаторы, циклы, живые переменные и достигающие определения ОПС"""
+    cfg = ControlFlowGraph(rpn)
+    dominators = cfg.dominators()
+    loops = cfg.loops(dominators)
+    accesses = variable_accesses(cfg)
+    Liveness(cfg, accesses=accesses)
+    ReachingDefinitions(cfg, accesses=accesses)
+    return cfg, loops
+
+
+def bench_cfg(args):
+    """Граф потока управления: сборка ОПС обратно и масштабирование анализа"""
+    sources = list(load_samples().values()) + [generate_program(40, seed) for seed in range(args.programs)]
+    success = True
+    checked = 0
+    for source in sources:
+        try:
+            rpn = Compiler().compile(source)
+        except Exception:
+            continue
+        cfg = ControlFlowGraph(rpn)
+        if cfg.to_rpn() != rpn:
+            print(f"ОПС, собранная из графа, отличается от исходной:\n{source[:200]}")
+            success = False
+        # Участки в обратном порядке: все переходы и проходы пересчитываются
+        order = [cfg.entry] + list(range(cfg.exit - 1, cfg.entry, -1)) + [cfg.exit]
+        if run_rpn(cfg.to_rpn(order)) != run_rpn(rpn):
+            print(f"ОПС с переставленными участками выполняется иначе:\n{source[:200]}")
+            success = False
+        checked += 1
+    print(f"Собрано из графа {checked} программ: " + ("совпадают с исходными" if success else "есть различия"))
+
+    for depth in args.depths:
+        rpn = Compiler().compile(nested_blocks_program(depth))
+        elapsed = best_time(analyze_control_flow, rpn, repeat=args.repeat)
+        cfg, loops = analyze_control_flow(rpn)
+        print(f"Вложенность {depth}: {len(rpn)} команд, {len(cfg.blocks)} участков, {len(loops)} циклов, "
+              f"анализ {elapsed:.3f} с ({elapsed / len(cfg.blocks) * 1e6:.1f} мкс на участок)")
+    return success
+
+
+def bench_bytecode(args):
+    """Байт-код .kbc: размер файла и загрузка против компиляции исходного текста"""
+    success = True
+    for source in list(load_samples().values()) + [generate_program(40, seed) for seed in range(args.programs)]:
+        compiler = Compiler()
+        buffer = io.BytesIO()
+        try:
+            rpn = compiler.save_bytecode(source, buffer)
+        except Exception:
+            continue
+        buffer.seek(0)
+        program = compiler.load_bytecode(buffer, source)
+        if run_rpn(rpn) != run_rpn(program, interpreter_class=(RPNInterpreter if isinstance(program, list)
+                                                              else SlotInterpreter)):
+            print(f"Программа из байт-кода выполняется иначе:\n{source[:200]}")
+            success = False
+    print("Программы из байт-кода выполняются " + ("так же, как" if success else "иначе, чем") + " из исходного текста")
+
+    source = generate_source(int(args.size_mb * 1024 * 1024), args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.kbc")
+        with open(path, 'wb') as file:
+            Compiler().save_bytecode(source, file)
+        size = os.path.getsize(path)
+
+        def load():
+            with open(path, 'rb') as file:
+                return read_bytecode(file)
+
+        def compile_source():
+            return resolve_slots(Compiler().compile(source))
+
+        loaded = best_time(load, repeat=args.repeat)
+        compiled = best_time(compile_source, repeat=args.repeat)
+    print(f"Исходный текст {len(source) / 1024:.0f} КБ, байт-код {size / 1024:.0f} КБ")
+    print(f"Компиляция {compiled:.3f} с, загрузка .kbc {loaded:.3f} с ({compiled / loaded:.1f}x)")
+    return success
+
+
+def branching_loop_program(size):
+    """Вложенные циклы с if и if-else в телах: size * size итераций"""
+    return f"""int n;
+n = {size};
+int i;
+int j;
+int even;
+int odd;
+int [n] row;
+i = 0;
+while (i < n) {{
+    j = 0;
+    while (j < n) {{
+        if (j > i) {{
+            row[j] = row[j] + 1;
+        }} else {{
+            row[i] = row[i] - 1;
+        }}
+        if (row[j] > 0) {{
+            even = even + 1;
+        }}
+        j = j + 1;
+    }}
+    if (i > j - n) {{
+        odd = odd + row[i];
+    }}
+    i = i + 1;
+}}
+output even;
+output odd;
+"""
+
+
+def backend_runs(rpn):
+    """
+    Выполняет ОПС всеми исполнителями: ОПС, слоты с суперкомандами и
+    регистры (если ОПС переводится в слоты). Возвращает список пар
+    (результат run_rpn без временных переменных, выполнено команд).
+    """
+    program = resolve_slots(rpn)
+    programs = [(rpn, RPNInterpreter)]
+    if program is not None:
+        programs.append((fuse_superinstructions(program), SlotInterpreter))
+        registers = lower_to_registers(program)
+        if registers is not None:
+            programs.append((registers, RegisterVM))
+    return [(visible_result(run_rpn(code, interpreter_class=interpreter_class)),
+             executed_count(code, interpreter_class=interpreter_class)) for code, interpreter_class in programs]
+
+
+def bench_rotation(args):
+    """
+    Повернутые циклы while: число выполненных команд и время на всех уровнях
+    и исполнителях. Поведение на небольших циклах проверяет test_rotation.py.
+    """
+    sources = dict(load_samples())
+    sources.update({
+        "nested_loops": nested_loop_program(args.size),
+        "branching_loops": branching_loop_program(args.size),
+        "nested_blocks": nested_blocks_program(args.depth),
+        "sort": sort_program(args.size),
+        "bubble_sort": bubble_sort_program(args.size),
+    })
+    sources.update((f"generated{seed}", generate_program(40, seed)) for seed in range(args.programs))
+    success = True
+    backends = ("ОПС", "слоты", "регистры")
+    totals = {level: [[0, 0] for _ in backends] for level in OPTIMIZATION_LEVELS}
+    shown = ("nested_loops", "branching_loops", "nested_blocks", "sort", "bubble_sort")
+    print(f"{'Пример':20} {'ур.':>3} {'ОПС':>17} {'слоты':>17} {'регистры':>17}")
+    for name, source in sources.items():
+        try:
+            Compiler().compile(source)
+        except Exception as e:
+            print(f"{name}: ошибка компиляции: {e!r}")
+            success = False
+            continue
+        for level in OPTIMIZATION_LEVELS:
+            plain = backend_runs(Compiler(optimization_level=level).compile(source))
+            rotated = backend_runs(Compiler(optimization_level=level, rotate_loops=True).compile(source))
+            expected = plain[0][0]
+            if len(rotated) != len(plain) or any(result != expected for result, _ in plain + rotated):
+                print(f"{name}, уровень {level}: поведение программы изменилось")
+                success = False
+                continue
+            for total, (_, before), (_, after) in zip(totals[level], plain, rotated):
+                total[0] += before
+                total[1] += after
+            if name in shown:
+                print(f"{name:20} {level:>3} " + " ".join(f"{before:>8}->{after:<8}"
+                                                          for (_, before), (_, after) in zip(plain, rotated)))
+    for level, total in totals.items():
+        print(f"{'Всего':20} {level:>3} " + " ".join(f"{before:>8}->{after:<8}" for before, after in total))
+    for backend, (before, after) in zip(backends, totals[max(OPTIMIZATION_LEVELS)]):
+        print(f"  {backend}: выполнено команд на {1 - after / before:.1%} меньше")
+
+    for name in ("nested_loops", "branching_loops"):
+        times = []
+        for rotate_loops in (False, True):
+            rpn = Compiler(optimization_level=3, rotate_loops=rotate_loops).compile(sources[name])
+            program = resolve_slots(rpn)
+            times.append((best_time(run_rpn, rpn, repeat=args.repeat),
+                          best_time(run_rpn, fuse_superinstructions(program), SAMPLE_INPUT, SlotInterpreter,
+                                    repeat=args.repeat),
+                          best_time(run_rpn, lower_to_registers(program), SAMPLE_INPUT, RegisterVM,
+                                    repeat=args.repeat)))
+        print(f"{name}: " + ", ".join(f"{backend} {before:.3f} -> {after:.3f} с ({before / after:.2f}x)"
+                                      for backend, before, after in zip(backends, *times)))
+    return success
+
+
+def bench_grammar(args):
+    """Анализ грамматики: конфликты, недостижимые нетерминалы, размер таблицы и скорость разбора"""
+    analysis = GrammarAnalysis(GRAMMAR)
+    rules = sum(len(alternatives) for alternatives in GRAMMAR.values())
+    print(f"Нетерминалов: {len(GRAMMAR)}, альтернатив: {rules}")
+    print(f"Записей таблицы разбора: {analysis.table_size()} (порог {args.max_entries})")
+    success = True
+    for nonterminal, token_type, first, second in analysis.conflicts:
+        print(f"Конфликт LL(1): {nonterminal} по {token_type.name}: {list(first)} и {list(second)}")
+        success = False
+    for nonterminal in analysis.undefined:
+        print(f"Не определен нетерминал {nonterminal}")
+        success = False
+    for nonterminal in analysis.unreachable:
+        print(f"Недостижим нетерминал {nonterminal}")
+        success = False
+    if analysis.table_size() > args.max_entries:
+        print("Размер таблицы превышает порог")
+        success = False
+
+    tokens = analyze_fast(generate_source(int(args.size_mb * 1024 * 1024)))
+    elapsed = best_time(lambda: Parser(tokens).parse(), repeat=args.repeat)
+    print(f"Разбор {len(tokens)} лексем: {elapsed:.3f} с, {len(tokens) / elapsed / 1e6:.2f} млн лексем/с")
+    return success
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности компилятора")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    lexer = commands.add_parser("lexer", help="analyze против analyze_fast")
+    lexer.add_argument("--size-mb", type=float, default=2.0)
+    lexer.add_argument("--repeat", type=int, default=3)
+    lexer.set_defaults(handler=bench_lexer)
+
+    tokens = commands.add_parser("tokens", help="список Token против TokenStream")
+    tokens.add_argument("--size-mb", type=float, default=0.5)
+    tokens.add_argument("--repeat", type=int, default=3)
+    tokens.set_defaults(handler=bench_tokens)
+
+    stream = commands.add_parser("stream", help="пиковая память потоковой компиляции")
+    stream.add_argument("--size-mb", type=float, default=0.5)
+    stream.set_defaults(handler=bench_stream)
+
+    parallel = commands.add_parser("parallel", help="масштабирование параллельного лексера")
+    parallel.add_argument("--size-mb", type=float, default=8.0)
+    parallel.add_argument("--workers", type=int, default=None)
+    parallel.add_argument("--repeat", type=int, default=3)
+    parallel.set_defaults(handler=bench_parallel)
+
+    incremental = commands.add_parser("incremental", help="compile_edit против полной перекомпиляции")
+    incremental.add_argument("--size-kb", type=float, default=64.0)
+    incremental.add_argument("--edits", type=int, default=200)
+    incremental.add_argument("--seed", type=int, default=0)
+    incremental.set_defaults(handler=bench_incremental)
+
+    constants = commands.add_parser("constants", help="числовые константы и пул констант")
+    constants.add_argument("--count", type=int, default=100000)
+    constants.add_argument("--repeat", type=int, default=3)
+    constants.set_defaults(handler=bench_constants)
+
+    parse_table = commands.add_parser("parse-table", help="общая таблица разбора на маленьких программах")
+    parse_table.add_argument("--programs", type=int, default=1000)
+    parse_table.add_argument("--repeat", type=int, default=3)
+    parse_table.set_defaults(handler=bench_parse_table)
+
+    parse = commands.add_parser("parser", help="пропускная способность синтаксического анализатора")
+    parse.add_argument("--size-mb", type=float, default=1.0)
+    parse.add_argument("--repeat", type=int, default=3)
+    parse.set_defaults(handler=bench_parser)
+
+    generated = commands.add_parser("generated-parser",
+                                    help="сгенерированный парсер рекурсивного спуска против табличного")
+    generated.add_argument("--size-mb", type=float, default=1.0)
+    generated.add_argument("--repeat", type=int, default=3)
+    generated.set_defaults(handler=bench_generated_parser)
+
+    expressions = commands.add_parser("expressions", help="быстрый разбор выражений против разбора по таблице")
+    expressions.add_argument("--size-mb", type=float, default=0.5)
+    expressions.add_argument("--programs", type=int, default=200)
+    expressions.add_argument("--seed", type=int, default=0)
+    expressions.add_argument("--repeat", type=int, default=3)
+    expressions.set_defaults(handler=bench_expressions)
+
+    ast = commands.add_parser("ast", help="дерево разбора: понижение в ОПС и память на узел")
+    ast.add_argument("--size-mb", type=float, default=1.0)
+    ast.add_argument("--programs", type=int, default=100)
+    ast.add_argument("--seed", type=int, default=0)
+    ast.add_argument("--repeat", type=int, default=3)
+    ast.set_defaults(handler=bench_ast)
+
+    instrumentation = commands.add_parser("instrumentation", help="стоимость счетчиков анализа")
+    instrumentation.add_argument("--size-mb", type=float, default=0.5)
+    instrumentation.add_argument("--repeat", type=int, default=3)
+    instrumentation.set_defaults(handler=bench_instrumentation)
+
+    optimization = commands.add_parser("optimize", help="оптимизация ОПС по уровням")
+    optimization.add_argument("--size-mb", type=float, default=0.1)
+    optimization.add_argument("--programs", type=int, default=50)
+    optimization.add_argument("--seed", type=int, default=0)
+    optimization.add_argument("--repeat", type=int, default=3)
+    optimization.set_defaults(handler=bench_optimize)
+
+    peephole_command = commands.add_parser("peephole", help="оконная оптимизация ОПС на примерах")
+    peephole_command.add_argument("--size-mb", type=float, default=0.1)
+    peephole_command.add_argument("--seed", type=int, default=0)
+    peephole_command.add_argument("--repeat", type=int, default=3)
+    peephole_command.set_defaults(handler=bench_peephole)
+
+    licm = commands.add_parser("licm", help="вынос инвариантов циклов на примерах")
+    licm.add_argument("--size", type=int, default=30)
+    licm.add_argument("--size-mb", type=float, default=0.1)
+    licm.add_argument("--seed", type=int, default=0)
+    licm.add_argument("--repeat", type=int, default=3)
+    licm.set_defaults(handler=bench_licm)
+
+    dead_stores = commands.add_parser("dead-stores", help="удаление мертвых записей и неиспользуемых массивов")
+    dead_stores.add_argument("--statements", type=int, default=200)
+    dead_stores.add_argument("--seed", type=int, default=0)
+    dead_stores.add_argument("--repeat", type=int, default=3)
+    dead_stores.set_defaults(handler=bench_dead_stores)
+
+    types = commands.add_parser("types", help="вывод типов и команды с типами int/float")
+    types.add_argument("--size", type=int, default=60)
+    types.add_argument("--repeat", type=int, default=3)
+    types.set_defaults(handler=bench_types)
+
+    bounds = commands.add_parser("bounds", help="снятие проверок границ массивов в циклах")
+    bounds.add_argument("--size", type=int, default=60)
+    bounds.add_argument("--repeat", type=int, default=3)
+    bounds.set_defaults(handler=bench_bounds)
+
+    slots = commands.add_parser("slots", help="выполнение по слотам переменных против имен")
+    slots.add_argument("--programs", type=int, default=50)
+    slots.add_argument("--size", type=int, default=150)
+    slots.add_argument("--repeat", type=int, default=3)
+    slots.set_defaults(handler=bench_slots)
+
+    fusion = commands.add_parser("superinstructions", help="частые последовательности команд и суперкоманды")
+    fusion.add_argument("--programs", type=int, default=20)
+    fusion.add_argument("--size", type=int, default=150)
+    fusion.add_argument("--lengths", type=int, nargs="+", default=[2, 3, 4])
+    fusion.add_argument("--top", type=int, default=5)
+    fusion.add_argument("--repeat", type=int, default=3)
+    fusion.set_defaults(handler=bench_superinstructions)
+
+    registers = commands.add_parser("registers", help="регистровая машина против стековой")
+    registers.add_argument("--programs", type=int, default=50)
+    registers.add_argument("--size", type=int, default=150)
+    registers.add_argument("--repeat", type=int, default=3)
+    registers.set_defaults(handler=bench_registers)
+
+    cfg = commands.add_parser("cfg", help="граф потока управления и анализ потока данных")
+    cfg.add_argument("--programs", type=int, default=50)
+    cfg.add_argument("--depths", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    cfg.add_argument("--repeat", type=int, default=3)
+    cfg.set_defaults(handler=bench_cfg)
+
+    bytecode = commands.add_parser("bytecode", help="загрузка байт-кода .kbc против компиляции")
+    bytecode.add_argument("--programs", type=int, default=50)
+    bytecode.add_argument("--size-mb", type=float, default=0.25)
+    bytecode.add_argument("--seed", type=int, default=0)
+    bytecode.add_argument("--repeat", type=int, default=3)
+    bytecode.set_defaults(handler=bench_bytecode)
+
+    rotation = commands.add_parser("rotation", help="повернутые циклы while против обычных")
+    rotation.add_argument("--programs", type=int, default=20)
+    rotation.add_argument("--size", type=int, default=40)
+    rotation.add_argument("--depth", type=int, default=9)
+    rotation.add_argument("--repeat", type=int, default=3)
+    rotation.set_defaults(handler=bench_rotation)
+
+    grammar = commands.add_parser("grammar", help="проверка LL(1) грамматики и размера таблицы разбора")
+    grammar.add_argument("--max-entries", type=int, default=PARSE_TABLE_BUDGET)
+    grammar.add_argument("--size-mb", type=float, default=0.5)
+    grammar.add_argument("--repeat", type=int, default=3)
+    grammar.set_defaults(handler=bench_grammar)
+
+    args = parser.parse_args()
+    success = args.handler(args)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import os
+import re
+import sys
+
+from src import expression_parser
+from src.expression_parser import EXPRESSION_NONTERMINALS
+from src.parser import (Parser, CodedGrammar, SYMBOL_TERMINAL, SYMBOL_NONTERMINAL,
+                        SYMBOL_ACTION, shared_parse_table)
+from src.token_type import TokenType
+
+
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "generated_parser.py")
+
+# Стартовые нетерминалы: с них начинает Parser и Parser.start_at_statement
+START_SYMBOLS = ("<Программа>", "<Список операторов>")
+STATEMENT_LIST = "<Список операторов>"
+
+HEADER = '''# Сгенерировано generate_parser.py по таблице Parser.build_parse_table.
+# Не редактировать вручную: после изменения грамматики выполните
+#     python generate_parser.py
+from .expression_parser import EXPRESSION_LOGICAL, EXPRESSION_ARITHMETIC, EXPRESSION_ARRAY_SIZE
+from .parser import Parser
+from .token_type import TokenType
+
+
+class _StopParsing(Exception):
+    """Разбор остановлен statement_hook на границе оператора верхнего уровня"""
+
+
+class GeneratedParser(Parser):
+    """
+    Парсер рекурсивного спуска, построенный по LL(1) таблице: по функции на
+    нетерминал, семантические действия вызываются на своих местах в правилах,
+    хвостовая рекурсия нетерминала на самого себя заменена циклом.
+    Выражения, как и в Parser, разбираются ExpressionParser, а функции
+    нетерминалов выражений нужны только для ошибочных выражений.
+    Выдает ту же ОПС, таблицу символов и те же ошибки, что Parser.parse.
+    Варианты функций с суффиксом _top разбирают цепочку операторов верхнего
+    уровня, на границах которой вызывается statement_hook.
+    """
+
+    def parse(self):
+        start = _START_FUNCTIONS.get(self.grammar.symbols[self.stack[-1]])
+        if start is None:
+            return Parser.parse(self)
+        try:
+            start(self)
+            if self._current_type != TokenType.EOF:
+                self.mismatch_error(TokenType.EOF)
+        except _StopParsing:
+            pass
+        self.rpn_generator.finish()
+        return self.rpn_generator.result(), self.symbol_table
+'''
+
+
+def function_names(nonterminals):
+    """Уникальные имена функций разбора для нетерминалов"""
+    names = {}
+    used = set()
+    for nonterminal in nonterminals:
+        # <Выражение*> - продолжение <Выражение>: суффикс _rest
+        base = "_parse_" + re.sub(r"\W", "_", nonterminal.strip("<>").replace("*", "_rest"))
+        name = base
+        number = 2
+        while name in used:
+            name = f"{base}_{number}"
+            number += 1
+        used.add(name)
+        names[nonterminal] = name
+    return names
+
+
+def tail_closure(table, kinds):
+    """Нетерминалы, достижимые от стартовых только через хвостовые позиции правил"""
+    result = set()
+    pending = list(START_SYMBOLS)
+    while pending:
+        nonterminal = pending.pop()
+        if nonterminal in result:
+            continue
+        result.add(nonterminal)
+        for rule in table.get(nonterminal, {}).values():
+            if rule and kinds(rule[-1]) == SYMBOL_NONTERMINAL:
+                pending.append(rule[-1])
+    return result
+
+
+def token_name(token_type):
+    return f"TokenType.{token_type.name}"
+
+
+def generate(table=None):
+    """Возвращает исходный текст модуля generated_parser.py"""
+    table = table or shared_parse_table()
+    grammar = CodedGrammar(table)
+
+    def kind(symbol):
+        return grammar.kinds[grammar.codes[symbol]]
+
+    nonterminals = [symbol for symbol in grammar.symbols
+                    if symbol is not None and kind(symbol) == SYMBOL_NONTERMINAL]
+    names = function_names(nonterminals)
+    top_level = tail_closure(table, kind)
+    referenced = {symbol for row in table.values() for rule in row.values() for symbol in rule}
+
+    lines = [HEADER]
+    tables = []
+    for number, nonterminal in enumerate(nonterminals):
+        row = table.get(nonterminal, {})
+        alternatives = []
+        choices = {}
+        for token_type, rule in row.items():
+            rule = tuple(rule)
+            if rule not in alternatives:
+                alternatives.append(rule)
+            choices[token_type] = alternatives.index(rule)
+        choice_table = f"_CHOICE_{number}"
+        expected_table = f"_EXPECTED_{number}"
+        tables.append(f"# {nonterminal}")
+        tables.append(f"{choice_table} = {{" + ", ".join(
+            f"{token_name(t)}: {c}" for t, c in choices.items()) + "}")
+        tables.append(f"{expected_table} = (" + "".join(
+            f"{token_name(t)}, " for t in row.keys()).rstrip() + ")")
+
+        selectors = [{t for t, c in choices.items() if c == number} for number in range(len(alternatives))]
+        variants = ([False] if nonterminal in referenced else []) + ([True] if nonterminal in top_level else [])
+        for top in variants:
+            lines.extend(generate_function(nonterminal, alternatives, selectors, names, kind, top, top_level,
+                                           choice_table, expected_table))
+
+    lines.append("")
+    lines.extend(tables)
+    lines.append("")
+    lines.append("_START_FUNCTIONS = {")
+    for symbol in START_SYMBOLS:
+        lines.append(f"    {symbol!r}: GeneratedParser.{names[symbol]}_top,")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_function(nonterminal, alternatives, selectors, names, kind, top, top_level,
+                      choice_table, expected_table):
+    name = names[nonterminal] + ("_top" if top else "")
+    self_tail = any(rule and rule[-1] == nonterminal for rule in alternatives)
+    lines = ["", f"    def {name}(self):", f'        """{nonterminal}"""']
+    indent = "        "
+    expression = EXPRESSION_NONTERMINALS.get(nonterminal)
+    if expression is not None:
+        constant = next(constant for constant, value in vars(expression_parser).items()
+                        if constant.startswith("EXPRESSION_") and value == expression)
+        lines.append(f"{indent}if self.expression_parser is not None and self.expression_parser.parse({constant}):")
+        lines.append(f"{indent}    return")
+    if self_tail:
+        lines.append(indent + "while True:")
+        indent += "    "
+    lines.append(f"{indent}choice = {choice_table}.get(self._current_type)")
+    lines.append(f"{indent}if choice is None:")
+    lines.append(f"{indent}    self.no_rule_error({nonterminal!r}, {expected_table})")
+    if top and nonterminal == STATEMENT_LIST:
+        lines.append(f"{indent}if self.statement_hook is not None and self.statement_hook(self):")
+        lines.append(f"{indent}    raise _StopParsing()")
+
+    for number, rule in enumerate(alternatives):
+        if len(alternatives) > 1:
+            keyword = "if" if number == 0 else "elif"
+            lines.append(f"{indent}{keyword} choice == {number}:")
+            body_indent = indent + "    "
+        else:
+            body_indent = indent
+        body = []
+        loops = bool(rule) and rule[-1] == nonterminal
+        symbols = rule[:-1] if loops else rule
+        # Типы, которым заведомо принадлежит текущий токен: правило выбрано по
+        # нему, а семантические действия токены не потребляют
+        known = selectors[number]
+        for position, symbol in enumerate(symbols):
+            tail = position == len(rule) - 1
+            body.extend(generate_symbol(symbol, names, kind, top and tail and symbol in top_level, known))
+            if kind(symbol) != SYMBOL_ACTION:
+                known = None
+        if self_tail:
+            body.append("continue" if loops else "return")
+        if not body:
+            body.append("pass")
+        lines.extend(body_indent + line if line else "" for line in body)
+    return lines
+
+
+def generate_symbol(symbol, names, kind, top, known):
+    symbol_kind = kind(symbol)
+    if symbol_kind == SYMBOL_TERMINAL:
+        if symbol == TokenType.EOF:
+            raise ValueError("EOF в правой части правила не поддерживается генератором")
+        lines = []
+        if known != {symbol}:
+            lines.append(f"if self._current_type != {token_name(symbol)}:")
+            lines.append(f"    self.mismatch_error({token_name(symbol)})")
+        if symbol == TokenType.INTEGER_CONST or symbol == TokenType.FLOAT_CONST:
+            lines.append("self.rpn_generator.add_constant(self._current_value)")
+        lines.append("self.advance()")
+        return lines
+    if symbol_kind == SYMBOL_NONTERMINAL:
+        return [f"self.{names[symbol]}{'_top' if top else ''}()"]
+    if symbol_kind == SYMBOL_ACTION:
+        method = "_action_" + symbol.strip("<>")
+        if not hasattr(Parser, method):
+            return [f"# {symbol}: нет семантического действия"]
+        return [f"self.{method}()"]
+    return [f"self.mismatch_error({symbol!r})"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор парсера рекурсивного спуска по LL(1) таблице")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="путь к создаваемому модулю")
+    parser.add_argument("--check", action="store_true",
+                        help="только проверить, что модуль соответствует текущей грамматике")
+    args = parser.parse_args()
+
+    source = generate()
+    if args.check:
+        try:
+            with open(args.output, 'r', encoding='utf-8') as file:
+                current = file.read()
+        except FileNotFoundError:
+            current = None
+        if current != source:
+            print(f"{args.output} устарел: выполните python generate_parser.py")
+            sys.exit(1)
+        print(f"{args.output} соответствует грамматике")
+        return
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        file.write(source)
+    print(f"Записан {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from .ast_nodes import (ArrayAccess, ArrayAssign, ArrayDeclaration, Assign, BinaryOp, Constant, If, Input,
+                        ListLiteral, Name, Output, Program, UnaryOp, VariableDeclaration, While)
+from .rpn_generator import RPNGenerator
+
+
+# Бинарные операторы выражений (символы RPNGenerator)
+BINARY_OPERATORS = frozenset('+-*/<>?!&|')
+
+
+class ASTBuilder(RPNGenerator):
+    """
+    Генератор для режима дерева разбора: Parser вызывает те же методы, что
+    и у RPNGenerator, но вместо команд ОПС строятся узлы ast_nodes.
+
+    Операнды и операции выражений собираются на стеке значений, как их
+    выдала бы ОПС; операторы присваивания, ввода, вывода и объявления
+    добавляются в текущий блок. Условный переход $JF открывает блок
+    if/while, а заполнение его адреса закрывает: цикл отличается переходом
+    на известный адрес, а else - безусловным переходом с заполнителем.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.values = []        # Стек узлов выражений
+        self.lists = []         # Глубина стека значений в начале каждого открытого списка {...}
+        self.body = []          # Операторы верхнего уровня
+        self.blocks = [self.body]  # Текущий блок операторов - последний
+        self.branches = []      # Открытые if/while: [узел If, это цикл]
+        self.declaration = None  # Объявление, ожидающее инициализатора
+
+    def add_identifier(self, name):
+        self.values.append(Name(name))
+
+    def add_constant(self, value):
+        if isinstance(value, str):
+            value = self.parse_constant(value)
+        self.values.append(Constant(self.constant_pool.intern(value)))
+
+    def add_operator(self, operator):
+        values = self.values
+        if operator in BINARY_OPERATORS:
+            right = values.pop()
+            values.append(BinaryOp(operator, values.pop(), right))
+        elif operator == '~':
+            values.append(UnaryOp(operator, values.pop()))
+        elif operator == 'array_index':
+            index = values.pop()
+            values.append(ArrayAccess(values.pop().name, index))
+        elif operator == '=':
+            value = values.pop()
+            if values:
+                self._add_statement(Assign(values.pop().name, value))
+            else:
+                # int name = value;
+                self._take_declaration().value = value
+        elif operator == 'array_assign':
+            value = values.pop()
+            index = values.pop()
+            if values:
+                self._add_statement(ArrayAssign(values.pop().name, index, value))
+            else:
+                # int name[size] = value;
+                declaration = self._take_declaration()
+                declaration.size = index
+                declaration.value = value
+        elif operator == 'w':
+            self._add_statement(Output(values.pop()))
+        elif operator == 'r':
+            self._add_statement(Input(values.pop().name))
+        elif operator == 'r_array':
+            index = values.pop()
+            self._add_statement(Input(values.pop().name, index))
+        elif operator == 'DECL_ARR':
+            values.pop()  # Имя массива уже записано в объявлении
+            self._take_declaration().size = values.pop()
+        else:
+            raise ValueError(f"Неизвестный оператор: {operator}")
+
+    def add_declaration(self, name, data_type, is_array):
+        node = ArrayDeclaration(data_type, name) if is_array else VariableDeclaration(data_type, name)
+        self._add_statement(node)
+        self.declaration = node
+
+    def begin_list(self):
+        self.lists.append(len(self.values))
+
+    def end_list(self):
+        start = self.lists.pop()
+        node = ListLiteral(self.values[start:])
+        del self.values[start:]
+        if not self.lists and isinstance(self.declaration, ArrayDeclaration):
+            # int [] name = {...};
+            self._take_declaration().initializer = node
+        else:
+            self.values.append(node)
+
+    def add_conditional_jump(self):
+        node = If(self.values.pop(), [])
+        self._add_statement(node)
+        self.blocks.append(node.body)
+        self.branches.append([node, False])
+        return node, False
+
+    def add_unconditional_jump_placeholder(self):
+        node = self.branches[-1][0]
+        node.orelse = []
+        self.blocks[-1] = node.orelse
+        return node, True
+
+    def add_jump_to_known_target(self, target_label):
+        self.branches[-1][1] = True
+
+    def add_loop_condition_jump(self, loop_start):
+        return self.add_conditional_jump()
+
+    def add_loop_end(self, jf_address_index):
+        # Поворот цикла - дело генератора ОПС, которому дерево передает lower
+        self.add_jump_to_known_target(None)
+        self.patch_jump_address(jf_address_index, None)
+
+    def patch_jump_address(self, rpn_placeholder_index, target_address):
+        node, is_else_jump = rpn_placeholder_index
+        if node.orelse is not None and not is_else_jump:
+            return  # Переход $JF на начало блока else: if еще не закончен
+        _, is_loop = self.branches.pop()
+        self.blocks.pop()
+        if is_loop:
+            self.blocks[-1][-1] = While(node.condition, node.body)
+
+    def get_current_index(self):
+        """Адресов ОПС у дерева нет: возвращается число операторов текущего блока"""
+        return len(self.blocks[-1])
+
+    def mark(self):
+        return len(self.values), len(self.lists)
+
+    def rewind(self, mark):
+        values, lists = mark
+        del self.values[values:]
+        del self.lists[lists:]
+        self.operator_stack.clear()
+
+    def result(self):
+        """Результат генерации: дерево программы Program"""
+        return Program(self.body)
+
+    def flush(self):
+        """Дерево строится целиком: передавать в sink нечего"""
+
+    def _add_statement(self, node):
+        self.blocks[-1].append(node)
+
+    def _take_declaration(self):
+        declaration = self.declaration
+        if declaration is None:
+            raise ValueError("ASTBuilder: инициализация без объявления")
+        self.declaration = None
+        return declaration
@@ -0,0 +1,302 @@
+from .rpn_generator import RPNGenerator
+
+
+class Node:
+    """
+    Узел дерева разбора. Поля перечислены в __slots__ каждого класса:
+    у узлов нет __dict__, поэтому дерево большой программы компактно.
+    Метод lower(generator) выдает ОПС узла через RPNGenerator - ту же,
+    что выдает разбор без дерева.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+
+def _lower_block(statements, generator):
+    for statement in statements:
+        statement.lower(generator)
+
+
+# Выражения
+
+class Constant(Node):
+    """Числовая константа (int или float)"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def lower(self, generator):
+        generator.add_constant(self.value)
+
+
+class Name(Node):
+    """Переменная"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def lower(self, generator):
+        generator.add_identifier(self.name)
+
+
+class ArrayAccess(Node):
+    """Элемент массива name[index]"""
+
+    __slots__ = ('name', 'index')
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def lower(self, generator):
+        generator.add_identifier(self.name)
+        self.index.lower(generator)
+        generator.add_operator('array_index')
+
+
+class UnaryOp(Node):
+    """Унарная операция: operator - символ RPNGenerator ('~')"""
+
+    __slots__ = ('operator', 'operand')
+
+    def __init__(self, operator, operand):
+        self.operator = operator
+        self.operand = operand
+
+    def lower(self, generator):
+        self.operand.lower(generator)
+        generator.add_operator(self.operator)
+
+
+class BinaryOp(Node):
+    """
+    Бинарная операция: operator - символ RPNGenerator ('+', '<', '&', ...).
+    Для '?' команда ОПС не порождается, как и при разборе без дерева.
+    """
+
+    __slots__ = ('operator', 'left', 'right')
+
+    def __init__(self, operator, left, right):
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+    def lower(self, generator):
+        self.left.lower(generator)
+        self.right.lower(generator)
+        generator.add_operator(self.operator)
+
+
+class ListLiteral(Node):
+    """Список {e1, e2, ...}: в ОПС - его элементы подряд"""
+
+    __slots__ = ('elements',)
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def lower(self, generator):
+        for element in self.elements:
+            element.lower(generator)
+
+
+# Операторы
+
+class VariableDeclaration(Node):
+    """
+    int name; / int name = value; / int name[size] = value;
+    В ОПС попадает только инициализация: value ASSIGN или
+    size value ARRAY_ASSIGN (без имени переменной).
+    """
+
+    __slots__ = ('data_type', 'name', 'size', 'value')
+
+    def __init__(self, data_type, name, size=None, value=None):
+        self.data_type = data_type
+        self.name = name
+        self.size = size
+        self.value = value
+
+    def lower(self, generator):
+        if self.value is None:
+            return
+        if self.size is None:
+            self.value.lower(generator)
+            generator.add_operator('=')
+        else:
+            self.size.lower(generator)
+            self.value.lower(generator)
+            generator.add_operator('array_assign')
+
+
+class ArrayDeclaration(Node):
+    """
+    int [size] name; - size name DECL_ARR
+    int [] name = {...}; - в ОПС только элементы списка initializer
+    """
+
+    __slots__ = ('data_type', 'name', 'size', 'initializer')
+
+    def __init__(self, data_type, name, size=None, initializer=None):
+        self.data_type = data_type
+        self.name = name
+        self.size = size
+        self.initializer = initializer
+
+    def lower(self, generator):
+        if self.size is not None:
+            self.size.lower(generator)
+            generator.add_identifier(self.name)
+            generator.add_operator('DECL_ARR')
+        elif self.initializer is not None:
+            self.initializer.lower(generator)
+
+
+class Assign(Node):
+    """name = value;"""
+
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def lower(self, generator):
+        generator.add_identifier(self.name)
+        self.value.lower(generator)
+        generator.add_operator('=')
+
+
+class ArrayAssign(Node):
+    """name[index] = value;"""
+
+    __slots__ = ('name', 'index', 'value')
+
+    def __init__(self, name, index, value):
+        self.name = name
+        self.index = index
+        self.value = value
+
+    def lower(self, generator):
+        generator.add_identifier(self.name)
+        self.index.lower(generator)
+        self.value.lower(generator)
+        generator.add_operator('array_assign')
+
+
+class If(Node):
+    """if (condition) { body } [else { orelse }]: orelse - None без else"""
+
+    __slots__ = ('condition', 'body', 'orelse')
+
+    def __init__(self, condition, body, orelse=None):
+        self.condition = condition
+        self.body = body
+        self.orelse = orelse
+
+    def lower(self, generator):
+        self.condition.lower(generator)
+        jf_address_index = generator.add_conditional_jump()
+        _lower_block(self.body, generator)
+        if self.orelse is None:
+            generator.patch_jump_address(jf_address_index, generator.get_current_index())
+            return
+        j_address_index = generator.add_unconditional_jump_placeholder()
+        generator.patch_jump_address(jf_address_index, generator.get_current_index())
+        _lower_block(self.orelse, generator)
+        generator.patch_jump_address(j_address_index, generator.get_current_index())
+
+
+class While(Node):
+    """while (condition) { body }"""
+
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
+    def lower(self, generator):
+        loop_start = generator.begin_loop()
+        self.condition.lower(generator)
+        jf_address_index = generator.add_loop_condition_jump(loop_start)
+        _lower_block(self.body, generator)
+        generator.add_loop_end(jf_address_index)
+
+
+class Input(Node):
+    """input name; / input name[index];"""
+
+    __slots__ = ('name', 'index')
+
+    def __init__(self, name, index=None):
+        self.name = name
+        self.index = index
+
+    def lower(self, generator):
+        generator.add_identifier(self.name)
+        if self.index is None:
+            generator.add_operator('r')
+        else:
+            self.index.lower(generator)
+            generator.add_operator('r_array')
+
+
+class Output(Node):
+    """output value;"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def lower(self, generator):
+        self.value.lower(generator)
+        generator.add_operator('w')
+
+
+class Program(Node):
+    """Программа - список операторов верхнего уровня"""
+
+    __slots__ = ('body',)
+
+    def __init__(self, body):
+        self.body = body
+
+    def lower(self, generator):
+        _lower_block(self.body, generator)
+
+
+def lower(node, generator=None):
+    """
+    Переводит дерево (обычно Program) в ОПС. Возвращает список команд -
+    тот же, что выдает Parser без дерева.
+    """
+    generator = generator or RPNGenerator()
+    node.lower(generator)
+    generator.finish()
+    return generator.result()
+
+
+def iter_nodes(node):
+    """Обходит дерево в глубину (узел, затем его потомки)"""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        children = []
+        for name in node.__slots__:
+            value = getattr(node, name)
+            if isinstance(value, Node):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(value)
+        pending.extend(reversed(children))
@@ -0,0 +1,461 @@
+from .control_flow import ControlFlowGraph, DataflowProblem, solve_dataflow, variable_accesses
+from .rpn_analysis import JUMP_OPERATIONS, TYPED_OPERATIONS, UNCHECKED_OPERATIONS, is_variable
+
+
+# Диапазон целого значения: (нижняя граница, верхняя граница, нижняя
+# граница через переменную, верхняя граница через переменную). Граница
+# через переменную - пара (имя, сдвиг): "не меньше n - 1" - ("n", -1).
+# None - граница неизвестна. Значение без диапазона (None) - не int или
+# неизвестно что
+_ANY_INT = (None, None, None, None)
+_BOOLEAN = (0, 1, None, None)
+
+_COMPARISONS = frozenset(("EQUALS", "NEQ", "LT", "GT"))
+_NARROWING_PASSES = 2
+_UNCHECKED = {generic: unchecked for unchecked, generic in UNCHECKED_OPERATIONS.items()}
+
+
+def eliminate_bounds_checks(rpn, eliminated=None):
+    """
+    Снятие проверок границ массивов: ARRAY_INDEX и ARRAY_ASSIGN, индекс
+    которых доказанно попадает в массив, заменяются командами без
+    проверок (ARRAY_INDEX_UNCHECKED, ARRAY_ASSIGN_UNCHECKED). Остальные
+    обращения сохраняют проверки и сообщения об ошибках.
+
+    Доказательство - анализ диапазонов прямой задачей потока данных по
+    графу (control_flow). Для целых переменных известны границы -
+    числами и через другие переменные (i <= n - 1), для массивов - длина
+    из размера DECL_ARR. Переходы $JF и $JT уточняют диапазоны на ребрах
+    условием (в теле while (i < n) известно i <= n - 1); в заголовках
+    циклов границы, которые меняются между итерациями решателя,
+    забываются (расширение), поэтому решение находится за конечное
+    число шагов. Затем несколько проходов без расширения (сужение)
+    возвращают границы, которые дают условия на ребрах перед заголовком:
+    в повернутом цикле (см. RPNGenerator.add_loop_end) условие проверяется
+    до заголовка - начала тела. Запись переменной забывает границы, выраженные через
+    нее, запись имени массива - его длину.
+
+    Обращение без проверок требует, чтобы имя было массивом известной
+    длины, а индекс - int с границами 0 <= индекс < длины: тогда
+    ARRAY_INDEX и ARRAY_ASSIGN не вызвали бы ошибку и получили бы тот же
+    элемент. Если стек не пуст на границе участков или ОПС нельзя
+    промоделировать, ОПС не меняется. Если задан список eliminated, в
+    него добавляется каждая поставленная команда без проверок.
+
+    Returns:
+        list: Новая ОПС (исходная не изменяется)
+    """
+    if not any(instruction.__class__ is str and instruction in _UNCHECKED for instruction in rpn):
+        return rpn  # Обращений к массивам нет
+    try:
+        cfg = ControlFlowGraph(rpn)
+    except ValueError:
+        return rpn
+    if variable_accesses(cfg) is None:
+        return rpn
+    names = {instruction for instruction in rpn if is_variable(instruction)}
+    problem = _RangeProblem(cfg, names)
+    try:
+        _, outgoing = solve_dataflow(cfg, problem)
+        problem.narrow(outgoing, _NARROWING_PASSES)
+    except _Unsimulated:
+        return rpn
+
+    result = list(rpn)
+    changed = False
+    for block in cfg.blocks:
+        entry = problem.entries[block.number]
+        if entry is None or block.start is None:
+            continue  # Участок недостижим
+        for index, instruction in problem.proven_accesses(block.number, entry):
+            result[block.start + index] = _UNCHECKED[instruction]
+            changed = True
+            if eliminated is not None:
+                eliminated.append(_UNCHECKED[instruction])
+    return result if changed else rpn
+
+
+class _Unsimulated(Exception):
+    """Значение переходит на стеке из участка в участок, или команду нельзя промоделировать"""
+
+
+class _RangeProblem(DataflowProblem):
+    """
+    Прямая задача: состояние - (диапазоны целых переменных, длины
+    массивов, имена, через которые могут быть выражены границы) или None
+    для недостижимого участка. Значение в конце участка - (состояние,
+    участок условного перехода, условия для ребер).
+    """
+
+    def __init__(self, cfg, names):
+        self.cfg = cfg
+        self.initial = ({name: (0, 0, None, None) for name in names}, {}, frozenset())  # Неопределенная - 0
+        # Заголовки циклов - участки, куда ведут обратные (по порядку обхода) ребра
+        order = cfg.reverse_postorder()
+        position = {number: index for index, number in enumerate(order)}
+        self.headers = {successor for number in order for successor in cfg.blocks[number].successors
+                        if position.get(successor, -1) <= position[number]}
+        self.entries = [None] * len(cfg.blocks)  # Состояние в начале участка (после расширения)
+
+    def boundary(self):
+        return self.initial
+
+    def top(self):
+        return None
+
+    def meet(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return _join_all(left[0], right[0]), _join_all(left[1], right[1]), left[2] | right[2]
+
+    def edge(self, source, target, value):
+        if value is None:
+            return None
+        state, jump_target, when_true, when_false = value
+        fallthrough = self.cfg.blocks[source].fallthrough
+        if jump_target is None or jump_target == fallthrough:
+            return state
+        return _refine(state, when_false if target == jump_target else when_true)
+
+    def transfer(self, number, value):
+        if value is None:
+            return None
+        if number in self.headers and self.entries[number] is not None:
+            value = _widen(self.entries[number], value)
+        self.entries[number] = value
+        return self._simulate(number, value, None)
+
+    def narrow(self, outgoing, passes):
+        """
+        Проходы сужения по решению solve_dataflow: состояния участков
+        пересчитываются по концам предшественников без расширения
+        (outgoing обновляется на месте). Решение остается верным: каждое
+        состояние получается из верных состояний предшественников.
+        Пересчитываются заголовки повернутых циклов (на них ведет $JT:
+        условие уточняет состояние до расширения) и участки циклов, у
+        предшественников которых изменилось состояние. Участки после
+        цикла сохраняют прежние, более широкие состояния.
+        """
+        cfg = self.cfg
+        pending = {block.code[-1] for block in cfg.blocks
+                   if len(block.code) >= 2 and block.code[-2] == "$JT" and block.code[-1] in self.headers}
+        if not pending:
+            return
+        order = cfg.reverse_postorder()
+        in_loops = {number for loop in cfg.loops() for number in loop.body}
+        for _ in range(passes):
+            for number in order:
+                if number not in pending:
+                    continue
+                pending.discard(number)
+                block = cfg.blocks[number]
+                value = self.initial if number == cfg.entry else None
+                for predecessor in block.predecessors:
+                    value = self.meet(value, self.edge(predecessor, number, outgoing[predecessor]))
+                if value is None:
+                    continue
+                self.entries[number] = value
+                value = self._simulate(number, value, None)
+                if value != outgoing[number]:
+                    outgoing[number] = value
+                    pending.update(successor for successor in block.successors if successor in in_loops)
+
+    def proven_accesses(self, number, state):
+        """Обращения к массивам участка, индекс которых доказан: (номер в code, команда)"""
+        found = []
+        self._simulate(number, state, found)
+        return found
+
+    def _simulate(self, number, state, found):
+        ranges, lengths = dict(state[0]), dict(state[1])
+        referenced = set(state[2])
+        stack = []
+        version = 0  # Число записей: условие верно, пока переменные не менялись
+
+        def pop():
+            if not stack:
+                raise _Unsimulated
+            return stack.pop()
+
+        def pop_name():
+            if not stack or stack[-1].__class__ is not str:
+                raise _Unsimulated
+            return stack.pop()
+
+        def operand(entry):
+            # (имя или None, диапазон); имя разыменовывается, когда его снимает команда
+            if entry.__class__ is str:
+                value = ranges.get(entry)
+                if value is None:
+                    return entry, None
+                low, high, symbolic_low, symbolic_high = value
+                return entry, (low, high, symbolic_low or (entry, 0), symbolic_high or (entry, 0))
+            return None, entry[0]
+
+        def assign(name, value, length=None):
+            nonlocal version
+            version += 1
+            _forget(ranges, lengths, name, referenced)
+            if value is not None:
+                ranges[name] = value = _without(value, name)
+                referenced.update(bound[0] for bound in value[2:] if bound is not None)
+            if length is not None:
+                lengths[name] = length = _without(length, name)
+                referenced.update(bound[0] for bound in length[2:] if bound is not None)
+
+        code = self.cfg.blocks[number].code
+        jump_target = None
+        when_true = when_false = ()
+        index = 0
+        while index < len(code):
+            instruction = code[index]
+            if instruction.__class__ is int:
+                stack.append(((instruction, instruction, None, None), (), (), version))
+            elif instruction.__class__ is float:
+                stack.append((None, (), (), version))
+            elif instruction in JUMP_OPERATIONS:
+                if instruction != "$J":
+                    entry = pop()
+                    jump_target = code[index + 1]
+                    if entry.__class__ is not str and entry[3] == version:
+                        when_true, when_false = entry[1], entry[2]
+                        if instruction == "$JT":
+                            when_true, when_false = when_false, when_true  # Переход - при истинном
+                index += 1
+            elif is_variable(instruction):
+                stack.append(instruction)
+            elif instruction == "UNARY_MINUS":
+                value = operand(pop())[1]
+                stack.append(((_negate(value[1]), _negate(value[0]), None, None) if value else None, (), (), version))
+            elif instruction in TYPED_OPERATIONS or instruction in _COMPARISONS or instruction in (
+                    "PLUS", "MINUS", "MULTIPLY", "DIVIDE", "AND", "OR"):
+                instruction = TYPED_OPERATIONS.get(instruction, instruction)
+                right_entry = pop()
+                left_entry = pop()
+                right = operand(right_entry)
+                left = operand(left_entry)
+                stack.append(_binary(instruction, left, right, left_entry, right_entry, version))
+            elif instruction == "ASSIGN":
+                values = []
+                while stack and stack[-1].__class__ is not str:
+                    values.append(stack.pop()[0])
+                name = pop_name()
+                if len(values) == 1:
+                    assign(name, values[0])
+                else:
+                    assign(name, None, (len(values), len(values), None, None))  # Список значений
+            elif instruction == "DECL_ARR":
+                name = pop_name()
+                size = operand(pop())[1]
+                if size is not None:
+                    # После DECL_ARR размер заведомо положителен
+                    low = size[0]
+                    size = (1 if low is None or low < 1 else low,) + size[1:]
+                assign(name, None, size)
+            elif instruction == "$r":
+                assign(pop_name(), None)
+            elif instruction == "$w":
+                pop()
+            elif instruction in ("ARRAY_INDEX", "ARRAY_ASSIGN", *UNCHECKED_OPERATIONS):
+                generic = UNCHECKED_OPERATIONS.get(instruction, instruction)
+                if generic == "ARRAY_ASSIGN":
+                    operand(pop())
+                position = operand(pop())[1]
+                name = pop_name()
+                if found is not None and _in_bounds(ranges, position, lengths.get(name)):
+                    found.append((index, generic))
+                if generic == "ARRAY_INDEX":
+                    stack.append((None, (), (), version))  # Элемент - любое значение
+            elif instruction == "r_array":
+                operand(pop())
+                pop_name()
+            else:
+                raise _Unsimulated
+            index += 1
+        if stack:
+            raise _Unsimulated
+        return (ranges, lengths, frozenset(referenced)), jump_target, when_true, when_false
+
+
+def _binary(instruction, left, right, left_entry, right_entry, version):
+    """Запись стека для результата бинарной команды: (диапазон, условия если верно, если неверно, версия)"""
+    if instruction in _COMPARISONS:
+        if instruction == "LT":
+            when_true, when_false = ((left, right, True),), ((right, left, False),)
+        elif instruction == "GT":
+            when_true, when_false = ((right, left, True),), ((left, right, False),)
+        elif instruction == "EQUALS":
+            when_true, when_false = ((left, right, False), (right, left, False)), ()
+        else:
+            when_true, when_false = (), ((left, right, False), (right, left, False))
+        return _BOOLEAN, when_true, when_false, version
+    if instruction == "AND" or instruction == "OR":
+        left_facts = left_entry[1:3] if left_entry.__class__ is not str and left_entry[3] == version else ((), ())
+        right_facts = right_entry[1:3] if right_entry.__class__ is not str and right_entry[3] == version else ((), ())
+        if instruction == "AND":
+            return _BOOLEAN, left_facts[0] + right_facts[0], (), version
+        return _BOOLEAN, (), left_facts[1] + right_facts[1], version
+    left, right = left[1], right[1]
+    if left is None or right is None or instruction == "DIVIDE":
+        return None, (), (), version  # Не int или деление (float)
+    if instruction == "PLUS":
+        value = (_add(left[0], right[0]), _add(left[1], right[1]),
+                 _shift(left[2], right[0]) or _shift(right[2], left[0]),
+                 _shift(left[3], right[1]) or _shift(right[3], left[1]))
+    elif instruction == "MINUS":
+        value = (_add(left[0], _negate(right[1])), _add(left[1], _negate(right[0])),
+                 _shift(left[2], _negate(right[1])), _shift(left[3], _negate(right[0])))
+    elif None in left[:2] or None in right[:2]:
+        value = _ANY_INT
+    else:
+        products = [a * b for a in left[:2] for b in right[:2]]
+        value = (min(products), max(products), None, None)
+    return value, (), (), version
+
+
+def _add(left, right):
+    return None if left is None or right is None else left + right
+
+
+def _negate(value):
+    return None if value is None else -value
+
+
+def _shift(bound, offset):
+    """Граница через переменную, сдвинутая на число offset (None, если его нет)"""
+    if bound is None or offset is None:
+        return None
+    return bound[0], bound[1] + offset
+
+
+def _without(value, name):
+    """Диапазон без границ, выраженных через переменную name"""
+    low, high, symbolic_low, symbolic_high = value
+    if symbolic_low is not None and symbolic_low[0] == name:
+        symbolic_low = None
+    if symbolic_high is not None and symbolic_high[0] == name:
+        symbolic_high = None
+    return low, high, symbolic_low, symbolic_high
+
+
+def _forget(ranges, lengths, name, referenced):
+    """
+    Запись переменной name: ее прежние диапазон и длина и границы через
+    нее больше не верны. referenced - имена, через которые выражены
+    границы (надмножество), чтобы не просматривать все диапазоны.
+    """
+    ranges.pop(name, None)
+    lengths.pop(name, None)
+    if name not in referenced:
+        return
+    for known in (ranges, lengths):
+        for other, value in known.items():
+            if (value[2] is not None and value[2][0] == name) or (value[3] is not None and value[3][0] == name):
+                known[other] = _without(value, name)
+
+
+def _refine(state, facts):
+    """Состояние на ребре, где верны факты (меньшее, большее, строго ли)"""
+    if not facts:
+        return state
+    ranges = dict(state[0])
+    referenced = set(state[2])
+    for (smaller_name, smaller), (larger_name, larger), strict in facts:
+        if smaller is None or larger is None:
+            continue  # Сравнение не двух int: i < 2.5 не дает i <= 1.5
+        step = 1 if strict else 0
+        if smaller_name is not None and smaller_name in ranges:
+            low, high, symbolic_low, symbolic_high = ranges[smaller_name]
+            limit = _add(larger[1], -step)
+            high = limit if high is None else high if limit is None else min(high, limit)
+            candidate = _shift(larger[3], -step)
+            if candidate is not None and candidate[0] != smaller_name:
+                symbolic_high = _tighter(symbolic_high, candidate, min)
+                referenced.add(candidate[0])
+            ranges[smaller_name] = (low, high, symbolic_low, symbolic_high)
+        if larger_name is not None and larger_name in ranges:
+            low, high, symbolic_low, symbolic_high = ranges[larger_name]
+            limit = _add(smaller[0], step)
+            low = limit if low is None else low if limit is None else max(low, limit)
+            candidate = _shift(smaller[2], step)
+            if candidate is not None and candidate[0] != larger_name:
+                symbolic_low = _tighter(symbolic_low, candidate, max)
+                referenced.add(candidate[0])
+            ranges[larger_name] = (low, high, symbolic_low, symbolic_high)
+    return ranges, state[1], frozenset(referenced)
+
+
+def _tighter(known, candidate, choose):
+    """Из двух границ через переменные: через одну - точнейшая, иначе уже известная"""
+    if known is None:
+        return candidate
+    if known[0] == candidate[0]:
+        return known[0], choose(known[1], candidate[1])
+    return known
+
+
+def _join(left, right):
+    """Диапазон, верный для значений обоих диапазонов"""
+    low = None if left[0] is None or right[0] is None else min(left[0], right[0])
+    high = None if left[1] is None or right[1] is None else max(left[1], right[1])
+    symbolic_low = symbolic_high = None
+    if left[2] is not None and right[2] is not None and left[2][0] == right[2][0]:
+        symbolic_low = left[2][0], min(left[2][1], right[2][1])
+    if left[3] is not None and right[3] is not None and left[3][0] == right[3][0]:
+        symbolic_high = left[3][0], max(left[3][1], right[3][1])
+    return low, high, symbolic_low, symbolic_high
+
+
+def _join_all(left, right):
+    if left == right:
+        return left
+    joined = {}
+    for name, value in left.items():
+        other = right.get(name)
+        if other is not None:
+            joined[name] = value if value == other else _join(value, other)
+    return joined
+
+
+def _widen(previous, current):
+    """Расширение в заголовке цикла: границы, изменившиеся с прошлого прохода, забываются"""
+    if previous == current:
+        return current
+    widened = []
+    for old, known in zip(previous[:2], current[:2]):
+        result = {}
+        for name, value in known.items():
+            before = old.get(name)
+            if before == value:
+                result[name] = value
+            elif before is not None:
+                result[name] = tuple(field if field == before[position] else None
+                                     for position, field in enumerate(value))
+        widened.append(result)
+    return widened[0], widened[1], current[2]
+
+
+def _in_bounds(ranges, position, length):
+    """Доказано ли 0 <= position < length (диапазоны индекса и длины массива)"""
+    if position is None or length is None:
+        return False
+    low, high, symbolic_low, symbolic_high = position
+    if low is None or low < 0:
+        base = ranges.get(symbolic_low[0]) if symbolic_low is not None else None
+        if base is None or base[0] is None or base[0] + symbolic_low[1] < 0:
+            return False
+    if high is not None and length[0] is not None and high < length[0]:
+        return True
+    if symbolic_high is not None:
+        if length[2] is not None and length[2][0] == symbolic_high[0] and symbolic_high[1] < length[2][1]:
+            return True
+        base = ranges.get(symbolic_high[0])
+        if base is not None and base[1] is not None and length[0] is not None and \
+                base[1] + symbolic_high[1] < length[0]:
+            return True
+    if high is not None and length[2] is not None:
+        base = ranges.get(length[2][0])
+        return base is not None and base[0] is not None and high < base[0] + length[2][1]
+    return False
@@ -0,0 +1,223 @@
+import hashlib
+import io
+import mmap
+import struct
+import sys
+from array import array
+
+from .rpn_analysis import JUMP_OPERATIONS, RPN_OPERATIONS, TYPED_OPERATIONS
+from .slot_resolution import SlotProgram
+from .superinstructions import BRANCH_OPERATIONS
+
+
+# Формат файла .kbc (все числа little-endian):
+#   заголовок HEADER: сигнатура, версия формата, флаги, SHA-256 исходного
+#       текста, число слов кода, переходов, констант и имен, длина пула
+#       констант и таблицы имен в байтах;
+#   код: по слову int32 на каждый элемент ОПС (или SlotProgram.code);
+#   таблица переходов: int32-позиции команд перехода в коде ($J/$JF/$JT,
+#       в SlotProgram - и суперкоманд сравнения с переходом);
+#   пул констант: для каждой константы байт вида и ее значение;
+#   таблица имен: имена в UTF-8 через "\n".
+MAGIC = b"KBC\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH32sIIIIII")
+
+# Флаги заголовка
+FLAG_SLOT_PROGRAM = 1  # Код - SlotProgram, а не ОПС
+
+# Слово кода: (индекс << 2) | вид
+_OPCODE, _CONSTANT, _NAME, _NUMBER = range(4)
+# Неотрицательные целые меньше _NUMBER_LIMIT (адреса, слоты, небольшие
+# константы) хранятся в самом слове
+_NUMBER_LIMIT = 1 << 29
+_NUMBERS = range(_NUMBER_LIMIT)
+
+# Команды ОПС и SlotProgram; номер команды - индекс в кортеже.
+# Новые команды добавляются только в конец, иначе меняется FORMAT_VERSION
+OPCODES = tuple(sorted(RPN_OPERATIONS)) + (
+    "PUSH", "LOAD", "LOAD_INIT", "LOAD_DEFINED", "STORE", "STORE_LIST", "LOAD_ELEM", "STORE_ELEM",
+    "INPUT", "INPUT_ELEM", "OUTPUT",
+    "INC_VAR", "LT_JF", "GT_JF", "NEQ_JF", "LOAD_ELEM_VAR",
+) + tuple(TYPED_OPERATIONS) + ("LOAD_ELEM_UNCHECKED", "STORE_ELEM_UNCHECKED", "LOAD_ELEM_VAR_UNCHECKED") + (
+    "$JT", "LT_JT", "GT_JT", "NEQ_JT",
+)
+_OPCODE_INDEX = {opcode: index for index, opcode in enumerate(OPCODES)}
+
+# Виды констант пула
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+_INT_CONSTANT, _FLOAT_CONSTANT, _BIG_INT_CONSTANT = b"i", b"f", b"I"
+
+
+def source_hash(source_code):
+    """SHA-256 исходного текста: по нему видно, что .kbc устарел"""
+    return hashlib.sha256(source_code.encode('utf-8')).digest()
+
+
+def dump_bytecode(program, file, source_code=""):
+    """
+    Записывает ОПС (список команд) или SlotProgram в двоичный файл file,
+    открытый на запись в режиме "wb".
+    """
+    if isinstance(program, SlotProgram):
+        code, names, flags = program.code, list(program.names), FLAG_SLOT_PROGRAM
+        jump_operations = BRANCH_OPERATIONS
+    else:
+        code, names, flags = program, [], 0
+        jump_operations = JUMP_OPERATIONS
+    name_index = {name: index for index, name in enumerate(names)}
+    constants = []
+    constant_index = {}
+    words = array('i', bytes(4 * len(code)))
+    jumps = array('i')
+
+    for position, item in enumerate(code):
+        if item.__class__ is int and 0 <= item < _NUMBER_LIMIT:
+            words[position] = (item << 2) | _NUMBER
+        elif item.__class__ is int or item.__class__ is float:
+            key = (item.__class__, item)
+            index = constant_index.get(key)
+            if index is None:
+                index = constant_index[key] = len(constants)
+                constants.append(item)
+            words[position] = (index << 2) | _CONSTANT
+        elif item.__class__ is str:
+            index = _OPCODE_INDEX.get(item)
+            if index is not None:
+                words[position] = (index << 2) | _OPCODE
+                if item in jump_operations:
+                    jumps.append(position)
+                continue
+            index = name_index.get(item)
+            if index is None:
+                index = name_index[item] = len(names)
+                names.append(item)
+            words[position] = (index << 2) | _NAME
+        else:
+            raise ValueError(f"Команду {item!r} нельзя записать в байт-код")
+
+    pool = bytearray()
+    for constant in constants:
+        if constant.__class__ is float:
+            pool += _FLOAT_CONSTANT + _FLOAT64.pack(constant)
+        elif -(1 << 63) <= constant < (1 << 63):
+            pool += _INT_CONSTANT + _INT64.pack(constant)
+        else:
+            digits = str(constant).encode('ascii')
+            pool += _BIG_INT_CONSTANT + _LENGTH.pack(len(digits)) + digits
+    name_bytes = "\n".join(names).encode('utf-8')
+
+    if sys.byteorder != "little":
+        words.byteswap()
+        jumps.byteswap()
+    file.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, source_hash(source_code), len(words), len(jumps),
+                           len(constants), len(names), len(pool), len(name_bytes)))
+    file.write(words.tobytes())
+    file.write(jumps.tobytes())
+    file.write(pool)
+    file.write(name_bytes)
+
+
+def load_bytecode(data):
+    """
+    Читает байт-код из bytes или другого буфера (например, mmap), не
+    копируя его: код и таблица переходов читаются через memoryview.
+
+    Returns:
+        tuple: (ОПС или SlotProgram, SHA-256 исходного текста)
+    Raises:
+        ValueError: Если данные - не байт-код этой версии или повреждены
+    """
+    with memoryview(data) as view:
+        if len(view) < HEADER.size:
+            raise ValueError("Файл байт-кода обрезан")
+        (magic, version, flags, digest, word_count, jump_count, constant_count, name_count,
+         pool_size, names_size) = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Это не файл байт-кода .kbc")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия байт-кода: {version} (ожидается {FORMAT_VERSION})")
+        code_offset = HEADER.size
+        jumps_offset = code_offset + 4 * word_count
+        pool_offset = jumps_offset + 4 * jump_count
+        names_offset = pool_offset + pool_size
+        if len(view) != names_offset + names_size:
+            raise ValueError("Размер файла байт-кода не совпадает с заголовком")
+
+        constants = _read_constants(view, pool_offset, names_offset, constant_count)
+        names = str(view[names_offset:], 'utf-8').split("\n") if name_count else []
+        if len(names) != name_count:
+            raise ValueError("Таблица имен байт-кода повреждена")
+
+        tables = (OPCODES, constants, names, _NUMBERS)
+        jump_operations = BRANCH_OPERATIONS if flags & FLAG_SLOT_PROGRAM else JUMP_OPERATIONS
+        with _int32_words(view, code_offset, word_count) as words:
+            if word_count and min(words) < 0:
+                raise ValueError("Код байт-кода поврежден")
+            try:
+                code = [tables[word & 3][word >> 2] for word in words]
+            except IndexError:
+                raise ValueError("Код байт-кода ссылается на несуществующую запись") from None
+        with _int32_words(view, jumps_offset, jump_count) as jumps:
+            for position in jumps:
+                if (not 0 <= position < word_count - 1 or code[position] not in jump_operations or
+                        code[position + 1].__class__ is not int or not 0 <= code[position + 1] <= word_count):
+                    raise ValueError(f"Неверный переход в позиции {position} байт-кода")
+
+    if flags & FLAG_SLOT_PROGRAM:
+        return SlotProgram(code, names), digest
+    return code, digest
+
+
+def read_bytecode(file):
+    """
+    Читает байт-код из файла, открытого в режиме "rb": файл отображается
+    в память (mmap), и load_bytecode читает его без копирования.
+    """
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        # Не файл на диске (например, BytesIO) или пустой файл
+        return load_bytecode(file.read())
+    try:
+        return load_bytecode(mapped)
+    finally:
+        mapped.close()
+
+
+def _int32_words(view, offset, count):
+    """memoryview слов int32 little-endian: без копии, если порядок байтов совпадает"""
+    words = view[offset:offset + 4 * count]
+    if sys.byteorder == "little":
+        return words.cast('i')
+    swapped = array('i', words)
+    swapped.byteswap()
+    return memoryview(swapped)
+
+
+def _read_constants(view, offset, end, count):
+    constants = []
+    try:
+        for _ in range(count):
+            kind = view[offset:offset + 1].tobytes()
+            offset += 1
+            if kind == _INT_CONSTANT:
+                constants.append(_INT64.unpack_from(view, offset)[0])
+                offset += _INT64.size
+            elif kind == _FLOAT_CONSTANT:
+                constants.append(_FLOAT64.unpack_from(view, offset)[0])
+                offset += _FLOAT64.size
+            elif kind == _BIG_INT_CONSTANT:
+                length, = _LENGTH.unpack_from(view, offset)
+                offset += _LENGTH.size
+                constants.append(int(view[offset:offset + length].tobytes()))
+                offset += length
+            else:
+                raise ValueError("Пул констант байт-кода поврежден")
+    except struct.error:
+        raise ValueError("Пул констант байт-кода обрезан") from None
+    if offset != end:
+        raise ValueError("Пул констант байт-кода поврежден")
+    return constants
@@ -1,6 +1,38 @@
-from .lexer import analyze
-from .parser import Parser
+from .ast_nodes import lower
+from .bytecode import dump_bytecode, read_bytecode, source_hash
+from .optimizer import OPTIMIZATION_LEVELS, optimize
+from .instrumentation import ParseStatistics, lexer_statistics
+from .incremental import CompilationSnapshot, apply_edit, boundary_recorder, compose_edit, edited_source
+from .lexer import analyze, analyze_fast, analyze_to_stream, tokenize_file
+from .generated_parser import GeneratedParser
+from .parser import Parser, shared_coded_grammar
+from .register_ir import RegisterProgram, lower_to_registers
+from .register_vm import RegisterVM
+from .rpn_analysis import is_temporary
+from .rpn_generator import RPNGenerator
 from .rpn_interpreter import RPNInterpreter # Добавлен импорт интерпретатора
+from .slot_interpreter import SlotInterpreter
+from .slot_resolution import SlotProgram, resolve_slots
+from .superinstructions import fuse_superinstructions
+from .token_stream import TokenStream
+
+# Доступные реализации лексического анализатора
+LEXER_ENGINES = {
+    "reference": analyze,   # Посимвольный автомат по состояниям State
+    "fast": analyze_fast,   # Мастер-выражение и срезы, тот же поток лексем
+}
+
+# Доступные реализации синтаксического анализатора
+PARSER_BACKENDS = {
+    "table": Parser,               # Цикл по LL(1) таблице со стеком символов
+    "generated": GeneratedParser,  # Рекурсивный спуск, сгенерированный generate_parser.py
+}
+
+# Доступные машины выполнения
+EXECUTION_BACKENDS = (
+    "stack",     # Стековая машина: SlotInterpreter (или RPNInterpreter)
+    "register",  # Трехадресный код и RegisterVM (см. register_ir)
+)
 
 class Compiler:
     """
@@ -9,13 +41,72 @@ class Compiler:
     генерирует обратную польскую запись (ОПС).
     """
     
-    def __init__(self):
-        """Инициализация компилятора"""
+    def __init__(self, lexer_engine="reference", compact_tokens=False, parser_backend="table", build_ast=False,
+                 instrument=False, optimization_level=0, slot_resolution=True,
+                 superinstructions=True, execution_backend="stack", keep_symbol_table=True, rotate_loops=False):
+        """
+        Инициализация компилятора
+
+        Args:
+            lexer_engine: Реализация лексера из LEXER_ENGINES ("reference" или "fast")
+            compact_tokens: Хранить токены в компактном TokenStream вместо списка Token
+            parser_backend: Реализация парсера из PARSER_BACKENDS ("table" или "generated")
+            build_ast: Строить при компиляции дерево разбора (см. get_ast) и
+                       получать ОПС из него
+            instrument: Собирать при компиляции счетчики лексического и
+                       синтаксического анализа (см. get_instrumentation_report).
+                       Разбор со счетчиками всегда выполняет табличный Parser.
+            optimization_level: Уровень оптимизации ОПС из OPTIMIZATION_LEVELS
+                       (0 - без оптимизации, 1 - свертка констант,
+                       2 - свертка констант и оконная оптимизация переходов,
+                       3 - то же, вынос инвариантов циклов и удаление
+                       мертвых записей)
+            slot_resolution: Выполнять программу по слотам переменных
+                       (slot_resolution.resolve_slots, SlotInterpreter); ОПС,
+                       которую нельзя так перевести, выполняет RPNInterpreter
+            superinstructions: Сливать частые последовательности команд
+                       SlotProgram в суперкоманды (см. superinstructions)
+            execution_backend: Машина выполнения из EXECUTION_BACKENDS. Регистровая
+                       выполняет программы, переведенные в слоты; программу,
+                       которую нельзя перевести в регистры, выполняет стековая
+            keep_symbol_table: Сохранять значения всех переменных для
+                       get_symbol_table_after_execution. False разрешает
+                       оптимизации удалять записи и массивы, которые не
+                       влияют на вывод: таблица символов после выполнения
+                       будет неполной
+            rotate_loops: Порождать циклы while в повернутом виде: условие
+                       повторяется в конце тела, и итерация выполняет один
+                       переход вместо двух (см. RPNGenerator.add_loop_end).
+                       compile_edit в этом режиме недоступен
+        """
+        if lexer_engine not in LEXER_ENGINES:
+            raise ValueError(f"Неизвестный лексический анализатор: {lexer_engine}")
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Неизвестный синтаксический анализатор: {parser_backend}")
+        if optimization_level not in OPTIMIZATION_LEVELS:
+            raise ValueError(f"Неизвестный уровень оптимизации: {optimization_level}")
+        if execution_backend not in EXECUTION_BACKENDS:
+            raise ValueError(f"Неизвестная машина выполнения: {execution_backend}")
+        self.parser_backend = parser_backend
+        self.lexer_engine = lexer_engine
+        self.compact_tokens = compact_tokens
+        self.build_ast = build_ast
+        self.instrument = instrument
+        self.optimization_level = optimization_level
+        self.slot_resolution = slot_resolution
+        self.superinstructions = superinstructions
+        self.execution_backend = execution_backend
+        self.keep_symbol_table = keep_symbol_table
+        self.rotate_loops = rotate_loops
         self.tokens = []  # Результат лексического анализа
         self.rpn = []     # Результат синтаксического анализа (ОПС)
         self.interpreter_output = [] # Результат выполнения программы
         self.symbol_table_after_execution = {} # Таблица символов после выполнения
         self.input_values = []  # Входные данные для программы
+        self.snapshot = None  # Результат последней компиляции для compile_edit
+        self.constant_pool_stats = {}  # Статистика пула констант последнего разбора
+        self.ast = None  # Дерево разбора последней компиляции в режиме build_ast
+        self.instrumentation_report = None  # Счетчики последней компиляции в режиме instrument
     
     def compile(self, source_code):
         """
@@ -23,6 +114,7 @@ class Compiler:
         1. Лексический анализ
         2. Синтаксический анализ
         3. Генерация ОПС
+        4. Оптимизация ОПС (если задан optimization_level)
         
         Args:
             source_code: Исходный код на языке компиляции
@@ -31,16 +123,117 @@ class Compiler:
             list: Список команд ОПС
         """
         # Лексический анализ
-        self.tokens = analyze(source_code)
+        if not self.compact_tokens:
+            self.tokens = LEXER_ENGINES[self.lexer_engine](source_code)
+        elif self.lexer_engine == "fast":
+            self.tokens = analyze_to_stream(source_code)
+        else:
+            self.tokens = TokenStream.from_tokens(analyze(source_code))
         
-        # Синтаксический анализ и генерация ОПС
-        parser = Parser(self.tokens)
-        rpn_result, symbol_table = parser.parse()
-        self.rpn = rpn_result
+        # Синтаксический анализ и генерация ОПС. Для списка токенов
+        # запоминаются границы операторов, чтобы поддержать compile_edit
+        # (адреса ОПС известны, только если ОПС строится без дерева;
+        # инкрементальный разбор порождает только обычные циклы)
+        incremental = isinstance(self.tokens, list) and not self.build_ast and not self.rotate_loops
+        self.snapshot = CompilationSnapshot.failed(source_code) if incremental else None
+        boundaries = [(0, 0, 0)]
+        parser_class = PARSER_BACKENDS[self.parser_backend]
+        hook = boundary_recorder(boundaries) if incremental else None
+        statistics = None
+        if self.instrument:
+            # Счетчики раскрытий и действий есть только у цикла по таблице
+            parser_class = Parser
+            statistics = ParseStatistics(shared_coded_grammar())
+        parser = parser_class(self.tokens, statement_hook=hook, build_ast=self.build_ast, statistics=statistics,
+                              rotate_loops=self.rotate_loops)
+        try:
+            result, symbol_table = parser.parse()
+        except RecursionError:
+            # Рекурсивный спуск ограничен глубиной стека Python: очень глубокую
+            # вложенность разбирает табличный парсер, у которого свой стек
+            del boundaries[1:]
+            parser = Parser(self.tokens, statement_hook=hook, build_ast=self.build_ast, rotate_loops=self.rotate_loops)
+            result, symbol_table = parser.parse()
+        if statistics is not None:
+            self.instrumentation_report = {"lexer": lexer_statistics(self.tokens), "parser": statistics.report()}
+        if self.build_ast:
+            self.ast = result
+            result = lower(result, RPNGenerator(rotate_loops=self.rotate_loops))
         self.symbol_table_after_parsing = symbol_table
+        self.constant_pool_stats = parser.rpn_generator.constant_pool.stats()
+        if incremental:
+            # Границы операторов относятся к ОПС до оптимизации
+            self.snapshot = CompilationSnapshot(source_code, self.tokens, result, symbol_table, boundaries)
+        self.rpn = optimize(result, self.optimization_level, self.keep_symbol_table)
         
         return self.rpn
+
+    def compile_edit(self, start, end, text):
+        """
+        Инкрементальная перекомпиляция после правки исходного кода
+        предыдущего вызова compile/compile_edit: source[start:end] заменяется
+        на text. Заново анализируются только затронутые строки и операторы
+        верхнего уровня; результат совпадает с compile(нового текста).
+
+        Args:
+            start: Начало заменяемого диапазона (индекс символа)
+            end: Конец заменяемого диапазона (не включая)
+            text: Вставляемый текст
+
+        Returns:
+            list: Список команд ОПС
+        """
+        if self.snapshot is None:
+            raise ValueError("compile_edit требует предыдущей компиляции compile без compact_tokens, build_ast "
+                             "и rotate_loops")
+        try:
+            snapshot = apply_edit(self.snapshot, start, end, text, PARSER_BACKENDS[self.parser_backend])
+        except (RuntimeError, SyntaxError, ValueError):
+            # Следующие правки относятся к тексту с ошибкой и применяются
+            # вместе с этой к последнему успешному результату
+            source = edited_source(self.snapshot.source, start, end, text)
+            self.snapshot = CompilationSnapshot.failed(source, compose_edit(self.snapshot, start, end, text))
+            raise
+        self.snapshot = snapshot
+        self.tokens = self.snapshot.tokens
+        self.rpn = optimize(self.snapshot.rpn, self.optimization_level, self.keep_symbol_table)
+        self.symbol_table_after_parsing = self.snapshot.symbol_table
+        return self.rpn
     
+    def compile_file(self, file, rpn_sink=None, chunk_size=1 << 16):
+        """
+        Потоковая компиляция файла с ограниченной памятью:
+        блочное чтение -> ленивый лексер -> парсер с просмотром на один
+        токен -> генератор ОПС, сбрасывающий готовые команды в rpn_sink.
+
+        Args:
+            file: Путь к файлу или открытый текстовый файловый объект
+            rpn_sink: Приемник готовых команд ОПС (вызывается со списком команд).
+                      Если не задан, ОПС собирается в self.rpn и оптимизируется
+                      по optimization_level; команды, переданные в rpn_sink,
+                      не оптимизируются (адреса переходов уже выданы).
+            chunk_size: Размер блока чтения в символах
+
+        Returns:
+            list: Список команд ОПС или None, если задан rpn_sink
+        """
+        if isinstance(file, str):
+            with open(file, 'r', encoding='utf-8') as opened_file:
+                return self.compile_file(opened_file, rpn_sink, chunk_size)
+
+        self.tokens = []  # Токены не сохраняются: они читаются по требованию
+        self.rpn = []
+        sink = rpn_sink if rpn_sink is not None else self.rpn.extend
+        parser = PARSER_BACKENDS[self.parser_backend](tokenize_file(file, chunk_size), rpn_sink=sink,
+                                                      rotate_loops=self.rotate_loops)
+        _, symbol_table = parser.parse()
+        self.symbol_table_after_parsing = symbol_table
+        self.constant_pool_stats = parser.rpn_generator.constant_pool.stats()
+        if rpn_sink is not None:
+            return None
+        self.rpn = optimize(self.rpn, self.optimization_level, self.keep_symbol_table)
+        return self.rpn
+
     def execute(self, source_code):
         """
         Компилирует и выполняет исходный код.
@@ -62,26 +255,120 @@ class Compiler:
             # print(f"Ошибка компиляции: {e}") # Ошибка уже должна быть выведена парсером
             raise # Перевыбрасываем ошибку компиляции, чтобы ее увидел вызывающий код
 
-        interpreter = RPNInterpreter()
+        return self.run(rpn_code)
+
+    def run(self, program):
+        """
+        Выполняет скомпилированную программу: ОПС, SlotProgram или RegisterProgram.
+
+        Returns:
+            tuple: (list_of_output, symbol_table_after_execution)
+        Raises:
+            Exception: Если во время выполнения возникает ошибка.
+        """
+        if isinstance(program, list):
+            program = self._executable_program(program)
+        if isinstance(program, RegisterProgram):
+            interpreter = RegisterVM()
+        elif isinstance(program, SlotProgram):
+            interpreter = SlotInterpreter()
+        else:
+            interpreter = RPNInterpreter()
         # Устанавливаем входные данные, если они есть
         if self.input_values:
             interpreter.set_input_values(self.input_values)
-        
-        try:
-            self.interpreter_output, self.symbol_table_after_execution = interpreter.interpret(rpn_code)
-            return self.interpreter_output, self.symbol_table_after_execution
-        except Exception as e:
-            # print(f"Ошибка выполнения ОПЗ: {e}")
-            raise # Перевыбрасываем ошибку выполнения, чтобы ее увидел вызывающий код
+        self.interpreter_output, symbol_table = interpreter.interpret(program)
+        # Временные переменные оптимизаций в таблицу символов не попадают
+        self.symbol_table_after_execution = {name: value for name, value in symbol_table.items()
+                                             if not is_temporary(name)}
+        return self.interpreter_output, self.symbol_table_after_execution
+
+    def _slot_program(self, rpn):
+        """SlotProgram для ОПС по настройкам компилятора или None, если ОПС выполняется как есть"""
+        if not self.slot_resolution:
+            return None
+        program = resolve_slots(rpn)
+        if program is not None and self.superinstructions:
+            program = fuse_superinstructions(program)
+        return program
+
+    def _executable_program(self, rpn):
+        """Программа для выполнения ОПС выбранной машиной (см. execution_backend)"""
+        if self.execution_backend == "register" and self.slot_resolution:
+            program = resolve_slots(rpn)
+            registers = program and lower_to_registers(program)
+            if registers is not None:
+                return registers
+        return self._slot_program(rpn) or rpn
+
+    def save_bytecode(self, source_code, file):
+        """
+        Компилирует source_code и записывает программу в файл байт-кода
+        .kbc (file открыт в режиме "wb", формат см. в bytecode): SlotProgram,
+        если ОПС переводится в слоты, иначе саму ОПС.
+
+        Returns:
+            list: Список команд ОПС
+        """
+        rpn = self.compile(source_code)
+        program = self._slot_program(rpn)
+        dump_bytecode(rpn if program is None else program, file, source_code)
+        return rpn
+
+    def load_bytecode(self, file, source_code=None):
+        """
+        Загружает программу из файла байт-кода .kbc (file открыт в режиме
+        "rb"); исходный текст для этого не нужен.
+
+        Args:
+            file: Файл байт-кода
+            source_code: Если задан, проверяется, что байт-код получен из
+                         этого текста, а не из его прежней версии
+
+        Returns:
+            list или SlotProgram: Программа для run
+        Raises:
+            ValueError: Если файл поврежден, другой версии или устарел
+        """
+        program, digest = read_bytecode(file)
+        if source_code is not None and digest != source_hash(source_code):
+            raise ValueError("Байт-код устарел: исходный текст изменился после его записи")
+        self.rpn = program if isinstance(program, list) else []
+        return program
+
+    def execute_bytecode(self, file):
+        """Загружает программу из файла байт-кода .kbc и выполняет ее (см. run)"""
+        return self.run(self.load_bytecode(file))
 
     def get_tokens(self):
         """Возвращает список токенов после лексического анализа"""
         return self.tokens
     
+    def get_ast(self):
+        """Возвращает дерево разбора (Program) последней компиляции в режиме build_ast"""
+        return self.ast
+
+    def get_instrumentation_report(self):
+        """
+        Возвращает счетчики последнего compile в режиме instrument:
+        {"lexer": {"tokens": ..., "transitions": ...},
+         "parser": {"expansions": ..., "actions": ..., "table_lookups": ...,
+                    "max_stack_depth": ..., "fast_expressions": ..., "declined_expressions": ...}}
+        (см. instrumentation.lexer_statistics и ParseStatistics.report)
+        """
+        return self.instrumentation_report
+
     def get_rpn(self):
         """Возвращает обратную польскую запись (ОПС) после синтаксического анализа"""
         return self.rpn
     
+    def get_constant_pool_stats(self):
+        """
+        Возвращает статистику пула констант последнего compile/compile_file:
+        {"constants": всего констант в ОПС, "unique": различных, "deduplicated": повторов}
+        """
+        return self.constant_pool_stats
+
     def get_interpreter_output(self):
         """Возвращает вывод программы после выполнения ОПЗ"""
         return self.interpreter_output
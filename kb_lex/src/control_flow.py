@@ -0,0 +1,761 @@
+import heapq
+
+from .rpn_analysis import JUMP_OPERATIONS, TYPED_OPERATIONS, UNCHECKED_OPERATIONS, is_variable
+
+
+# Бинарные команды ОПС: снимают два значения и кладут результат
+_BINARY_OPERATIONS = frozenset(("PLUS", "MINUS", "MULTIPLY", "DIVIDE", "EQUALS", "NEQ", "LT", "GT", "AND", "OR",
+                                *TYPED_OPERATIONS))
+
+# Запись стека при моделировании: значение (не имя)
+_VALUE = None
+
+# Виды обращения к переменной (см. variable_accesses)
+USE = "use"                # Чтение значения
+ELEMENT = "element"        # Чтение элемента массива
+DEFINE = "def"             # Запись значения целиком
+DEFINE_ARRAY = "def_array" # Запись массива (DECL_ARR, ASSIGN списка значений)
+UPDATE = "update"          # Чтение массива и запись его элемента
+
+# Виды обращений, которые записывают переменную целиком
+DEFINITIONS = frozenset((DEFINE, DEFINE_ARRAY))
+
+
+class BasicBlock:
+    """
+    Линейный участок ОПС: переходы бывают только на его начало и только
+    из его конца.
+
+    code - команды участка; за $J/$JF в нем стоит не адрес, а номер
+    участка, на который ведет переход. fallthrough - номер участка, на
+    который управление переходит после последней команды (None, если
+    участок кончается $J или это выход). start - адрес начала участка в
+    исходной ОПС (None для участков, добавленных преобразованиями).
+    """
+
+    __slots__ = ('number', 'start', 'code', 'fallthrough', 'successors', 'predecessors')
+
+    def __init__(self, number, start, code, fallthrough=None):
+        self.number = number
+        self.start = start
+        self.code = code
+        self.fallthrough = fallthrough
+        self.successors = []
+        self.predecessors = []
+
+    def jump_targets(self):
+        """Номера участков, на которые ведут переходы из code"""
+        code = self.code
+        targets = []
+        index = 0
+        while index < len(code):
+            if code[index].__class__ is str and code[index] in JUMP_OPERATIONS:
+                targets.append(code[index + 1])
+                index += 2
+            else:
+                index += 1
+        return targets
+
+    def __repr__(self):
+        return (f"BasicBlock(number={self.number!r}, start={self.start!r}, code={self.code!r}, "
+                f"fallthrough={self.fallthrough!r})")
+
+
+class ControlFlowGraph:
+    """
+    Граф потока управления ОПС: участки в порядке адресов, последний из
+    них - пустой участок выхода (адрес len(rpn)), на который ведут
+    переходы в конец программы. entry - номер участка входа (сначала 0).
+
+    Преобразования меняют code и fallthrough участков и добавляют участки
+    (add_block), затем вызывают update_edges; to_rpn собирает ОПС обратно.
+    """
+
+    def __init__(self, rpn):
+        length = len(rpn)
+        leaders = {0, length}
+        index = 0
+        while index < length:
+            instruction = rpn[index]
+            if instruction.__class__ is str and instruction in JUMP_OPERATIONS:
+                target = rpn[index + 1] if index + 1 < length else None
+                if target.__class__ is not int or not 0 <= target <= length:
+                    raise ValueError(f"Неверный адрес перехода в позиции {index}: {target!r}")
+                leaders.add(target)
+                leaders.add(index + 2)
+                index += 2
+            else:
+                index += 1
+        leaders = sorted(leader for leader in leaders if leader <= length)
+        number_at = {leader: number for number, leader in enumerate(leaders)}
+
+        self.blocks = []
+        for number, start in enumerate(leaders):
+            end = leaders[number + 1] if number + 1 < len(leaders) else length
+            code = list(rpn[start:end])
+            index = 0
+            while index < len(code):
+                if code[index].__class__ is str and code[index] in JUMP_OPERATIONS:
+                    code[index + 1] = number_at[code[index + 1]]
+                    index += 2
+                else:
+                    index += 1
+            falls_through = start < length and not (len(code) >= 2 and code[-2] == "$J")
+            self.blocks.append(BasicBlock(number, start, code, number + 1 if falls_through else None))
+        self.entry = 0
+        self.exit = len(self.blocks) - 1
+        self.update_edges()
+
+    def add_block(self, code, fallthrough=None):
+        """Добавляет участок (вне раскладки до вызова to_rpn с порядком) и возвращает его"""
+        block = BasicBlock(len(self.blocks), None, code, fallthrough)
+        self.blocks.append(block)
+        return block
+
+    def update_edges(self):
+        """Пересчитывает successors и predecessors по code и fallthrough участков"""
+        for block in self.blocks:
+            block.predecessors = []
+        for block in self.blocks:
+            successors = block.jump_targets()
+            if block.fallthrough is not None and block.fallthrough not in successors:
+                successors.append(block.fallthrough)
+            block.successors = successors
+            for successor in successors:
+                self.blocks[successor].predecessors.append(block.number)
+
+    def reverse_postorder(self):
+        """Достижимые из входа участки в обратном порядке обхода в глубину"""
+        blocks = self.blocks
+        visited = bytearray(len(blocks))
+        order = []
+        visited[self.entry] = 1
+        stack = [(self.entry, iter(blocks[self.entry].successors))]
+        while stack:
+            number, successors = stack[-1]
+            for successor in successors:
+                if not visited[successor]:
+                    visited[successor] = 1
+                    stack.append((successor, iter(blocks[successor].successors)))
+                    break
+            else:
+                stack.pop()
+                order.append(number)
+        order.reverse()
+        return order
+
+    def dominators(self):
+        """Дерево доминаторов (см. DominatorTree)"""
+        return DominatorTree(self)
+
+    def loops(self, dominators=None):
+        """Естественные циклы, внешние раньше вложенных (см. find_loops)"""
+        return find_loops(self, dominators or self.dominators())
+
+    def to_rpn(self, order=None):
+        """
+        Собирает ОПС из участков в порядке order (по умолчанию - вход,
+        затем остальные участки по номерам, участок выхода - последним). Адреса переходов
+        пересчитываются; если участок, на который управление проходит
+        после последней команды, не следует за ним, добавляется $J.
+
+        Returns:
+            list: Новая ОПС
+        """
+        if order is None:
+            order = [self.entry] + [block.number for block in self.blocks
+                                    if block.number != self.entry and block.number != self.exit] + [self.exit]
+        if order[0] != self.entry or order[-1] != self.exit:
+            raise ValueError("Раскладка участков должна начинаться входом и кончаться выходом")
+        pieces = []
+        for position, number in enumerate(order):
+            block = self.blocks[number]
+            code = block.code
+            following = order[position + 1] if position + 1 < len(order) else None
+            if block.fallthrough is not None and block.fallthrough != following:
+                code = code + ["$J", block.fallthrough]
+            pieces.append(code)
+
+        addresses = {}
+        address = 0
+        for number, code in zip(order, pieces):
+            addresses[number] = address
+            address += len(code)
+        rpn = []
+        for code in pieces:
+            index = len(rpn)
+            rpn.extend(code)
+            while index < len(rpn):
+                if rpn[index].__class__ is str and rpn[index] in JUMP_OPERATIONS:
+                    rpn[index + 1] = addresses[rpn[index + 1]]
+                    index += 2
+                else:
+                    index += 1
+        return rpn
+
+
+class DominatorTree:
+    """
+    Непосредственные доминаторы достижимых участков (итеративный алгоритм
+    Купера - Харви - Кеннеди по обратному порядку обхода в глубину; на
+    структурных программах он сходится за два прохода). dominates
+    отвечает за O(1) по интервалам обхода дерева.
+    """
+
+    def __init__(self, cfg):
+        order = cfg.reverse_postorder()
+        blocks = cfg.blocks
+        position = [-1] * len(blocks)
+        for index, number in enumerate(order):
+            position[number] = index
+        idom = [None] * len(blocks)
+        idom[cfg.entry] = cfg.entry
+        changed = True
+        while changed:
+            changed = False
+            for number in order[1:]:
+                new_idom = None
+                for predecessor in blocks[number].predecessors:
+                    if idom[predecessor] is None:
+                        continue
+                    if new_idom is None:
+                        new_idom = predecessor
+                        continue
+                    # Пересечение: поднимаемся к общему доминатору
+                    left, right = predecessor, new_idom
+                    while left != right:
+                        while position[left] > position[right]:
+                            left = idom[left]
+                        while position[right] > position[left]:
+                            right = idom[right]
+                    new_idom = left
+                if idom[number] != new_idom:
+                    idom[number] = new_idom
+                    changed = True
+        self.idom = idom
+
+        children = [[] for _ in blocks]
+        for number in order[1:]:
+            children[idom[number]].append(number)
+        self.children = children
+        self.enter = [-1] * len(blocks)
+        self.leave = [-1] * len(blocks)
+        clock = 0
+        stack = [(cfg.entry, iter(children[cfg.entry]))]
+        self.enter[cfg.entry] = clock
+        while stack:
+            number, pending = stack[-1]
+            child = next(pending, None)
+            if child is None:
+                stack.pop()
+                clock += 1
+                self.leave[number] = clock
+            else:
+                clock += 1
+                self.enter[child] = clock
+                stack.append((child, iter(children[child])))
+
+    def dominates(self, dominator, number):
+        """Доминирует ли участок dominator над участком number (оба достижимы)"""
+        return (self.enter[dominator] <= self.enter[number] and
+                self.leave[number] <= self.leave[dominator] and self.enter[number] >= 0)
+
+
+class Loop:
+    """
+    Естественный цикл: header - заголовок, latches - участки с обратными
+    дугами на него, body - участки цикла, не входящие во вложенные циклы,
+    children - вложенные циклы, parent - объемлющий цикл (или None).
+    """
+
+    __slots__ = ('header', 'latches', 'body', 'children', 'parent')
+
+    def __init__(self, header):
+        self.header = header
+        self.latches = []
+        self.body = [header]
+        self.children = []
+        self.parent = None
+
+    @property
+    def depth(self):
+        depth = 1
+        loop = self.parent
+        while loop is not None:
+            depth += 1
+            loop = loop.parent
+        return depth
+
+    def blocks(self):
+        """Все участки цикла вместе с вложенными циклами"""
+        result = []
+        pending = [self]
+        while pending:
+            loop = pending.pop()
+            result.extend(loop.body)
+            pending.extend(loop.children)
+        return result
+
+    def __repr__(self):
+        return f"Loop(header={self.header!r}, latches={self.latches!r}, body={self.body!r})"
+
+
+def find_loops(cfg, dominators):
+    """
+    Находит естественные циклы: дуга u -> h обратная, если h доминирует
+    над u. Заголовки обрабатываются от вложенных к внешним; найденный
+    вложенный цикл при обходе назад сворачивается в свой заголовок
+    (система непересекающихся множеств), поэтому каждая дуга
+    просматривается почти константное число раз.
+
+    Returns:
+        list: Циклы (Loop), внешние раньше вложенных
+    """
+    blocks = cfg.blocks
+    order = cfg.reverse_postorder()
+    representative = list(range(len(blocks)))
+
+    def find(number):
+        root = number
+        while representative[root] != root:
+            root = representative[root]
+        while representative[number] != root:
+            representative[number], number = root, representative[number]
+        return root
+
+    loops = {}
+    for header in reversed(order):
+        latches = [predecessor for predecessor in blocks[header].predecessors
+                   if dominators.enter[predecessor] >= 0 and dominators.dominates(header, predecessor)]
+        if not latches:
+            continue
+        loop = loops[header] = Loop(header)
+        loop.latches = latches
+        pending = [find(latch) for latch in latches]
+        while pending:
+            number = pending.pop()
+            if number == header or representative[number] != number:
+                continue  # Уже в цикле
+            representative[number] = header
+            inner = loops.get(number)
+            if inner is not None and inner.parent is None:
+                inner.parent = loop
+                loop.children.append(inner)
+            else:
+                loop.body.append(number)
+            for predecessor in blocks[number].predecessors:
+                if dominators.enter[predecessor] < 0 or not dominators.dominates(header, predecessor):
+                    continue  # Недостижимый участок или вход в цикл не через заголовок
+                root = find(predecessor)
+                if root != header:
+                    pending.append(root)
+    return [loops[header] for header in order if header in loops]
+
+
+def variable_accesses(cfg):
+    """
+    Обращения к переменным в участках. RPNInterpreter кладет имя на стек и
+    разыменовывает его, только когда имя снимает команда, поэтому стек
+    моделируется по графу, и обращение приписывается команде, снявшей
+    имя: ASSIGN одного значения и $r записывают переменную (DEFINE),
+    DECL_ARR и ASSIGN списка значений - массив (DEFINE_ARRAY), ARRAY_INDEX
+    читает элемент массива (ELEMENT), ARRAY_ASSIGN и r_array записывают
+    его (UPDATE), остальные команды читают значение переменной (USE).
+
+    Returns:
+        list или None: Для каждого участка - список (номер команды в code,
+            имя, вид); None, если стек в начале участка разный на разных
+            путях или команды ОПС нельзя промоделировать
+    """
+    blocks = cfg.blocks
+    entry_stacks = [None] * len(blocks)
+    entry_stacks[cfg.entry] = ()
+    accesses = [[] for _ in blocks]
+    pending = [cfg.entry]
+    while pending:
+        number = pending.pop()
+        block = blocks[number]
+        stack = list(entry_stacks[number])
+        found = accesses[number] = []
+        code = block.code
+        index = 0
+        try:
+            while index < len(code):
+                instruction = code[index]
+                if instruction.__class__ is int or instruction.__class__ is float:
+                    stack.append(_VALUE)
+                elif instruction.__class__ is not str:
+                    return None
+                elif instruction in JUMP_OPERATIONS:
+                    if instruction != "$J":
+                        _pop_value(stack, index, found)
+                    index += 1
+                elif is_variable(instruction):
+                    stack.append(instruction)
+                else:
+                    _simulate(instruction, index, stack, found)
+                index += 1
+        except _Unsimulated:
+            return None
+        stack = tuple(stack)
+        for successor in block.successors:
+            known = entry_stacks[successor]
+            if known is None:
+                entry_stacks[successor] = stack
+                pending.append(successor)
+            elif known != stack:
+                return None
+    return accesses
+
+
+class _Unsimulated(Exception):
+    """Команду ОПС нельзя промоделировать"""
+
+
+def _pop_value(stack, index, found):
+    if not stack:
+        raise _Unsimulated
+    entry = stack.pop()
+    if entry is not _VALUE:
+        found.append((index, entry, USE))
+
+
+def _pop_name(stack):
+    if not stack or stack[-1] is _VALUE:
+        raise _Unsimulated
+    return stack.pop()
+
+
+def _simulate(instruction, index, stack, found):
+    instruction = UNCHECKED_OPERATIONS.get(instruction, instruction)
+    if instruction in _BINARY_OPERATIONS:
+        _pop_value(stack, index, found)
+        _pop_value(stack, index, found)
+        stack.append(_VALUE)
+    elif instruction == "UNARY_MINUS":
+        _pop_value(stack, index, found)
+        stack.append(_VALUE)
+    elif instruction == "$w":
+        _pop_value(stack, index, found)
+    elif instruction == "ASSIGN":
+        # Значения снимаются до ближайшего имени: оно и есть левая часть
+        count = 0
+        while stack and stack[-1] is _VALUE:
+            stack.pop()
+            count += 1
+        found.append((index, _pop_name(stack), DEFINE if count == 1 else DEFINE_ARRAY))
+    elif instruction == "DECL_ARR":
+        name = _pop_name(stack)
+        _pop_value(stack, index, found)
+        found.append((index, name, DEFINE_ARRAY))
+    elif instruction == "ARRAY_INDEX":
+        _pop_value(stack, index, found)
+        found.append((index, _pop_name(stack), ELEMENT))
+        stack.append(_VALUE)
+    elif instruction == "ARRAY_ASSIGN":
+        _pop_value(stack, index, found)
+        _pop_value(stack, index, found)
+        found.append((index, _pop_name(stack), UPDATE))
+    elif instruction == "$r":
+        found.append((index, _pop_name(stack), DEFINE))
+    elif instruction == "r_array":
+        _pop_value(stack, index, found)
+        found.append((index, _pop_name(stack), UPDATE))
+    else:
+        raise _Unsimulated
+
+
+class DataflowProblem:
+    """
+    Задача потока данных для solve_dataflow. Значения - любые объекты,
+    сравнимые на равенство (например, битовые маски в int).
+
+    forward - направление: прямое (от входа) или обратное (от выхода).
+    boundary - значение на входе программы (прямая задача) или на
+    выходе (обратная), top - начальное значение остальных участков,
+    meet объединяет значения путей, transfer(номер участка, значение)
+    проводит значение через участок, edge(откуда, куда, значение) - по
+    ребру графа (например, уточняет его условием перехода).
+    """
+
+    forward = True
+
+    def boundary(self):
+        raise NotImplementedError
+
+    def top(self):
+        raise NotImplementedError
+
+    def meet(self, left, right):
+        raise NotImplementedError
+
+    def transfer(self, number, value):
+        raise NotImplementedError
+
+    def edge(self, source, target, value):
+        return value
+
+
+def solve_dataflow(cfg, problem):
+    """
+    Решает задачу потока данных методом рабочего списка: участки
+    обрабатываются в обратном порядке обхода (для обратной задачи - в
+    прямом), и участок возвращается в список, только когда изменилось
+    значение на его границе.
+
+    Returns:
+        tuple: (значения в начале участков, значения в конце участков) -
+               списки по номерам участков
+    """
+    blocks = cfg.blocks
+    order = cfg.reverse_postorder()
+    reachable = set(order)
+    unreachable = [block.number for block in blocks if block.number not in reachable]
+    if problem.forward:
+        order = order + unreachable
+        start, predecessors, successors = cfg.entry, "predecessors", "successors"
+    else:
+        order = list(reversed(order)) + unreachable
+        start, predecessors, successors = cfg.exit, "successors", "predecessors"
+    priority = [0] * len(blocks)
+    for index, number in enumerate(order):
+        priority[number] = index
+
+    incoming = [problem.top() for _ in blocks]
+    outgoing = [problem.top() for _ in blocks]
+    queued = bytearray(len(blocks))
+    worklist = [(index, number) for index, number in enumerate(order)]
+    for number in order:
+        queued[number] = 1
+    while worklist:
+        _, number = heapq.heappop(worklist)
+        queued[number] = 0
+        block = blocks[number]
+        if number == start:
+            value = problem.boundary()
+        else:
+            value = problem.top()
+        for neighbour in getattr(block, predecessors):
+            value = problem.meet(value, problem.edge(neighbour, number, outgoing[neighbour]))
+        incoming[number] = value
+        value = problem.transfer(number, value)
+        if value != outgoing[number]:
+            outgoing[number] = value
+            for neighbour in getattr(block, successors):
+                if not queued[neighbour]:
+                    queued[neighbour] = 1
+                    heapq.heappush(worklist, (priority[neighbour], neighbour))
+    if problem.forward:
+        return incoming, outgoing
+    return outgoing, incoming
+
+
+class _BitVectorProblem(DataflowProblem):
+    """Задача над битовыми масками: transfer = gen | (value & ~kill)"""
+
+    def __init__(self, gen, kill, forward, boundary=0):
+        self.forward = forward
+        self.gen = gen
+        self.kill = kill
+        self.boundary_value = boundary
+
+    def boundary(self):
+        return self.boundary_value
+
+    def top(self):
+        return 0
+
+    def meet(self, left, right):
+        return left | right
+
+    def transfer(self, number, value):
+        return self.gen[number] | (value & ~self.kill[number])
+
+
+def _members(mask, items):
+    result = []
+    index = 0
+    while mask:
+        if mask & 1:
+            result.append(items[index])
+        mask >>= 1
+        index += 1
+    return result
+
+
+class Liveness:
+    """
+    Живые переменные: переменная жива в точке, если ее значение может быть
+    прочитано дальше на каком-то пути до ее записи. Значения переменных в
+    конце программы видны в таблице символов, поэтому по умолчанию на
+    выходе живы все переменные (live_at_exit - другое множество имен).
+
+    Raises:
+        ValueError: Если обращения к переменным нельзя найти (см.
+                    variable_accesses)
+    """
+
+    def __init__(self, cfg, live_at_exit=None, accesses=None):
+        accesses = accesses if accesses is not None else variable_accesses(cfg)
+        if accesses is None:
+            raise ValueError("Обращения к переменным в ОПС нельзя определить")
+        self.cfg = cfg
+        self.accesses = accesses
+        self.names = sorted({name for found in accesses for _, name, _ in found} | set(live_at_exit or ()))
+        self.index = {name: index for index, name in enumerate(self.names)}
+        uses = []
+        definitions = []
+        for found in accesses:
+            used = defined = 0
+            for _, name, kind in found:
+                bit = 1 << self.index[name]
+                if kind in DEFINITIONS:
+                    defined |= bit & ~used
+                elif not defined & bit:
+                    used |= bit
+            uses.append(used)
+            definitions.append(defined)
+        if live_at_exit is None:
+            exit_mask = (1 << len(self.names)) - 1
+        else:
+            exit_mask = self.mask(live_at_exit)
+        problem = _BitVectorProblem(uses, definitions, forward=False, boundary=exit_mask)
+        self.live_in_masks, self.live_out_masks = solve_dataflow(cfg, problem)
+
+    def mask(self, names):
+        mask = 0
+        for name in names:
+            if name in self.index:
+                mask |= 1 << self.index[name]
+        return mask
+
+    def live_in(self, number):
+        """Имена переменных, живых в начале участка"""
+        return _members(self.live_in_masks[number], self.names)
+
+    def live_out(self, number):
+        """Имена переменных, живых в конце участка"""
+        return _members(self.live_out_masks[number], self.names)
+
+    def live_after(self, number):
+        """
+        Для каждой команды участка (по номеру в code) - маска переменных,
+        живых сразу после нее.
+        """
+        code_length = len(self.cfg.blocks[number].code)
+        after = [0] * code_length
+        live = self.live_out_masks[number]
+        found = self.accesses[number]
+        position = len(found) - 1
+        for index in range(code_length - 1, -1, -1):
+            after[index] = live
+            while position >= 0 and found[position][0] == index:
+                _, name, kind = found[position]
+                bit = 1 << self.index[name]
+                live = live & ~bit if kind in DEFINITIONS else live | bit
+                position -= 1
+        return after
+
+
+class ReachingDefinitions:
+    """
+    Достигающие определения: запись переменной (DEFINITIONS: ASSIGN, $r, DECL_ARR)
+    достигает точки, если есть путь от нее до точки без другой записи той
+    же переменной. definitions - список (номер участка, номер команды в
+    code, имя); множества определений - битовые маски по этому списку.
+
+    Raises:
+        ValueError: Если обращения к переменным нельзя найти (см.
+                    variable_accesses)
+    """
+
+    def __init__(self, cfg, accesses=None):
+        accesses = accesses if accesses is not None else variable_accesses(cfg)
+        if accesses is None:
+            raise ValueError("Обращения к переменным в ОПС нельзя определить")
+        self.cfg = cfg
+        self.definitions = []
+        by_name = {}
+        for number, found in enumerate(accesses):
+            for index, name, kind in found:
+                if kind in DEFINITIONS:
+                    by_name[name] = by_name.get(name, 0) | 1 << len(self.definitions)
+                    self.definitions.append((number, index, name))
+        gen = []
+        kill = []
+        definition = 0
+        for found in accesses:
+            generated = killed = 0
+            for _, name, kind in found:
+                if kind in DEFINITIONS:
+                    generated = (generated & ~by_name[name]) | 1 << definition
+                    killed |= by_name[name]
+                    definition += 1
+            gen.append(generated)
+            kill.append(killed)
+        self.by_name = by_name
+        self.reach_in_masks, self.reach_out_masks = solve_dataflow(cfg, _BitVectorProblem(gen, kill, forward=True))
+
+    def reach_in(self, number):
+        """Определения (участок, команда, имя), достигающие начала участка"""
+        return _members(self.reach_in_masks[number], self.definitions)
+
+    def reach_out(self, number):
+        """Определения, достигающие конца участка"""
+        return _members(self.reach_out_masks[number], self.definitions)
+
+    def reaching(self, number, name):
+        """Определения переменной name, достигающие начала участка"""
+        return _members(self.reach_in_masks[number] & self.by_name.get(name, 0), self.definitions)
+
+
+class DefinedVariables:
+    """
+    Определенные переменные: переменная определена в точке, если на
+    каждом пути к ней было обращение к ней. После любого обращения
+    переменная определена: запись задает значение, чтение неопределенной
+    переменной RPNInterpreter заводит со значением 0, а обращение к
+    неопределенному массиву - ошибка выполнения.
+
+    Raises:
+        ValueError: Если обращения к переменным нельзя найти (см.
+                    variable_accesses)
+    """
+
+    def __init__(self, cfg, accesses=None):
+        accesses = accesses if accesses is not None else variable_accesses(cfg)
+        if accesses is None:
+            raise ValueError("Обращения к переменным в ОПС нельзя определить")
+        self.names = sorted({name for found in accesses for _, name, _ in found})
+        self.index = {name: index for index, name in enumerate(self.names)}
+        accessed = []
+        for found in accesses:
+            mask = 0
+            for _, name, _ in found:
+                mask |= 1 << self.index[name]
+            accessed.append(mask)
+        self.defined_in_masks, self.defined_out_masks = solve_dataflow(cfg, _MustProblem(accessed, len(self.names)))
+
+    def defined_out(self, number):
+        """Имена переменных, определенных в конце участка"""
+        return _members(self.defined_out_masks[number], self.names)
+
+
+class _MustProblem(DataflowProblem):
+    """Прямая задача "на всех путях": пересечение масок, transfer = value | gen"""
+
+    def __init__(self, gen, width):
+        self.gen = gen
+        self.all = (1 << width) - 1
+
+    def boundary(self):
+        return 0
+
+    def top(self):
+        return self.all
+
+    def meet(self, left, right):
+        return left & right
+
+    def transfer(self, number, value):
+        return value | self.gen[number]
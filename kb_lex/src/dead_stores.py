@@ -0,0 +1,453 @@
+from bisect import bisect_left
+from collections import Counter
+
+from .control_flow import (DEFINE, DEFINE_ARRAY, DEFINITIONS, ELEMENT, UPDATE, USE, ControlFlowGraph,
+                           DefinedVariables, Liveness, ReachingDefinitions, variable_accesses)
+from .rpn_analysis import is_constant, is_temporary, is_variable
+
+
+# Операции, которые на любых числах не вызывают ошибок
+_SAFE_OPERATIONS = frozenset(("EQUALS", "NEQ", "LT", "GT", "AND", "OR"))
+
+# Операции без ошибок на целых числах: смешение большого целого с float
+# дает OverflowError, поэтому операнды должны быть целыми
+_INTEGER_OPERATIONS = frozenset(("PLUS", "MINUS", "MULTIPLY"))
+
+# Запись стека при поиске операторов, начало которой неизвестно
+_UNKNOWN = (None, None, False)
+
+
+class _Store:
+    """
+    Оператор записи в участке: code[start:end] - команды от имени (или
+    размера массива) до операции, values - участки значений (start, end).
+    """
+
+    __slots__ = ('operation', 'start', 'end', 'target', 'values')
+
+    def __init__(self, operation, start, end, target, values):
+        self.operation = operation
+        self.start = start
+        self.end = end
+        self.target = target
+        self.values = values
+
+
+def eliminate_dead_stores(rpn, keep_symbol_table=True, removed=None):
+    """
+    Удаление лишних записей переменных: присваивание, значение которого
+    дальше не читается (мертвая запись), присваивания переменных, которые
+    нужны только самим себе (счетчик k = k + 1, который нигде не выводится),
+    и объявления массивов, из которых ничего не читается, вместе с
+    записями их элементов.
+
+    Значения переменных в конце программы видны в таблице символов
+    (Compiler.get_symbol_table_after_execution). С keep_symbol_table
+    они сохраняются: удаляются только записи, которые перезаписываются
+    до чтения, и только если переменная к ним уже определена (иначе
+    изменится порядок таблицы). Без keep_symbol_table сохраняются вывод,
+    ввод и ошибки выполнения, а таблица символов может потерять
+    переменные и массивы.
+
+    Удаляется только оператор, который не может вызвать ошибку: значения
+    из констант и переменных с операциями сравнения и логики, а
+    PLUS/MINUS/MULTIPLY - только над переменными, которым присваиваются
+    одни целые числа. Массив удаляется, если его размер и индексы всех
+    записей - известные при компиляции числа в границах массива. Ввод
+    ($r, r_array) не удаляется никогда.
+
+    Если задан Counter removed, в нем считаются удаленные операторы по
+    видам: "dead store", "unused variable", "unused array", "array store".
+
+    Returns:
+        list: Новая ОПС (исходная не изменяется)
+    """
+    while True:
+        result = _eliminate_once(rpn, keep_symbol_table, removed)
+        if result is None:
+            return rpn
+        rpn = result
+
+
+def _eliminate_once(rpn, keep_symbol_table, removed):
+    """Один проход удаления; None, если удалять нечего"""
+    try:
+        cfg = ControlFlowGraph(rpn)
+    except ValueError:
+        return None
+    accesses = variable_accesses(cfg)
+    if accesses is None:
+        return None
+    arrays = {name for found in accesses for _, name, kind in found if kind in (ELEMENT, UPDATE, DEFINE_ARRAY)}
+    if any(kind == USE and name in arrays for found in accesses for _, name, kind in found):
+        return None  # Массив как значение: операции могут получить список
+    stores = [_find_stores(block.code) for block in cfg.blocks]
+    integers = _integer_variables(cfg, accesses, stores, arrays)
+
+    def safe(number, store):
+        code = cfg.blocks[number].code
+        return all(_evaluate(code, start, end, integers)[0] for start, end in store.values)
+
+    # Кандидаты - присваивания скалярам, которые не вызывают ошибок
+    candidates = []
+    for number, found in enumerate(accesses):
+        for index, name, kind in found:
+            store = stores[number].get(index)
+            if (kind == DEFINE and name not in arrays and store is not None and store.operation == "ASSIGN"
+                    and safe(number, store)):
+                candidates.append((number, store))
+
+    deleted = {}  # Номер участка -> удаляемые операторы
+    counts = Counter()
+    if not keep_symbol_table:
+        defined = DefinedVariables(cfg, accesses)
+        for number, store, reason in _unused_stores(cfg, accesses, stores, candidates, arrays, safe):
+            if store.operation == "ASSIGN" and not _defined_before(defined, accesses[number], number, store, False):
+                continue
+            deleted.setdefault(number, []).append(store)
+            counts[reason] += 1
+
+    # Мертвые записи среди оставшихся: переменная не жива после записи
+    remaining = []
+    for number, found in enumerate(accesses):
+        if number in deleted:
+            owners = _owners(deleted[number], len(cfg.blocks[number].code))
+            found = [access for access in found if owners[access[0]] is None]
+        remaining.append(found)
+    removing = {id(store) for block_stores in deleted.values() for store in block_stores}
+    names = {name for found in remaining for _, name, _ in found}
+    live_at_exit = {name for name in names if not is_temporary(name)} if keep_symbol_table else ()
+    liveness = Liveness(cfg, live_at_exit, remaining)
+    defined = DefinedVariables(cfg, remaining)
+    live_after = {}
+    for number, store in candidates:
+        if id(store) in removing:
+            continue
+        if number not in live_after:
+            live_after[number] = liveness.live_after(number)
+        if live_after[number][store.end - 1] >> liveness.index[store.target] & 1:
+            continue
+        if not _defined_before(defined, remaining[number], number, store, keep_symbol_table):
+            continue
+        deleted.setdefault(number, []).append(store)
+        counts["dead store"] += 1
+
+    if not deleted:
+        return None
+    for number, block_stores in deleted.items():
+        code = cfg.blocks[number].code
+        for store in sorted(block_stores, key=lambda store: store.start, reverse=True):
+            del code[store.start:store.end]
+    if removed is not None:
+        removed.update(counts)
+    return cfg.to_rpn()
+
+
+def _find_stores(code):
+    """
+    Операторы записи участка, которые можно удалить целиком: имя и
+    значения идут подряд и кончаются операцией записи.
+
+    Returns:
+        dict: Номер команды записи в code -> _Store
+    """
+    stores = {}
+    stack = []  # (начало, конец, имя ли это)
+
+    def pop():
+        return stack.pop() if stack else _UNKNOWN
+
+    def adjacent(entries, end):
+        # Записи идут подряд и кончаются перед командой end
+        for entry, following in zip(entries, entries[1:]):
+            if entry[1] is None or entry[1] != following[0]:
+                return False
+        return entries[0][0] is not None and entries[-1][1] == end
+
+    index = 0
+    while index < len(code):
+        instruction = code[index]
+        if is_constant(instruction):
+            stack.append((index, index + 1, False))
+        elif instruction.__class__ is not str:
+            return {}
+        elif instruction == "$J":
+            index += 1
+        elif instruction == "$JF" or instruction == "$JT":
+            pop()
+            index += 1
+        elif is_variable(instruction):
+            stack.append((index, index + 1, True))
+        elif instruction == "UNARY_MINUS":
+            stack.append((pop()[0], index + 1, False))
+        elif instruction == "ASSIGN":
+            values = []
+            while stack and not stack[-1][2]:
+                values.append(stack.pop())
+            name = pop()
+            values.reverse()
+            if adjacent([name] + values, index):
+                stores[index] = _Store("ASSIGN", name[0], index + 1, code[name[0]],
+                                       [(value[0], value[1]) for value in values])
+        elif instruction == "DECL_ARR":
+            name = pop()
+            size = pop()
+            if adjacent([size, name], index):
+                stores[index] = _Store("DECL_ARR", size[0], index + 1, code[name[0]], [(size[0], size[1])])
+        elif instruction == "ARRAY_ASSIGN":
+            value = pop()
+            position = pop()
+            name = pop()
+            if adjacent([name, position, value], index):
+                stores[index] = _Store("ARRAY_ASSIGN", name[0], index + 1, code[name[0]],
+                                       [(position[0], position[1]), (value[0], value[1])])
+        elif instruction in ("$w", "$r"):
+            pop()
+        elif instruction == "r_array":
+            pop()
+            pop()
+        else:
+            # Бинарные операции и ARRAY_INDEX: результат - одно значение
+            right = pop()
+            left = pop()
+            stack.append((left[0], index + 1, False))
+            if right[0] is None:
+                stack[-1] = (None, index + 1, False)
+        index += 1
+    return stores
+
+
+def _evaluate(code, start, end, integers):
+    """
+    Значение code[start:end]: (не может ли вызвать ошибку, всегда ли оно
+    целое). integers - переменные, которые всегда содержат целые числа.
+    """
+    stack = []
+    for instruction in code[start:end]:
+        if is_constant(instruction):
+            stack.append(instruction.__class__ is int)
+        elif is_variable(instruction):
+            stack.append(instruction in integers)
+        elif instruction == "UNARY_MINUS":
+            if not stack:
+                return False, False
+        elif instruction in _SAFE_OPERATIONS or instruction in _INTEGER_OPERATIONS:
+            if len(stack) < 2:
+                return False, False
+            right = stack.pop()
+            left = stack.pop()
+            if instruction in _INTEGER_OPERATIONS and not (left and right):
+                return False, False
+            stack.append(True)
+        else:
+            return False, False  # DIVIDE, ARRAY_INDEX
+    return len(stack) == 1, bool(stack) and stack[-1]
+
+
+def _integer_variables(cfg, accesses, stores, arrays):
+    """
+    Скалярные переменные, которые всегда содержат целые числа: каждое
+    присваивание дает целое, а ввода нет. Неопределенная переменная при
+    чтении равна 0, так что переменные без записей - целые.
+    """
+    definitions = {}  # Имя -> [(участок, _Store или None)]
+    for number, found in enumerate(accesses):
+        for index, name, kind in found:
+            if kind == DEFINE:
+                store = stores[number].get(index)
+                definitions.setdefault(name, []).append((number, store if store and store.operation == "ASSIGN"
+                                                         else None))
+    integers = {name for found in accesses for _, name, _ in found if name not in arrays}
+    readers = {}  # Имя -> переменные, в присваиваниях которых оно читается
+    for name, found in definitions.items():
+        for number, store in found:
+            if store is None:
+                continue
+            code = cfg.blocks[number].code
+            for start, end in store.values:
+                for instruction in code[start:end]:
+                    if is_variable(instruction):
+                        readers.setdefault(instruction, set()).add(name)
+
+    def is_integer(name):
+        for number, store in definitions.get(name, ()):
+            if store is None:
+                return False
+            code = cfg.blocks[number].code
+            if not all(_evaluate(code, start, end, integers)[1] for start, end in store.values):
+                return False
+        return True
+
+    pending = list(definitions)
+    while pending:
+        name = pending.pop()
+        if name in integers and not is_integer(name):
+            integers.discard(name)
+            pending.extend(readers.get(name, ()))
+    return integers
+
+
+def _unused_stores(cfg, accesses, stores, candidates, arrays, safe):
+    """
+    Записи, значения которых программе не нужны (без keep_symbol_table):
+    присваивания переменных, которые читаются только в присваиваниях
+    таких же переменных, и массивы, из которых ничего не читается.
+
+    Returns:
+        list: (номер участка, _Store, вид удаления)
+    """
+    in_candidates = {}  # Номер участка -> кандидаты участка
+    for number, store in candidates:
+        in_candidates.setdefault(number, []).append(store)
+    owners = {number: _owners(block_candidates, len(cfg.blocks[number].code))
+              for number, block_candidates in in_candidates.items()}
+    targets = {}  # Переменная -> переменные, читаемые в ее присваиваниях-кандидатах
+    needed = set()
+    for number, found in enumerate(accesses):
+        block_owners = owners.get(number)
+        for index, name, kind in found:
+            if kind in DEFINITIONS or kind == UPDATE:
+                continue  # Запись элемента не читает массив: нужен ли он, решает _unused_arrays
+            owner = block_owners[index] if block_owners else None
+            if owner is None:
+                needed.add(name)
+            else:
+                targets.setdefault(owner.target, set()).add(name)
+    pending = list(needed)
+    while pending:
+        for name in targets.pop(pending.pop(), ()):
+            if name not in needed:
+                needed.add(name)
+                pending.append(name)
+
+    unused = [(number, store, "unused variable") for number, store in candidates if store.target not in needed]
+    unused += _unused_arrays(cfg, accesses, stores, arrays - needed, safe)
+    return unused
+
+
+def _unused_arrays(cfg, accesses, stores, unread, safe):
+    """
+    Операторы массивов из unread, которые можно удалить: одно объявление
+    известного размера, которое предшествует всем записям элементов с
+    известными индексами в границах массива.
+    """
+    found_by_name = {}
+    for number, found in enumerate(accesses):
+        for index, name, kind in found:
+            if name in unread:
+                found_by_name.setdefault(name, []).append((number, index, kind))
+    if not found_by_name:
+        return []
+    assigned = [[access for access in found if access[2] == DEFINE] for found in accesses]
+    constants = _ConstantVariables(cfg, accesses, stores, assigned)
+    dominators = cfg.dominators()
+
+    result = []
+    for name, found in found_by_name.items():
+        declarations = [(number, index) for number, index, kind in found if kind == DEFINE_ARRAY]
+        if len(declarations) != 1:
+            continue
+        number, index = declarations[0]
+        declaration = stores[number].get(index)
+        if declaration is None or not safe(number, declaration):
+            continue
+        code = cfg.blocks[number].code
+        if declaration.operation == "DECL_ARR":
+            size = constants.value(code, declaration.values[0], number, declaration.end - 1)
+            if size is None or int(size) <= 0:
+                continue
+            size = int(size)
+        else:
+            size = len(declaration.values)
+        removable = [(number, declaration, "unused array")]
+        for element_number, element_index, kind in found:
+            if kind == DEFINE_ARRAY:
+                continue
+            store = stores[element_number].get(element_index)
+            if kind != UPDATE or store is None or store.operation != "ARRAY_ASSIGN":
+                break
+            if not (dominators.dominates(number, element_number)
+                    and (element_number != number or element_index > index)):
+                break
+            position = constants.value(cfg.blocks[element_number].code, store.values[0],
+                                       element_number, element_index)
+            if position is None or not 0 <= int(position) < size or not safe(element_number, store):
+                break
+            removable.append((element_number, store, "array store"))
+        else:
+            result += removable
+    return result
+
+
+class _ConstantVariables:
+    """
+    Значения, известные при компиляции: числовая константа или
+    переменная, которой на всех путях до точки присвоена одна и та же
+    константа.
+    """
+
+    def __init__(self, cfg, accesses, stores, assigned):
+        self.block_definitions = {}  # (участок, имя) -> номера команд записи по возрастанию
+        for number, found in enumerate(accesses):
+            for index, name, kind in found:
+                if kind in DEFINITIONS:
+                    self.block_definitions.setdefault((number, name), []).append(index)
+        self.assigned = DefinedVariables(cfg, assigned)
+        self.reaching = ReachingDefinitions(cfg, accesses)
+        self.constants = {}  # (участок, номер команды записи) -> константа
+        for number, found in enumerate(assigned):
+            code = cfg.blocks[number].code
+            for index, _, _ in found:
+                store = stores[number].get(index)
+                if store is not None and store.operation == "ASSIGN" and len(store.values) == 1:
+                    start, end = store.values[0]
+                    if end == start + 1 and is_constant(code[start]):
+                        self.constants[number, index] = code[start]
+
+    def value(self, code, span, number, index):
+        """Значение code[start:end] перед командой index участка number (None, если неизвестно)"""
+        start, end = span
+        if end != start + 1:
+            return None
+        if is_constant(code[start]):
+            return code[start]
+        name = code[start]
+        definitions = self.block_definitions.get((number, name), ())
+        position = bisect_left(definitions, index)
+        if position:
+            return self.constants.get((number, definitions[position - 1]))
+        bit = self.assigned.index.get(name)
+        if bit is None or not self.assigned.defined_in_masks[number] >> bit & 1:
+            return None  # На каком-то пути переменная не присвоена: значение 0 или ошибка
+        values = {self.constants.get((definition_number, definition_index))
+                  for definition_number, definition_index, _ in self.reaching.reaching(number, name)}
+        if len(values) != 1 or None in values:
+            return None
+        return values.pop()
+
+
+def _owners(stores, length):
+    """Для каждой команды участка длины length - оператор из stores, которому она принадлежит"""
+    owners = [None] * length
+    for store in stores:
+        owners[store.start:store.end] = [store] * (store.end - store.start)
+    return owners
+
+
+def _defined_before(defined, found, number, store, keep_symbol_table):
+    """
+    Определены ли перед оператором store все читаемые в нем переменные (и
+    с keep_symbol_table - его переменная): тогда после удаления оператора
+    переменные заводятся в том же порядке, а чтение неопределенной
+    переменной (например, размера массива) дает ту же ошибку.
+    """
+    mask = defined.defined_in_masks[number]
+    names = {store.target} if keep_symbol_table else set()
+    for index, name, _ in found:
+        if index >= store.end:
+            break
+        if index < store.start:
+            mask |= 1 << defined.index[name]
+        elif name != store.target:
+            names.add(name)
+    return all(mask >> defined.index[name] & 1 for name in names)
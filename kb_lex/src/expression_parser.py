@@ -0,0 +1,327 @@
+import sys
+from itertools import chain
+
+from .grammar import SYMBOL_ACTION, symbol_kind
+from .token_type import TokenType
+
+
+# Виды выражений, разбор которых Parser передает ExpressionParser
+EXPRESSION_LOGICAL = 1     # <Логическое выражение>: все бинарные операторы
+EXPRESSION_ARITHMETIC = 2  # <Выражение>: + - * / и список {...}
+EXPRESSION_ARRAY_SIZE = 3  # <Размер массива>: <Выражение> без списка {...}
+
+EXPRESSION_NONTERMINALS = {
+    "<Логическое выражение>": EXPRESSION_LOGICAL,
+    "<Выражение>": EXPRESSION_ARITHMETIC,
+    "<Размер массива>": EXPRESSION_ARRAY_SIZE,
+}
+
+# Символы операторов RPNGenerator по типу токена
+OPERATOR_SYMBOLS = {
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.MULTIPLY: '*',
+    TokenType.DIVIDE: '/',
+    TokenType.LT: '<',
+    TokenType.GT: '>',
+    TokenType.EQ: '?',
+    TokenType.NEQ: '!',
+    TokenType.AND: '&',
+    TokenType.OR: '|',
+}
+
+# Типы токенов, проверяемые при разборе выражения
+_UNARY_MINUS = TokenType.UNARY_MINUS
+_IDENTIFIER = TokenType.IDENTIFIER
+_INTEGER_CONST = TokenType.INTEGER_CONST
+_FLOAT_CONST = TokenType.FLOAT_CONST
+_LPAREN = TokenType.LPAREN
+_RPAREN = TokenType.RPAREN
+_LSQUARE = TokenType.LSQUARE
+_RSQUARE = TokenType.RSQUARE
+_LCURLY = TokenType.LCURLY
+_RCURLY = TokenType.RCURLY
+_COMMA = TokenType.COMMA
+_EOF = TokenType.EOF
+
+# Позиция операнда - нетерминал, которым он разбирается по таблице
+_LEVEL_FACTOR = 0      # <Фактор>: каждый '~' порождает UNARY_MINUS
+_LEVEL_TERM = 1        # <Терм>: ведущий '~' отбрасывается
+_LEVEL_EXPRESSION = 2  # <Выражение>: как <Терм>, а также список {...}
+
+_OPERAND_LEVELS = {
+    "<Фактор>": _LEVEL_FACTOR,
+    "<Терм>": _LEVEL_TERM,
+    "<Выражение>": _LEVEL_EXPRESSION,
+}
+
+# Кадры: выражение верхнего уровня и вложенные скобки ( ), [ ], { }
+_FRAME_LOGICAL = 0
+_FRAME_ARITHMETIC = 1
+
+# Вид последнего разобранного операнда
+_OPERAND_VALUE = 0
+_OPERAND_IDENTIFIER = 1
+_OPERAND_BRACES = 2
+
+# Токен завершает выражение кадра
+_STOP = ("", None)
+
+_LOGICAL_CHAIN = ("<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>",
+                  "<ЛогическоеИ*>", "<ЛогическоеВыражение*>")
+_ARITHMETIC_CHAIN = _LOGICAL_CHAIN[:2]
+_IDENTIFIER_TAIL = "<ФакторIdent>"
+
+
+def _continuations(table, nonterminals):
+    """
+    Что делает таблица разбора с токеном после операнда, раскрывая по очереди
+    нетерминалы nonterminals (<Терм*>, <Выражение*>, ...): либо правило одного
+    из них начинается с оператора - (символ оператора, позиция следующего
+    операнда), либо все выбирают пустое правило - _STOP. Токенов, на которых
+    таблица сообщила бы об ошибке, в результате нет.
+    """
+    result = {}
+    for token_type in TokenType:
+        for nonterminal in nonterminals:
+            rule = table[nonterminal].get(token_type)
+            if rule is None:
+                break
+            symbols = [symbol for symbol in rule if symbol_kind(symbol) != SYMBOL_ACTION]
+            if not symbols:
+                continue
+            if (symbols[0] == token_type and token_type in OPERATOR_SYMBOLS and len(symbols) > 1 and
+                    symbols[1] in _OPERAND_LEVELS):
+                result[token_type] = (OPERATOR_SYMBOLS[token_type], _OPERAND_LEVELS[symbols[1]])
+            break
+        else:
+            result[token_type] = _STOP
+    return result
+
+
+class ExpressionGrammar:
+    """
+    Данные для разбора выражений, вычисленные по таблице разбора один раз:
+    kinds - вид выражения по коду нетерминала (см. CodedGrammar),
+    continuations[кадр][вид операнда] - продолжения после операнда.
+    После списка {...} в арифметическом кадре выражение закончено (None).
+    """
+
+    __slots__ = ('kinds', 'continuations')
+
+    def __init__(self, table, symbols):
+        self.kinds = [EXPRESSION_NONTERMINALS.get(symbol) if isinstance(symbol, str) else None
+                      for symbol in symbols]
+        identifier = (_IDENTIFIER_TAIL,)
+        self.continuations = (
+            (_continuations(table, _LOGICAL_CHAIN),
+             _continuations(table, identifier + _LOGICAL_CHAIN),
+             _continuations(table, _LOGICAL_CHAIN[2:])),
+            (_continuations(table, _ARITHMETIC_CHAIN),
+             _continuations(table, identifier + _ARITHMETIC_CHAIN),
+             None),
+        )
+
+
+class _TokenWindow:
+    """
+    Токены итератора с индексацией от start (текущего токена first):
+    читаются по требованию и запоминаются, чтобы при откате вернуть их в
+    поток. Индексирование дает тип токена, как последовательность типов
+    Parser.token_types.
+    """
+
+    __slots__ = ('source', 'start', 'buffer', 'end_token')
+
+    def __init__(self, source, start, first, end_token):
+        self.source = source
+        self.start = start
+        self.buffer = [first]
+        self.end_token = end_token
+
+    def token(self, index):
+        offset = index - self.start
+        while len(self.buffer) <= offset:
+            self.buffer.append(next(self.source, self.end_token))
+        return self.buffer[offset]
+
+    def __getitem__(self, index):
+        return self.token(index).token_type
+
+    def value(self, index):
+        return self.token(index).value
+
+
+class ExpressionParser:
+    """
+    Разбор выражений методом сортировочной станции на стеке операторов
+    RPNGenerator вместо раскрытия цепочки <Терм*>, <Выражение*>, <Сравнение*>,
+    <Проверка равенства*>, <ЛогическоеИ*> по таблице.
+
+    Выдает ту же ОПС, что и разбор по таблице, вместе с особенностями
+    грамматики: ведущий '~' операнда <Терм>/<Выражение> отбрасывается, '?'
+    команды не порождает, после списка {...} допустимы только операторы
+    сравнения и логические. Какие токены продолжают выражение, а какие его
+    завершают, берется из таблицы разбора (ExpressionGrammar). На ошибочном
+    выражении разбор откатывается, и Parser раскрывает нетерминал по таблице,
+    поэтому сообщения об ошибках не меняются.
+    """
+
+    def __init__(self, parser, grammar):
+        self.parser = parser
+        self.continuations = grammar.continuations
+
+    def parse(self, kind):
+        """
+        Разбирает выражение вида kind, начиная с текущего токена.
+        Возвращает False, если выражение ошибочно: состояние парсера
+        восстановлено, разбор нужно продолжить по таблице.
+        """
+        parser = self.parser
+        generator = parser.rpn_generator
+        start_index = parser.current_index
+        mark = generator.mark()
+        source = parser._token_iterator
+        if source is None:
+            # Тип и значение токена читаются по индексу без создания Token
+            types = parser.token_types()
+            value_at = parser.token_value
+            count = parser._token_count
+        else:
+            # Токены после текущего читаются из итератора по одному
+            window = _TokenWindow(source, start_index, parser.current_token(), parser._end_token)
+            types = window
+            value_at = window.value
+            count = sys.maxsize
+
+        index = self._parse(kind, types, value_at, count, start_index, parser._current_type)
+        if index >= 0:
+            if source is None:
+                parser._seek(index)
+            else:
+                parser.current_index = index
+                parser._set_current_token(window.token(index))
+            return True
+
+        if source is not None:
+            parser._token_iterator = chain(window.buffer[1:], source)
+        # Ошибочный текст все равно не скомпилируется, поэтому команды, уже
+        # переданные в sink, неважны
+        generator.rewind(mark)
+        return False
+
+    def _parse(self, kind, types, value_at, count, index, token_type):
+        """
+        Разбирает выражение с токена index типа token_type: types[i] - тип
+        токена i, value_at(i) - его значение. Возвращает индекс токена после
+        выражения или -1, если оно ошибочно.
+        """
+        generator = self.parser.rpn_generator
+        push = generator.push_to_operator_stack
+        pop_until = generator.pop_operator_stack_until
+        add_identifier = generator.add_identifier
+        add_constant = generator.add_constant
+        begin_list = generator.begin_list
+        end_list = generator.end_list
+        continuations = self.continuations
+
+        frame = _FRAME_LOGICAL if kind == EXPRESSION_LOGICAL else _FRAME_ARITHMETIC
+        level = _LEVEL_EXPRESSION if kind == EXPRESSION_ARITHMETIC else _LEVEL_TERM
+        frames = []  # (закрывающий токен, кадр снаружи скобок, доступ к элементу массива)
+
+        while True:
+            # Операнд
+            if token_type == _UNARY_MINUS:
+                if level != _LEVEL_FACTOR:
+                    # <Терм> -> ~ <Фактор> <Терм*>: сам '~' команды не порождает
+                    index += 1
+                    token_type = types[index] if index < count else _EOF
+                    level = _LEVEL_FACTOR
+                while token_type == _UNARY_MINUS:
+                    push('~')
+                    index += 1
+                    token_type = types[index] if index < count else _EOF
+
+            if token_type == _IDENTIFIER:
+                name = value_at(index)
+                index += 1
+                token_type = types[index] if index < count else _EOF
+                if token_type == _LSQUARE:
+                    # Доступ к элементу массива: имя, индекс, ARRAY_INDEX
+                    add_identifier(name)
+                    push("(")
+                    frames.append((_RSQUARE, frame, True))
+                    frame = _FRAME_LOGICAL
+                    level = _LEVEL_TERM
+                    index += 1
+                    token_type = types[index] if index < count else _EOF
+                    continue
+                add_identifier(name)
+                operand = _OPERAND_IDENTIFIER
+            elif token_type == _INTEGER_CONST or token_type == _FLOAT_CONST:
+                add_constant(value_at(index))
+                index += 1
+                token_type = types[index] if index < count else _EOF
+                operand = _OPERAND_VALUE
+            elif token_type == _LPAREN:
+                push("(")
+                frames.append((_RPAREN, frame, False))
+                frame = _FRAME_LOGICAL
+                level = _LEVEL_TERM
+                index += 1
+                token_type = types[index] if index < count else _EOF
+                continue
+            elif token_type == _LCURLY and level == _LEVEL_EXPRESSION:
+                begin_list()
+                index += 1
+                token_type = types[index] if index < count else _EOF
+                if token_type != _RCURLY:
+                    push("(")
+                    frames.append((_RCURLY, frame, False))
+                    frame = _FRAME_ARITHMETIC
+                    continue
+                # Пустой список {} команд не порождает
+                end_list()
+                index += 1
+                token_type = types[index] if index < count else _EOF
+                operand = _OPERAND_BRACES
+            else:
+                return -1
+
+            # Оператор или закрывающая скобка после операнда
+            while True:
+                continuation = continuations[frame][operand]
+                operator, next_level = _STOP if continuation is None else continuation.get(token_type, (None, None))
+                if operator is None:
+                    return -1
+                if operator:
+                    push(operator)
+                    level = next_level
+                    index += 1
+                    token_type = types[index] if index < count else _EOF
+                    break
+                if not frames:
+                    pop_until("")
+                    return index
+                closer, outer_frame, array_access = frames[-1]
+                if token_type == closer:
+                    pop_until("(")
+                    if array_access:
+                        generator.add_operator('array_index')
+                    elif closer == _RCURLY:
+                        end_list()
+                    frames.pop()
+                    frame = outer_frame
+                    operand = _OPERAND_BRACES if closer == _RCURLY else _OPERAND_VALUE
+                    index += 1
+                    token_type = types[index] if index < count else _EOF
+                    continue
+                if token_type == _COMMA and closer == _RCURLY:
+                    # Следующий элемент списка
+                    pop_until("(")
+                    push("(")
+                    level = _LEVEL_EXPRESSION
+                    index += 1
+                    token_type = types[index] if index < count else _EOF
+                    break
+                return -1
@@ -0,0 +1,819 @@
+# Сгенерировано generate_parser.py по таблице Parser.build_parse_table.
+# Не редактировать вручную: после изменения грамматики выполните
+#     python generate_parser.py
+from .expression_parser import EXPRESSION_LOGICAL, EXPRESSION_ARITHMETIC, EXPRESSION_ARRAY_SIZE
+from .parser import Parser
+from .token_type import TokenType
+
+
+class _StopParsing(Exception):
+    """Разбор остановлен statement_hook на границе оператора верхнего уровня"""
+
+
+class GeneratedParser(Parser):
+    """
+    Парсер рекурсивного спуска, построенный по LL(1) таблице: по функции на
+    нетерминал, семантические действия вызываются на своих местах в правилах,
+    хвостовая рекурсия нетерминала на самого себя заменена циклом.
+    Выражения, как и в Parser, разбираются ExpressionParser, а функции
+    нетерминалов выражений нужны только для ошибочных выражений.
+    Выдает ту же ОПС, таблицу символов и те же ошибки, что Parser.parse.
+    Варианты функций с суффиксом _top разбирают цепочку операторов верхнего
+    уровня, на границах которой вызывается statement_hook.
+    """
+
+    def parse(self):
+        start = _START_FUNCTIONS.get(self.grammar.symbols[self.stack[-1]])
+        if start is None:
+            return Parser.parse(self)
+        try:
+            start(self)
+            if self._current_type != TokenType.EOF:
+                self.mismatch_error(TokenType.EOF)
+        except _StopParsing:
+            pass
+        self.rpn_generator.finish()
+        return self.rpn_generator.result(), self.symbol_table
+
+
+    def _parse_Программа_top(self):
+        """<Программа>"""
+        choice = _CHOICE_0.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Программа>', _EXPECTED_0)
+        if choice == 0:
+            self._action_push_int_type()
+            self.advance()
+            self._parse_ОператорDT()
+            self._parse_Список_операторов_top()
+        elif choice == 1:
+            self._action_push_float_type()
+            self.advance()
+            self._parse_ОператорDT()
+            self._parse_Список_операторов_top()
+        elif choice == 2:
+            self.advance()
+            if self._current_type != TokenType.LPAREN:
+                self.mismatch_error(TokenType.LPAREN)
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+            self._action_after_if_condition()
+            self._parse_Блок()
+            self._parse_Альтернативное_действие_extended()
+            self._parse_Список_операторов_top()
+        elif choice == 3:
+            self._action_save_identifier_token()
+            self.advance()
+            self._parse_ПрисваиваниеIdent()
+            if self._current_type != TokenType.SEMICOLON:
+                self.mismatch_error(TokenType.SEMICOLON)
+            self.advance()
+            self._parse_Список_операторов_top()
+        elif choice == 4:
+            self.advance()
+            self._action_while()
+            if self._current_type != TokenType.LPAREN:
+                self.mismatch_error(TokenType.LPAREN)
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+            self._action_after_while_condition()
+            self._parse_Блок()
+            self._action_end_while_block()
+            self._parse_Список_операторов_top()
+        elif choice == 5:
+            self.advance()
+            self._parse_ВводInput()
+            self._parse_Список_операторов_top()
+        elif choice == 6:
+            self.advance()
+            self._parse_Логическое_выражение()
+            self._action_gen_output_op()
+            if self._current_type != TokenType.SEMICOLON:
+                self.mismatch_error(TokenType.SEMICOLON)
+            self.advance()
+            self._parse_Список_операторов_top()
+
+    def _parse_ОператорDT(self):
+        """<ОператорDT>"""
+        choice = _CHOICE_1.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ОператорDT>', _EXPECTED_1)
+        if choice == 0:
+            self._action_save_identifier_token()
+            self.advance()
+            self._action_add_variable_declaration()
+            self._parse_ОператорDTIdent()
+            if self._current_type != TokenType.SEMICOLON:
+                self.mismatch_error(TokenType.SEMICOLON)
+            self.advance()
+        elif choice == 1:
+            self.advance()
+            self._parse_ОператорDT_array()
+
+    def _parse_Список_операторов(self):
+        """<Список операторов>"""
+        while True:
+            choice = _CHOICE_2.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Список операторов>', _EXPECTED_2)
+            if choice == 0:
+                self._action_push_int_type()
+                self.advance()
+                self._parse_ОператорDT()
+                continue
+            elif choice == 1:
+                self._action_push_float_type()
+                self.advance()
+                self._parse_ОператорDT()
+                continue
+            elif choice == 2:
+                self.advance()
+                if self._current_type != TokenType.LPAREN:
+                    self.mismatch_error(TokenType.LPAREN)
+                self.advance()
+                self._parse_Логическое_выражение()
+                if self._current_type != TokenType.RPAREN:
+                    self.mismatch_error(TokenType.RPAREN)
+                self.advance()
+                self._action_after_if_condition()
+                self._parse_Блок()
+                self._parse_Альтернативное_действие_extended()
+                continue
+            elif choice == 3:
+                self._action_save_identifier_token()
+                self.advance()
+                self._parse_ПрисваиваниеIdent()
+                if self._current_type != TokenType.SEMICOLON:
+                    self.mismatch_error(TokenType.SEMICOLON)
+                self.advance()
+                continue
+            elif choice == 4:
+                self.advance()
+                self._action_while()
+                if self._current_type != TokenType.LPAREN:
+                    self.mismatch_error(TokenType.LPAREN)
+                self.advance()
+                self._parse_Логическое_выражение()
+                if self._current_type != TokenType.RPAREN:
+                    self.mismatch_error(TokenType.RPAREN)
+                self.advance()
+                self._action_after_while_condition()
+                self._parse_Блок()
+                self._action_end_while_block()
+                continue
+            elif choice == 5:
+                self.advance()
+                self._parse_ВводInput()
+                continue
+            elif choice == 6:
+                self.advance()
+                self._parse_Логическое_выражение()
+                self._action_gen_output_op()
+                if self._current_type != TokenType.SEMICOLON:
+                    self.mismatch_error(TokenType.SEMICOLON)
+                self.advance()
+                continue
+            elif choice == 7:
+                return
+
+    def _parse_Список_операторов_top(self):
+        """<Список операторов>"""
+        while True:
+            choice = _CHOICE_2.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Список операторов>', _EXPECTED_2)
+            if self.statement_hook is not None and self.statement_hook(self):
+                raise _StopParsing()
+            if choice == 0:
+                self._action_push_int_type()
+                self.advance()
+                self._parse_ОператорDT()
+                continue
+            elif choice == 1:
+                self._action_push_float_type()
+                self.advance()
+                self._parse_ОператорDT()
+                continue
+            elif choice == 2:
+                self.advance()
+                if self._current_type != TokenType.LPAREN:
+                    self.mismatch_error(TokenType.LPAREN)
+                self.advance()
+                self._parse_Логическое_выражение()
+                if self._current_type != TokenType.RPAREN:
+                    self.mismatch_error(TokenType.RPAREN)
+                self.advance()
+                self._action_after_if_condition()
+                self._parse_Блок()
+                self._parse_Альтернативное_действие_extended()
+                continue
+            elif choice == 3:
+                self._action_save_identifier_token()
+                self.advance()
+                self._parse_ПрисваиваниеIdent()
+                if self._current_type != TokenType.SEMICOLON:
+                    self.mismatch_error(TokenType.SEMICOLON)
+                self.advance()
+                continue
+            elif choice == 4:
+                self.advance()
+                self._action_while()
+                if self._current_type != TokenType.LPAREN:
+                    self.mismatch_error(TokenType.LPAREN)
+                self.advance()
+                self._parse_Логическое_выражение()
+                if self._current_type != TokenType.RPAREN:
+                    self.mismatch_error(TokenType.RPAREN)
+                self.advance()
+                self._action_after_while_condition()
+                self._parse_Блок()
+                self._action_end_while_block()
+                continue
+            elif choice == 5:
+                self.advance()
+                self._parse_ВводInput()
+                continue
+            elif choice == 6:
+                self.advance()
+                self._parse_Логическое_выражение()
+                self._action_gen_output_op()
+                if self._current_type != TokenType.SEMICOLON:
+                    self.mismatch_error(TokenType.SEMICOLON)
+                self.advance()
+                continue
+            elif choice == 7:
+                return
+
+    def _parse_Логическое_выражение(self):
+        """<Логическое выражение>"""
+        if self.expression_parser is not None and self.expression_parser.parse(EXPRESSION_LOGICAL):
+            return
+        choice = _CHOICE_3.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Логическое выражение>', _EXPECTED_3)
+        if choice == 0:
+            self.advance()
+            self._parse_Фактор()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+            self._parse_Сравнение_rest()
+            self._parse_Проверка_равенства_rest()
+            self._parse_ЛогическоеИ_rest()
+            self._parse_ЛогическоеВыражение_rest()
+        elif choice == 1:
+            self._action_save_current_token_as_factor()
+            self.advance()
+            self._parse_ФакторIdent()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+            self._parse_Сравнение_rest()
+            self._parse_Проверка_равенства_rest()
+            self._parse_ЛогическоеИ_rest()
+            self._parse_ЛогическоеВыражение_rest()
+        elif choice == 2:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+            self._parse_Сравнение_rest()
+            self._parse_Проверка_равенства_rest()
+            self._parse_ЛогическоеИ_rest()
+            self._parse_ЛогическоеВыражение_rest()
+        elif choice == 3:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+            self._parse_Сравнение_rest()
+            self._parse_Проверка_равенства_rest()
+            self._parse_ЛогическоеИ_rest()
+            self._parse_ЛогическоеВыражение_rest()
+        elif choice == 4:
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+            self._parse_Сравнение_rest()
+            self._parse_Проверка_равенства_rest()
+            self._parse_ЛогическоеИ_rest()
+            self._parse_ЛогическоеВыражение_rest()
+
+    def _parse_Блок(self):
+        """<Блок>"""
+        choice = _CHOICE_4.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Блок>', _EXPECTED_4)
+        self.advance()
+        self._parse_Список_операторов()
+        if self._current_type != TokenType.RCURLY:
+            self.mismatch_error(TokenType.RCURLY)
+        self.advance()
+
+    def _parse_Альтернативное_действие_extended(self):
+        """<Альтернативное действие_extended>"""
+        choice = _CHOICE_5.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Альтернативное действие_extended>', _EXPECTED_5)
+        if choice == 0:
+            self.advance()
+            self._action_start_else_block()
+            self._parse_Блок()
+            self._action_end_if_block()
+        elif choice == 1:
+            self._action_end_if_block()
+
+    def _parse_ПрисваиваниеIdent(self):
+        """<ПрисваиваниеIdent>"""
+        choice = _CHOICE_6.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ПрисваиваниеIdent>', _EXPECTED_6)
+        if choice == 0:
+            self._action_add_identifier_to_rpn_for_assign()
+            self.advance()
+            self._parse_Выражение()
+            self._action_gen_assign_op()
+        elif choice == 1:
+            self._action_add_identifier_to_rpn_for_assign()
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RSQUARE:
+                self.mismatch_error(TokenType.RSQUARE)
+            self.advance()
+            if self._current_type != TokenType.ASSIGN:
+                self.mismatch_error(TokenType.ASSIGN)
+            self.advance()
+            self._parse_Выражение()
+            self._action_gen_array_assign_op()
+
+    def _parse_ВводInput(self):
+        """<ВводInput>"""
+        choice = _CHOICE_7.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ВводInput>', _EXPECTED_7)
+        self._action_save_identifier_token()
+        self.advance()
+        self._parse_ВводInputIdent()
+        if self._current_type != TokenType.SEMICOLON:
+            self.mismatch_error(TokenType.SEMICOLON)
+        self.advance()
+
+    def _parse_ОператорDTIdent(self):
+        """<ОператорDTIdent>"""
+        choice = _CHOICE_8.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ОператорDTIdent>', _EXPECTED_8)
+        if choice == 0:
+            self.advance()
+            self._parse_Выражение()
+            self._action_gen_assign_op()
+        elif choice == 1:
+            self.advance()
+            if self._current_type != TokenType.INTEGER_CONST:
+                self.mismatch_error(TokenType.INTEGER_CONST)
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            if self._current_type != TokenType.RSQUARE:
+                self.mismatch_error(TokenType.RSQUARE)
+            self.advance()
+            if self._current_type != TokenType.ASSIGN:
+                self.mismatch_error(TokenType.ASSIGN)
+            self.advance()
+            self._parse_Выражение()
+            self._action_gen_array_assign_op()
+        elif choice == 2:
+            pass
+
+    def _parse_ОператорDT_array(self):
+        """<ОператорDT_array>"""
+        choice = _CHOICE_9.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ОператорDT_array>', _EXPECTED_9)
+        if choice == 0:
+            self._parse_Размер_массива()
+            if self._current_type != TokenType.RSQUARE:
+                self.mismatch_error(TokenType.RSQUARE)
+            self.advance()
+            self._action_save_identifier_token()
+            if self._current_type != TokenType.IDENTIFIER:
+                self.mismatch_error(TokenType.IDENTIFIER)
+            self.advance()
+            self._action_add_dynamic_array_declaration()
+            if self._current_type != TokenType.SEMICOLON:
+                self.mismatch_error(TokenType.SEMICOLON)
+            self.advance()
+        elif choice == 1:
+            self.advance()
+            self._action_save_identifier_token()
+            if self._current_type != TokenType.IDENTIFIER:
+                self.mismatch_error(TokenType.IDENTIFIER)
+            self.advance()
+            self._action_add_array_declaration_for_init()
+            if self._current_type != TokenType.ASSIGN:
+                self.mismatch_error(TokenType.ASSIGN)
+            self.advance()
+            self._action_gen_array_init_start()
+            if self._current_type != TokenType.LCURLY:
+                self.mismatch_error(TokenType.LCURLY)
+            self.advance()
+            self._parse_Инициализаторы()
+            if self._current_type != TokenType.RCURLY:
+                self.mismatch_error(TokenType.RCURLY)
+            self.advance()
+            self._action_gen_array_init_end()
+            if self._current_type != TokenType.SEMICOLON:
+                self.mismatch_error(TokenType.SEMICOLON)
+            self.advance()
+
+    def _parse_Размер_массива(self):
+        """<Размер массива>"""
+        if self.expression_parser is not None and self.expression_parser.parse(EXPRESSION_ARRAY_SIZE):
+            return
+        choice = _CHOICE_10.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Размер массива>', _EXPECTED_10)
+        if choice == 0:
+            self.advance()
+            self._parse_Фактор()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 1:
+            self._action_save_current_token_as_factor()
+            self.advance()
+            self._parse_ФакторIdent()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 2:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 3:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 4:
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+
+    def _parse_Инициализаторы(self):
+        """<Инициализаторы>"""
+        choice = _CHOICE_11.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Инициализаторы>', _EXPECTED_11)
+        if choice == 0:
+            self._parse_Выражение()
+            self._parse_Инициализаторы_продолжение()
+        elif choice == 1:
+            pass
+
+    def _parse_Выражение(self):
+        """<Выражение>"""
+        if self.expression_parser is not None and self.expression_parser.parse(EXPRESSION_ARITHMETIC):
+            return
+        choice = _CHOICE_12.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Выражение>', _EXPECTED_12)
+        if choice == 0:
+            self.advance()
+            self._parse_Фактор()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 1:
+            self._action_save_current_token_as_factor()
+            self.advance()
+            self._parse_ФакторIdent()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 2:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 3:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 4:
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+            self._parse_Терм_rest()
+            self._parse_Выражение_rest()
+        elif choice == 5:
+            self._action_gen_list_start()
+            self.advance()
+            self._parse_Инициализаторы()
+            if self._current_type != TokenType.RCURLY:
+                self.mismatch_error(TokenType.RCURLY)
+            self.advance()
+            self._action_gen_list_end()
+
+    def _parse_Инициализаторы_продолжение(self):
+        """<Инициализаторы_продолжение>"""
+        while True:
+            choice = _CHOICE_13.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Инициализаторы_продолжение>', _EXPECTED_13)
+            if choice == 0:
+                self.advance()
+                self._parse_Выражение()
+                continue
+            elif choice == 1:
+                return
+
+    def _parse_ВводInputIdent(self):
+        """<ВводInputIdent>"""
+        choice = _CHOICE_14.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ВводInputIdent>', _EXPECTED_14)
+        if choice == 0:
+            self._action_add_input_identifier_to_rpn()
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RSQUARE:
+                self.mismatch_error(TokenType.RSQUARE)
+            self.advance()
+            self._action_gen_input_array_op()
+        elif choice == 1:
+            self._action_add_input_identifier_to_rpn()
+            self._action_gen_input_op()
+
+    def _parse_Фактор(self):
+        """<Фактор>"""
+        choice = _CHOICE_15.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Фактор>', _EXPECTED_15)
+        if choice == 0:
+            self.advance()
+            self._parse_Фактор()
+            self._action_gen_op_uminus()
+        elif choice == 1:
+            self._action_save_current_token_as_factor()
+            self.advance()
+            self._parse_ФакторIdent()
+            self._action_add_factor_to_rpn_if_not_array()
+        elif choice == 2:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+        elif choice == 3:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+        elif choice == 4:
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+
+    def _parse_Терм_rest(self):
+        """<Терм*>"""
+        while True:
+            choice = _CHOICE_16.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Терм*>', _EXPECTED_16)
+            if choice == 0:
+                self.advance()
+                self._parse_Фактор()
+                self._action_gen_op_multiply()
+                continue
+            elif choice == 1:
+                self.advance()
+                self._parse_Фактор()
+                self._action_gen_op_divide()
+                continue
+            elif choice == 2:
+                return
+
+    def _parse_Выражение_rest(self):
+        """<Выражение*>"""
+        while True:
+            choice = _CHOICE_17.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Выражение*>', _EXPECTED_17)
+            if choice == 0:
+                self.advance()
+                self._parse_Терм()
+                self._action_gen_op_plus()
+                continue
+            elif choice == 1:
+                self.advance()
+                self._parse_Терм()
+                self._action_gen_op_minus()
+                continue
+            elif choice == 2:
+                return
+
+    def _parse_Сравнение_rest(self):
+        """<Сравнение*>"""
+        while True:
+            choice = _CHOICE_18.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Сравнение*>', _EXPECTED_18)
+            if choice == 0:
+                self.advance()
+                self._parse_Выражение()
+                self._action_gen_op_lt()
+                continue
+            elif choice == 1:
+                self.advance()
+                self._parse_Выражение()
+                self._action_gen_op_gt()
+                continue
+            elif choice == 2:
+                return
+
+    def _parse_Проверка_равенства_rest(self):
+        """<Проверка равенства*>"""
+        while True:
+            choice = _CHOICE_19.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<Проверка равенства*>', _EXPECTED_19)
+            if choice == 0:
+                self.advance()
+                self._parse_Выражение()
+                self._parse_Сравнение_rest()
+                self._action_gen_op_eq()
+                continue
+            elif choice == 1:
+                self.advance()
+                self._parse_Выражение()
+                self._parse_Сравнение_rest()
+                self._action_gen_op_neq()
+                continue
+            elif choice == 2:
+                return
+
+    def _parse_ЛогическоеИ_rest(self):
+        """<ЛогическоеИ*>"""
+        while True:
+            choice = _CHOICE_20.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<ЛогическоеИ*>', _EXPECTED_20)
+            if choice == 0:
+                self.advance()
+                self._parse_Выражение()
+                self._parse_Сравнение_rest()
+                self._parse_Проверка_равенства_rest()
+                self._action_gen_op_and()
+                continue
+            elif choice == 1:
+                return
+
+    def _parse_ЛогическоеВыражение_rest(self):
+        """<ЛогическоеВыражение*>"""
+        while True:
+            choice = _CHOICE_21.get(self._current_type)
+            if choice is None:
+                self.no_rule_error('<ЛогическоеВыражение*>', _EXPECTED_21)
+            if choice == 0:
+                self.advance()
+                self._parse_Выражение()
+                self._parse_Сравнение_rest()
+                self._parse_Проверка_равенства_rest()
+                self._parse_ЛогическоеИ_rest()
+                self._action_gen_op_or()
+                continue
+            elif choice == 1:
+                return
+
+    def _parse_ФакторIdent(self):
+        """<ФакторIdent>"""
+        choice = _CHOICE_22.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<ФакторIdent>', _EXPECTED_22)
+        if choice == 0:
+            self._action_add_array_name_to_rpn()
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RSQUARE:
+                self.mismatch_error(TokenType.RSQUARE)
+            self.advance()
+            self._action_gen_array_access_op()
+        elif choice == 1:
+            self._action_add_factor_to_rpn_if_not_array()
+
+    def _parse_Терм(self):
+        """<Терм>"""
+        choice = _CHOICE_23.get(self._current_type)
+        if choice is None:
+            self.no_rule_error('<Терм>', _EXPECTED_23)
+        if choice == 0:
+            self.advance()
+            self._parse_Фактор()
+            self._parse_Терм_rest()
+        elif choice == 1:
+            self._action_save_current_token_as_factor()
+            self.advance()
+            self._parse_ФакторIdent()
+            self._parse_Терм_rest()
+        elif choice == 2:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+        elif choice == 3:
+            self.rpn_generator.add_constant(self._current_value)
+            self.advance()
+            self._parse_Терм_rest()
+        elif choice == 4:
+            self.advance()
+            self._parse_Логическое_выражение()
+            if self._current_type != TokenType.RPAREN:
+                self.mismatch_error(TokenType.RPAREN)
+            self.advance()
+            self._parse_Терм_rest()
+
+# <Программа>
+_CHOICE_0 = {TokenType.INT: 0, TokenType.FLOAT: 1, TokenType.IF: 2, TokenType.IDENTIFIER: 3, TokenType.WHILE: 4, TokenType.INPUT: 5, TokenType.OUTPUT: 6}
+_EXPECTED_0 = (TokenType.INT, TokenType.FLOAT, TokenType.IF, TokenType.IDENTIFIER, TokenType.WHILE, TokenType.INPUT, TokenType.OUTPUT,)
+# <ОператорDT>
+_CHOICE_1 = {TokenType.IDENTIFIER: 0, TokenType.LSQUARE: 1}
+_EXPECTED_1 = (TokenType.IDENTIFIER, TokenType.LSQUARE,)
+# <Список операторов>
+_CHOICE_2 = {TokenType.INT: 0, TokenType.FLOAT: 1, TokenType.IF: 2, TokenType.IDENTIFIER: 3, TokenType.WHILE: 4, TokenType.INPUT: 5, TokenType.OUTPUT: 6, TokenType.RCURLY: 7, TokenType.EOF: 7}
+_EXPECTED_2 = (TokenType.INT, TokenType.FLOAT, TokenType.IF, TokenType.IDENTIFIER, TokenType.WHILE, TokenType.INPUT, TokenType.OUTPUT, TokenType.RCURLY, TokenType.EOF,)
+# <Логическое выражение>
+_CHOICE_3 = {TokenType.UNARY_MINUS: 0, TokenType.IDENTIFIER: 1, TokenType.INTEGER_CONST: 2, TokenType.FLOAT_CONST: 3, TokenType.LPAREN: 4}
+_EXPECTED_3 = (TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN,)
+# <Блок>
+_CHOICE_4 = {TokenType.LCURLY: 0}
+_EXPECTED_4 = (TokenType.LCURLY,)
+# <Альтернативное действие_extended>
+_CHOICE_5 = {TokenType.ELSE: 0, TokenType.INT: 1, TokenType.FLOAT: 1, TokenType.IF: 1, TokenType.WHILE: 1, TokenType.OUTPUT: 1, TokenType.INPUT: 1, TokenType.IDENTIFIER: 1, TokenType.RCURLY: 1, TokenType.EOF: 1}
+_EXPECTED_5 = (TokenType.ELSE, TokenType.INT, TokenType.FLOAT, TokenType.IF, TokenType.WHILE, TokenType.OUTPUT, TokenType.INPUT, TokenType.IDENTIFIER, TokenType.RCURLY, TokenType.EOF,)
+# <ПрисваиваниеIdent>
+_CHOICE_6 = {TokenType.ASSIGN: 0, TokenType.LSQUARE: 1}
+_EXPECTED_6 = (TokenType.ASSIGN, TokenType.LSQUARE,)
+# <ВводInput>
+_CHOICE_7 = {TokenType.IDENTIFIER: 0}
+_EXPECTED_7 = (TokenType.IDENTIFIER,)
+# <ОператорDTIdent>
+_CHOICE_8 = {TokenType.ASSIGN: 0, TokenType.LSQUARE: 1, TokenType.SEMICOLON: 2}
+_EXPECTED_8 = (TokenType.ASSIGN, TokenType.LSQUARE, TokenType.SEMICOLON,)
+# <ОператорDT_array>
+_CHOICE_9 = {TokenType.IDENTIFIER: 0, TokenType.INTEGER_CONST: 0, TokenType.FLOAT_CONST: 0, TokenType.LPAREN: 0, TokenType.UNARY_MINUS: 0, TokenType.RSQUARE: 1}
+_EXPECTED_9 = (TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN, TokenType.UNARY_MINUS, TokenType.RSQUARE,)
+# <Размер массива>
+_CHOICE_10 = {TokenType.UNARY_MINUS: 0, TokenType.IDENTIFIER: 1, TokenType.INTEGER_CONST: 2, TokenType.FLOAT_CONST: 3, TokenType.LPAREN: 4}
+_EXPECTED_10 = (TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN,)
+# <Инициализаторы>
+_CHOICE_11 = {TokenType.IDENTIFIER: 0, TokenType.INTEGER_CONST: 0, TokenType.FLOAT_CONST: 0, TokenType.LPAREN: 0, TokenType.LCURLY: 0, TokenType.UNARY_MINUS: 0, TokenType.RCURLY: 1}
+_EXPECTED_11 = (TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN, TokenType.LCURLY, TokenType.UNARY_MINUS, TokenType.RCURLY,)
+# <Выражение>
+_CHOICE_12 = {TokenType.UNARY_MINUS: 0, TokenType.IDENTIFIER: 1, TokenType.INTEGER_CONST: 2, TokenType.FLOAT_CONST: 3, TokenType.LPAREN: 4, TokenType.LCURLY: 5}
+_EXPECTED_12 = (TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN, TokenType.LCURLY,)
+# <Инициализаторы_продолжение>
+_CHOICE_13 = {TokenType.COMMA: 0, TokenType.RCURLY: 1}
+_EXPECTED_13 = (TokenType.COMMA, TokenType.RCURLY,)
+# <ВводInputIdent>
+_CHOICE_14 = {TokenType.LSQUARE: 0, TokenType.SEMICOLON: 1}
+_EXPECTED_14 = (TokenType.LSQUARE, TokenType.SEMICOLON,)
+# <Фактор>
+_CHOICE_15 = {TokenType.UNARY_MINUS: 0, TokenType.IDENTIFIER: 1, TokenType.INTEGER_CONST: 2, TokenType.FLOAT_CONST: 3, TokenType.LPAREN: 4}
+_EXPECTED_15 = (TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN,)
+# <Терм*>
+_CHOICE_16 = {TokenType.MULTIPLY: 0, TokenType.DIVIDE: 1, TokenType.RPAREN: 2, TokenType.RSQUARE: 2, TokenType.RCURLY: 2, TokenType.SEMICOLON: 2, TokenType.COMMA: 2, TokenType.PLUS: 2, TokenType.MINUS: 2, TokenType.LT: 2, TokenType.GT: 2, TokenType.NEQ: 2, TokenType.EQ: 2, TokenType.AND: 2, TokenType.OR: 2}
+_EXPECTED_16 = (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.RPAREN, TokenType.RSQUARE, TokenType.RCURLY, TokenType.SEMICOLON, TokenType.COMMA, TokenType.PLUS, TokenType.MINUS, TokenType.LT, TokenType.GT, TokenType.NEQ, TokenType.EQ, TokenType.AND, TokenType.OR,)
+# <Выражение*>
+_CHOICE_17 = {TokenType.PLUS: 0, TokenType.MINUS: 1, TokenType.RPAREN: 2, TokenType.RSQUARE: 2, TokenType.RCURLY: 2, TokenType.SEMICOLON: 2, TokenType.COMMA: 2, TokenType.LT: 2, TokenType.GT: 2, TokenType.NEQ: 2, TokenType.EQ: 2, TokenType.AND: 2, TokenType.OR: 2}
+_EXPECTED_17 = (TokenType.PLUS, TokenType.MINUS, TokenType.RPAREN, TokenType.RSQUARE, TokenType.RCURLY, TokenType.SEMICOLON, TokenType.COMMA, TokenType.LT, TokenType.GT, TokenType.NEQ, TokenType.EQ, TokenType.AND, TokenType.OR,)
+# <Сравнение*>
+_CHOICE_18 = {TokenType.LT: 0, TokenType.GT: 1, TokenType.RPAREN: 2, TokenType.RSQUARE: 2, TokenType.SEMICOLON: 2, TokenType.NEQ: 2, TokenType.EQ: 2, TokenType.AND: 2, TokenType.OR: 2}
+_EXPECTED_18 = (TokenType.LT, TokenType.GT, TokenType.RPAREN, TokenType.RSQUARE, TokenType.SEMICOLON, TokenType.NEQ, TokenType.EQ, TokenType.AND, TokenType.OR,)
+# <Проверка равенства*>
+_CHOICE_19 = {TokenType.EQ: 0, TokenType.NEQ: 1, TokenType.RPAREN: 2, TokenType.RSQUARE: 2, TokenType.SEMICOLON: 2, TokenType.AND: 2, TokenType.OR: 2}
+_EXPECTED_19 = (TokenType.EQ, TokenType.NEQ, TokenType.RPAREN, TokenType.RSQUARE, TokenType.SEMICOLON, TokenType.AND, TokenType.OR,)
+# <ЛогическоеИ*>
+_CHOICE_20 = {TokenType.AND: 0, TokenType.RPAREN: 1, TokenType.RSQUARE: 1, TokenType.SEMICOLON: 1, TokenType.OR: 1}
+_EXPECTED_20 = (TokenType.AND, TokenType.RPAREN, TokenType.RSQUARE, TokenType.SEMICOLON, TokenType.OR,)
+# <ЛогическоеВыражение*>
+_CHOICE_21 = {TokenType.OR: 0, TokenType.RPAREN: 1, TokenType.RSQUARE: 1, TokenType.SEMICOLON: 1}
+_EXPECTED_21 = (TokenType.OR, TokenType.RPAREN, TokenType.RSQUARE, TokenType.SEMICOLON,)
+# <ФакторIdent>
+_CHOICE_22 = {TokenType.LSQUARE: 0, TokenType.RPAREN: 1, TokenType.RSQUARE: 1, TokenType.RCURLY: 1, TokenType.SEMICOLON: 1, TokenType.COMMA: 1, TokenType.PLUS: 1, TokenType.MINUS: 1, TokenType.MULTIPLY: 1, TokenType.DIVIDE: 1, TokenType.LT: 1, TokenType.GT: 1, TokenType.NEQ: 1, TokenType.EQ: 1, TokenType.AND: 1, TokenType.OR: 1}
+_EXPECTED_22 = (TokenType.LSQUARE, TokenType.RPAREN, TokenType.RSQUARE, TokenType.RCURLY, TokenType.SEMICOLON, TokenType.COMMA, TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.LT, TokenType.GT, TokenType.NEQ, TokenType.EQ, TokenType.AND, TokenType.OR,)
+# <Терм>
+_CHOICE_23 = {TokenType.UNARY_MINUS: 0, TokenType.IDENTIFIER: 1, TokenType.INTEGER_CONST: 2, TokenType.FLOAT_CONST: 3, TokenType.LPAREN: 4}
+_EXPECTED_23 = (TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN,)
+
+_START_FUNCTIONS = {
+    '<Программа>': GeneratedParser._parse_Программа_top,
+    '<Список операторов>': GeneratedParser._parse_Список_операторов_top,
+}
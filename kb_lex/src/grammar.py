@@ -0,0 +1,310 @@
+from .token_type import TokenType
+
+
+# Виды символов грамматики
+SYMBOL_UNKNOWN = 0
+SYMBOL_TERMINAL = 1
+SYMBOL_NONTERMINAL = 2
+SYMBOL_ACTION = 3
+
+# Маркеры семантических действий отличаются от нетерминалов префиксом
+_ACTION_PREFIXES = ("<gen_", "<after_", "<end_", "<start_", "<while", "<push_", "<save_", "<add_")
+
+
+def symbol_kind(symbol):
+    """Вид символа грамматики: терминал (TokenType), нетерминал <...> или маркер действия"""
+    if isinstance(symbol, TokenType):
+        return SYMBOL_TERMINAL
+    if isinstance(symbol, str):
+        if symbol.startswith(_ACTION_PREFIXES):
+            return SYMBOL_ACTION
+        if symbol.startswith("<") and symbol.endswith(">"):
+            return SYMBOL_NONTERMINAL
+    return SYMBOL_UNKNOWN
+
+
+START_SYMBOL = "<Программа>"
+
+# Операторы: общие альтернативы <Программа> и <Список операторов>
+_STATEMENTS = (
+    ("<push_int_type>", TokenType.INT, "<ОператорDT>", "<Список операторов>"),
+    ("<push_float_type>", TokenType.FLOAT, "<ОператорDT>", "<Список операторов>"),
+    (TokenType.IF, TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<after_if_condition>",
+     "<Блок>", "<Альтернативное действие_extended>", "<Список операторов>"),
+    ("<save_identifier_token>", TokenType.IDENTIFIER, "<ПрисваиваниеIdent>", TokenType.SEMICOLON,
+     "<Список операторов>"),
+    (TokenType.WHILE, "<while>", TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN,
+     "<after_while_condition>", "<Блок>", "<end_while_block>", "<Список операторов>"),
+    (TokenType.INPUT, "<ВводInput>", "<Список операторов>"),
+    (TokenType.OUTPUT, "<Логическое выражение>", "<gen_output_op>", TokenType.SEMICOLON, "<Список операторов>"),
+)
+
+# Арифметическое выражение: общие альтернативы <Выражение> и <Размер массива>
+_ARITHMETIC_EXPRESSION = (
+    (TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>", "<Выражение*>"),
+    ("<save_current_token_as_factor>", TokenType.IDENTIFIER, "<ФакторIdent>", "<Терм*>", "<Выражение*>"),
+    (TokenType.INTEGER_CONST, "<Терм*>", "<Выражение*>"),
+    (TokenType.FLOAT_CONST, "<Терм*>", "<Выражение*>"),
+    (TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>", "<Выражение*>"),
+)
+
+# Грамматика языка: {нетерминал: кортеж альтернатив}. Маркеры семантических
+# действий не потребляют токенов и при построении таблицы считаются пустыми.
+# Пустая альтернатива () выбирается по FOLLOW нетерминала.
+GRAMMAR = {
+    "<Программа>": _STATEMENTS,
+    "<Список операторов>": _STATEMENTS + ((),),
+
+    "<ОператорDT>": (
+        ("<save_identifier_token>", TokenType.IDENTIFIER, "<add_variable_declaration>", "<ОператорDTIdent>",
+         TokenType.SEMICOLON),
+        (TokenType.LSQUARE, "<ОператорDT_array>"),
+    ),
+    "<ОператорDT_array>": (
+        # type [размер] name; - массив с размером из выражения
+        ("<Размер массива>", TokenType.RSQUARE, "<save_identifier_token>", TokenType.IDENTIFIER,
+         "<add_dynamic_array_declaration>", TokenType.SEMICOLON),
+        # type [] name = {...}; - массив со списком инициализации
+        (TokenType.RSQUARE, "<save_identifier_token>", TokenType.IDENTIFIER, "<add_array_declaration_for_init>",
+         TokenType.ASSIGN, "<gen_array_init_start>", TokenType.LCURLY, "<Инициализаторы>", TokenType.RCURLY,
+         "<gen_array_init_end>", TokenType.SEMICOLON),
+    ),
+    "<ОператорDTIdent>": (
+        (TokenType.ASSIGN, "<Выражение>", "<gen_assign_op>"),
+        # type arr[size] = expr;
+        (TokenType.LSQUARE, TokenType.INTEGER_CONST, TokenType.RSQUARE, TokenType.ASSIGN, "<Выражение>",
+         "<gen_array_assign_op>"),
+        (),
+    ),
+    "<Инициализаторы>": (
+        ("<Выражение>", "<Инициализаторы_продолжение>"),
+        (),
+    ),
+    "<Инициализаторы_продолжение>": (
+        (TokenType.COMMA, "<Выражение>", "<Инициализаторы_продолжение>"),
+        (),
+    ),
+    "<Альтернативное действие_extended>": (
+        (TokenType.ELSE, "<start_else_block>", "<Блок>", "<end_if_block>"),
+        ("<end_if_block>",),
+    ),
+    "<Блок>": (
+        (TokenType.LCURLY, "<Список операторов>", TokenType.RCURLY),
+    ),
+    "<ПрисваиваниеIdent>": (
+        ("<add_identifier_to_rpn_for_assign>", TokenType.ASSIGN, "<Выражение>", "<gen_assign_op>"),
+        ("<add_identifier_to_rpn_for_assign>", TokenType.LSQUARE, "<Логическое выражение>", TokenType.RSQUARE,
+         TokenType.ASSIGN, "<Выражение>", "<gen_array_assign_op>"),
+    ),
+    "<ВводInput>": (
+        ("<save_identifier_token>", TokenType.IDENTIFIER, "<ВводInputIdent>", TokenType.SEMICOLON),
+    ),
+    "<ВводInputIdent>": (
+        ("<add_input_identifier_to_rpn>", TokenType.LSQUARE, "<Логическое выражение>", TokenType.RSQUARE,
+         "<gen_input_array_op>"),
+        # Простая переменная
+        ("<add_input_identifier_to_rpn>", "<gen_input_op>"),
+    ),
+
+    "<Логическое выражение>": (
+        (TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>",
+         "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"),
+        ("<save_current_token_as_factor>", TokenType.IDENTIFIER, "<ФакторIdent>", "<Терм*>", "<Выражение*>",
+         "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"),
+        (TokenType.INTEGER_CONST, "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>",
+         "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"),
+        (TokenType.FLOAT_CONST, "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>",
+         "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"),
+        (TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>", "<Выражение*>", "<Сравнение*>",
+         "<Проверка равенства*>", "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"),
+    ),
+    # | : операнд - <Выражение><Сравнение*><Проверка равенства*><ЛогическоеИ*>
+    "<ЛогическоеВыражение*>": (
+        (TokenType.OR, "<Выражение>", "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<gen_op_or>",
+         "<ЛогическоеВыражение*>"),
+        (),
+    ),
+    # & : операнд - <Выражение><Сравнение*><Проверка равенства*>
+    "<ЛогическоеИ*>": (
+        (TokenType.AND, "<Выражение>", "<Сравнение*>", "<Проверка равенства*>", "<gen_op_and>", "<ЛогическоеИ*>"),
+        (),
+    ),
+    # ?, ! : операнд - <Выражение><Сравнение*>
+    "<Проверка равенства*>": (
+        (TokenType.EQ, "<Выражение>", "<Сравнение*>", "<gen_op_eq>", "<Проверка равенства*>"),
+        (TokenType.NEQ, "<Выражение>", "<Сравнение*>", "<gen_op_neq>", "<Проверка равенства*>"),
+        (),
+    ),
+    # <, > : операнд - <Выражение>
+    "<Сравнение*>": (
+        (TokenType.LT, "<Выражение>", "<gen_op_lt>", "<Сравнение*>"),
+        (TokenType.GT, "<Выражение>", "<gen_op_gt>", "<Сравнение*>"),
+        (),
+    ),
+
+    "<Выражение>": _ARITHMETIC_EXPRESSION + (
+        ("<gen_list_start>", TokenType.LCURLY, "<Инициализаторы>", TokenType.RCURLY, "<gen_list_end>"),
+    ),
+    # Размер массива - выражение без списка инициализации {...}
+    "<Размер массива>": _ARITHMETIC_EXPRESSION,
+    "<Выражение*>": (
+        (TokenType.PLUS, "<Терм>", "<gen_op_plus>", "<Выражение*>"),
+        (TokenType.MINUS, "<Терм>", "<gen_op_minus>", "<Выражение*>"),
+        (),
+    ),
+    "<Терм>": (
+        (TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>"),
+        ("<save_current_token_as_factor>", TokenType.IDENTIFIER, "<ФакторIdent>", "<Терм*>"),
+        (TokenType.INTEGER_CONST, "<Терм*>"),
+        (TokenType.FLOAT_CONST, "<Терм*>"),
+        (TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>"),
+    ),
+    "<Терм*>": (
+        (TokenType.MULTIPLY, "<Фактор>", "<gen_op_multiply>", "<Терм*>"),
+        (TokenType.DIVIDE, "<Фактор>", "<gen_op_divide>", "<Терм*>"),
+        (),
+    ),
+    "<Фактор>": (
+        (TokenType.UNARY_MINUS, "<Фактор>", "<gen_op_uminus>"),
+        ("<save_current_token_as_factor>", TokenType.IDENTIFIER, "<ФакторIdent>", "<add_factor_to_rpn_if_not_array>"),
+        (TokenType.INTEGER_CONST,),  # Константа добавляется в ОПС при сопоставлении
+        (TokenType.FLOAT_CONST,),
+        (TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN),
+    ),
+    "<ФакторIdent>": (
+        # Доступ к элементу массива
+        ("<add_array_name_to_rpn>", TokenType.LSQUARE, "<Логическое выражение>", TokenType.RSQUARE,
+         "<gen_array_access_op>"),
+        # Простая переменная
+        ("<add_factor_to_rpn_if_not_array>",),
+    ),
+}
+
+
+class GrammarAnalysis:
+    """
+    Результат анализа LL(1) грамматики: множества FIRST и FOLLOW,
+    конфликты, недостижимые и неопределенные нетерминалы и минимальная
+    таблица разбора - правило записано только для токенов из FIRST
+    альтернативы, а для пустой альтернативы - из FOLLOW нетерминала.
+    """
+
+    __slots__ = ('grammar', 'start', 'first', 'nullable', 'follow', 'reachable',
+                 'unreachable', 'undefined', 'conflicts', 'table')
+
+    def __init__(self, grammar, start=START_SYMBOL):
+        self.grammar = grammar
+        self.start = start
+        self.undefined = sorted({symbol for alternatives in grammar.values() for rule in alternatives
+                                 for symbol in rule
+                                 if symbol_kind(symbol) == SYMBOL_NONTERMINAL and symbol not in grammar})
+        self.reachable = self._reachable()
+        self.unreachable = [nonterminal for nonterminal in grammar if nonterminal not in self.reachable]
+        self.first, self.nullable = self._first_sets()
+        self.follow = self._follow_sets()
+        self.conflicts = []  # (нетерминал, токен, первая альтернатива, вторая альтернатива)
+        self.table = self._table()
+
+    def _reachable(self):
+        reachable = set()
+        pending = [self.start]
+        while pending:
+            nonterminal = pending.pop()
+            if nonterminal in reachable or nonterminal not in self.grammar:
+                continue
+            reachable.add(nonterminal)
+            for rule in self.grammar[nonterminal]:
+                pending.extend(s for s in rule if symbol_kind(s) == SYMBOL_NONTERMINAL)
+        return reachable
+
+    def first_of(self, symbols, first=None, nullable=None):
+        """FIRST цепочки символов и признак того, что она выводит пустую строку"""
+        first = self.first if first is None else first
+        nullable = self.nullable if nullable is None else nullable
+        result = set()
+        for symbol in symbols:
+            kind = symbol_kind(symbol)
+            if kind == SYMBOL_TERMINAL:
+                result.add(symbol)
+                return result, False
+            if kind == SYMBOL_NONTERMINAL:
+                result |= first.get(symbol, set())
+                if symbol not in nullable:
+                    return result, False
+        return result, True
+
+    def _first_sets(self):
+        first = {nonterminal: set() for nonterminal in self.grammar}
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for nonterminal, alternatives in self.grammar.items():
+                for rule in alternatives:
+                    rule_first, rule_nullable = self.first_of(rule, first, nullable)
+                    if not rule_first <= first[nonterminal]:
+                        first[nonterminal] |= rule_first
+                        changed = True
+                    if rule_nullable and nonterminal not in nullable:
+                        nullable.add(nonterminal)
+                        changed = True
+        return first, nullable
+
+    def _follow_sets(self):
+        follow = {nonterminal: set() for nonterminal in self.grammar}
+        follow[self.start].add(TokenType.EOF)
+        changed = True
+        while changed:
+            changed = False
+            for nonterminal, alternatives in self.grammar.items():
+                for rule in alternatives:
+                    for position, symbol in enumerate(rule):
+                        if symbol_kind(symbol) != SYMBOL_NONTERMINAL or symbol not in follow:
+                            continue
+                        rest_first, rest_nullable = self.first_of(rule[position + 1:])
+                        if rest_nullable:
+                            rest_first = rest_first | follow[nonterminal]
+                        if not rest_first <= follow[symbol]:
+                            follow[symbol] |= rest_first
+                            changed = True
+        return follow
+
+    def _table(self):
+        table = {}
+        for nonterminal, alternatives in self.grammar.items():
+            if nonterminal not in self.reachable:
+                continue
+            row = {}
+            for rule in alternatives:
+                predict, rule_nullable = self.first_of(rule)
+                if rule_nullable:
+                    predict = predict | self.follow[nonterminal]
+                for token_type in sorted(predict):
+                    if token_type in row and row[token_type] != list(rule):
+                        self.conflicts.append((nonterminal, token_type, tuple(row[token_type]), rule))
+                        continue
+                    row[token_type] = list(rule)
+            table[nonterminal] = row
+        return table
+
+    def check(self):
+        """Бросает ValueError, если грамматика не LL(1) или ссылается на неопределенные нетерминалы"""
+        problems = [f"нетерминал {nonterminal} не определен" for nonterminal in self.undefined]
+        problems += [f"конфликт LL(1) в {nonterminal} по {token_type.name}: {list(a)} и {list(b)}"
+                     for nonterminal, token_type, a, b in self.conflicts]
+        if problems:
+            raise ValueError("Грамматика не является LL(1): " + "; ".join(problems))
+
+    def table_size(self):
+        """Число записей таблицы разбора"""
+        return sum(len(row) for row in self.table.values())
+
+
+def build_parse_table(grammar=GRAMMAR, start=START_SYMBOL):
+    """
+    Строит минимальную LL(1) таблицу разбора {нетерминал: {терминал: правило}}.
+    Недостижимые нетерминалы в таблицу не попадают; при конфликтах бросает ValueError.
+    """
+    analysis = GrammarAnalysis(grammar, start)
+    analysis.check()
+    return analysis.table
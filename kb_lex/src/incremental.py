@@ -0,0 +1,243 @@
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from .lexer import analyze, _analyze_fragment
+from .parser import Parser
+from .rpn_analysis import JUMP_OPERATIONS
+from .symbol_table import SymbolTable
+from .token_1 import Token
+
+
+class CompilationSnapshot:
+    """
+    Результат компиляции, пригодный для инкрементальной перекомпиляции.
+
+    Кроме токенов, ОПС и таблицы символов хранит границы операторов
+    верхнего уровня <Список операторов>: для каждой границы - индекс
+    первого токена оператора, адрес его первой команды ОПС и число
+    символов, объявленных до него.
+    """
+
+    __slots__ = ('source', 'tokens', 'rpn', 'symbol_table', 'boundaries', 'pending')
+
+    def __init__(self, source, tokens, rpn, symbol_table, boundaries, pending=None):
+        self.source = source
+        self.tokens = tokens
+        self.rpn = rpn
+        self.symbol_table = symbol_table
+        self.boundaries = boundaries  # Список (индекс токена, адрес ОПС, число символов)
+        # Для текста с ошибкой: (последний успешный результат, start, end, text) -
+        # одна правка, переводящая его текст в source
+        self.pending = pending
+
+    @classmethod
+    def failed(cls, source, pending=None):
+        """Текст, компиляция которого завершилась ошибкой"""
+        return cls(source, None, None, None, None, pending)
+
+
+def boundary_recorder(boundaries):
+    """Возвращает statement_hook парсера, записывающий границы операторов в boundaries"""
+    def hook(parser):
+        boundaries.append((parser.current_index,
+                           parser.rpn_generator.get_current_index(),
+                           len(parser.symbol_table.symbols)))
+        return False
+    return hook
+
+
+def compile_snapshot(source, tokens=None, parser_class=Parser):
+    """
+    Полная компиляция с записью границ операторов.
+
+    Args:
+        source: Исходный код
+        tokens: Уже полученный список токенов source (если есть)
+        parser_class: Реализация парсера (Parser или GeneratedParser)
+    """
+    if tokens is None:
+        tokens = analyze(source)
+    boundaries = [(0, 0, 0)]
+    parser = parser_class(tokens, statement_hook=boundary_recorder(boundaries))
+    try:
+        rpn, symbol_table = parser.parse()
+    except RecursionError:
+        # Слишком глубокая вложенность для рекурсивного спуска (см. Compiler.compile)
+        del boundaries[1:]
+        parser = Parser(tokens, statement_hook=boundary_recorder(boundaries))
+        rpn, symbol_table = parser.parse()
+    return CompilationSnapshot(source, tokens, rpn, symbol_table, boundaries)
+
+
+def edited_source(source, start, end, text):
+    """Текст source после замены диапазона [start, end) на text"""
+    if not 0 <= start <= end <= len(source):
+        raise ValueError(f"Некорректный диапазон правки: [{start}, {end})")
+    return source[:start] + text + source[end:]
+
+
+class _Resync(Exception):
+    """Инкрементальная перекомпиляция невозможна - нужна полная"""
+
+
+def apply_edit(snapshot, start, end, text, parser_class=Parser):
+    """
+    Инкрементальная перекомпиляция после замены source[start:end] на text.
+
+    Заново анализируются только строки, затронутые правкой, и заново
+    разбираются только операторы верхнего уровня от оператора перед
+    правкой до первой границы, совпавшей с границей старого разбора.
+    ОПС остальных операторов переиспользуется: адреса переходов $J/$JF
+    в хвосте сдвигаются, номера строк токенов и символов хвоста - тоже.
+    Если правка не укладывается в эту схему (символ '\0', конфликт с
+    объявлениями хвоста), выполняется полная компиляция, поэтому результат
+    и ошибки всегда совпадают с compile_snapshot нового текста.
+
+    parser_class задает реализацию парсера (Parser или GeneratedParser).
+    Правки текста с ошибкой объединяются с правками, сделанными после
+    последней успешной компиляции, и применяются к ее результату.
+
+    Returns:
+        CompilationSnapshot: Результат для нового текста
+    """
+    new_source = edited_source(snapshot.source, start, end, text)
+    if snapshot.tokens is None:
+        pending = compose_edit(snapshot, start, end, text)
+        if pending is None:
+            return compile_snapshot(new_source, parser_class=parser_class)
+        snapshot, start, end, text = pending
+    try:
+        return _apply_edit(snapshot, start, end, text, new_source, parser_class)
+    except RecursionError:
+        return compile_snapshot(new_source, parser_class=parser_class)
+    except (RuntimeError, SyntaxError, ValueError):
+        # Строки до правки и хвост не изменились и были корректны, поэтому
+        # первая ошибка в измененной части - первая ошибка всего текста
+        raise
+    except Exception:
+        return compile_snapshot(new_source, parser_class=parser_class)
+
+
+def compose_edit(snapshot, start, end, text):
+    """
+    Выражает правку текста snapshot.source одной правкой текста последнего
+    успешного результата. Возвращает (результат, start, end, text) или None,
+    если успешного результата нет.
+    """
+    if snapshot.tokens is not None:
+        return snapshot, start, end, text
+    if snapshot.pending is None:
+        return None
+    base, base_start, base_end, base_text = snapshot.pending
+    # В snapshot.source изменен только диапазон [base_start, changed_end)
+    changed_end = base_start + len(base_text)
+    new_start = min(base_start, start)
+    new_end = max(changed_end, end)
+    new_source = edited_source(snapshot.source, start, end, text)
+    replacement = new_source[new_start:new_end + len(text) - (end - start)]
+    return base, new_start, new_end - changed_end + base_end, replacement
+
+
+def _apply_edit(snapshot, start, end, text, new_source, parser_class):
+    source = snapshot.source
+    tokens = snapshot.tokens
+    if '\0' in new_source or '\0' in source:
+        raise _Resync()
+
+    # Затронутые правкой строки целиком, вместе с завершающим '\n'
+    region_start = source.rfind('\n', 0, start) + 1
+    region_end = source.find('\n', end)
+    final = region_end == -1
+    region_end = len(source) if final else region_end + 1
+    first_line = source.count('\n', 0, region_start) + 1
+    last_line = first_line + source.count('\n', region_start, region_end) - (0 if final else 1)
+    region_text = source[region_start:start] + text + source[end:region_end]
+    line_delta = text.count('\n') - source.count('\n', start, end)
+
+    region_tokens = _analyze_fragment(region_text, first_line, 0 if first_line == 1 else 1, final)
+    first_token = bisect_left(tokens, first_line, key=_token_line)
+    tail_token = len(tokens) if final else bisect_right(tokens, last_line, key=_token_line)
+    token_delta = len(region_tokens) - (tail_token - first_token)
+
+    tail = tokens[tail_token:]
+    if line_delta:
+        tail = [Token.from_parts(t.token_type, t.value, t.line + line_delta, t.position) for t in tail]
+    new_tokens = tokens[:first_token] + region_tokens + tail
+    new_tail_token = first_token + len(region_tokens)
+
+    # Разбор начинается с оператора, предшествующего первому измененному
+    # токену: его окончание определялось просмотром этого токена
+    boundaries = snapshot.boundaries
+    resume = bisect_left(boundaries, (first_token,)) - 1
+    if resume < 0:
+        resume = 0
+    resume_token, resume_address, resume_symbols = boundaries[resume]
+
+    symbol_table = SymbolTable()
+    for name, info in islice(snapshot.symbol_table.symbols.items(), resume_symbols):
+        symbol_table.symbols[name] = dict(info)
+
+    old_boundary_by_token = {boundary[0]: number
+                             for number, boundary in enumerate(boundaries[resume + 1:], resume + 1)
+                             if boundary[0] >= tail_token}
+    new_boundaries = boundaries[:resume]
+    resynced = []
+
+    def hook(parser):
+        index = parser.current_index
+        boundary = (index, parser.rpn_generator.get_current_index(), len(parser.symbol_table.symbols))
+        if new_boundaries and new_boundaries[-1][0] == index:
+            return False  # Граница, с которой разбор возобновлен
+        new_boundaries.append(boundary)
+        if index >= new_tail_token:
+            number = old_boundary_by_token.get(index - token_delta)
+            if number is not None:
+                resynced.append(number)
+                return True
+        return False
+
+    parser = parser_class(new_tokens, statement_hook=hook)
+    if resume_token == 0:
+        new_boundaries.append((0, 0, 0))
+        parser.symbol_table = symbol_table
+    else:
+        new_boundaries.append(boundaries[resume])
+        parser.start_at_statement(resume_token, resume_address, symbol_table)
+    region_rpn, symbol_table = parser.parse()
+
+    rpn = snapshot.rpn[:resume_address]
+    rpn.extend(region_rpn)
+    if resynced:
+        number = resynced[0]
+        old_token, old_address, old_symbols = boundaries[number]
+        new_token, new_address, new_symbols = new_boundaries[-1]
+        rpn_delta = new_address - old_address
+        symbol_delta = new_symbols - old_symbols
+
+        # Объявления хвоста не должны конфликтовать с новыми объявлениями
+        symbols = symbol_table.symbols
+        for name, info in islice(snapshot.symbol_table.symbols.items(), old_symbols, None):
+            if name in symbols:
+                raise _Resync()
+            info = dict(info)
+            info['line'] += line_delta
+            symbols[name] = info
+
+        rpn.extend(relocate_jumps(snapshot.rpn[old_address:], rpn_delta))
+        new_boundaries.extend((token + token_delta, address + rpn_delta, count + symbol_delta)
+                              for token, address, count in boundaries[number + 1:])
+
+    return CompilationSnapshot(new_source, new_tokens, rpn, symbol_table, new_boundaries)
+
+
+def relocate_jumps(rpn, delta):
+    """Сдвигает на delta адреса переходов ($J, $JF, $JT) во фрагменте ОПС (на месте)"""
+    if delta:
+        for index in range(len(rpn) - 1):
+            if rpn[index] in JUMP_OPERATIONS:
+                rpn[index + 1] += delta
+    return rpn
+
+
+def _token_line(token):
+    return token.line
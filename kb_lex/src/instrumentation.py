@@ -0,0 +1,177 @@
+from collections import Counter
+
+from .expression_parser import EXPRESSION_NONTERMINALS
+from .lexer import KEYWORDS
+from .state import State
+from .token_stream import TokenStream
+from .token_type import TokenType
+
+
+# Переходы автомата analyze, которые проходит лексема каждого типа
+# (символы, обработанные без смены состояния, не считаются)
+_WORD_TRANSITIONS = ((State.S, State.A), (State.A, State.S))
+_TOKEN_TRANSITIONS = {token_type: _WORD_TRANSITIONS for token_type in KEYWORDS.values()}
+_TOKEN_TRANSITIONS[TokenType.IDENTIFIER] = _WORD_TRANSITIONS
+_TOKEN_TRANSITIONS[TokenType.INTEGER_CONST] = ((State.S, State.B), (State.B, State.S))
+_TOKEN_TRANSITIONS[TokenType.FLOAT_CONST] = ((State.S, State.B), (State.B, State.C), (State.C, State.D),
+                                             (State.D, State.S))
+
+
+def lexer_statistics(tokens):
+    """
+    Счетчики лексического анализа по готовым лексемам (списку Token или
+    TokenStream): число лексем каждого TokenType и переходов автомата
+    analyze между состояниями State.
+
+    Автомат детерминирован, и каждая лексема проходит в нем одну и ту же
+    цепочку состояний (идентификатор: S -> A -> S, вещественная константа:
+    S -> B -> C -> D -> S, оператор не покидает S), поэтому переходы
+    восстанавливаются по лексемам без счетчиков в самом лексере. Счет
+    одинаков для обоих лексеров, так как они выдают одни и те же лексемы.
+
+    Returns:
+        dict: {"tokens": {имя TokenType: число},
+               "transitions": {имя State: {имя State: число}}}
+    """
+    if isinstance(tokens, TokenStream):
+        counts = Counter(TokenType(code) for code in tokens.types)
+    else:
+        counts = Counter(token.token_type for token in tokens)
+
+    transitions = {}
+    for token_type, count in counts.items():
+        for source, target in _TOKEN_TRANSITIONS.get(token_type, ()):
+            row = transitions.setdefault(source.name, {})
+            row[target.name] = row.get(target.name, 0) + count
+    return {
+        "tokens": {token_type.name: count for token_type, count in sorted(counts.items())},
+        "transitions": transitions,
+    }
+
+
+class _CountingRow:
+    """Строка таблицы разбора, считающая обращения и раскрытия нетерминала"""
+
+    __slots__ = ('row', 'code', 'statistics', 'stack')
+
+    def __init__(self, row, code, statistics, stack):
+        self.row = row
+        self.code = code
+        self.statistics = statistics
+        self.stack = stack
+
+    def get(self, token_type):
+        statistics = self.statistics
+        statistics.table_lookups += 1
+        rule = self.row.get(token_type)
+        if rule is not None:
+            statistics.expansions[self.code] += 1
+            # Глубина стека после замены нетерминала правой частью правила
+            depth = len(self.stack) - 1 + len(rule)
+            if depth > statistics.max_stack_depth:
+                statistics.max_stack_depth = depth
+        return rule
+
+
+class ParseStatistics:
+    """
+    Счетчики синтаксического анализа одного разбора Parser.parse:
+    раскрытия правил по нетерминалам, выполненные семантические действия,
+    обращения к таблице разбора, наибольшая глубина стека разбора и
+    выражения, разобранные ExpressionParser.
+
+    Parser без статистики работает по обычным строкам таблицы и списку
+    действий. Со статистикой parse один раз подменяет их считающими
+    обертками (instrument), поэтому цикл разбора один и тот же, а
+    выключенные счетчики ничего не стоят.
+    """
+
+    __slots__ = ('grammar', 'expansions', 'actions', 'table_lookups', 'max_stack_depth',
+                 'fast_expressions', 'declined_expressions')
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        size = len(grammar.symbols)
+        self.expansions = [0] * size
+        self.actions = [0] * size
+        self.table_lookups = 0
+        self.max_stack_depth = 0
+        self.fast_expressions = Counter()
+        self.declined_expressions = Counter()
+
+    def instrument(self, rows, actions, parse_expression, stack):
+        """Считающие варианты строк таблицы, действий и разбора выражений"""
+        if len(stack) > self.max_stack_depth:
+            self.max_stack_depth = len(stack)
+        counting_rows = [None if row is None else _CountingRow(row, code, self, stack)
+                         for code, row in enumerate(rows)]
+        counting_actions = [None if action is None else self._counting_action(code, action)
+                            for code, action in enumerate(actions)]
+        if parse_expression is None:
+            return counting_rows, counting_actions, None
+
+        def counting_parse_expression(kind):
+            parsed = parse_expression(kind)
+            (self.fast_expressions if parsed else self.declined_expressions)[kind] += 1
+            return parsed
+
+        return counting_rows, counting_actions, counting_parse_expression
+
+    def _counting_action(self, code, action):
+        counts = self.actions
+
+        def counting_action():
+            counts[code] += 1
+            return action()
+
+        return counting_action
+
+    def report(self):
+        """
+        Returns:
+            dict: {"expansions": {нетерминал: число}, "actions": {маркер: число},
+                   "table_lookups": число, "max_stack_depth": число,
+                   "fast_expressions": {нетерминал: число},
+                   "declined_expressions": {нетерминал: число}}
+        """
+        symbols = self.grammar.symbols
+        names = {kind: name for name, kind in EXPRESSION_NONTERMINALS.items()}
+        return {
+            "expansions": {symbols[code]: count for code, count in enumerate(self.expansions) if count},
+            "actions": {symbols[code]: count for code, count in enumerate(self.actions) if count},
+            "table_lookups": self.table_lookups,
+            "max_stack_depth": self.max_stack_depth,
+            "fast_expressions": {names[kind]: count for kind, count in sorted(self.fast_expressions.items())},
+            "declined_expressions": {names[kind]: count
+                                     for kind, count in sorted(self.declined_expressions.items())},
+        }
+
+
+def format_report(report):
+    """Текст отчета Compiler.get_instrumentation_report для печати"""
+    lines = []
+    lexer = report["lexer"]
+    lines.append(f"Лексем: {sum(lexer['tokens'].values())}")
+    for name, count in sorted(lexer["tokens"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {name:15} {count}")
+    lines.append("Переходы автомата лексера:")
+    for source, targets in lexer["transitions"].items():
+        for target, count in targets.items():
+            lines.append(f"  {source} -> {target}: {count}")
+
+    parser = report["parser"]
+    lines.append(f"Обращений к таблице разбора: {parser['table_lookups']}")
+    lines.append(f"Наибольшая глубина стека разбора: {parser['max_stack_depth']}")
+    lines.append(f"Раскрытий правил: {sum(parser['expansions'].values())}")
+    for nonterminal, count in sorted(parser["expansions"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {nonterminal:35} {count}")
+    lines.append(f"Семантических действий: {sum(parser['actions'].values())}")
+    for action, count in sorted(parser["actions"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {action:35} {count}")
+    if parser["fast_expressions"] or parser["declined_expressions"]:
+        lines.append("Выражения, разобранные сортировочной станцией:")
+        for nonterminal, count in parser["fast_expressions"].items():
+            lines.append(f"  {nonterminal:35} {count}")
+        for nonterminal, count in parser["declined_expressions"].items():
+            lines.append(f"  {nonterminal:35} {count} (разобрано по таблице)")
+    return "\n".join(lines)
@@ -1,5 +1,11 @@
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 from .state import State
 from .token_1 import Token
+from .token_stream import TokenStream
 from .token_type import TokenType
 
 
@@ -39,12 +45,12 @@ KEYWORDS = {
 }
 
 
-def analyze(input_string):
+def analyze(input_string, line=1, position=0):
+    # line и position задают начальную строку и позицию, когда текст является
+    # фрагментом файла, начинающимся сразу после перевода строки (position=1)
     tokens = []         
-    line = 1   
     state = State.S
     buffer = ""  
-    position = 0        
     start_position = 0  
     input_string += '\0'  
     i = 0
@@ -128,4 +134,258 @@ def analyze(input_string):
         i += 1
         position += 1
 
-    return tokens
\ No newline at end of file
+    return tokens
+
+
+# Мастер-выражение быстрого лексера. Пробелы и табуляции поглощаются вместе
+# со следующей лексемой, номер сработавшей группы (m.lastindex) задает класс
+# лексемы, поэтому порядок групп менять нельзя.
+_TOKEN_RE = re.compile(r"""
+    [ \t]*+
+    (?:
+        (\n)                        # 1: перевод строки
+      | ([A-Za-z][A-Za-z0-9]*)      # 2: идентификатор или ключевое слово
+      | ([-+*/=<>!?&|~()\[\]{};,])   # 3: оператор или разделитель
+      | ([0-9]+\.[0-9]+)            # 4: вещественная константа
+      | ([0-9]+)                    # 5: целая константа
+      | (.)                         # 6: недопустимый символ
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_NL, _IDENT, _OP, _FLOAT, _INT, _BAD = range(1, 7)
+
+# Таблицы символов, после которых автомат analyze выдает ошибку (ASCII).
+_AFTER_IDENT_ERRORS = frozenset('.~')
+_AFTER_INT_ERRORS = frozenset('{~' + 'abcdefghijklmnopqrstuvwxyz' + 'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_AFTER_FLOAT_ERRORS = _AFTER_INT_ERRORS | {'.'}
+
+
+def _scan_ascii(input_string, emit, line=1, position=0, emit_eof=True):
+    """
+    Разбирает ASCII-текст мастер-выражением и вызывает
+    emit(token_type, value, line, position) для каждой лексемы, включая EOF.
+    Значения передаются строками, как их получает Token в analyze.
+    line и position - как в analyze; при emit_eof=False лексема EOF
+    не выдается (фрагмент текста не последний).
+    """
+    # Символ '\0' завершает разбор в analyze, остаток текста не читается
+    end = input_string.find('\0')
+    if end != -1:
+        input_string = input_string[:end]
+    length = len(input_string)
+
+    keywords_get = KEYWORDS.get
+    operators = OPERATORS
+    identifier = TokenType.IDENTIFIER
+    line_start = -position  # Позиция в строке = индекс - line_start (см. analyze)
+
+    for m in _TOKEN_RE.finditer(input_string):
+        kind = m.lastindex
+        start, end = m.span(kind)
+        if kind == _IDENT:
+            value = input_string[start:end]
+            if end < length and input_string[end] in _AFTER_IDENT_ERRORS:
+                raise RuntimeError(f"Недопустимый символ '{input_string[end]}' после идентификатора/ключевого слова в строке {line}, позиция {end - line_start + 1}")
+            emit(keywords_get(value, identifier), value, line, start - line_start)
+        elif kind == _OP:
+            value = input_string[start]
+            emit(operators[value], value, line, start - line_start)
+        elif kind == _NL:
+            line += 1
+            line_start = start
+        elif kind == _INT:
+            if end < length:
+                c = input_string[end]
+                if c == '.':
+                    # Точка без цифры после нее: ошибка на следующем символе
+                    raise RuntimeError(f"Ожидалась цифра после точки в строке {line}, позиция {end - line_start + 2}")
+                if c in _AFTER_INT_ERRORS:
+                    raise RuntimeError(f"Недопустимый символ '{c}' после целого числа в строке {line}, позиция {end - line_start + 1}")
+            emit(TokenType.INTEGER_CONST, input_string[start:end], line, start - line_start)
+        elif kind == _FLOAT:
+            if end < length and input_string[end] in _AFTER_FLOAT_ERRORS:
+                raise RuntimeError(f"Недопустимый символ '{input_string[end]}' после дробной части числа в строке {line}, позиция {end - line_start + 1}")
+            emit(TokenType.FLOAT_CONST, input_string[start:end], line, start - line_start)
+        else:
+            raise RuntimeError(f"Неизвестный символ '{input_string[start]}' в строке {line}, позиция {start - line_start + 1}")
+
+    if emit_eof:
+        emit(TokenType.EOF, "", line, length - line_start)
+
+
+def analyze_fast(input_string):
+    """
+    Быстрый лексический анализатор.
+
+    Выдает ту же последовательность лексем и те же сообщения RuntimeError,
+    что и analyze, но разбирает текст одним скомпилированным регулярным
+    выражением и берет срезы вместо посимвольного накопления буфера.
+    Исходные тексты с не-ASCII символами передаются эталонному автомату,
+    так как его классы символов (isalpha/isdigit) определены для Unicode.
+    """
+    if not input_string.isascii():
+        return analyze(input_string)
+
+    tokens = []
+    append = tokens.append
+    _scan_ascii(input_string, lambda token_type, value, line, position:
+                append(Token(token_type, value, line, position)))
+    return tokens
+
+
+def analyze_to_stream(input_string):
+    """
+    Лексический анализ сразу в компактный TokenStream без создания
+    объекта Token на каждую лексему.
+    """
+    if not input_string.isascii():
+        return TokenStream.from_tokens(analyze(input_string))
+
+    stream = TokenStream()
+    _scan_ascii(input_string, stream.append)
+    return stream
+
+
+def _analyze_fragment(text, line, position, final):
+    """
+    Лексический анализ фрагмента файла из целых строк.
+    Возвращает список токенов; EOF добавляется только для последнего фрагмента.
+    """
+    if text.isascii():
+        tokens = []
+        append = tokens.append
+        _scan_ascii(text, lambda token_type, value, token_line, token_position:
+                    append(Token(token_type, value, token_line, token_position)),
+                    line, position, final)
+        return tokens
+    tokens = analyze(text, line, position)
+    if not final:
+        tokens.pop()  # EOF, добавленный analyze в конце фрагмента
+    return tokens
+
+
+def tokenize_file(file, chunk_size=1 << 16):
+    """
+    Генератор токенов для файлового объекта, читаемого блоками по chunk_size
+    символов. Язык не содержит многострочных лексем, поэтому каждый блок
+    обрезается по последнему переводу строки, а остаток переносится в
+    следующий. Память ограничена размером блока и длиной самой длинной
+    строки; последовательность токенов совпадает с analyze(file.read()).
+    """
+    line = 1
+    position = 0
+    pending = ""
+    while True:
+        chunk = file.read(chunk_size)
+        final = not chunk
+        text = pending + chunk
+        if '\0' in text:
+            # analyze прекращает разбор на первом '\0' - это последний фрагмент
+            final = True
+            text = text[:text.index('\0')]
+        if not final:
+            cut = text.rfind('\n') + 1
+            if cut == 0:
+                pending = text
+                continue
+            text, pending = text[:cut], text[cut:]
+        yield from _analyze_fragment(text, line, position, final)
+        if final:
+            return
+        line += text.count('\n')
+        position = 1
+
+
+# Файлы меньше этого размера разбираются последовательно: запуск пула
+# процессов дороже самого анализа
+PARALLEL_MIN_SIZE = 1 << 20
+PARALLEL_MIN_CHUNK = 1 << 18
+
+
+def _lex_file_range(path, start, end, line, position, final):
+    """
+    Рабочая функция пула: разбирает байты [start, end) файла как фрагмент
+    из целых строк, начинающийся со строки line. Возвращает TokenStream,
+    который передается между процессами компактнее списка Token.
+    """
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            text = mapped[start:end].decode('utf-8')
+    if text.isascii():
+        stream = TokenStream()
+        _scan_ascii(text, stream.append, line, position, final)
+        return stream
+    return TokenStream.from_tokens(_analyze_fragment(text, line, position, final))
+
+
+def analyze_parallel(path, workers=None, compact=False):
+    """
+    Параллельный лексический анализ большого файла.
+
+    Файл отображается в память и режется на фрагменты по переводам строк
+    (многострочных лексем в языке нет), фрагменты разбираются в
+    ProcessPoolExecutor, а потоки токенов склеиваются в исходном порядке.
+    Номер начальной строки каждого фрагмента считается заранее, поэтому
+    строки токенов и сообщений об ошибках совпадают с analyze.
+
+    Args:
+        path: Путь к файлу в кодировке UTF-8
+        workers: Число процессов (по умолчанию os.cpu_count())
+        compact: Вернуть TokenStream вместо списка Token
+
+    Returns:
+        Те же токены, что analyze(open(path, encoding='utf-8').read())
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0 or size < PARALLEL_MIN_SIZE or workers == 1:
+            ranges = None
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                ranges = _split_lines(mapped, workers)
+
+    if ranges is None:
+        # Текстовый режим переводит '\r\n' в '\n', как при обычном чтении файла
+        with open(path, 'r', encoding='utf-8') as file:
+            source = file.read()
+        return analyze_to_stream(source) if compact else analyze_fast(source)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_lex_file_range, path, start, end, line, position, final)
+                   for start, end, line, position, final in ranges]
+        # Результаты забираются по порядку: первой поднимается ошибка,
+        # которая встретилась бы раньше всех при последовательном разборе
+        result = TokenStream()
+        for future in futures:
+            result.extend(future.result())
+    return result if compact else list(result)
+
+
+def _split_lines(mapped, workers):
+    """
+    Делит отображенный файл на фрагменты по переводам строк.
+    Возвращает список (start, end, line, position, final) или None, если
+    файл нужно читать последовательно (есть '\r', которые текстовый режим
+    превращает в переводы строк).
+    """
+    if mapped.find(b'\r') != -1:
+        return None
+    limit = mapped.find(b'\0')  # analyze прекращает разбор на первом '\0'
+    if limit == -1:
+        limit = len(mapped)
+
+    chunk_size = max(limit // (workers * 4), PARALLEL_MIN_CHUNK)
+    ranges = []
+    start = 0
+    line = 1
+    while True:
+        end = mapped.find(b'\n', start + chunk_size, limit) + 1
+        final = end == 0
+        if final:
+            end = limit
+        ranges.append((start, end, line, 0 if start == 0 else 1, final))
+        if final:
+            return ranges
+        line += mapped[start:end].count(b'\n')
+        start = end
@@ -0,0 +1,256 @@
+from .control_flow import (DEFINE_ARRAY, DEFINITIONS, ELEMENT, UPDATE, USE, ControlFlowGraph, DefinedVariables,
+                           variable_accesses)
+from .rpn_analysis import JUMP_OPERATIONS, TEMPORARY_PREFIX, is_constant, is_variable
+
+
+# Операции, которые можно вычислить заранее: без побочных эффектов, на
+# числах - без ошибок, кроме переполнения при смешении int и float
+_PURE_OPERATIONS = frozenset(("PLUS", "MINUS", "MULTIPLY", "EQUALS", "NEQ", "LT", "GT", "AND", "OR", "UNARY_MINUS"))
+
+# Из них - операции, которые на числах могут вызвать ошибку (OverflowError)
+_RAISING_OPERATIONS = frozenset(("PLUS", "MINUS", "MULTIPLY"))
+
+# Команды, которыми заканчивается оператор: после них стек пуст
+_STATEMENT_ENDS = frozenset(("ASSIGN", "$w", "$r", "DECL_ARR", "r_array", "ARRAY_ASSIGN"))
+
+# Значение на стеке при поиске выражений: (начало, конец, инвариантно ли,
+# есть ли в нем операции, может ли вызвать ошибку, имя ли это)
+_UNKNOWN = (-1, -1, False, False, False, False)
+
+
+def hoist_loop_invariants(rpn, hoisted=None):
+    """
+    Вынос инвариантов циклов: выражение внутри цикла, которое на каждой
+    итерации дает одно и то же, вычисляется один раз перед циклом
+    (в участке-предзаголовке) во временную переменную, а в цикле
+    остается только ее имя (while (i < n - 1) -> _t0 = n - 1; while (i < _t0)).
+
+    Выносятся выражения из констант и переменных без DIVIDE и обращений
+    к массивам, если их переменные:
+      - не записываются в цикле (присваиванием, input или DECL_ARR);
+      - определены перед циклом на всех путях (иначе чтение заводит
+        переменную и меняет порядок таблицы символов);
+      - не массивы, а массивы в программе нигде не используются как
+        значения, так что все значения выражений - числа.
+    Выражение вычисляется в предзаголовке и тогда, когда цикл не
+    выполняется ни разу. Поэтому из тела выносятся только выражения без
+    PLUS/MINUS/MULTIPLY (на числах они не вызывают ошибок), а из условия
+    цикла - любые, если до них условие только кладет значения на стек:
+    условие вычисляется при каждом входе в цикл, и ошибка возникнет там
+    же и той же. В повернутом цикле (см. RPNGenerator.add_loop_end)
+    так же выносятся выражения начала тела и повторенного в конце
+    условия: перед входом в цикл это условие только что вычислено без
+    ошибки. Значение, которое сразу снимает ASSIGN, не заменяется
+    именем: ASSIGN собирает значения до ближайшего имени.
+
+    Временные переменные (TEMPORARY_PREFIX) не видны в таблице символов
+    Compiler. Если задан список hoisted, в него добавляется каждое
+    вынесенное выражение (кортеж команд ОПС).
+
+    Returns:
+        list: Новая ОПС (исходная не изменяется)
+    """
+    try:
+        cfg = ControlFlowGraph(rpn)
+    except ValueError:
+        return rpn
+    accesses = variable_accesses(cfg)
+    if accesses is None:
+        return rpn
+    arrays = {name for found in accesses for _, name, kind in found if kind in (ELEMENT, UPDATE, DEFINE_ARRAY)}
+    if any(kind == USE and name in arrays for found in accesses for _, name, kind in found):
+        return rpn  # Массив как значение: выражения могут давать списки
+    loops = cfg.loops()
+    if not loops:
+        return rpn
+    defined = DefinedVariables(cfg, accesses)
+    names = _TemporaryNames(rpn)
+
+    preheaders = {}
+    for loop in loops:
+        if loop.header == cfg.entry:
+            continue  # В начале программы не определено ничего: выносить нечего
+        blocks = loop.blocks()
+        in_loop = set(blocks)
+        written = {name for number in blocks for _, name, kind in accesses[number] if kind in DEFINITIONS}
+        outside = [number for number in cfg.blocks[loop.header].predecessors if number not in in_loop]
+        entry_mask = -1
+        for number in outside:
+            entry_mask &= defined.defined_out_masks[number]
+        entry_defined = {name for index, name in enumerate(defined.names) if entry_mask >> index & 1}
+        invariant = {name for name in entry_defined if name not in written and name not in arrays}
+
+        temporaries = {}  # Выражение -> временная переменная
+        preheader_code = []
+        for number in loop.body:
+            block = cfg.blocks[number]
+            split = _repeated_condition(cfg, block, loop.header, outside)
+            if split is None:
+                spans = _hoistable_spans(block.code, invariant, number == loop.header)
+            else:
+                spans = _hoistable_spans(block.code[:split], invariant, number == loop.header)
+                spans += [(start + split, end + split)
+                          for start, end in _hoistable_spans(block.code[split:], invariant, True)]
+            for start, end in reversed(spans):
+                expression = tuple(block.code[start:end])
+                temporary = temporaries.get(expression)
+                if temporary is None:
+                    temporary = temporaries[expression] = names.new()
+                    preheader_code += [temporary, *expression, "ASSIGN"]
+                    if hoisted is not None:
+                        hoisted.append(expression)
+                block.code[start:end] = [temporary]
+        if preheader_code:
+            preheaders[loop.header] = _insert_preheader(cfg, loop.header, outside, preheader_code)
+
+    if not preheaders:
+        return rpn
+    cfg.update_edges()
+    order = []
+    for block in cfg.blocks:
+        if block.start is None or block.number == cfg.exit:
+            continue  # Предзаголовки ставятся перед заголовками, выход - в конец
+        if block.number in preheaders:
+            order.append(preheaders[block.number])
+        order.append(block.number)
+    order.append(cfg.exit)
+    return cfg.to_rpn(order)
+
+
+class _TemporaryNames:
+    """Имена временных переменных, которых еще нет в ОПС"""
+
+    def __init__(self, rpn):
+        self.used = {instruction for instruction in rpn if instruction.__class__ is str}
+        self.count = 0
+
+    def new(self):
+        while True:
+            name = f"{TEMPORARY_PREFIX}t{self.count}"
+            self.count += 1
+            if name not in self.used:
+                self.used.add(name)
+                return name
+
+
+def _insert_preheader(cfg, header, outside, code):
+    """Добавляет участок с code перед заголовком цикла; входы в цикл идут через него"""
+    preheader = cfg.add_block(code, fallthrough=header).number
+    for number in outside:
+        block = cfg.blocks[number]
+        if block.fallthrough == header:
+            block.fallthrough = preheader
+        index = 0
+        while index < len(block.code):
+            if block.code[index] in JUMP_OPERATIONS:
+                if block.code[index + 1] == header:
+                    block.code[index + 1] = preheader
+                index += 2
+            else:
+                index += 1
+    return preheader
+
+
+def _repeated_condition(cfg, block, header, outside):
+    """
+    Начало условия повернутого цикла в конце участка block: block
+    заканчивается переходом $JT на заголовок, а единственный вход в цикл
+    - участок, который заканчивается тем же условием с переходом $JF и
+    при истинном условии переходит в заголовок. None, если это не так.
+    """
+    code = block.code
+    if len(outside) != 1 or len(code) < 3 or code[-2] != "$JT" or code[-1] != header:
+        return None
+    start = 0
+    for index in range(len(code) - 2):
+        instruction = code[index]
+        if instruction in _STATEMENT_ENDS:
+            start = index + 1
+        elif instruction in JUMP_OPERATIONS:
+            start = index + 2
+    guard = cfg.blocks[outside[0]].code
+    condition = code[start:-2]
+    if (not condition or cfg.blocks[outside[0]].fallthrough != header or len(guard) < len(condition) + 2 or
+            guard[-2] != "$JF" or guard[-2 - len(condition):-2] != condition):
+        return None
+    return start
+
+
+def _hoistable_spans(code, invariant, in_header):
+    """
+    Участки code[start:end], которые можно вынести: наибольшие
+    инвариантные выражения с операциями (см. hoist_loop_invariants).
+
+    Returns:
+        list: Пары (start, end) по возрастанию
+    """
+    candidates = []
+    stack = []
+
+    def pop():
+        return stack.pop() if stack else _UNKNOWN
+
+    def consume(entry):
+        # Значение снимает команда, которая сама не инвариантна
+        if entry[2] and entry[3]:
+            candidates.append(entry)
+
+    index = 0
+    while index < len(code):
+        instruction = code[index]
+        if is_constant(instruction):
+            stack.append((index, index + 1, True, False, False, False))
+        elif instruction.__class__ is not str:
+            return []
+        elif instruction == "$J":
+            index += 1
+        elif instruction == "$JF" or instruction == "$JT":
+            consume(pop())
+            index += 1
+        elif is_variable(instruction):
+            stack.append((index, index + 1, instruction in invariant, False, False, True))
+        elif instruction in _PURE_OPERATIONS:
+            operands = [pop()] if instruction == "UNARY_MINUS" else [pop(), pop()][::-1]
+            if all(operand[2] for operand in operands):
+                stack.append((operands[0][0], index + 1, True, True,
+                              instruction in _RAISING_OPERATIONS or any(operand[4] for operand in operands), False))
+            else:
+                for operand in operands:
+                    consume(operand)
+                stack.append((index, index + 1, False, False, False, False))
+        elif instruction == "ASSIGN":
+            while stack and not stack[-1][5]:
+                stack.pop()  # Значения, которые снимает ASSIGN, не заменяются именем
+            pop()
+        elif instruction in ("DIVIDE", "ARRAY_INDEX"):
+            consume(pop())
+            if instruction == "DIVIDE":
+                consume(pop())
+            else:
+                pop()
+            stack.append((index, index + 1, False, False, False, False))
+        elif instruction in ("$w", "DECL_ARR", "r_array", "ARRAY_ASSIGN", "$r"):
+            if instruction in ("DECL_ARR", "$r"):
+                pop()  # Имя
+            if instruction != "$r":
+                consume(pop())
+            if instruction == "ARRAY_ASSIGN":
+                consume(pop())
+            if instruction in ("r_array", "ARRAY_ASSIGN"):
+                pop()  # Имя массива
+        else:
+            return []
+        index += 1
+
+    spans = []
+    silent = True  # До текущего места условие только кладет значения на стек
+    position = 0
+    for start, end, _, _, may_raise, _ in sorted(candidates):
+        if any(not (is_constant(instruction) or is_variable(instruction)) for instruction in code[position:start]):
+            silent = False
+        if not may_raise or (in_header and silent):
+            spans.append((start, end))
+        else:
+            silent = False
+        position = end
+    return spans
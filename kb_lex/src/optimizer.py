@@ -0,0 +1,232 @@
+from .bounds_checks import eliminate_bounds_checks
+from .dead_stores import eliminate_dead_stores
+from .loop_invariants import hoist_loop_invariants
+from .rpn_analysis import JUMP_OPERATIONS, JumpTargets, is_constant, remap_jumps
+from .type_inference import specialize_types
+
+
+# Результат, который нельзя вычислить при компиляции: операция остается в ОПС
+_NOT_FOLDED = object()
+
+
+def _divide(a, b):
+    # Деление на ноль RPNInterpreter обнаруживает при выполнении
+    if b == 0:
+        return _NOT_FOLDED
+    return a / b
+
+
+# Операции над константами - те же, что выполняет RPNInterpreter
+BINARY_OPERATIONS = {
+    "PLUS": lambda a, b: a + b,
+    "MINUS": lambda a, b: a - b,
+    "MULTIPLY": lambda a, b: a * b,
+    "DIVIDE": _divide,
+    "LT": lambda a, b: int(a < b),
+    "GT": lambda a, b: int(a > b),
+    "EQUALS": lambda a, b: int(a == b),
+    "NEQ": lambda a, b: int(a != b),
+    "AND": lambda a, b: int(bool(a) and bool(b)),
+    "OR": lambda a, b: int(bool(a) or bool(b)),
+}
+
+UNARY_OPERATIONS = {
+    "UNARY_MINUS": lambda a: -a,
+}
+
+
+def _evaluate(operation, *operands):
+    try:
+        return operation(*operands)
+    except ArithmeticError:
+        # Например, переполнение при делении очень больших целых:
+        # ошибку, как и без оптимизации, получит выполнение программы
+        return _NOT_FOLDED
+
+
+def fold_constants(rpn):
+    """
+    Свертка констант: операция, все операнды которой - числовые константы,
+    заменяется своим результатом (2 3 MULTIPLY 1 PLUS -> 7, 5 UNARY_MINUS -> -5).
+
+    Операнды операции - константы, непосредственно предшествующие ей в ОПС,
+    если на них и на саму операцию нет переходов. Деление на ноль и другие
+    ошибки вычисления остаются в ОПС и возникают при выполнении, как и без
+    свертки. Адреса переходов $J/$JF/$JT пересчитываются под сократившийся код.
+
+    Returns:
+        list: Новая ОПС (исходная не изменяется)
+    """
+    targets = JumpTargets(rpn)
+    length = len(rpn)
+    result = []
+    # Для каждой команды результата - адрес начала ее кода в исходной ОПС,
+    # если это константа, и -1 иначе
+    origins = []
+    new_addresses = [0] * (length + 1)
+
+    index = 0
+    while index < length:
+        instruction = rpn[index]
+        new_addresses[index] = len(result)
+        if instruction in JUMP_OPERATIONS:
+            result.append(instruction)
+            result.append(rpn[index + 1])
+            origins.append(-1)
+            origins.append(-1)
+            index += 2
+            continue
+
+        if instruction.__class__ is str:
+            operation = BINARY_OPERATIONS.get(instruction)
+            if (operation is not None and len(origins) >= 2 and origins[-1] >= 0 and origins[-2] >= 0 and
+                    not targets.any_between(origins[-2], index)):
+                value = _evaluate(operation, result[-2], result[-1])
+                if value is not _NOT_FOLDED:
+                    result.pop()
+                    origins.pop()
+                    result[-1] = value
+                    index += 1
+                    continue
+            operation = UNARY_OPERATIONS.get(instruction)
+            if (operation is not None and origins and origins[-1] >= 0 and
+                    not targets.any_between(origins[-1], index)):
+                value = _evaluate(operation, result[-1])
+                if value is not _NOT_FOLDED:
+                    result[-1] = value
+                    index += 1
+                    continue
+
+        result.append(instruction)
+        origins.append(index if is_constant(instruction) else -1)
+        index += 1
+
+    new_addresses[length] = len(result)
+    return remap_jumps(result, new_addresses)
+
+
+# Правила оконной (peephole) оптимизации. Правило вызывается для начала
+# каждой команды: rule(rpn, index, targets), где targets - JumpTargets ОПС.
+# Оно возвращает None, если не применимо, или пару (end, instructions):
+# команды rpn[index:end] заменяются на instructions. Адреса переходов в
+# instructions - адреса исходной ОПС; peephole пересчитывает их сам.
+# Переход на замененную команду попадает на начало замены (или на
+# следующую команду, если замена пуста).
+
+def thread_jumps(rpn, index, targets):
+    """Переход на $J заменяется переходом сразу по адресу этого $J"""
+    operation = rpn[index]
+    if operation not in JUMP_OPERATIONS:
+        return None
+    target = rpn[index + 1]
+    visited = {index}
+    while target < len(rpn) and rpn[target] == "$J" and target not in visited:
+        visited.add(target)
+        target = rpn[target + 1]
+    if target == rpn[index + 1]:
+        return None
+    return index + 2, [operation, target]
+
+
+def remove_jump_to_next(rpn, index, targets):
+    """$J на следующую за ним команду ничего не делает"""
+    if rpn[index] == "$J" and rpn[index + 1] == index + 2:
+        return index + 2, []
+    return None
+
+
+def remove_unreachable(rpn, index, targets):
+    """Команды после $J до ближайшего адреса перехода никогда не выполняются"""
+    if index < 2 or rpn[index - 2] != "$J" or index in targets:
+        return None
+    end = targets.first_after(index)
+    return (len(rpn) if end is None else end), []
+
+
+def fold_constant_condition(rpn, index, targets):
+    """
+    Условный переход по константе: $JF при истинной константе (и $JT при
+    ложной) не выполняется никогда - команды удаляются, иначе переход
+    выполняется всегда ($J).
+    """
+    if not (is_constant(rpn[index]) and index + 1 < len(rpn) and rpn[index + 1] in ("$JF", "$JT") and
+            index + 1 not in targets):
+        return None
+    if bool(rpn[index]) == (rpn[index + 1] == "$JF"):
+        return index + 3, []
+    return index + 3, ["$J", rpn[index + 2]]
+
+
+PEEPHOLE_RULES = (thread_jumps, remove_jump_to_next, remove_unreachable, fold_constant_condition)
+
+
+def peephole(rpn, rules=PEEPHOLE_RULES, applied=None):
+    """
+    Оконная оптимизация ОПС: правила rules (по умолчанию PEEPHOLE_RULES)
+    применяются к каждой команде, пока ОПС меняется. Если задан applied
+    (collections.Counter), в нем считается число применений каждого
+    правила по имени функции.
+
+    Returns:
+        list: Новая ОПС (исходная не изменяется)
+    """
+    while True:
+        targets = JumpTargets(rpn)
+        length = len(rpn)
+        result = []
+        new_addresses = [0] * (length + 1)
+        changed = False
+
+        index = 0
+        while index < length:
+            for rule in rules:
+                replacement = rule(rpn, index, targets)
+                if replacement is not None:
+                    break
+            if replacement is None:
+                new_addresses[index] = len(result)
+                end = index + 2 if rpn[index] in JUMP_OPERATIONS else index + 1
+                result.extend(rpn[index:end])
+            else:
+                end, instructions = replacement
+                start = len(result)
+                for address in range(index, end):
+                    new_addresses[address] = start
+                result.extend(instructions)
+                changed = True
+                if applied is not None:
+                    applied[rule.__name__] += 1
+            index = end
+
+        new_addresses[length] = len(result)
+        rpn = remap_jumps(result, new_addresses)
+        if not changed:
+            return rpn
+
+
+# Проходы каждого уровня оптимизации (уровень 0 - без оптимизации)
+OPTIMIZATION_LEVELS = {
+    0: (),
+    1: (fold_constants,),
+    2: (fold_constants, peephole),
+    3: (fold_constants, hoist_loop_invariants, eliminate_dead_stores, peephole, specialize_types,
+        eliminate_bounds_checks),
+}
+
+
+def optimize(rpn, level=1, keep_symbol_table=True):
+    """
+    Оптимизирует ОПС проходами уровня level (см. OPTIMIZATION_LEVELS).
+    Исходный список не изменяется. keep_symbol_table=False разрешает
+    удалять записи, значения которых видны только в таблице символов
+    после выполнения (см. eliminate_dead_stores).
+    """
+    passes = OPTIMIZATION_LEVELS.get(level)
+    if passes is None:
+        raise ValueError(f"Неизвестный уровень оптимизации: {level}")
+    for optimization in passes:
+        if optimization is eliminate_dead_stores:
+            rpn = optimization(rpn, keep_symbol_table)
+        else:
+            rpn = optimization(rpn)
+    return rpn
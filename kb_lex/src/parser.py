@@ -1,17 +1,153 @@
+from types import MappingProxyType
+
 from .token_type import TokenType
 from .token_1 import Token
+from .token_stream import TokenStream
 from .rpn_generator import RPNGenerator
+from .ast_builder import ASTBuilder
 from .symbol_table import SymbolTable
+from .expression_parser import ExpressionGrammar, ExpressionParser
+from .grammar import (GRAMMAR, START_SYMBOL, SYMBOL_TERMINAL, SYMBOL_NONTERMINAL,
+                      SYMBOL_ACTION, symbol_kind, build_parse_table as build_ll1_table)
+
+
+_shared_parse_table = None
+
+
+def shared_parse_table():
+    """
+    Возвращает таблицу разбора, общую для всех экземпляров Parser.
+    Таблица строится один раз на процесс и замораживается: строки -
+    MappingProxyType, правые части правил - кортежи.
+    """
+    global _shared_parse_table
+    if _shared_parse_table is None:
+        table = Parser.build_parse_table()
+        _shared_parse_table = MappingProxyType({
+            nonterminal: MappingProxyType({token_type: tuple(rule) for token_type, rule in row.items()})
+            for nonterminal, row in table.items()
+        })
+    return _shared_parse_table
+
+
+def _action_method_name(action):
+    """Имя метода Parser, реализующего семантическое действие <имя>"""
+    return "_action_" + action.strip("<>")
+
+
+class CodedGrammar:
+    """
+    Таблица разбора с символами, закодированными малыми целыми числами.
+
+    Код терминала равен значению TokenType, нетерминалы и маркеры действий
+    нумеруются следом. По коду за одно обращение к списку получаются вид
+    символа (kinds), исходный символ для сообщений об ошибках (symbols) и
+    строка таблицы нетерминала (rows) с правыми частями правил, уже
+    перевернутыми для записи в стек.
+    """
+
+    __slots__ = ('codes', 'symbols', 'kinds', 'rows', 'expected', 'action_methods')
+
+    def __init__(self, table):
+        first_code = max(TokenType) + 1
+        self.codes = {}
+        self.symbols = [None] * first_code
+        for token_type in TokenType:
+            self.codes[token_type] = token_type.value
+            self.symbols[token_type.value] = token_type
+
+        def code_of(symbol):
+            code = self.codes.get(symbol)
+            if code is None:
+                code = len(self.symbols)
+                self.codes[symbol] = code
+                self.symbols.append(symbol)
+            return code
+
+        code_of(START_SYMBOL)
+        for nonterminal, row in table.items():
+            code_of(nonterminal)
+            for rule in row.values():
+                for symbol in rule:
+                    code_of(symbol)
+
+        self.kinds = [symbol_kind(symbol) for symbol in self.symbols]
+        self.rows = [None] * len(self.symbols)
+        self.expected = [None] * len(self.symbols)
+        self.action_methods = [None] * len(self.symbols)
+        for code, symbol in enumerate(self.symbols):
+            if self.kinds[code] == SYMBOL_NONTERMINAL:
+                row = table.get(symbol, {})
+                self.rows[code] = MappingProxyType({
+                    token_type: tuple(self.codes[s] for s in reversed(rule)) for token_type, rule in row.items()
+                })
+                self.expected[code] = tuple(row.keys())
+            elif self.kinds[code] == SYMBOL_ACTION:
+                self.action_methods[code] = _action_method_name(symbol)
+
+    def bind_actions(self, parser):
+        """Список связанных методов действий parser, индексированный кодом символа"""
+        return [None if name is None else getattr(parser, name, parser._action_none)
+                for name in self.action_methods]
+
+
+_shared_coded_grammar = None
+
+
+def shared_coded_grammar():
+    """Закодированная таблица разбора, общая для всех экземпляров Parser"""
+    global _shared_coded_grammar
+    if _shared_coded_grammar is None:
+        _shared_coded_grammar = CodedGrammar(shared_parse_table())
+    return _shared_coded_grammar
+
+
+_shared_expression_grammar = None
+
+
+def shared_expression_grammar():
+    """Данные быстрого разбора выражений, общие для всех экземпляров Parser"""
+    global _shared_expression_grammar
+    if _shared_expression_grammar is None:
+        _shared_expression_grammar = ExpressionGrammar(shared_parse_table(), shared_coded_grammar().symbols)
+    return _shared_expression_grammar
+
 
 class Parser:
-    def __init__(self, tokens):
+    def __init__(self, tokens, rpn_sink=None, statement_hook=None, fast_expressions=True, build_ast=False,
+                 statistics=None, rotate_loops=False):
+        """
+        Args:
+            tokens: Список токенов, TokenStream или любой итератор токенов.
+                    Итератор читается по требованию с просмотром на один токен
+                    вперед - этого достаточно для LL(1) таблицы.
+            rpn_sink: Необязательный приемник готовых команд ОПС (см. RPNGenerator)
+            statement_hook: Необязательная функция hook(parser), вызываемая на
+                    границе каждого оператора верхнего уровня (перед раскрытием
+                    <Список операторов> на дне стека). Если она возвращает True,
+                    разбор останавливается на этой границе.
+            fast_expressions: Разбирать выражения сортировочной станцией
+                    (ExpressionParser), а не раскрытием нетерминалов по таблице
+            build_ast: Строить дерево разбора (ASTBuilder, узлы ast_nodes)
+                    вместо ОПС: parse возвращает Program вместо списка команд.
+                    ОПС получается из дерева функцией ast_nodes.lower.
+            statistics: Необязательный ParseStatistics (см. instrumentation.py),
+                    в который parse записывает счетчики разбора
+            rotate_loops: Порождать циклы while в повернутом виде
+                    (см. RPNGenerator.add_loop_end). При build_ast не
+                    действует: циклы поворачивает генератор, переданный
+                    в ast_nodes.lower
+        """
         self.tokens = tokens  
         self.current_index = 0  
         self.stack = []  
-        self.rpn_generator = RPNGenerator()  
+        self.rpn_generator = ASTBuilder() if build_ast else RPNGenerator(sink=rpn_sink, rotate_loops=rotate_loops)
         self.symbol_table = SymbolTable()  
         self.data_types_stack = []  
         self.label_stack = []  
+        self.statement_hook = statement_hook
+        self.statistics = statistics
+        self.parse_table = shared_parse_table()
         
 
         self.context = {
@@ -29,23 +165,120 @@ class Parser:
         }
         
 
-        self.stack.append(TokenType.EOF)
-        self.stack.append("<Программа>")
+        # Стек разбора хранит коды символов (см. CodedGrammar)
+        self.grammar = shared_coded_grammar()
+        self._actions = self.grammar.bind_actions(self)
+        self.expression_parser = (ExpressionParser(self, shared_expression_grammar())
+                                  if fast_expressions else None)
+        self.stack.append(self.grammar.codes[TokenType.EOF])
+        self.stack.append(self.grammar.codes[START_SYMBOL])
+
+        # Токен за концом входа: возвращается, когда токены закончились
+        self._end_token = Token(TokenType.EOF, "", -1, -1)
+        if hasattr(tokens, "__getitem__") and hasattr(tokens, "__len__"):
+            self._token_iterator = None
+            self._token_count = len(tokens)
+        else:
+            self._token_iterator = iter(tokens)
+            self._token_count = 0
+        # Из TokenStream тип и значение текущего токена читаются прямо из
+        # массивов; объект Token создается только по запросу (current_token)
+        self._stream = tokens if isinstance(tokens, TokenStream) else None
+        self._token_types = None
+
+        # Текущий токен: тип (TokenType или равный ему код из TokenStream),
+        # значение и сам Token или None, если он еще не создан
+        self._current_type = None
+        self._current_value = None
+        self._current_token = None
+        self._seek(0)
+
+    def _token_at(self, index):
+        """Возвращает токен по индексу или токен EOF, если достигнут конец списка"""
+        if self._token_iterator is not None:
+            return next(self._token_iterator, self._end_token)
+        if index < self._token_count:
+            return self.tokens[index]
+
+        return self._end_token
+
+    def _seek(self, index):
+        """Делает текущим токен index (для итератора - следующий токен)"""
+        self.current_index = index
+        stream = self._stream
+        if stream is not None and index < self._token_count:
+            self._current_type = stream.types[index]
+            self._current_value = stream.values[stream.value_ids[index]]
+            self._current_token = None
+        else:
+            self._set_current_token(self._token_at(index))
+
+    def _set_current_token(self, token):
+        self._current_token = token
+        self._current_type = token.token_type
+        self._current_value = token.value
+
+    def token_types(self):
+        """
+        Последовательность типов токенов по индексу (только для списка или
+        TokenStream): для TokenStream - массив кодов, для списка строится один раз
+        """
+        if self._stream is not None:
+            return self._stream.types
+        if self._token_types is None:
+            self._token_types = [token.token_type for token in self.tokens]
+        return self._token_types
+
+    def token_value(self, index):
+        """Значение токена index без создания объекта Token (только для списка или TokenStream)"""
+        stream = self._stream
+        if stream is not None:
+            return stream.values[stream.value_ids[index]]
+        return self.tokens[index].value
         
+    def start_at_statement(self, index, rpn_address, symbol_table):
+        """
+        Начинает разбор с границы оператора верхнего уровня: токен index,
+        адрес ОПС rpn_address, таблица символов с уже объявленными именами.
+        Используется инкрементальной компиляцией (см. incremental.py).
+        """
+        self._seek(index)
+        self.stack = [self.grammar.codes[TokenType.EOF], self.grammar.codes["<Список операторов>"]]
+        self.rpn_generator.base_address = rpn_address
+        self.symbol_table = symbol_table
+
     def current_token(self):
         """Возвращает текущий токен или токен EOF, если достигнут конец списка"""
-        if self.current_index < len(self.tokens):
-            return self.tokens[self.current_index]
-
-        return Token(TokenType.EOF, "", -1, -1)
+        token = self._current_token
+        if token is None:
+            token = self._current_token = self._stream[self.current_index]
+        return token
     
     def advance(self):
         """Переход к следующему токену"""
-        self.current_index += 1
+        index = self.current_index + 1
+        self.current_index = index
+        stream = self._stream
+        if stream is not None:
+            if index < self._token_count:
+                self._current_type = stream.types[index]
+                self._current_value = stream.values[stream.value_ids[index]]
+                self._current_token = None
+                return
+            token = self._end_token
+        elif self._token_iterator is not None:
+            token = next(self._token_iterator, self._end_token)
+        elif index < self._token_count:
+            token = self.tokens[index]
+        else:
+            token = self._end_token
+        self._current_token = token
+        self._current_type = token.token_type
+        self._current_value = token.value
         
     def match(self, token_type):
         """Проверяет, соответствует ли текущий токен ожидаемому типу"""
-        if self.current_token().token_type == token_type:
+        if self._current_type == token_type:
             self.advance()
             return True
         return False
@@ -55,650 +288,343 @@ class Parser:
         token = self.current_token()
         raise SyntaxError(f"Синтаксическая ошибка в строке {token.line}, позиция {token.position}: {message}")
     
-    def build_parse_table(self):
+    def no_rule_error(self, nonterminal, expected_tokens):
+        """
+        Ошибка: в строке таблицы нетерминала нет правила для текущего токена.
+        expected_tokens - ключи строки минимальной таблицы (FIRST/FOLLOW), то
+        есть только токены, допустимые в этом месте программы.
         """
-        Строит таблицу синтаксического анализа для LL(1) парсера на основе грамматики в форме Грейбаха.
+        token = self.current_token()
+        self.error(f"Ожидался один из токенов {list(expected_tokens)} или правило для нетерминала '{nonterminal}' не найдено для токена {token.token_type}, но получен {token.token_type} ('{token.value}')")
+
+    def mismatch_error(self, expected_symbol):
+        """Ошибка: текущий токен не совпадает с ожидаемым символом"""
+        token = self.current_token()
+        self.error(f"Несоответствие токена. Ожидался {expected_symbol}, но получен {token.token_type} ('{token.value}') или неизвестный символ в стеке.")
+
+    @staticmethod
+    def build_parse_table():
+        """
+        Строит минимальную таблицу синтаксического анализа для LL(1) парсера по грамматике
+        GRAMMAR (см. grammar.py): множества FIRST/FOLLOW вычисляются, конфликты проверяются.
         Возвращает словарь: {нетерминал: {терминал: список правил}}
+        Парсер использует замороженную копию, построенную один раз (shared_parse_table).
         """
-        table = {}
-        
-        table["<Программа>"] = {
-            TokenType.INT: ["<push_int_type>", TokenType.INT, "<ОператорDT>", "<Список операторов>"],
-            TokenType.FLOAT: ["<push_float_type>", TokenType.FLOAT, "<ОператорDT>", "<Список операторов>"],
-            TokenType.IF: [TokenType.IF, TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<after_if_condition>", "<Блок>", "<Альтернативное действие_extended>", "<Список операторов>"],
-            TokenType.IDENTIFIER: ["<save_identifier_token>", TokenType.IDENTIFIER, "<ПрисваиваниеIdent>", TokenType.SEMICOLON, "<Список операторов>"],
-            TokenType.WHILE: [TokenType.WHILE, "<while>", TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<after_while_condition>", "<Блок>", "<end_while_block>", "<Список операторов>"],
-            TokenType.INPUT: [TokenType.INPUT, "<ВводInput>", "<Список операторов>"],
-            TokenType.OUTPUT: [TokenType.OUTPUT, "<Логическое выражение>", "<gen_output_op>", TokenType.SEMICOLON, "<Список операторов>"]
-        }
-        
-        table["<ОператорDT>"] = {
-            TokenType.IDENTIFIER: [
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_variable_declaration>", 
-                "<ОператорDTIdent>", 
-                TokenType.SEMICOLON
-            ],
-            TokenType.LSQUARE: [
-                TokenType.LSQUARE, 
-                "<ОператорDT_array>"
-            ]
-        }
-        
-        table["<ОператорDT_array>"] = {
-            TokenType.UNARY_MINUS: [
-                "<Выражение>", 
-                TokenType.RSQUARE, 
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_dynamic_array_declaration>", 
-                TokenType.SEMICOLON
-            ],
-            TokenType.IDENTIFIER: [
-                "<Выражение>", 
-                TokenType.RSQUARE, 
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_dynamic_array_declaration>", 
-                TokenType.SEMICOLON
-            ],
-            TokenType.INTEGER_CONST: [
-                "<Выражение>", 
-                TokenType.RSQUARE, 
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_dynamic_array_declaration>", 
-                TokenType.SEMICOLON
-            ],
-            TokenType.FLOAT_CONST: [
-                "<Выражение>", 
-                TokenType.RSQUARE, 
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_dynamic_array_declaration>", 
-                TokenType.SEMICOLON
-            ],
-            TokenType.LPAREN: [
-                "<Выражение>", 
-                TokenType.RSQUARE, 
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_dynamic_array_declaration>", 
-                TokenType.SEMICOLON
-            ],
-            TokenType.RSQUARE: [
-                TokenType.RSQUARE, 
-                "<save_identifier_token>", 
-                TokenType.IDENTIFIER, 
-                "<add_array_declaration_for_init>", 
-                TokenType.ASSIGN, 
-                "<gen_array_init_start>",
-                TokenType.LCURLY, 
-                "<Инициализаторы>", 
-                TokenType.RCURLY,
-                "<gen_array_init_end>",
-                TokenType.SEMICOLON
-            ]
-        }
-        
-        table["<Список операторов>"] = {
-            TokenType.INT: ["<push_int_type>", TokenType.INT, "<ОператорDT>", "<Список операторов>"],
-            TokenType.FLOAT: ["<push_float_type>", TokenType.FLOAT, "<ОператорDT>", "<Список операторов>"],
-            TokenType.IF: [TokenType.IF, TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<after_if_condition>", "<Блок>", "<Альтернативное действие_extended>", "<Список операторов>"],
-            TokenType.IDENTIFIER: ["<save_identifier_token>", TokenType.IDENTIFIER, "<ПрисваиваниеIdent>", TokenType.SEMICOLON, "<Список операторов>"],
-            TokenType.WHILE: [TokenType.WHILE, "<while>", TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<after_while_condition>", "<Блок>", "<end_while_block>", "<Список операторов>"],
-            TokenType.INPUT: [TokenType.INPUT, "<ВводInput>", "<Список операторов>"],
-            TokenType.OUTPUT: [TokenType.OUTPUT, "<Логическое выражение>", "<gen_output_op>", TokenType.SEMICOLON, "<Список операторов>"],
-        }
-        explicitly_defined_tokens_for_list_ops = list(table["<Список операторов>"].keys())
-        for token_type in TokenType:
-            if token_type not in explicitly_defined_tokens_for_list_ops:
-                table["<Список операторов>"][token_type] = []
-
-        table["<Инициализаторы>"] = {}
-        expression_starter_tokens = [
-            TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST,
-            TokenType.FLOAT_CONST, TokenType.LPAREN, TokenType.LCURLY
-        ]
-        for token_type in expression_starter_tokens:
-            table["<Инициализаторы>"][token_type] = ["<Выражение>", "<Инициализаторы_продолжение>"]
-        
-        table["<Инициализаторы>"][TokenType.RCURLY] = [] 
+        return build_ll1_table(GRAMMAR, START_SYMBOL)
 
-        table["<Инициализаторы_продолжение>"] = {
-            TokenType.COMMA: [TokenType.COMMA, "<Выражение>", "<Инициализаторы_продолжение>"]
-        }
-        table["<Инициализаторы_продолжение>"][TokenType.RCURLY] = []
+    def execute_semantic_action(self, action, current_token_arg): 
+        """
+        Выполняет семантическое действие на основе маркера.
+        Действие <имя> реализуется методом _action_имя; маркеры без метода
+        ничего не делают. Текущий токен действия берут у парсера
+        (current_token), current_token_arg оставлен для совместимости.
+        """
+        getattr(self, _action_method_name(action), self._action_none)()
 
-        table["<Альтернативное действие_extended>"] = {
-            TokenType.ELSE: [TokenType.ELSE, "<start_else_block>", "<Блок>", "<end_if_block>"]
-        }
-        for token_type in TokenType:
-            if token_type != TokenType.ELSE:
-                 table["<Альтернативное действие_extended>"].setdefault(token_type, ["<end_if_block>"])
+    def _action_none(self):
+        """Маркер без семантического действия"""
 
-        table["<Блок>"] = {
-            TokenType.LCURLY: [TokenType.LCURLY, "<Список операторов>", TokenType.RCURLY]
-        }
-        
+    def _action_push_int_type(self):
+        self.data_types_stack.append("int")
 
-        table["<Логическое выражение>"] = {
-            TokenType.UNARY_MINUS: [TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"],
-            TokenType.IDENTIFIER: [
-                "<save_current_token_as_factor>",  
-                TokenType.IDENTIFIER, 
-                "<ФакторIdent>", 
-                "<Терм*>", 
-                "<Выражение*>", 
-                "<Сравнение*>", 
-                "<Проверка равенства*>", 
-                "<ЛогическоеИ*>", 
-                "<ЛогическоеВыражение*>"
-            ],
-            TokenType.INTEGER_CONST: [TokenType.INTEGER_CONST, "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"],
-            TokenType.FLOAT_CONST: [TokenType.FLOAT_CONST, "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"],
-            TokenType.LPAREN: [TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>", "<Выражение*>", "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<ЛогическоеВыражение*>"],
-        }
-        
+    def _action_push_float_type(self):
+        self.data_types_stack.append("float")
 
-        table["<Логическое выражение*>"] = {
-            TokenType.OR: ["|", "<Логическое И>", "<Логическое выражение*>"]
-        }
-        for token_type in TokenType:
-            if token_type != TokenType.OR:
-                table["<Логическое выражение*>"][token_type] = []
+    def _action_save_identifier_token(self):
+        token = self.current_token()
+        if token is not self._end_token:
+             self.context["last_identifier_token"] = token
+        else:
+            self.error("Internal parser error: <save_identifier_token> called at end of tokens.")
+
+    def _action_add_variable_declaration(self):
+        var_token = self.context.get("last_identifier_token")
+        if not var_token or var_token.token_type != TokenType.IDENTIFIER:
+            self.error("Internal parser error: last_identifier_token not set correctly for variable declaration.")
+            return
+
+        var_name = var_token.value
+        if not self.data_types_stack:
+            self.error(f"Internal parser error: data_types_stack is empty for variable {var_name}.")
+            return
+        var_type = self.data_types_stack.pop()
         
+        self.symbol_table.add_symbol(var_name, var_type, var_token.line, var_token.position, is_array=False)
+        self.rpn_generator.add_declaration(var_name, var_type, False)
+        self.context["last_identifier_token"] = None
 
-        table["<Логическое И>"] = {
-            TokenType.UNARY_MINUS: ["~", "<Фактор>", "<Терм*>", "<Выражение*>", "<Сравнение*_wrapper>", "<ПроверкаРавенства*_wrapper>", "<Логическое И*>"],
-            TokenType.IDENTIFIER: ["идентификатор", "<ФакторIdent>", "<Терм*>", "<Выражение*>", "<Сравнение*_wrapper>", "<ПроверкаРавенства*_wrapper>", "<Логическое И*>"],
-            TokenType.INTEGER_CONST: ["константа", "<Терм*>", "<Выражение*>", "<Сравнение*_wrapper>", "<ПроверкаРавенства*_wrapper>", "<Логическое И*>"],
-            TokenType.FLOAT_CONST: ["константа", "<Терм*>", "<Выражение*>", "<Сравнение*_wrapper>", "<ПроверкаРавенства*_wrapper>", "<Логическое И*>"],
-            TokenType.LPAREN: ["(", "<Логическое выражение>", ")", "<Терм*>", "<Выражение*>", "<Сравнение*_wrapper>", "<ПроверкаРавенства*_wrapper>", "<Логическое И*>"]
-        }
+    def _action_add_dynamic_array_declaration(self):
+        arr_token = self.context.get("last_identifier_token")
+        if not arr_token or arr_token.token_type != TokenType.IDENTIFIER:
+            self.error("Internal parser error: last_identifier_token not set correctly for dynamic array declaration.")
+            return
 
+        arr_name = arr_token.value
+        if not self.data_types_stack:
+            self.error(f"Internal parser error: data_types_stack is empty for array {arr_name}.")
+            return
+        arr_type = self.data_types_stack.pop() 
 
-        table["<ЛогическоеИ*_wrapper>"] = { 
-            token_type: ["<Логическое И>", "<Логическое И*>"] for token_type in TokenType 
-        }
-        table["<Логическое И*>"] = {
-            TokenType.AND: ["&", "<Проверка равенства>", "<Логическое И*>"]
-        }
-        for token_type in TokenType:
-            if token_type != TokenType.AND:
-                 table["<Логическое И*>"].setdefault(token_type, [])
-        
+        self.symbol_table.add_symbol(arr_name, arr_type, arr_token.line, arr_token.position, is_array=True)
 
-        table["<ОператорDTIdent>"] = {
-            TokenType.ASSIGN: [TokenType.ASSIGN, "<Выражение>", "<gen_assign_op>"],
-            TokenType.LSQUARE: [TokenType.LSQUARE, TokenType.INTEGER_CONST, TokenType.RSQUARE, TokenType.ASSIGN, "<Выражение>", "<gen_array_assign_op>"], # Для type arr[size] = expr;
-        }
-        explicitly_defined_for_op_dt_ident = list(table["<ОператорDTIdent>"].keys())
-        for token_type in TokenType:
-            if token_type not in explicitly_defined_for_op_dt_ident:
-                table["<ОператорDTIdent>"][token_type] = []  
+        self.rpn_generator.add_declaration(arr_name, arr_type, True)
+        self.rpn_generator.add_identifier(arr_name)
+        self.rpn_generator.add_operator('DECL_ARR')
+        self.context["last_identifier_token"] = None
 
-        table["<ПрисваиваниеIdent>"] = {
-            TokenType.ASSIGN: ["<add_identifier_to_rpn_for_assign>", TokenType.ASSIGN, "<Выражение>", "<gen_assign_op>"],
-            TokenType.LSQUARE: ["<add_identifier_to_rpn_for_assign>", TokenType.LSQUARE, "<Логическое выражение>", TokenType.RSQUARE, TokenType.ASSIGN, "<Выражение>", "<gen_array_assign_op>"]
-        }
-        
+    def _action_add_array_declaration(self):
+        arr_token = self.context.get("last_identifier_token")
+        if not arr_token or arr_token.token_type != TokenType.IDENTIFIER:
+            self.error("Internal parser error: last_identifier_token not set correctly for array declaration.")
+            return
 
-        table["<Выражение>"] = {
-            TokenType.UNARY_MINUS: [TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>", "<Выражение*>"],
-            TokenType.IDENTIFIER: [
-                "<save_current_token_as_factor>",  
-                TokenType.IDENTIFIER, 
-                "<ФакторIdent>", 
-                "<Терм*>", 
-                "<Выражение*>"
-            ],
-            TokenType.INTEGER_CONST: [TokenType.INTEGER_CONST, "<Терм*>", "<Выражение*>"],
-            TokenType.FLOAT_CONST: [TokenType.FLOAT_CONST, "<Терм*>", "<Выражение*>"],
-            TokenType.LPAREN: [TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>", "<Выражение*>"],
-            TokenType.LCURLY: [TokenType.LCURLY, "<Инициализаторы>", TokenType.RCURLY]
-        }
-        
-        table["<Выражение*>"] = {
-            TokenType.PLUS: [TokenType.PLUS, "<Терм>", "<gen_op_plus>", "<Выражение*>"], # <gen_op_plus> уже был
-            TokenType.MINUS: [TokenType.MINUS, "<Терм>", "<gen_op_minus>", "<Выражение*>"]
-        }
-        for token_type in TokenType:
-            if token_type not in [TokenType.PLUS, TokenType.MINUS]:
-                table["<Выражение*>"][token_type] = []
-        
+        arr_name = arr_token.value
+        if not self.data_types_stack:
+            self.error(f"Internal parser error: data_types_stack is empty for array {arr_name}.")
+            return
+        arr_type = self.data_types_stack.pop() 
 
-        table["<Терм>"] = {
-            TokenType.UNARY_MINUS: [TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>"],
-            TokenType.IDENTIFIER: [
-                "<save_current_token_as_factor>",  
-                TokenType.IDENTIFIER, 
-                "<ФакторIdent>", 
-                "<Терм*>"
-            ],
-            TokenType.INTEGER_CONST: [TokenType.INTEGER_CONST, "<Терм*>"],
-            TokenType.FLOAT_CONST: [TokenType.FLOAT_CONST, "<Терм*>"],
-            TokenType.LPAREN: [TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>"]
-        }
-        
+        self.symbol_table.add_symbol(arr_name, arr_type, arr_token.line, arr_token.position, is_array=True)
+        self.rpn_generator.add_array_declaration(arr_name)
+        self.context["last_identifier_token"] = None
 
-        table["<Терм*>"] = {
-            TokenType.MULTIPLY: [TokenType.MULTIPLY, "<Фактор>", "<gen_op_multiply>", "<Терм*>"],
-            TokenType.DIVIDE: [TokenType.DIVIDE, "<Фактор>", "<gen_op_divide>", "<Терм*>"],
-        }
-        for token_type in TokenType:
-            if token_type not in [TokenType.MULTIPLY, TokenType.DIVIDE]:
-                table["<Терм*>"][token_type] = []
-        
+    def _action_add_array_declaration_for_init(self):
+        # Массив со списком инициализации в таблицу символов не заносится,
+        # в ОПС попадают только значения списка
+        arr_token = self.context.get("last_identifier_token")
+        if not arr_token or arr_token.token_type != TokenType.IDENTIFIER:
+            self.error("Internal parser error: last_identifier_token not set correctly for array declaration.")
+            return
 
-        table["<Фактор>"] = {
-            TokenType.UNARY_MINUS: [TokenType.UNARY_MINUS, "<Фактор>", "<gen_op_uminus>"],
-
-            TokenType.IDENTIFIER: [
-                "<save_current_token_as_factor>", 
-                TokenType.IDENTIFIER, 
-                "<ФакторIdent>",
-                "<add_factor_to_rpn_if_not_array>" 
-            ],
-            TokenType.INTEGER_CONST: [TokenType.INTEGER_CONST], # Уже добавляется в RPN при match
-            TokenType.FLOAT_CONST: [TokenType.FLOAT_CONST],   # Уже добавляется в RPN при match
-            TokenType.LPAREN: [TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN]
-        }
-        
-        # <ФакторIdent>
-        table["<ФакторIdent>"] = {
-            # Если за IDENTIFIER следует LSQUARE, это доступ к элементу массива
-            TokenType.LSQUARE: [
-                "<add_array_name_to_rpn>",  # Добавляем имя массива в RPN
-                TokenType.LSQUARE, 
-                "<Логическое выражение>", # Выражение для индекса
-                TokenType.RSQUARE, 
-                "<gen_array_access_op>"  # Семантическое действие для генерации ОПЗ доступа к массиву
-            ]
-        }
-        # Эпсилон-продукции для <ФакторIdent> (если это не доступ к массиву)
-        # Добавляем все токены, которые могут следовать за фактором в выражении
-        follow_factor_ident = [
-            TokenType.MULTIPLY, TokenType.DIVIDE, # Терм*
-            TokenType.PLUS, TokenType.MINUS,      # Выражение*
-            TokenType.LT, TokenType.GT, TokenType.EQ, TokenType.NEQ, # Сравнение*, ПроверкаРавенства*
-            TokenType.AND, TokenType.OR,          # ЛогическоеИ*, ЛогическоеВыражение*
-            TokenType.RPAREN, TokenType.SEMICOLON, TokenType.RSQUARE, TokenType.COMMA, 
-            TokenType.RCURLY, TokenType.EOF # Добавим RCURLY для инициализаторов
-        ]
-        for token_type in follow_factor_ident:
-            if token_type not in table["<ФакторIdent>"]: # Избегаем перезаписи правила для LSQUARE
-                table["<ФакторIdent>"][token_type] = ["<add_factor_to_rpn_if_not_array>"] # Добавляем идентификатор в RPN при эпсилон-продукции
-        
-        # <ВводInput>
-        table["<ВводInput>"] = {
-            TokenType.IDENTIFIER: ["<save_identifier_token>", TokenType.IDENTIFIER, "<ВводInputIdent>", TokenType.SEMICOLON]
-        }
-        
-        # <ВводInputIdent>
-        table["<ВводInputIdent>"] = {
-            TokenType.LSQUARE: ["<add_input_identifier_to_rpn>", TokenType.LSQUARE, "<Логическое выражение>", TokenType.RSQUARE, "<gen_input_array_op>"]
-        }
-        for token_type in TokenType:
-            if token_type != TokenType.LSQUARE:
-                table["<ВводInputIdent>"][token_type] = ["<add_input_identifier_to_rpn>", "<gen_input_op>"]  # Для простых переменных
-        
-        # <Сравнение>
-        table["<Сравнение>"] = {
-            TokenType.UNARY_MINUS: [TokenType.UNARY_MINUS, "<Фактор>", "<Терм*>", "<Выражение*>"],
-            TokenType.IDENTIFIER: [
-                "<save_current_token_as_factor>",  # Сохраняем токен перед разбором
-                TokenType.IDENTIFIER, 
-                "<ФакторIdent>", 
-                "<Терм*>", 
-                "<Выражение*>"
-            ],
-            TokenType.INTEGER_CONST: [TokenType.INTEGER_CONST, "<Терм*>", "<Выражение*>"],
-            TokenType.FLOAT_CONST: [TokenType.FLOAT_CONST, "<Терм*>", "<Выражение*>"],
-            TokenType.LPAREN: [TokenType.LPAREN, "<Логическое выражение>", TokenType.RPAREN, "<Терм*>", "<Выражение*>"],
-        }
+        if not self.data_types_stack:
+            self.error(f"Internal parser error: data_types_stack is empty for array {arr_token.value}.")
+            return
+        arr_type = self.data_types_stack.pop()
 
-        # <Сравнение*> (обрабатывает <, >)
-        # Операнд для <, > - это <Выражение> (арифметическое)
-        table["<Сравнение*>"] = {
-            TokenType.LT: [TokenType.LT, "<Выражение>", "<gen_op_lt>", "<Сравнение*>"],
-            TokenType.GT: [TokenType.GT, "<Выражение>", "<gen_op_gt>", "<Сравнение*>"],
-            # Добавим LE, GE если они есть
-        }
-        follow_sravnenie_star = [
-            TokenType.EQ, TokenType.NEQ, TokenType.AND, TokenType.OR, 
-            TokenType.RPAREN, TokenType.SEMICOLON, TokenType.LCURLY, 
-            TokenType.RSQUARE, TokenType.COMMA, TokenType.EOF
-        ]
-        for token_type in follow_sravnenie_star:
-            if token_type not in table["<Сравнение*>"]:
-                 table["<Сравнение*>"][token_type] = []
-        
-        # <Проверка равенства*> (обрабатывает ?, !)
-        # Операнд для ?, ! - это <Выражение><Сравнение*>
-        table["<Проверка равенства*>"] = {
-            TokenType.EQ: [TokenType.EQ, "<Выражение>", "<Сравнение*>", "<gen_op_eq>", "<Проверка равенства*>"],
-            TokenType.NEQ: [TokenType.NEQ, "<Выражение>", "<Сравнение*>", "<gen_op_neq>", "<Проверка равенства*>"], # Добавим NEQ позже
-        }
-        follow_proverka_ravenstva_star = [
-            TokenType.AND, TokenType.OR, TokenType.RPAREN, TokenType.SEMICOLON, 
-            TokenType.LCURLY, TokenType.RSQUARE, TokenType.COMMA, TokenType.EOF
-        ]
-        for token_type in follow_proverka_ravenstva_star:
-            if token_type not in table["<Проверка равенства*>"]:
-                 table["<Проверка равенства*>"][token_type] = []
-
-        # <ЛогическоеИ*> (обрабатывает &)
-        # Операнд для & - это <Выражение><Сравнение*><Проверка равенства*>
-        table["<ЛогическоеИ*>"] = {
-            TokenType.AND: [TokenType.AND, "<Выражение>", "<Сравнение*>", "<Проверка равенства*>", "<gen_op_and>", "<ЛогическоеИ*>"],
-        }
-        follow_logicheskoe_i_star = [
-            TokenType.OR, TokenType.RPAREN, TokenType.SEMICOLON, 
-            TokenType.LCURLY, TokenType.RSQUARE, TokenType.COMMA, TokenType.EOF
-        ]
-        for token_type in follow_logicheskoe_i_star:
-            if token_type not in table["<ЛогическоеИ*>"]:
-                 table["<ЛогическоеИ*>"][token_type] = []
-
-        # <ЛогическоеВыражение*> (обрабатывает |)
-        # Операнд для | - это <Выражение><Сравнение*><Проверка равенства*><ЛогическоеИ*>
-        table["<ЛогическоеВыражение*>"] = {
-            TokenType.OR: [TokenType.OR, "<Выражение>", "<Сравнение*>", "<Проверка равенства*>", "<ЛогическоеИ*>", "<gen_op_or>", "<ЛогическоеВыражение*>"],
-        }
-        follow_logicheskoe_virazhenie_star = [
-            TokenType.RPAREN, TokenType.SEMICOLON, TokenType.LCURLY, 
-            TokenType.RSQUARE, TokenType.COMMA, TokenType.EOF
-        ]
-        for token_type in follow_logicheskoe_virazhenie_star:
-            if token_type not in table["<ЛогическоеВыражение*>"]:
-                 table["<ЛогическоеВыражение*>"][token_type] = []
-
-        # Определение для <Инициализаторы> и <Инициализаторы_продолжение>
-        # FIRST(<ЛогВыражение>) уже определен как first_arith_expr
-        first_arith_expr = {TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST, TokenType.FLOAT_CONST, TokenType.LPAREN, TokenType.LCURLY}
-
-
-        first_expression_starters = {
-            TokenType.UNARY_MINUS, TokenType.IDENTIFIER, TokenType.INTEGER_CONST,
-            TokenType.FLOAT_CONST, TokenType.LPAREN, TokenType.LCURLY
-        }
+        self.rpn_generator.add_declaration(arr_token.value, arr_type, True)
+        self.context["last_identifier_token"] = None
 
-        table["<Инициализаторы>"] = {}
-        for token_type in first_expression_starters:
+    def _action_gen_array_init_start(self):
+        self.rpn_generator.begin_list()
 
-            table["<Инициализаторы>"][token_type] = ["<Выражение>", "<Инициализаторы_продолжение>"]
+    def _action_gen_array_init_end(self):
+        self.rpn_generator.end_list()
 
-        table["<Инициализаторы>"][TokenType.RCURLY] = []
+    def _action_gen_list_start(self):
+        self.rpn_generator.begin_list()
 
+    def _action_gen_list_end(self):
+        self.rpn_generator.end_list()
 
-        table["<Инициализаторы_продолжение>"] = {
-            TokenType.COMMA: [TokenType.COMMA, "<Выражение>", "<Инициализаторы_продолжение>"],
-            TokenType.RCURLY: []  
-        }
+    def _action_gen_op_plus(self):
+        self.rpn_generator.add_operator('+')
 
-        
-        if "<Инициализаторы*>" in table:
+    def _action_gen_op_minus(self):
+        self.rpn_generator.add_operator('-')
 
-            del table["<Инициализаторы*>"]
+    def _action_gen_op_uminus(self):
+        self.rpn_generator.add_operator('~')
 
+    def _action_gen_op_multiply(self):
+        self.rpn_generator.add_operator('*')
 
-        return table
+    def _action_gen_op_divide(self):
+        self.rpn_generator.add_operator('/')
 
-    def execute_semantic_action(self, action, current_token_arg): 
-        """
-        Выполняет семантическое действие на основе маркера.
-        """
+    def _action_gen_op_lt(self):
+        self.rpn_generator.add_operator('<')
 
+    def _action_gen_op_gt(self):
+        self.rpn_generator.add_operator('>')
 
-        if action == "<push_int_type>":
-            self.data_types_stack.append("int")
-        elif action == "<push_float_type>":
-            self.data_types_stack.append("float")
-        elif action == "<save_identifier_token>":
-            if self.current_index < len(self.tokens):
-                 self.context["last_identifier_token"] = self.tokens[self.current_index]
-            else:
-                self.error("Internal parser error: <save_identifier_token> called at end of tokens.")
-
-        elif action == "<add_variable_declaration>":
-            var_token = self.context.get("last_identifier_token")
-            if not var_token or var_token.token_type != TokenType.IDENTIFIER:
-                self.error("Internal parser error: last_identifier_token not set correctly for variable declaration.")
-                return
+    def _action_gen_op_eq(self):
+        self.rpn_generator.add_operator('?')
 
-            var_name = var_token.value
-            if not self.data_types_stack:
-                self.error(f"Internal parser error: data_types_stack is empty for variable {var_name}.")
-                return
-            var_type = self.data_types_stack.pop()
-            
-            self.symbol_table.add_symbol(var_name, var_type, var_token.line, var_token.position, is_array=False)
-            self.context["last_identifier_token"] = None
-
-        elif action == "<add_dynamic_array_declaration>":
-            arr_token = self.context.get("last_identifier_token")
-            if not arr_token or arr_token.token_type != TokenType.IDENTIFIER:
-                self.error("Internal parser error: last_identifier_token not set correctly for dynamic array declaration.")
-                return
+    def _action_gen_op_neq(self):
+        self.rpn_generator.add_operator('!')
 
-            arr_name = arr_token.value
-            if not self.data_types_stack:
-                self.error(f"Internal parser error: data_types_stack is empty for array {arr_name}.")
-                return
-            arr_type = self.data_types_stack.pop() 
+    def _action_gen_op_and(self):
+        self.rpn_generator.add_operator('&')
 
-            self.symbol_table.add_symbol(arr_name, arr_type, arr_token.line, arr_token.position, is_array=True)
+    def _action_gen_op_or(self):
+        self.rpn_generator.add_operator('|')
 
-            self.rpn_generator.add_identifier(arr_name)
-            self.rpn_generator.add_operator('DECL_ARR')
-            self.context["last_identifier_token"] = None
+    def _action_save_current_token_as_factor(self):
+        token = self.current_token()
+        if token is not self._end_token:
+            self.context["saved_factor_token"] = token
+        else:
+            self.error("Internal parser error: <save_current_token_as_factor> called at end of tokens.")
 
-        elif action == "<add_array_declaration>":
-            arr_token = self.context.get("last_identifier_token")
-            if not arr_token or arr_token.token_type != TokenType.IDENTIFIER:
-                self.error("Internal parser error: last_identifier_token not set correctly for array declaration.")
-                return
+    def _action_add_factor_to_rpn_if_not_array(self):
+        saved_token = self.context.get("saved_factor_token")
+        if saved_token and saved_token.token_type == TokenType.IDENTIFIER:
 
-            arr_name = arr_token.value
-            if not self.data_types_stack:
-                self.error(f"Internal parser error: data_types_stack is empty for array {arr_name}.")
-                return
-            arr_type = self.data_types_stack.pop() 
-
-            self.symbol_table.add_symbol(arr_name, arr_type, arr_token.line, arr_token.position, is_array=True)
-            self.rpn_generator.add_array_declaration(arr_name)
-            self.context["last_identifier_token"] = None
-
-        elif action == "<gen_op_plus>":
-            self.rpn_generator.add_operator('+')
-        elif action == "<gen_op_minus>":
-            self.rpn_generator.add_operator('-')
-        elif action == "<gen_op_uminus>":
-            self.rpn_generator.add_operator('~')
-        elif action == "<gen_op_multiply>":
-            self.rpn_generator.add_operator('*')
-        elif action == "<gen_op_divide>":
-            self.rpn_generator.add_operator('/')
-        elif action == "<gen_op_lt>":
-            self.rpn_generator.add_operator('<')
-        elif action == "<gen_op_gt>":
-            self.rpn_generator.add_operator('>')
-        elif action == "<gen_op_neq>":
-            self.rpn_generator.add_operator('!')
-        elif action == "<gen_op_and>":
-            self.rpn_generator.add_operator('&')
-        elif action == "<gen_op_or>":
-            self.rpn_generator.add_operator('|')
-        elif action == "<save_current_token_as_factor>":
-
-            if self.current_index < len(self.tokens):
-                self.context["saved_factor_token"] = self.tokens[self.current_index]
-            else:
-                self.error("Internal parser error: <save_current_token_as_factor> called at end of tokens.")
-        elif action == "<add_factor_to_rpn_if_not_array>":
-
-            saved_token = self.context.get("saved_factor_token")
-            if saved_token and saved_token.token_type == TokenType.IDENTIFIER:
-
-                self.rpn_generator.add_identifier(saved_token.value)
-                self.context["saved_factor_token"] = None
-        elif action == "<gen_assign_op>":
-            self.rpn_generator.add_operator('=')
-        elif action == "<gen_array_assign_op>":
-            self.rpn_generator.add_operator('array_assign')  
-        elif action == "<gen_output_op>":
-
-            self.rpn_generator.add_operator('w')
-        elif action == "<add_identifier_to_rpn_for_assign>":
-
-            var_token = self.context.get("last_identifier_token")
-            if var_token and var_token.token_type == TokenType.IDENTIFIER:
-                self.rpn_generator.add_identifier(var_token.value)
-        elif action == "<add_input_identifier_to_rpn>":
-
-            var_token = self.context.get("last_identifier_token")
-            if var_token and var_token.token_type == TokenType.IDENTIFIER:
-                self.rpn_generator.add_identifier(var_token.value)
-        elif action == "<gen_input_op>":
-            self.rpn_generator.add_operator('r')
-        elif action == "<gen_input_array_op>":
-
-            self.rpn_generator.add_operator('r_array')  
-        elif action == "<gen_array_access_op>":
-
-            self.rpn_generator.add_operator('array_index')  
-        elif action == "<add_array_name_to_rpn>":
-            saved_token = self.context.get("saved_factor_token")
-            if saved_token and saved_token.token_type == TokenType.IDENTIFIER:
-                self.rpn_generator.add_identifier(saved_token.value)
-                self.context["saved_factor_token"] = None  
-        elif action == "<while>":
-            loop_start = len(self.rpn_generator.rpn)  
-            if "while_stack" not in self.context:
-                self.context["while_stack"] = []
-            self.context["while_stack"].append({"start": loop_start})
-        elif action == "<after_while_condition>":
-            if "while_stack" not in self.context or not self.context["while_stack"]:
-                raise ValueError("while_stack is empty in <after_while_condition>")
-            
-            self.rpn_generator.add_operator('$JF')
-            jf_address_index = len(self.rpn_generator.rpn)
-            self.rpn_generator.rpn.append(None)  
-            
-            self.context["while_stack"][-1]["jf_address_index"] = jf_address_index
-        elif action == "<end_while_block>":
-            if "while_stack" not in self.context or not self.context["while_stack"]:
-                raise ValueError("while_stack is empty in <end_while_block>")
-            
-            while_info = self.context["while_stack"].pop()
-            loop_start = while_info["start"]
-            jf_address_index = while_info["jf_address_index"]
-            
-            self.rpn_generator.add_operator('$J')
-            self.rpn_generator.rpn.append(loop_start)
-            
-            end_address = len(self.rpn_generator.rpn)  
-            self.rpn_generator.rpn[jf_address_index] = end_address
+            self.rpn_generator.add_identifier(saved_token.value)
+            self.context["saved_factor_token"] = None
+
+    def _action_gen_assign_op(self):
+        self.rpn_generator.add_operator('=')
+
+    def _action_gen_array_assign_op(self):
+        self.rpn_generator.add_operator('array_assign')  
+
+    def _action_gen_output_op(self):
+        self.rpn_generator.add_operator('w')
+
+    def _action_add_identifier_to_rpn_for_assign(self):
+        var_token = self.context.get("last_identifier_token")
+        if var_token and var_token.token_type == TokenType.IDENTIFIER:
+            self.rpn_generator.add_identifier(var_token.value)
+
+    def _action_add_input_identifier_to_rpn(self):
+        var_token = self.context.get("last_identifier_token")
+        if var_token and var_token.token_type == TokenType.IDENTIFIER:
+            self.rpn_generator.add_identifier(var_token.value)
+
+    def _action_gen_input_op(self):
+        self.rpn_generator.add_operator('r')
+
+    def _action_gen_input_array_op(self):
+        self.rpn_generator.add_operator('r_array')  
+
+    def _action_gen_array_access_op(self):
+        self.rpn_generator.add_operator('array_index')  
+
+    def _action_add_array_name_to_rpn(self):
+        saved_token = self.context.get("saved_factor_token")
+        if saved_token and saved_token.token_type == TokenType.IDENTIFIER:
+            self.rpn_generator.add_identifier(saved_token.value)
+            self.context["saved_factor_token"] = None  
+
+    def _action_while(self):
+        loop_start = self.rpn_generator.begin_loop()
+        if "while_stack" not in self.context:
+            self.context["while_stack"] = []
+        self.context["while_stack"].append({"start": loop_start})
+
+    def _action_after_while_condition(self):
+        if "while_stack" not in self.context or not self.context["while_stack"]:
+            raise ValueError("while_stack is empty in <after_while_condition>")
         
-        # Семантические действия для if-else конструкций
-        elif action == "<after_if_condition>":
-            # Программа 9: После условия if
-            # Добавляем условный переход $JF с заполнителем
-            self.rpn_generator.add_operator('$JF')
-            jf_address_index = len(self.rpn_generator.rpn)
-            self.rpn_generator.rpn.append(None)  # Заполнитель для адреса
-            
-            # Инициализируем стек if-else, если его нет
-            if "if_stack" not in self.context:
-                self.context["if_stack"] = []
-            
-            # Сохраняем индекс команды $JF для последующего заполнения
-            self.context["if_stack"].append({"jf_address_index": jf_address_index})
+        loop_start = self.context["while_stack"][-1]["start"]
+        jf_address_index = self.rpn_generator.add_loop_condition_jump(loop_start)
         
-        elif action == "<start_else_block>":
-            # Программа 11: Начало блока else
-            if "if_stack" not in self.context or not self.context["if_stack"]:
-                raise ValueError("if_stack is empty in <start_else_block>")
-            
-            if_info = self.context["if_stack"][-1]
-            jf_address_index = if_info["jf_address_index"]
-            
-            # Добавляем безусловный переход $J для пропуска блока else
-            self.rpn_generator.add_operator('$J')
-            j_address_index = len(self.rpn_generator.rpn)
-            self.rpn_generator.rpn.append(None)  # Заполнитель для адреса
-            
-            # Заполняем адрес для $JF (переход на начало блока else)
-            current_address = len(self.rpn_generator.rpn)
-            self.rpn_generator.rpn[jf_address_index] = current_address
-            
-            # Сохраняем индекс команды $J для последующего заполнения
-            if_info["j_address_index"] = j_address_index
+        self.context["while_stack"][-1]["jf_address_index"] = jf_address_index
+
+    def _action_end_while_block(self):
+        if "while_stack" not in self.context or not self.context["while_stack"]:
+            raise ValueError("while_stack is empty in <end_while_block>")
         
-        elif action == "<end_if_block>":
-            # Программа 10: Конец блока if (или if-else)
-            if "if_stack" not in self.context or not self.context["if_stack"]:
-                raise ValueError("if_stack is empty in <end_if_block>")
-            
-            if_info = self.context["if_stack"].pop()
-            
-            # Если есть $J (блок else), заполняем его адрес
-            if "j_address_index" in if_info:
-                j_address_index = if_info["j_address_index"]
-                end_address = len(self.rpn_generator.rpn)
-                self.rpn_generator.rpn[j_address_index] = end_address
-            else:
-                # Если нет блока else, заполняем адрес для $JF
-                jf_address_index = if_info["jf_address_index"]
-                end_address = len(self.rpn_generator.rpn)
-                self.rpn_generator.rpn[jf_address_index] = end_address
+        while_info = self.context["while_stack"].pop()
+        self.rpn_generator.add_loop_end(while_info["jf_address_index"])
+
+    # Семантические действия для if-else конструкций
+    def _action_after_if_condition(self):
+        # Программа 9: После условия if
+        # Добавляем условный переход $JF с заполнителем
+        jf_address_index = self.rpn_generator.add_conditional_jump()
         
-        pass
+        # Инициализируем стек if-else, если его нет
+        if "if_stack" not in self.context:
+            self.context["if_stack"] = []
+        
+        # Сохраняем индекс команды $JF для последующего заполнения
+        self.context["if_stack"].append({"jf_address_index": jf_address_index})
 
+    def _action_start_else_block(self):
+        # Программа 11: Начало блока else
+        if "if_stack" not in self.context or not self.context["if_stack"]:
+            raise ValueError("if_stack is empty in <start_else_block>")
+        
+        if_info = self.context["if_stack"][-1]
+        jf_address_index = if_info["jf_address_index"]
+        
+        # Добавляем безусловный переход $J для пропуска блока else
+        j_address_index = self.rpn_generator.add_unconditional_jump_placeholder()
+        
+        # Заполняем адрес для $JF (переход на начало блока else)
+        current_address = self.rpn_generator.get_current_index()
+        self.rpn_generator.patch_jump_address(jf_address_index, current_address)
+        
+        # Сохраняем индекс команды $J для последующего заполнения
+        if_info["j_address_index"] = j_address_index
 
-    def parse(self):
-        self.parse_table = self.build_parse_table()
+    def _action_end_if_block(self):
+        # Программа 10: Конец блока if (или if-else)
+        if "if_stack" not in self.context or not self.context["if_stack"]:
+            raise ValueError("if_stack is empty in <end_if_block>")
         
-        while self.stack:
-            top_of_stack = self.stack[-1]
-            current_token_loop = self.current_token() 
+        if_info = self.context["if_stack"].pop()
+        
+        # Если есть $J (блок else), заполняем его адрес
+        if "j_address_index" in if_info:
+            j_address_index = if_info["j_address_index"]
+            end_address = self.rpn_generator.get_current_index()
+            self.rpn_generator.patch_jump_address(j_address_index, end_address)
+        else:
+            # Если нет блока else, заполняем адрес для $JF
+            jf_address_index = if_info["jf_address_index"]
+            end_address = self.rpn_generator.get_current_index()
+            self.rpn_generator.patch_jump_address(jf_address_index, end_address)
 
 
-            if top_of_stack == TokenType.EOF and current_token_loop.token_type == TokenType.EOF:
 
-                break
+    def parse(self):
+        grammar = self.grammar
+        kinds = grammar.kinds
+        rows = grammar.rows
+        actions = self._actions
+        stack = self.stack
+        statement_list = grammar.codes["<Список операторов>"]
+        add_constant = self.rpn_generator.add_constant
+        if self.expression_parser is not None:
+            expression_kinds = shared_expression_grammar().kinds
+            parse_expression = self.expression_parser.parse
+        else:
+            expression_kinds = [None] * len(kinds)
+            parse_expression = None
+        if self.statistics is not None:
+            rows, actions, parse_expression = self.statistics.instrument(rows, actions, parse_expression, stack)
+
+        while stack:
+            top_of_stack = stack[-1]
+            kind = kinds[top_of_stack]
+
+            if kind == SYMBOL_TERMINAL:
+                if top_of_stack == self._current_type:
+                    if top_of_stack == TokenType.EOF:
+                        break
+                    stack.pop()
+
+                    if top_of_stack == TokenType.INTEGER_CONST or top_of_stack == TokenType.FLOAT_CONST:
+                        add_constant(self._current_value)
+
+                    self.advance()
+                    continue
+            elif kind == SYMBOL_NONTERMINAL:
+                expression = expression_kinds[top_of_stack]
+                if expression is not None and parse_expression(expression):
+                    stack.pop()
+                    continue
+
+                rule = rows[top_of_stack].get(self._current_type)
+                if rule is None:
+                    self.no_rule_error(grammar.symbols[top_of_stack], grammar.expected[top_of_stack])
 
-            if isinstance(top_of_stack, TokenType) and top_of_stack == current_token_loop.token_type:
-                self.stack.pop()
+                if (self.statement_hook is not None and top_of_stack == statement_list and
+                        len(stack) == 2 and self.statement_hook(self)):
+                    break
 
-                if top_of_stack == TokenType.INTEGER_CONST or top_of_stack == TokenType.FLOAT_CONST:
-                    self.rpn_generator.add_constant(current_token_loop.value)
+                stack.pop()
+                stack.extend(rule)
+                continue
+            elif kind == SYMBOL_ACTION:
+                stack.pop()
+                actions[top_of_stack]()
+                continue
 
-                
-                self.advance()
-            elif isinstance(top_of_stack, str) and top_of_stack.startswith("<") and top_of_stack.endswith(">") and (
-                not top_of_stack.startswith("<gen_") and not top_of_stack.startswith("<after_") and
-                not top_of_stack.startswith("<end_") and not top_of_stack.startswith("<start_") and
-                not top_of_stack.startswith("<while") and not top_of_stack.startswith("<push_") and
-                not top_of_stack.startswith("<save_") and not top_of_stack.startswith("<add_")): 
-                
-                rule = self.parse_table.get(top_of_stack, {}).get(current_token_loop.token_type)
-                if rule is None:
-                    expected_tokens = list(self.parse_table.get(top_of_stack, {}).keys())
-                    self.error(f"Ожидался один из токенов {expected_tokens} или правило для нетерминала '{top_of_stack}' не найдено для токена {current_token_loop.token_type}, но получен {current_token_loop.token_type} ('{current_token_loop.value}')")
-                    break 
-                
-                self.stack.pop()
-                for symbol in reversed(rule):
-                    self.stack.append(symbol)
-            elif isinstance(top_of_stack, str) and (top_of_stack.startswith("<gen_") or top_of_stack.startswith("<after_") or top_of_stack.startswith("<end_") or top_of_stack.startswith("<start_") or top_of_stack.startswith("<while") or top_of_stack.startswith("<push_") or top_of_stack.startswith("<save_") or top_of_stack.startswith("<add_")): # Semantic action
-                action_to_execute = self.stack.pop()
-
-                self.execute_semantic_action(action_to_execute, current_token_loop) 
-            else: 
-                self.error(f"Несоответствие токена. Ожидался {top_of_stack}, но получен {current_token_loop.token_type} ('{current_token_loop.value}') или неизвестный символ в стеке.")
-                break
-        
-        return self.rpn_generator.rpn, self.symbol_table
\ No newline at end of file
+            self.mismatch_error(grammar.symbols[top_of_stack])
+
+        self.rpn_generator.finish()
+        return self.rpn_generator.result(), self.symbol_table
\ No newline at end of file
@@ -0,0 +1,433 @@
+from .rpn_analysis import TYPED_OPERATIONS
+from .slot_resolution import BINARY_OPERATIONS, OPERAND_COUNTS
+
+
+# Число регистров для временных значений; временные значения, которым
+# регистра не хватило, получают ячейки памяти за регистрами
+REGISTER_COUNT = 16
+
+# Команды, которые записывают результат в регистр d (первый операнд)
+_RESULT_OPERATIONS = BINARY_OPERATIONS | {"UNARY_MINUS", "LOAD_ELEM", "LOAD_ELEM_UNCHECKED", "MOVE"}
+
+# Команды, которые определяют переменную первого операнда (сами, без DEFINE)
+_DEFINING_OPERATIONS = frozenset(("LOAD_INIT", "CHECK_DEFINED"))
+
+# Команды, которые записывают переменную первого операнда целиком
+_VARIABLE_WRITES = frozenset(("STORE_LIST", "DECL_ARR", "INPUT"))
+
+_JUMP_OPERATIONS = frozenset(("$J", "$JF", "$JT"))
+
+
+class RegisterProgram:
+    """
+    Трехадресная программа над файлом регистров.
+
+    code - список команд-кортежей (имя, операнды...); операнды - номера
+    регистров, кроме адресов переходов (номер команды в code):
+        MOVE d a              - d = a
+        PLUS d a b ... OR     - d = a op b (DIVIDE - с проверкой деления на 0),
+                                так же команды с типами (I_ADD d a b, ...)
+        UNARY_MINUS d a       - d = -a
+        LOAD_ELEM d v i       - d = v[i]
+        STORE_ELEM v i a      - v[i] = a
+        LOAD_ELEM_UNCHECKED d v i, STORE_ELEM_UNCHECKED v i a
+                              - то же без проверок (индекс доказан)
+        STORE_LIST v (a, ...) - v = [a, ...]
+        DECL_ARR v a          - v = массив из a нулей
+        INPUT v, INPUT_ELEM v i - прочитать v или v[i]
+        OUTPUT a              - вывести a
+        LOAD_INIT v           - неопределенная v получает 0
+        CHECK_DEFINED v       - для неопределенной v NameError
+        DEFINE v              - v определяется (следующая команда пишет в нее)
+        $J t, $JF a t, $JT a t - переход (при ложном a, при истинном a)
+
+    Файл регистров: сначала переменные (регистр v - переменная names[v]),
+    затем константы constants, затем temporary_count регистров и ячеек
+    памяти для временных значений.
+    """
+
+    __slots__ = ('code', 'names', 'constants', 'temporary_count')
+
+    def __init__(self, code, names, constants, temporary_count):
+        self.code = code
+        self.names = names
+        self.constants = constants
+        self.temporary_count = temporary_count
+
+    def __repr__(self):
+        return (f"RegisterProgram(code={self.code!r}, names={self.names!r}, constants={self.constants!r}, "
+                f"temporary_count={self.temporary_count!r})")
+
+
+class _Unlowerable(Exception):
+    """SlotProgram нельзя перевести в регистры"""
+
+
+def lower_to_registers(program, register_count=REGISTER_COUNT):
+    """
+    Переводит SlotProgram (без суперкоманд) в RegisterProgram: значения
+    стека становятся временными регистрами, переменные и константы -
+    регистрами файла, а временные регистры распределяются линейным
+    сканированием по register_count регистрам.
+
+    Перевод выполняется, если на переходах и в их целях стек пуст (так
+    устроены операторы .kb); иначе возвращается None, и программу
+    выполняет SlotInterpreter.
+
+    Returns:
+        RegisterProgram или None
+    """
+    try:
+        lowering = _Lowering(program)
+        code = lowering.lower()
+    except _Unlowerable:
+        return None
+    code = _insert_definitions(code, len(program.names))
+    code, temporary_count = _allocate(code, len(program.names) + len(lowering.constants), register_count)
+    return RegisterProgram(code, program.names, lowering.constants, temporary_count)
+
+
+class _Lowering:
+    def __init__(self, program):
+        self.program = program
+        self.constants = []
+        self.constant_registers = {}  # (тип, значение) -> регистр
+        self.temporaries = 0          # Временные регистры до распределения: -1, -2, ...
+        self.code = []
+        self.stack = []
+
+    def constant(self, value):
+        key = (value.__class__, value)
+        register = self.constant_registers.get(key)
+        if register is None:
+            register = self.constant_registers[key] = len(self.program.names) + len(self.constants)
+            self.constants.append(value)
+        return register
+
+    def temporary(self):
+        self.temporaries += 1
+        return -self.temporaries
+
+    def pop(self):
+        if not self.stack:
+            raise _Unlowerable
+        return self.stack.pop()
+
+    def protect(self, variable):
+        """Значения variable на стеке копируются до записи в нее"""
+        for depth, register in enumerate(self.stack):
+            if register == variable:
+                temporary = self.temporary()
+                self.code.append(("MOVE", temporary, variable))
+                self.stack[depth] = temporary
+
+    def store(self, variable, register):
+        code = self.code
+        if register == variable:
+            return
+        if variable in self.stack:
+            self.protect(variable)
+        elif register < 0 and code and code[-1][0] in _RESULT_OPERATIONS and code[-1][1] == register:
+            # Результат только что вычислен: пишем его сразу в переменную
+            code[-1] = (code[-1][0], variable) + code[-1][2:]
+            return
+        code.append(("MOVE", variable, register))
+
+    def lower(self):
+        source = self.program.code
+        length = len(source)
+        targets = set()
+        position = 0
+        while position < length:
+            if source[position] in _JUMP_OPERATIONS:
+                targets.add(source[position + 1])
+            position += 1 + OPERAND_COUNTS.get(source[position], 0)
+
+        code = self.code
+        stack = self.stack
+        new_addresses = {}
+        position = 0
+        while position < length:
+            if position in targets and stack:
+                raise _Unlowerable
+            new_addresses[position] = len(code)
+            instruction = source[position]
+            operand = source[position + 1] if OPERAND_COUNTS.get(instruction) else None
+            if instruction == "PUSH":
+                stack.append(self.constant(operand))
+            elif instruction == "LOAD":
+                stack.append(operand)
+            elif instruction == "LOAD_INIT" or instruction == "LOAD_DEFINED":
+                code.append(("LOAD_INIT" if instruction == "LOAD_INIT" else "CHECK_DEFINED", operand))
+                stack.append(operand)
+            elif instruction in BINARY_OPERATIONS:
+                right = self.pop()
+                left = self.pop()
+                result = self.temporary()
+                code.append((instruction, result, left, right))
+                stack.append(result)
+            elif instruction == "UNARY_MINUS":
+                result = self.temporary()
+                code.append((instruction, result, self.pop()))
+                stack.append(result)
+            elif instruction == "LOAD_ELEM" or instruction == "LOAD_ELEM_UNCHECKED":
+                index = self.pop()
+                result = self.temporary()
+                code.append((instruction, result, operand, index))
+                stack.append(result)
+            elif instruction == "STORE":
+                self.store(operand, self.pop())
+            elif instruction == "STORE_LIST":
+                count = source[position + 2]
+                if count > len(stack):
+                    raise _Unlowerable
+                values = tuple(stack[len(stack) - count:])
+                del stack[len(stack) - count:]
+                self.protect(operand)
+                code.append(("STORE_LIST", operand, values))
+            elif instruction == "DECL_ARR":
+                size = self.pop()
+                self.protect(operand)
+                code.append(("DECL_ARR", operand, size))
+            elif instruction == "STORE_ELEM" or instruction == "STORE_ELEM_UNCHECKED":
+                value = self.pop()
+                index = self.pop()
+                code.append((instruction, operand, index, value))
+            elif instruction == "INPUT":
+                self.protect(operand)
+                code.append(("INPUT", operand))
+            elif instruction == "INPUT_ELEM":
+                code.append(("INPUT_ELEM", operand, self.pop()))
+            elif instruction == "OUTPUT":
+                code.append(("OUTPUT", self.pop()))
+            elif instruction == "$JF" or instruction == "$JT":
+                condition = self.pop()
+                if stack:
+                    raise _Unlowerable
+                code.append((instruction, condition, operand))
+            elif instruction == "$J":
+                if stack:
+                    raise _Unlowerable
+                code.append(("$J", operand))
+            else:
+                raise _Unlowerable  # Суперкоманды и неизвестные команды
+            position += 1 + OPERAND_COUNTS.get(instruction, 0)
+        new_addresses[length] = len(code)
+        return [_with_target(instruction, new_addresses[instruction[-1]])
+                if instruction[0] in _JUMP_OPERATIONS else instruction for instruction in code]
+
+
+def _with_target(instruction, target):
+    return instruction[:-1] + (target,)
+
+
+def _written_variable(instruction, variable_count):
+    """Переменная, которую команда записывает и, возможно, впервые определяет"""
+    operation = instruction[0]
+    if operation in _RESULT_OPERATIONS:
+        return instruction[1] if 0 <= instruction[1] < variable_count else None
+    if operation in _VARIABLE_WRITES:
+        return instruction[1]
+    return None
+
+
+def _insert_definitions(code, variable_count):
+    """
+    Таблица символов перечисляет переменные в порядке определения. Перед
+    записью в переменную, которая на каком-то пути к ней еще не
+    определена, вставляется DEFINE (определенность - прямой поток данных
+    по линейным участкам, множества - битовые маски).
+    """
+    length = len(code)
+    leaders = {0}
+    for index, instruction in enumerate(code):
+        if instruction[0] in _JUMP_OPERATIONS:
+            leaders.add(instruction[-1])
+            leaders.add(index + 1)
+    leaders = sorted(leader for leader in leaders if leader < length)
+
+    blocks = []
+    for number, start in enumerate(leaders):
+        end = leaders[number + 1] if number + 1 < len(leaders) else length
+        generated = 0
+        for instruction in code[start:end]:
+            variable = _written_variable(instruction, variable_count)
+            if variable is None and instruction[0] in _DEFINING_OPERATIONS:
+                variable = instruction[1]
+            if variable is not None:
+                generated |= 1 << variable
+        last = code[end - 1]
+        successors = [last[-1]] if last[0] in _JUMP_OPERATIONS else []
+        if last[0] != "$J" and end < length:
+            successors.append(end)
+        blocks.append((start, end, generated, successors))
+
+    defined = {0: 0}
+    changed = True
+    while changed:
+        changed = False
+        for start, _, generated, successors in blocks:
+            entry = defined.get(start)
+            if entry is None:
+                continue
+            leaving = entry | generated
+            for successor in successors:
+                known = defined.get(successor)
+                updated = leaving if known is None else known & leaving
+                if successor < length and updated != known:
+                    defined[successor] = updated
+                    changed = True
+
+    needs_definition = set()
+    for start, end, _, _ in blocks:
+        current = defined.get(start)
+        if current is None:
+            continue  # Недостижимый участок
+        for index in range(start, end):
+            instruction = code[index]
+            variable = _written_variable(instruction, variable_count)
+            if variable is None and instruction[0] in _DEFINING_OPERATIONS:
+                variable = instruction[1]
+            elif variable is not None and not current >> variable & 1:
+                needs_definition.add(index)
+            if variable is not None:
+                current |= 1 << variable
+    if not needs_definition:
+        return code
+
+    result = []
+    new_addresses = []
+    for index, instruction in enumerate(code):
+        new_addresses.append(len(result))
+        if index in needs_definition:
+            result.append(("DEFINE", _written_variable(instruction, variable_count)))
+        result.append(instruction)
+    new_addresses.append(len(result))
+    return [_with_target(instruction, new_addresses[instruction[-1]])
+            if instruction[0] in _JUMP_OPERATIONS else instruction for instruction in result]
+
+
+def _register_fields(instruction):
+    """Номера полей кортежа команды, в которых стоят регистры"""
+    operation = instruction[0]
+    if operation == "$J":
+        return ()
+    if operation == "$JF" or operation == "$JT":
+        return (1,)
+    if operation == "STORE_LIST":
+        return (1,)
+    return range(1, len(instruction))
+
+
+def _allocate(code, first_temporary, register_count):
+    """
+    Линейное сканирование: временный регистр живет от записи до последнего
+    чтения (значения стека не переживают переходов, так что интервалы
+    точны). При нехватке регистров в память уходит интервал, который
+    кончается позже всех.
+
+    Returns:
+        tuple: (код с номерами регистров файла, число регистров и ячеек
+               памяти для временных значений)
+    """
+    starts = {}
+    ends = {}
+    for index, instruction in enumerate(code):
+        registers = [instruction[field] for field in _register_fields(instruction)]
+        if instruction[0] == "STORE_LIST":
+            registers.extend(instruction[2])
+        for register in registers:
+            if register < 0:
+                starts.setdefault(register, index)
+                ends[register] = index
+
+    locations = {}
+    free = list(range(register_count - 1, -1, -1))
+    active = []  # (конец, временный регистр), по возрастанию конца
+    spilled = 0
+    for temporary in sorted(starts, key=starts.get):
+        start = starts[temporary]
+        while active and active[0][0] <= start:
+            free.append(locations[active.pop(0)[1]])
+        if free:
+            locations[temporary] = free.pop()
+            active.append((ends[temporary], temporary))
+            active.sort()
+            continue
+        # Регистров нет: в память уходит интервал с самым дальним концом
+        last_end, last = active[-1]
+        if last_end > ends[temporary]:
+            locations[temporary] = locations[last]
+            locations[last] = register_count + spilled
+            active[-1] = (ends[temporary], temporary)
+            active.sort()
+        else:
+            locations[temporary] = register_count + spilled
+        spilled += 1
+
+    used = max(locations.values(), default=-1) + 1
+
+    def place(register):
+        return first_temporary + locations[register] if register < 0 else register
+
+    allocated = []
+    for instruction in code:
+        fields = _register_fields(instruction)
+        instruction = tuple(place(value) if field in fields else value for field, value in enumerate(instruction))
+        if instruction[0] == "STORE_LIST":
+            instruction = instruction[:2] + (tuple(place(register) for register in instruction[2]),)
+        allocated.append(instruction)
+    return allocated, used
+
+
+def format_register_program(program):
+    """
+    Текст трехадресного кода: переменные - по именам, константы -
+    значениями, временные регистры - r0, r1, ..., ячейки памяти - m0, ...
+
+    Returns:
+        list: Строки "номер: команда"
+    """
+    names = program.names
+    first_constant = len(names)
+    first_temporary = first_constant + len(program.constants)
+
+    def show(register):
+        if register < first_constant:
+            return names[register]
+        if register < first_temporary:
+            return repr(program.constants[register - first_constant])
+        register -= first_temporary
+        return f"r{register}" if register < REGISTER_COUNT else f"m{register - REGISTER_COUNT}"
+
+    symbols = {"PLUS": "+", "MINUS": "-", "MULTIPLY": "*", "DIVIDE": "/", "EQUALS": "==", "NEQ": "!=",
+               "LT": "<", "GT": ">", "AND": "&&", "OR": "||"}
+    lines = []
+    for index, instruction in enumerate(program.code):
+        operation, operands = instruction[0], instruction[1:]
+        if operation in TYPED_OPERATIONS:
+            # Тип операндов - приставкой к знаку: i+ (I_ADD), f< (FCMP_LT)
+            symbol = operation[0].lower() + symbols[TYPED_OPERATIONS[operation]]
+            text = f"{show(operands[0])} = {show(operands[1])} {symbol} {show(operands[2])}"
+        elif operation in symbols:
+            text = f"{show(operands[0])} = {show(operands[1])} {symbols[operation]} {show(operands[2])}"
+        elif operation == "MOVE":
+            text = f"{show(operands[0])} = {show(operands[1])}"
+        elif operation == "UNARY_MINUS":
+            text = f"{show(operands[0])} = -{show(operands[1])}"
+        elif operation == "LOAD_ELEM" or operation == "LOAD_ELEM_UNCHECKED":
+            text = f"{show(operands[0])} = {show(operands[1])}[{show(operands[2])}]"
+        elif operation == "STORE_ELEM" or operation == "STORE_ELEM_UNCHECKED":
+            text = f"{show(operands[0])}[{show(operands[1])}] = {show(operands[2])}"
+        elif operation == "STORE_LIST":
+            text = f"{show(operands[0])} = [{', '.join(show(register) for register in operands[1])}]"
+        elif operation == "$J":
+            text = f"jump {operands[0]}"
+        elif operation == "$JF":
+            text = f"jf {show(operands[0])} {operands[1]}"
+        elif operation == "$JT":
+            text = f"jt {show(operands[0])} {operands[1]}"
+        else:
+            text = " ".join([operation.lower()] + [show(register) for register in operands])
+        lines.append(f"{index}: {text}")
+    return lines
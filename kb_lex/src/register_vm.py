@@ -0,0 +1,110 @@
+from .slot_interpreter import BINARY_OPERATIONS, UNDEFINED, SlotInterpreter
+
+
+class RegisterVM(SlotInterpreter):
+    """
+    Выполняет RegisterProgram (см. register_ir.lower_to_registers): команды
+    читают операнды из файла регистров и пишут результат в регистр, стека
+    значений нет.
+
+    Вывод, ввод, ошибки выполнения и таблица символов - те же, что у
+    RPNInterpreter на исходной ОПС.
+    """
+
+    def interpret(self, program):
+        code = program.code
+        names = program.names
+        registers = [UNDEFINED] * len(names) + list(program.constants) + [None] * program.temporary_count
+        defined = []  # Переменные в порядке определения
+        self.stack = []
+        self.output = output = []
+        self.symbol_table = {}
+        self.input_index = 0
+        binary_operations = BINARY_OPERATIONS
+        element = self._element
+        length = len(code)
+        pointer = 0
+        executed = 0
+
+        try:
+            while pointer < length:
+                instruction = code[pointer]
+                operation = instruction[0]
+                executed += 1
+                pointer += 1
+                if operation == "LOAD_ELEM":
+                    array = registers[instruction[2]]
+                    index = registers[instruction[3]]
+                    if array.__class__ is not list or index.__class__ is not int or not 0 <= index < len(array):
+                        array, index = element(registers, names, instruction[2], index)
+                    registers[instruction[1]] = array[index]
+                elif operation == "LOAD_ELEM_UNCHECKED":
+                    registers[instruction[1]] = registers[instruction[2]][registers[instruction[3]]]
+                elif operation == "LT" or operation == "ICMP_LT":
+                    registers[instruction[1]] = int(registers[instruction[2]] < registers[instruction[3]])
+                elif operation == "$JF":
+                    if not registers[instruction[1]]:
+                        pointer = instruction[2]
+                elif operation == "$JT":
+                    if registers[instruction[1]]:
+                        pointer = instruction[2]
+                elif operation == "PLUS" or operation == "I_ADD":
+                    registers[instruction[1]] = registers[instruction[2]] + registers[instruction[3]]
+                elif operation == "MOVE":
+                    registers[instruction[1]] = registers[instruction[2]]
+                elif operation == "$J":
+                    pointer = instruction[1]
+                elif operation == "STORE_ELEM":
+                    array = registers[instruction[1]]
+                    index = registers[instruction[2]]
+                    if array.__class__ is not list or index.__class__ is not int or not 0 <= index < len(array):
+                        array, index = element(registers, names, instruction[1], index)
+                    array[index] = registers[instruction[3]]
+                elif operation == "STORE_ELEM_UNCHECKED":
+                    registers[instruction[1]][registers[instruction[2]]] = registers[instruction[3]]
+                elif operation in binary_operations:
+                    registers[instruction[1]] = binary_operations[operation](registers[instruction[2]],
+                                                                             registers[instruction[3]])
+                elif operation == "DEFINE":
+                    if registers[instruction[1]] is UNDEFINED:
+                        defined.append(instruction[1])
+                elif operation == "DIVIDE":
+                    right = registers[instruction[3]]
+                    if right == 0:
+                        raise ZeroDivisionError("Division by zero")
+                    registers[instruction[1]] = registers[instruction[2]] / right
+                elif operation == "UNARY_MINUS":
+                    registers[instruction[1]] = -registers[instruction[2]]
+                elif operation == "OUTPUT":
+                    output.append(registers[instruction[1]])
+                elif operation == "LOAD_INIT":
+                    if registers[instruction[1]] is UNDEFINED:
+                        registers[instruction[1]] = 0
+                        defined.append(instruction[1])
+                elif operation == "CHECK_DEFINED":
+                    if registers[instruction[1]] is UNDEFINED:
+                        raise NameError(f"Undefined variable: {names[instruction[1]]}")
+                elif operation == "STORE_LIST":
+                    registers[instruction[1]] = [registers[register] for register in instruction[2]]
+                elif operation == "DECL_ARR":
+                    size = int(registers[instruction[2]])
+                    if size <= 0:
+                        raise ValueError(f"Array size must be positive, got {size}")
+                    registers[instruction[1]] = [0] * size
+                elif operation == "INPUT":
+                    variable = instruction[1]
+                    registers[variable] = self._read_input(f"Введите значение для переменной '{names[variable]}': ")
+                elif operation == "INPUT_ELEM":
+                    variable = instruction[1]
+                    index = registers[instruction[2]]
+                    value = self._read_input(f"Введите значение для элемента {names[variable]}[{index}]: ")
+                    array, index = element(registers, names, variable, index)
+                    array[index] = value
+                else:
+                    raise ValueError(f"Unknown register program instruction: {operation}")
+        finally:
+            self.instruction_pointer = pointer
+            self.executed_count = executed
+
+        self.symbol_table = {names[variable]: registers[variable] for variable in defined}
+        return output, self.symbol_table
@@ -0,0 +1,108 @@
+from bisect import bisect_left
+
+
+# Команды перехода: за каждой в ОПС следует адрес перехода. $JF снимает
+# условие и переходит при ложном, $JT - при истинном (см. rotate_loops)
+JUMP_OPERATIONS = frozenset(("$J", "$JF", "$JT"))
+
+# Имена команд, которые RPNInterpreter не считает именами переменных
+RPN_OPERATIONS = frozenset((
+    "$JF", "$J", "ARR_INDEX", "OUTPUT_OP", "ASSIGN", "ASSIGN_ARR", "EQUALS", "MINUS", "PLUS", "MULTIPLY",
+    "DIVIDE", "UNARY_MINUS", "LT", "GT", "NEQ", "AND", "OR", "DECL_ARR", "$r", "$w", "r_array",
+    "ARRAY_INDEX", "ARRAY_ASSIGN",
+))
+
+# Команды с доказанными типами операндов (см. type_inference): команда ->
+# общая команда, которую она заменяет. I - оба операнда int, F - оба float.
+# В именах есть "_": в идентификаторах исходного текста его не бывает, так
+# что команда не совпадет с именем переменной (int IADD; - обычная переменная)
+TYPED_OPERATIONS = {
+    "I_ADD": "PLUS", "I_SUB": "MINUS", "I_MUL": "MULTIPLY", "IDIV_TO_FLOAT": "DIVIDE",
+    "ICMP_EQ": "EQUALS", "ICMP_NE": "NEQ", "ICMP_LT": "LT", "ICMP_GT": "GT",
+    "F_ADD": "PLUS", "F_SUB": "MINUS", "F_MUL": "MULTIPLY", "F_DIV": "DIVIDE",
+    "FCMP_EQ": "EQUALS", "FCMP_NE": "NEQ", "FCMP_LT": "LT", "FCMP_GT": "GT",
+}
+
+# Обращения к массиву с доказанным индексом (см. bounds_checks): массив
+# заведомо есть, индекс - int в его границах, проверки не нужны
+UNCHECKED_OPERATIONS = {"ARRAY_INDEX_UNCHECKED": "ARRAY_INDEX", "ARRAY_ASSIGN_UNCHECKED": "ARRAY_ASSIGN"}
+
+# Все команды, которые ставят оптимизации вместо общих: команда -> общая
+SPECIALIZED_OPERATIONS = {**TYPED_OPERATIONS, **UNCHECKED_OPERATIONS}
+
+
+# Префикс имен временных переменных, которые заводят оптимизации. Имя в
+# исходном тексте начинается с буквы, поэтому имена не пересекаются
+TEMPORARY_PREFIX = "_"
+
+
+def is_temporary(name):
+    """Имя временной переменной оптимизации: в таблице символов его не показывают"""
+    return name.startswith(TEMPORARY_PREFIX)
+
+
+def is_constant(instruction):
+    """Числовая константа ОПС (int или float)"""
+    return instruction.__class__ is int or instruction.__class__ is float
+
+
+def is_variable(instruction):
+    """Имя переменной в ОПС: RPNInterpreter кладет его на стек как строку"""
+    return (instruction.__class__ is str and instruction.isidentifier() and instruction not in RPN_OPERATIONS
+            and instruction not in SPECIALIZED_OPERATIONS)
+
+
+def jump_targets(rpn):
+    """Отсортированный список различных адресов, на которые есть переходы"""
+    targets = set()
+    index = 0
+    length = len(rpn)
+    while index < length:
+        if rpn[index] in JUMP_OPERATIONS:
+            targets.add(rpn[index + 1])
+            index += 2
+        else:
+            index += 1
+    return sorted(targets)
+
+
+class JumpTargets:
+    """
+    Адреса переходов ОПС: позволяет проверить, есть ли переход внутрь
+    участка кода, который оптимизация собирается заменить.
+    """
+
+    __slots__ = ('targets',)
+
+    def __init__(self, rpn):
+        self.targets = jump_targets(rpn)
+
+    def any_between(self, start, end):
+        """Есть ли переход на адрес из полуинтервала (start, end]"""
+        index = bisect_left(self.targets, start + 1)
+        return index < len(self.targets) and self.targets[index] <= end
+
+    def __contains__(self, address):
+        index = bisect_left(self.targets, address)
+        return index < len(self.targets) and self.targets[index] == address
+
+    def first_after(self, address):
+        """Наименьший адрес перехода больше address (None, если такого нет)"""
+        index = bisect_left(self.targets, address + 1)
+        return self.targets[index] if index < len(self.targets) else None
+
+
+def remap_jumps(rpn, new_addresses):
+    """
+    Заменяет (на месте) адреса переходов ОПС: адрес target становится
+    new_addresses[target]. Возвращает rpn.
+    """
+    index = 0
+    length = len(rpn)
+    while index < length:
+        if rpn[index] in JUMP_OPERATIONS:
+            rpn[index + 1] = new_addresses[rpn[index + 1]]
+            index += 2
+        else:
+            index += 1
+    return rpn
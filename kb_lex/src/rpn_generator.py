@@ -1,19 +1,95 @@
-class RPNGenerator:
+from .token_1 import parse_float_literal, parse_int_literal
+
+
+class ConstantPool:
+    """
+    Пул констант одной компиляции: одинаковые литералы (например, тысячи
+    повторов в инициализаторах массивов) хранятся одним объектом.
+    """
+
+    __slots__ = ('constants', 'requests')
 
     def __init__(self):
+        # Ключ включает тип, чтобы 1 и 1.0 не считались одной константой
+        self.constants = {}
+        self.requests = 0
+
+    def intern(self, value):
+        """Возвращает объект пула, равный value (добавляет value, если его нет)"""
+        self.requests += 1
+        return self.constants.setdefault((value.__class__, value), value)
+
+    def stats(self):
+        """Статистика пула: всего констант, уникальных и повторов"""
+        unique = len(self.constants)
+        return {"constants": self.requests, "unique": unique, "deduplicated": self.requests - unique}
+
+
+class RPNGenerator:
+    # Команды ОПС для операторов
+    OPERATOR_NAMES = {
+        '+': "PLUS",
+        '-': "MINUS",
+        '*': "MULTIPLY",
+        '/': "DIVIDE",
+        '<': "LT",
+        '>': "GT",
+        '!': "NEQ",
+        '?': None,  # Сравнение на равенство команды ОПС не порождает
+        '&': "AND",
+        '|': "OR",
+        '~': "UNARY_MINUS",
+        '=': "ASSIGN",
+        'w': "$w",
+        'r': "$r",
+        'r_array': "r_array",
+        'i': "$i", 
+        'init': "LIST",
+        'GEN': "$GEN", 
+        'DECL_ARR': "DECL_ARR",
+        'comma': "COMMA",
+        'array_index': "ARRAY_INDEX",
+        'array_assign': "ARRAY_ASSIGN",
+        '$JF': "$JF",
+        '$J': "$J",
+    }
+
+    def __init__(self, sink=None, flush_threshold=4096, rotate_loops=False):
+        """
+        Args:
+            sink: Необязательный приемник готовых команд, вызывается со списком
+                  команд по мере их завершения. Без приемника вся ОПС
+                  накапливается в self.rpn.
+            flush_threshold: Размер self.rpn, при котором готовые команды
+                  передаются в sink.
+            rotate_loops: Порождать циклы while в повернутом виде (см.
+                  add_loop_end): условие проверяется перед первой итерацией
+                  и повторяется в конце тела с переходом $JT на его начало.
+        """
         self.rpn = []  
         self.current_index = 0  
         self.operator_stack = []  # Добавляем стек для операторов
+        self.sink = sink
+        self.flush_threshold = flush_threshold
+        self.base_address = 0  # Адрес команды self.rpn[0] (команды до нее переданы в sink)
+        self.pending_jumps = []  # Адреса заполнителей переходов в порядке создания
+        self.rotate_loops = rotate_loops
+        self.loop_starts = []  # Адреса условий циклов, которые еще разбираются (при rotate_loops)
+        # Открытые циклы: адрес заполнителя $JF -> (адрес начала условия,
+        # команды условия для повернутого цикла или None)
+        self.loops = {}
+        self.constant_pool = ConstantPool()
         
-        # Задаем приоритеты операторов
+        # Приоритеты операторов - те же уровни, что в грамматике выражений:
+        # | < & < ?,! < <,> < +,- < *,/ < ~ (все бинарные левоассоциативны)
         self.operator_precedence = {
-            '+': 1,
-            '-': 1, 
-            '*': 2,
-            '/': 2,
-            '~': 3,  # унарный минус имеет высокий приоритет
-            '<': 0,
-            '>': 0,
+            '+': 2,
+            '-': 2,
+            '*': 3,
+            '/': 3,
+            '~': 4,  # унарный минус имеет высокий приоритет
+            '<': 1,
+            '>': 1,
             '?': 0,  # сравнения на равенство (==)
             '!': 0,  # сравнения на неравенство (!=)
             '&': -1, # логическое И
@@ -29,33 +105,30 @@ class RPNGenerator:
         self.rpn.append(name)
         self.current_index += 1
         
-    def add_constant(self, value_str): # value_str - это строка из лексера, например, "10" или "3.14"
+    def add_constant(self, value):
         """
         Добавляет константу в ОПС.
-        Преобразует строковое значение в числовой тип (int или float).
-        Если преобразование не удается, вызывает ValueError, так как это указывает
-        на проблему с токеном константы, полученным от лексера.
+        Значение уже преобразовано в int или float при создании токена;
+        строка (например, "10" или "3.14") преобразуется тем же способом.
+        Одинаковые константы берутся из пула и разделяют один объект.
         """
-        processed_value = None
+        if isinstance(value, str):
+            value = self.parse_constant(value)
+
+        self.rpn.append(self.constant_pool.intern(value))
+        self.current_index += 1
+
+    @staticmethod
+    def parse_constant(value):
+        """Преобразует строку константы (например, "10" или "3.14") в int или float"""
         try:
-            # Сначала пытаемся преобразовать в int
-            processed_value = int(value_str)
+            return parse_float_literal(value) if '.' in value else parse_int_literal(value)
         except ValueError:
-            # Если не получилось в int (например, для "3.14"), пытаемся в float
-            try:
-                processed_value = float(value_str)
-            except ValueError:
-                # Если оба преобразования не удались, это критическая ошибка.
-                # Лексер должен предоставлять корректные числовые строки для констант.
-                raise ValueError(
-                    f"RPNGenerator: Критическая ошибка. Не удалось преобразовать значение токена '{value_str}' "
-                    f"(ожидалось число) в int или float. "
-                    f"Возможно, лексер создал некорректный токен константы."
-                )
-
-        self.rpn.append(processed_value)
-        self.current_index += 1
-        # print(f"DEBUG: RPNGenerator добавил константу {processed_value} (тип: {type(processed_value)})")
+            raise ValueError(
+                f"RPNGenerator: Критическая ошибка. Не удалось преобразовать значение токена '{value}' "
+                f"(ожидалось число) в int или float. "
+                f"Возможно, лексер создал некорректный токен константы."
+            )
         
     def get_precedence(self, operator):
         """Возвращает приоритет оператора"""
@@ -63,21 +136,17 @@ class RPNGenerator:
         
     def push_to_operator_stack(self, operator):
         """Добавляет оператор в стек операторов с учетом приоритетов"""
-        
-        if operator == "(":
-            # Открывающая скобка всегда добавляется в стек
-            self.operator_stack.append(operator)
-        else:
-            # Для других операторов применяем правила приоритета
-            while (self.operator_stack and operator != "(" and 
-                   self.operator_stack[-1] != "(" and 
-                   self.get_precedence(self.operator_stack[-1]) >= self.get_precedence(operator)):
-                # Извлекаем операторы с большим или равным приоритетом
-                top_operator = self.operator_stack.pop()
-                self.add_operator(top_operator)
-            
-            # Добавляем текущий оператор в стек
-            self.operator_stack.append(operator)
+        stack = self.operator_stack
+        # Открывающая скобка и префиксный унарный минус ничего не выталкивают:
+        # их операнд еще не разобран
+        if operator != "(" and operator != "~":
+            # Извлекаем операторы с большим или равным приоритетом
+            precedence = self.operator_precedence
+            current = precedence.get(operator, 0)
+            while stack and stack[-1] != "(" and precedence.get(stack[-1], 0) >= current:
+                self.pop_operator()
+
+        stack.append(operator)
             
     def pop_operator_stack_until(self, delimiter):
         """
@@ -87,77 +156,153 @@ class RPNGenerator:
         if delimiter == "":
             # Извлекаем все операторы из стека
             while self.operator_stack:
-                operator = self.operator_stack.pop()
-                self.add_operator(operator)
+                self.pop_operator()
         else:
             # Извлекаем операторы до указанного разделителя
             while self.operator_stack and self.operator_stack[-1] != delimiter:
-                operator = self.operator_stack.pop()
-                self.add_operator(operator)
+                self.pop_operator()
                 
             if self.operator_stack and self.operator_stack[-1] == delimiter:
                 self.operator_stack.pop()  # Удаляем разделитель
+
+    def pop_operator(self):
+        """Переносит оператор с вершины стека операторов в ОПС"""
+        self.add_operator(self.operator_stack.pop())
         
     def add_operator(self, operator):
         """Добавляет оператор в ОПС"""
-        operator_map = {
-            '+': "PLUS",
-            '-': "MINUS",
-            '*': "MULTIPLY",
-            '/': "DIVIDE",
-            '<': "LT",
-            '>': "GT",
-            '!': "NEQ",
-            '?': "EQUALS",
-            '&': "AND",
-            '|': "OR",
-            '~': "UNARY_MINUS",
-            '=': "ASSIGN",
-            'w': "$w",
-            'r': "$r",
-            'r_array': "r_array",
-            'i': "$i", 
-            'init': "LIST",
-            'GEN': "$GEN", 
-            'DECL_ARR': "DECL_ARR",
-            'comma': "COMMA",
-            'array_index': "ARRAY_INDEX",
-            'array_assign': "ARRAY_ASSIGN",
-            '$JF': "$JF",
-            '$J': "$J",
-        }
-        
-        if operator in operator_map:
-            self.rpn.append(operator_map[operator])
+        name = self.OPERATOR_NAMES.get(operator)
+        if name is not None:
+            self.rpn.append(name)
             self.current_index += 1
-        else:
+        elif operator != '?':
             raise ValueError(f"Неизвестный оператор: {operator}")
-        
+        if self.sink is not None and len(self.rpn) >= self.flush_threshold:
+            self.flush()
+
+    def begin_list(self):
+        """Начало списка {...}: в ОПС список - это просто его элементы подряд"""
+
+    def end_list(self):
+        """Конец списка {...}"""
+
+    def add_declaration(self, name, data_type, is_array):
+        """Объявление переменной или массива: в ОПС не попадает (см. SymbolTable)"""
+
+    def mark(self):
+        """Состояние генерации, к которому можно вернуться методом rewind"""
+        return self.get_current_index(), self.current_index
+
+    def rewind(self, mark):
+        """
+        Отменяет команды, добавленные после mark. Команды, уже переданные
+        в sink, не вернуть: вызывающий код должен сам обеспечить, что
+        ошибочный текст не скомпилируется.
+        """
+        address, count = mark
+        del self.rpn[max(0, address - self.base_address):]
+        self.current_index = count
+        self.operator_stack.clear()
+
+    def result(self):
+        """Результат генерации: ОПС (без команд, уже переданных в sink)"""
+        return self.rpn
+
+    def flush(self):
+        """
+        Передает в sink все команды, которые уже не изменятся: все, что
+        предшествует самому раннему незаполненному переходу.
+        """
+        if self.sink is None:
+            return
+        if self.pending_jumps:
+            # Оставляем и сам оператор перехода: patch_jump_address проверяет его
+            cut = self.pending_jumps[0] - 1 - self.base_address
+        else:
+            cut = len(self.rpn)
+        if self.loop_starts:
+            # Условие повернутого цикла еще понадобится add_loop_condition_jump
+            cut = min(cut, self.loop_starts[0] - self.base_address)
+        if cut <= 0:
+            return
+        self.sink(self.rpn[:cut])
+        del self.rpn[:cut]
+        self.base_address += cut
+
+    def finish(self):
+        """Завершает генерацию: передает в sink оставшиеся команды"""
+        self.flush()
 
 
     def add_conditional_jump(self): # Убираем аргумент label
-        """Добавляет условный переход $JF с заполнителем и возвращает индекс заполнителя."""
-        self.rpn.append("$JF")
-        self.current_index += 1
-        placeholder_index = self.current_index # Индекс, где будет стоять адрес
-        self.rpn.append("_")  # Заполнитель для адреса
-        self.current_index += 1
-        return placeholder_index
+        """Добавляет условный переход $JF с заполнителем и возвращает адрес заполнителя."""
+        return self._add_jump_placeholder("$JF")
 
     def add_unconditional_jump_placeholder(self):
-        """Добавляет безусловный переход $J с заполнителем и возвращает индекс заполнителя."""
-        self.rpn.append("$J")
+        """Добавляет безусловный переход $J с заполнителем и возвращает адрес заполнителя."""
+        return self._add_jump_placeholder("$J")
+
+    def begin_loop(self):
+        """
+        Начало цикла while: возвращает адрес, с которого начнется его
+        условие. При rotate_loops команды условия не передаются в sink,
+        пока их не скопирует add_loop_condition_jump.
+        """
+        loop_start = self.get_current_index()
+        if self.rotate_loops:
+            self.loop_starts.append(loop_start)
+        return loop_start
+
+    def add_loop_condition_jump(self, loop_start):
+        """
+        Переход $JF из цикла while после его условия, которое начинается
+        с адреса loop_start (см. begin_loop). Возвращает адрес заполнителя
+        для add_loop_end.
+        """
+        placeholder_index = self._add_jump_placeholder("$JF")
+        condition = None
+        if self.rotate_loops:
+            # Условие повторяется в конце тела (циклов в условии нет)
+            self.loop_starts.pop()
+            condition = self.rpn[loop_start - self.base_address:-2]
+        self.loops[placeholder_index] = (loop_start, condition)
+        return placeholder_index
+
+    def add_loop_end(self, jf_address_index):
+        """
+        Конец тела цикла while. Обычно это переход $J на начало условия:
+        каждая итерация выполняет $J и $JF. Повернутый цикл повторяет
+        условие и переходит по $JT на начало тела, а $JF перед первой
+        итерацией выполняется один раз:
+
+            условие $JF выход  тело  условие $JT тело  выход:
+        """
+        loop_start, condition = self.loops.pop(jf_address_index)
+        if condition is None:
+            self.add_jump_to_known_target(loop_start)
+        else:
+            self.rpn.extend(condition)
+            self.rpn.append("$JT")
+            self.rpn.append(jf_address_index + 1)
+            self.current_index += len(condition) + 2
+        self.patch_jump_address(jf_address_index, self.get_current_index())
+
+    def _add_jump_placeholder(self, jump):
+        self.rpn.append(jump)
         self.current_index += 1
-        placeholder_index = self.current_index # Индекс, где будет стоять адрес
-        self.rpn.append("_")  # Заполнитель для адреса
+        placeholder_index = self.get_current_index() # Адрес, где будет стоять адрес перехода
+        self.rpn.append(None)  # Заполнитель для адреса
         self.current_index += 1
+        self.pending_jumps.append(placeholder_index)
         return placeholder_index
 
     def patch_jump_address(self, rpn_placeholder_index, target_address):
-        """Заменяет заполнитель адреса перехода по указанному индексу в ОПС."""
-        if 0 <= rpn_placeholder_index < len(self.rpn) and self.rpn[rpn_placeholder_index-1] in ["$JF", "$J"]:
+        """Заменяет заполнитель адреса перехода по указанному адресу в ОПС."""
+        local_index = rpn_placeholder_index - self.base_address
+        if 0 < local_index < len(self.rpn) and self.rpn[local_index-1] in ["$JF", "$J"]:
             # Убедимся, что target_address является числом
-            self.rpn[rpn_placeholder_index] = int(target_address)
+            self.rpn[local_index] = int(target_address)
+            self.pending_jumps.remove(rpn_placeholder_index)
         else:
             # Можно добавить логирование ошибки, если индекс некорректен
             pass
@@ -181,8 +326,8 @@ class RPNGenerator:
         return False
         
     def get_current_index(self):
-        """Возвращает текущий индекс в ОПС"""
-        return self.current_index
+        """Возвращает адрес следующей команды ОПС (с учетом переданных в sink)"""
+        return self.base_address + len(self.rpn)
         
     def get_rpn(self):
         """Возвращает сгенерированную ОПС"""
@@ -1,3 +1,26 @@
+import operator
+
+from .rpn_analysis import SPECIALIZED_OPERATIONS
+
+
+def _divide(left, right):
+    if right == 0:
+        raise ZeroDivisionError("Division by zero")
+    return left / right
+
+
+# Команды с доказанными типами операндов (см. type_inference): операнды -
+# числа, поэтому операция применяется без проверок _binary_op
+TYPED_FUNCTIONS = {
+    "I_ADD": operator.add, "I_SUB": operator.sub, "I_MUL": operator.mul, "IDIV_TO_FLOAT": _divide,
+    "ICMP_EQ": lambda a, b: int(a == b), "ICMP_NE": lambda a, b: int(a != b),
+    "ICMP_LT": lambda a, b: int(a < b), "ICMP_GT": lambda a, b: int(a > b),
+    "F_ADD": operator.add, "F_SUB": operator.sub, "F_MUL": operator.mul, "F_DIV": _divide,
+    "FCMP_EQ": lambda a, b: int(a == b), "FCMP_NE": lambda a, b: int(a != b),
+    "FCMP_LT": lambda a, b: int(a < b), "FCMP_GT": lambda a, b: int(a > b),
+}
+
+
 class RPNInterpreter:
     def __init__(self):
         self.stack = []
@@ -6,6 +29,7 @@ class RPNInterpreter:
         self.instruction_pointer = 0
         self.input_values = []  # Входные данные из командной строки
         self.input_index = 0    # Индекс текущего входного значения
+        self.executed_count = 0  # Число выполненных команд ОПС (для сравнения оптимизаций)
         
     def set_input_values(self, input_values):
         """Устанавливает входные данные для операций ввода"""
@@ -18,11 +42,13 @@ class RPNInterpreter:
         self.output = []
         self.instruction_pointer = 0
         self.input_index = 0  # Сбрасываем индекс входных данных для нового выполнения
+        self.executed_count = 0
 
         # print(f"Starting RPN interpretation: {rpn_instructions}")
 
         while self.instruction_pointer < len(rpn_instructions):
             instruction = rpn_instructions[self.instruction_pointer]
+            self.executed_count += 1
             # print(f"IP: {self.instruction_pointer}, Instr: {instruction}, Stack: {self.stack}, SymTable: {self.symbol_table}")
 
             if isinstance(instruction, (int, float)):  # Constants
@@ -35,11 +61,26 @@ class RPNInterpreter:
                                             "$JF", "$J", "ARR_INDEX", "OUTPUT_OP", "ASSIGN", "ASSIGN_ARR",
                                             "EQUALS", "MINUS", "PLUS", "MULTIPLY", "DIVIDE", "UNARY_MINUS",
                                             "LT", "GT", "NEQ", "AND", "OR", "DECL_ARR", "$r", "$w", "r_array", "ARRAY_INDEX", "ARRAY_ASSIGN"
-                                        ])
+                                        ] and instruction not in SPECIALIZED_OPERATIONS)
 
                 if is_simple_identifier:
                     self.stack.append(instruction) # Push identifier NAME
                     self.instruction_pointer += 1
+                elif instruction in TYPED_FUNCTIONS:
+                    right = self._pop_number()
+                    left = self._pop_number()
+                    self.stack.append(TYPED_FUNCTIONS[instruction](left, right))
+                    self.instruction_pointer += 1
+                elif instruction == "ARRAY_INDEX_UNCHECKED":
+                    # Индекс доказан (см. bounds_checks): без проверок ARRAY_INDEX
+                    index_value = self._pop_number()
+                    self.stack.append(self.symbol_table[self.stack.pop()][index_value])
+                    self.instruction_pointer += 1
+                elif instruction == "ARRAY_ASSIGN_UNCHECKED":
+                    value_to_assign = self._pop_operand()
+                    index_value = self._pop_number()
+                    self.symbol_table[self.stack.pop()][index_value] = value_to_assign
+                    self.instruction_pointer += 1
                 elif instruction == 'PLUS': # Изменено с '+'
                     self._binary_op(lambda a, b: a + b)
                     self.instruction_pointer += 1
@@ -124,7 +165,8 @@ class RPNInterpreter:
                            potential_lhs.isidentifier() and \
                            not potential_lhs in ["$JF", "$J", "ARR_INDEX", "OUTPUT_OP", "ASSIGN", "ASSIGN_ARR",
                                                "EQUALS", "MINUS", "PLUS", "MULTIPLY", "DIVIDE", "UNARY_MINUS",
-                                               "LT", "GT", "NEQ", "AND", "OR", "DECL_ARR", "$r", "$w", "r_array", "ARRAY_INDEX", "ARRAY_ASSIGN"]:
+                                               "LT", "GT", "NEQ", "AND", "OR", "DECL_ARR", "$r", "$w", "r_array", "ARRAY_INDEX", "ARRAY_ASSIGN"] and \
+                           potential_lhs not in SPECIALIZED_OPERATIONS:
                             is_lhs_candidate = True
                         
                         if is_lhs_candidate:
@@ -201,6 +243,16 @@ class RPNInterpreter:
                     else:
                         self.instruction_pointer += 2
                 
+                elif instruction == "$JT":
+                    target_address_idx = rpn_instructions[self.instruction_pointer + 1]
+                    if not isinstance(target_address_idx, int):
+                        raise TypeError(f"$JT target address must be an int, got {target_address_idx}")
+                    condition_result = self._pop_operand()
+                    if condition_result:
+                        self.instruction_pointer = target_address_idx
+                    else:
+                        self.instruction_pointer += 2
+                
                 elif instruction == "$J":
                     target_address_idx = rpn_instructions[self.instruction_pointer + 1]
                     if not isinstance(target_address_idx, int):
@@ -222,18 +274,7 @@ class RPNInterpreter:
                         raise TypeError(f"INPUT operation expected variable name (string), got {var_name}")
                     
                     # Интерактивный ввод
-                    try:
-                        input_value = int(input(f"Введите значение для переменной '{var_name}': "))
-                    except ValueError:
-                        print("Ошибка: введите целое число.")
-                        input_value = 0
-                    except EOFError:
-                        # Если ввод недоступен (например, в тестах), используем значения по умолчанию
-                        if hasattr(self, 'input_values') and self.input_values and self.input_index < len(self.input_values):
-                            input_value = self.input_values[self.input_index]
-                            self.input_index += 1
-                        else:
-                            input_value = 0
+                    input_value = self._read_input(f"Введите значение для переменной '{var_name}': ")
                     
                     self.symbol_table[var_name] = input_value
                     self.instruction_pointer += 1
@@ -254,18 +295,7 @@ class RPNInterpreter:
                     array_name = self.stack.pop()
                     
                     # Интерактивный ввод для массива
-                    try:
-                        input_value = int(input(f"Введите значение для элемента {array_name}[{index_value}]: "))
-                    except ValueError:
-                        print("Ошибка: введите целое число.")
-                        input_value = 0
-                    except EOFError:
-                        # Если ввод недоступен (например, в тестах), используем значения по умолчанию
-                        if hasattr(self, 'input_values') and self.input_values and self.input_index < len(self.input_values):
-                            input_value = self.input_values[self.input_index]
-                            self.input_index += 1
-                        else:
-                            input_value = 0
+                    input_value = self._read_input(f"Введите значение для элемента {array_name}[{index_value}]: ")
                     
                     # Присваиваем значение элементу массива
                     if array_name not in self.symbol_table:
@@ -339,6 +369,21 @@ class RPNInterpreter:
         # print(f"Final Output: {self.output}")
         return self.output, self.symbol_table
 
+    def _read_input(self, prompt):
+        """Читает целое число с консоли, а если ввод недоступен - из input_values"""
+        try:
+            return int(input(prompt))
+        except ValueError:
+            print("Ошибка: введите целое число.")
+            return 0
+        except EOFError:
+            # Если ввод недоступен (например, в тестах), используем значения по умолчанию
+            if hasattr(self, 'input_values') and self.input_values and self.input_index < len(self.input_values):
+                input_value = self.input_values[self.input_index]
+                self.input_index += 1
+                return input_value
+            return 0
+
     def _pop_operand(self):
         if not self.stack:
             raise IndexError("Stack underflow: trying to pop operand")
@@ -351,7 +396,7 @@ class RPNInterpreter:
                 operations = ["$JF", "$J", "ARR_INDEX", "OUTPUT_OP", "ASSIGN", "ASSIGN_ARR",
                              "EQUALS", "MINUS", "PLUS", "MULTIPLY", "DIVIDE", "UNARY_MINUS",
                              "LT", "GT", "NEQ", "AND", "OR", "DECL_ARR", "$r", "$w", "r_array", "ARRAY_INDEX", "ARRAY_ASSIGN"]
-                if operand in operations:
+                if operand in operations or operand in SPECIALIZED_OPERATIONS:
                     raise ValueError(f"Tried to pop operation '{operand}' as operand")
                 
                 # Для неопределенных переменных возвращаем 0 (автоинициализация)
@@ -359,6 +404,19 @@ class RPNInterpreter:
                 return 0
         return operand
 
+    def _pop_number(self):
+        """
+        Операнд команды с типами: тип доказан, значит на стеке число или
+        имя числовой переменной, и проверки _pop_operand не нужны.
+        """
+        operand = self.stack.pop()
+        if operand.__class__ is str:
+            symbol_table = self.symbol_table
+            if operand not in symbol_table:
+                symbol_table[operand] = 0  # Автоинициализация, как в _pop_operand
+            return symbol_table[operand]
+        return operand
+
     def _binary_op(self, op_func):
         op2 = self._pop_operand()
         op1 = self._pop_operand()
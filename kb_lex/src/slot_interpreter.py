@@ -0,0 +1,206 @@
+from .rpn_interpreter import TYPED_FUNCTIONS, RPNInterpreter
+
+
+# Значение еще не определенного слота
+UNDEFINED = object()
+
+# Бинарные операции SlotProgram - те же, что выполняет RPNInterpreter
+BINARY_OPERATIONS = {
+    "PLUS": lambda a, b: a + b,
+    "MINUS": lambda a, b: a - b,
+    "MULTIPLY": lambda a, b: a * b,
+    "EQUALS": lambda a, b: int(a == b),
+    "NEQ": lambda a, b: int(a != b),
+    "LT": lambda a, b: int(a < b),
+    "GT": lambda a, b: int(a > b),
+    "AND": lambda a, b: int(bool(a) and bool(b)),
+    "OR": lambda a, b: int(bool(a) or bool(b)),
+    **TYPED_FUNCTIONS,
+}
+
+
+class SlotInterpreter(RPNInterpreter):
+    """
+    Выполняет SlotProgram (см. slot_resolution.resolve_slots): значения
+    переменных лежат в списке слотов, а на стеке - только значения, поэтому
+    команды не разбирают имена и не ищут их в таблице символов.
+
+    Вывод, ввод (input_values) и ошибки выполнения - те же, что у
+    RPNInterpreter на исходной ОПС. Таблица символов {имя: значение}
+    собирается из слотов после выполнения в порядке, в котором переменные
+    были определены.
+
+    Выполняет и суперкоманды (см. superinstructions.fuse_superinstructions).
+    """
+
+    def interpret(self, program):
+        code = program.code
+        names = program.names
+        slots = [UNDEFINED] * len(names)
+        defined = []  # Слоты в порядке определения
+        self.stack = stack = []
+        self.output = output = []
+        self.symbol_table = {}
+        self.input_index = 0
+        push = stack.append
+        pop = stack.pop
+        binary_operations = BINARY_OPERATIONS
+        length = len(code)
+        pointer = 0
+        executed = 0
+
+        try:
+            while pointer < length:
+                instruction = code[pointer]
+                executed += 1
+                if instruction == "LOAD":
+                    push(slots[code[pointer + 1]])
+                    pointer += 2
+                elif instruction == "LOAD_ELEM_VAR":
+                    array, index = self._element(slots, names, code[pointer + 1], slots[code[pointer + 2]])
+                    push(array[index])
+                    pointer += 3
+                elif instruction == "LOAD_ELEM_VAR_UNCHECKED":
+                    push(slots[code[pointer + 1]][slots[code[pointer + 2]]])
+                    pointer += 3
+                elif instruction == "PUSH":
+                    push(code[pointer + 1])
+                    pointer += 2
+                elif instruction == "I_ADD":
+                    right = pop()
+                    stack[-1] += right
+                    pointer += 1
+                elif instruction in binary_operations:
+                    right = pop()
+                    stack[-1] = binary_operations[instruction](stack[-1], right)
+                    pointer += 1
+                elif instruction == "LT_JF":
+                    right = pop()
+                    pointer = pointer + 2 if pop() < right else code[pointer + 1]
+                elif instruction == "INC_VAR":
+                    slot = code[pointer + 1]
+                    slots[slot] = slots[slot] + code[pointer + 2]
+                    pointer += 3
+                elif instruction == "$JF":
+                    pointer = pointer + 2 if pop() else code[pointer + 1]
+                elif instruction == "STORE":
+                    slot = code[pointer + 1]
+                    if slots[slot] is UNDEFINED:
+                        defined.append(slot)
+                    slots[slot] = pop()
+                    pointer += 2
+                elif instruction == "STORE_ELEM_UNCHECKED":
+                    value = pop()
+                    slots[code[pointer + 1]][pop()] = value
+                    pointer += 2
+                elif instruction == "LOAD_ELEM_UNCHECKED":
+                    stack[-1] = slots[code[pointer + 1]][stack[-1]]
+                    pointer += 2
+                elif instruction == "LOAD_ELEM":
+                    array, index = self._element(slots, names, code[pointer + 1], pop())
+                    push(array[index])
+                    pointer += 2
+                elif instruction == "STORE_ELEM":
+                    value = pop()
+                    index = pop()
+                    array, index = self._element(slots, names, code[pointer + 1], index)
+                    array[index] = value
+                    pointer += 2
+                elif instruction == "$J":
+                    pointer = code[pointer + 1]
+                elif instruction == "LT_JT":
+                    right = pop()
+                    pointer = code[pointer + 1] if pop() < right else pointer + 2
+                elif instruction == "$JT":
+                    pointer = code[pointer + 1] if pop() else pointer + 2
+                elif instruction == "GT_JF":
+                    right = pop()
+                    pointer = pointer + 2 if pop() > right else code[pointer + 1]
+                elif instruction == "NEQ_JF":
+                    right = pop()
+                    pointer = pointer + 2 if pop() != right else code[pointer + 1]
+                elif instruction == "GT_JT":
+                    right = pop()
+                    pointer = code[pointer + 1] if pop() > right else pointer + 2
+                elif instruction == "NEQ_JT":
+                    right = pop()
+                    pointer = code[pointer + 1] if pop() != right else pointer + 2
+                elif instruction == "LOAD_INIT":
+                    slot = code[pointer + 1]
+                    if slots[slot] is UNDEFINED:
+                        slots[slot] = 0
+                        defined.append(slot)
+                    push(slots[slot])
+                    pointer += 2
+                elif instruction == "DIVIDE":
+                    right = pop()
+                    left = pop()
+                    if right == 0:
+                        raise ZeroDivisionError("Division by zero")
+                    push(left / right)
+                    pointer += 1
+                elif instruction == "UNARY_MINUS":
+                    push(-pop())
+                    pointer += 1
+                elif instruction == "OUTPUT":
+                    output.append(pop())
+                    pointer += 1
+                elif instruction == "STORE_LIST":
+                    slot = code[pointer + 1]
+                    count = code[pointer + 2]
+                    values = stack[len(stack) - count:]
+                    del stack[len(stack) - count:]
+                    if slots[slot] is UNDEFINED:
+                        defined.append(slot)
+                    slots[slot] = values
+                    pointer += 3
+                elif instruction == "LOAD_DEFINED":
+                    slot = code[pointer + 1]
+                    if slots[slot] is UNDEFINED:
+                        raise NameError(f"Undefined variable: {names[slot]}")
+                    push(slots[slot])
+                    pointer += 2
+                elif instruction == "DECL_ARR":
+                    slot = code[pointer + 1]
+                    size = int(pop())
+                    if size <= 0:
+                        raise ValueError(f"Array size must be positive, got {size}")
+                    if slots[slot] is UNDEFINED:
+                        defined.append(slot)
+                    slots[slot] = [0] * size
+                    pointer += 2
+                elif instruction == "INPUT":
+                    slot = code[pointer + 1]
+                    value = self._read_input(f"Введите значение для переменной '{names[slot]}': ")
+                    if slots[slot] is UNDEFINED:
+                        defined.append(slot)
+                    slots[slot] = value
+                    pointer += 2
+                elif instruction == "INPUT_ELEM":
+                    slot = code[pointer + 1]
+                    index = pop()
+                    value = self._read_input(f"Введите значение для элемента {names[slot]}[{index}]: ")
+                    array, index = self._element(slots, names, slot, index)
+                    array[index] = value
+                    pointer += 2
+                else:
+                    raise ValueError(f"Unknown slot program instruction: {instruction}")
+        finally:
+            self.instruction_pointer = pointer
+            self.executed_count = executed
+
+        self.symbol_table = {names[slot]: slots[slot] for slot in defined}
+        return output, self.symbol_table
+
+    @staticmethod
+    def _element(slots, names, slot, index):
+        """Массив слота и целый индекс элемента с проверками RPNInterpreter"""
+        array = slots[slot]
+        if array is UNDEFINED:
+            raise NameError(f"Array '{names[slot]}' not defined")
+        if not isinstance(array, list):
+            raise TypeError(f"'{names[slot]}' is not an array")
+        index = int(index)
+        if index < 0 or index >= len(array):
+            raise IndexError(f"Array index {index} out of bounds for array '{names[slot]}'")
+        return array, index
@@ -0,0 +1,375 @@
+from .rpn_analysis import JUMP_OPERATIONS, TYPED_OPERATIONS, JumpTargets, is_variable, remap_jumps
+
+
+# Команды ОПС, которые берут два значения со стека и кладут результат
+BINARY_OPERATIONS = frozenset(("PLUS", "MINUS", "MULTIPLY", "DIVIDE", "EQUALS", "NEQ", "LT", "GT", "AND", "OR",
+                               *TYPED_OPERATIONS))
+
+# Команды ОПС, заменяющие значение переменной целиком
+_STORE_OPERATIONS = frozenset(("ASSIGN", "$r", "DECL_ARR"))
+
+# Запись в стеке при моделировании: значение (не имя)
+_VALUE = -1
+
+
+# Число операндов каждой команды SlotProgram (у остальных команд их нет)
+OPERAND_COUNTS = {
+    "PUSH": 1, "LOAD": 1, "LOAD_INIT": 1, "LOAD_DEFINED": 1, "STORE": 1, "STORE_LIST": 2, "DECL_ARR": 1,
+    "LOAD_ELEM": 1, "STORE_ELEM": 1, "LOAD_ELEM_UNCHECKED": 1, "STORE_ELEM_UNCHECKED": 1, "INPUT": 1, "INPUT_ELEM": 1, "$J": 1, "$JF": 1,
+    "$JT": 1,
+}
+
+
+class SlotProgram:
+    """
+    Программа, в которой переменные заменены номерами слотов.
+
+    code - плоский список: имя команды, за ним ее операнды (номер слота,
+    константа, число значений или адрес перехода). Команды:
+        PUSH c            - положить константу c
+        LOAD s            - положить значение слота s (он заведомо определен)
+        LOAD_INIT s       - то же, неопределенный слот сначала получает 0
+        LOAD_DEFINED s    - то же, для неопределенного слота NameError
+        STORE s           - снять значение в слот s
+        STORE_LIST s k    - снять k значений и записать их списком в слот s
+        DECL_ARR s        - снять размер и создать в слоте s массив из нулей
+        LOAD_ELEM s       - снять индекс, положить элемент массива слота s
+        STORE_ELEM s      - снять значение и индекс, записать элемент массива
+        LOAD_ELEM_UNCHECKED s, STORE_ELEM_UNCHECKED s
+                          - то же без проверок (индекс доказан, см. bounds_checks)
+        INPUT s           - прочитать значение слота s
+        INPUT_ELEM s      - снять индекс и прочитать элемент массива слота s
+        OUTPUT            - снять значение в вывод
+        PLUS ... OR, UNARY_MINUS, $J a, $JF a, $JT a - как в ОПС, в том числе
+                            команды с типами (I_ADD, ICMP_LT, ...)
+    names[s] - имя переменной слота s.
+    """
+
+    __slots__ = ('code', 'names')
+
+    def __init__(self, code, names):
+        self.code = code
+        self.names = names
+
+    def __repr__(self):
+        return f"SlotProgram(code={self.code!r}, names={self.names!r})"
+
+
+class _Unresolvable(Exception):
+    """Программу нельзя перевести в слоты без изменения поведения"""
+
+
+def resolve_slots(rpn):
+    """
+    Переводит ОПС в SlotProgram: каждая переменная и массив получают номер
+    слота, а имя на стеке вместе с командой, которая его снимает,
+    заменяется командой над слотом (n i 1 PLUS ASSIGN -> LOAD i PUSH 1 PLUS
+    STORE n).
+
+    RPNInterpreter кладет на стек имена и разыменовывает их только при
+    снятии, а ASSIGN собирает значения до ближайшего имени. Поэтому стек
+    моделируется при компиляции, и перевод выполняется, только если он
+    точно сохраняет поведение: в каждую точку программы стек приходит в
+    одном и том же виде, между чтением имени и его использованием
+    переменная не меняется, а неопределенные переменные (они получают 0
+    при чтении) заводятся в том же порядке. Иначе, как и при ошибке
+    выполнения, которую видно уже по ОПС, возвращается None: такую
+    программу выполняет RPNInterpreter.
+
+    Returns:
+        SlotProgram или None
+    """
+    try:
+        return _SlotResolver(rpn).resolve()
+    except _Unresolvable:
+        return None
+
+
+class _SlotResolver:
+    def __init__(self, rpn):
+        self.rpn = rpn
+        self.slots = {}      # Имя -> номер слота
+        self.names = []
+        self.uses = {}       # Позиция имени в ОПС -> "load", "strict" или "ref"
+        self.loads = []      # (позиция имени, позиция команды, снявшей его значение)
+        self.operands = {}   # Позиция команды -> ее команда в SlotProgram
+        self.reachable = bytearray(len(rpn) + 1)
+        self.leaders = self.find_leaders()  # Начала линейных участков
+        self.targets = JumpTargets(rpn)
+
+    def resolve(self):
+        self.simulate()
+        self.check_loads()
+        maybe_undefined = self.check_definitions()
+        return SlotProgram(self.emit(maybe_undefined), self.names)
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+    def use(self, position, kind):
+        if self.uses.setdefault(position, kind) != kind:
+            raise _Unresolvable  # Одно и то же имя снимается по-разному на разных путях
+
+    def pop_value(self, stack, index):
+        if not stack:
+            raise _Unresolvable
+        entry = stack.pop()
+        if entry != _VALUE:
+            self.use(entry, "load")
+            self.loads.append((entry, index))
+
+    def pop_name(self, stack):
+        if not stack or stack[-1] == _VALUE:
+            raise _Unresolvable
+        entry = stack.pop()
+        self.use(entry, "ref")
+        return self.slot(self.rpn[entry])
+
+    def find_leaders(self):
+        rpn = self.rpn
+        length = len(rpn)
+        leaders = {0}
+        index = 0
+        while index < length:
+            instruction = rpn[index]
+            if instruction.__class__ is str and instruction in JUMP_OPERATIONS:
+                target = rpn[index + 1] if index + 1 < length else None
+                if target.__class__ is not int or not 0 <= target <= length:
+                    raise _Unresolvable
+                leaders.add(target)
+                leaders.add(index + 2)
+                index += 2
+            else:
+                index += 1
+        return leaders
+
+    def simulate(self):
+        """
+        Моделирует стек ОПС: запись стека - позиция имени в ОПС или _VALUE.
+        Каждая команда моделируется один раз: стек в начале участка, куда
+        ведут переходы, запоминается и должен совпасть на всех путях.
+        """
+        rpn = self.rpn
+        length = len(rpn)
+        entry_stacks = {}
+        pending = [(0, ())]
+        while pending:
+            index, stack = pending.pop()
+            stack = list(stack)
+            while index < length:
+                if index in self.leaders:
+                    known = entry_stacks.get(index)
+                    if known is not None:
+                        if known != tuple(stack):
+                            raise _Unresolvable
+                        break
+                    entry_stacks[index] = tuple(stack)
+                self.reachable[index] = 1
+                instruction = rpn[index]
+                if isinstance(instruction, (int, float)):
+                    stack.append(_VALUE)
+                elif not isinstance(instruction, str):
+                    raise _Unresolvable
+                elif is_variable(instruction):
+                    stack.append(index)
+                elif instruction in JUMP_OPERATIONS:
+                    target = rpn[index + 1]
+                    if instruction != "$J":
+                        self.pop_value(stack, index)
+                        pending.append((target, tuple(stack)))
+                        index += 2
+                        continue
+                    pending.append((target, tuple(stack)))
+                    break
+                else:
+                    self.simulate_operation(instruction, index, stack)
+                index += 1
+            if index == length:
+                self.reachable[length] = 1
+
+    def simulate_operation(self, instruction, index, stack):
+        if instruction in BINARY_OPERATIONS:
+            self.pop_value(stack, index)
+            self.pop_value(stack, index)
+            stack.append(_VALUE)
+        elif instruction == "UNARY_MINUS":
+            self.pop_value(stack, index)
+            stack.append(_VALUE)
+        elif instruction == "$w":
+            self.pop_value(stack, index)
+            self.operands[index] = ("OUTPUT",)
+        elif instruction == "ASSIGN":
+            # Значения снимаются до ближайшего имени: оно и есть левая часть
+            count = 0
+            while stack and stack[-1] == _VALUE:
+                stack.pop()
+                count += 1
+            slot = self.pop_name(stack)
+            self.operands[index] = ("STORE", slot) if count == 1 else ("STORE_LIST", slot, count)
+        elif instruction == "DECL_ARR":
+            slot = self.pop_name(stack)
+            if not stack:
+                raise _Unresolvable
+            entry = stack.pop()
+            if entry != _VALUE:
+                # Размер-имя без автоинициализации: NameError, если не определено
+                if index - entry != 2:
+                    raise _Unresolvable
+                self.use(entry, "strict")
+            self.operands[index] = ("DECL_ARR", slot)
+        elif instruction == "ARRAY_INDEX" or instruction == "ARRAY_INDEX_UNCHECKED":
+            self.pop_value(stack, index)
+            self.operands[index] = ("LOAD_ELEM" if instruction == "ARRAY_INDEX" else "LOAD_ELEM_UNCHECKED",
+                                    self.pop_name(stack))
+            stack.append(_VALUE)
+        elif instruction == "ARRAY_ASSIGN" or instruction == "ARRAY_ASSIGN_UNCHECKED":
+            self.pop_value(stack, index)
+            self.pop_value(stack, index)
+            self.operands[index] = ("STORE_ELEM" if instruction == "ARRAY_ASSIGN" else "STORE_ELEM_UNCHECKED",
+                                    self.pop_name(stack))
+        elif instruction == "$r":
+            self.operands[index] = ("INPUT", self.pop_name(stack))
+        elif instruction == "r_array":
+            self.pop_value(stack, index)
+            self.operands[index] = ("INPUT_ELEM", self.pop_name(stack))
+        else:
+            raise _Unresolvable
+
+    def check_loads(self):
+        """
+        Значение переменной берется в момент, когда имя кладется на стек:
+        между этим местом и снятием имени не должно быть перехода внутрь и
+        записи переменных.
+        """
+        rpn = self.rpn
+        stores = [0]
+        for instruction in rpn:
+            stores.append(stores[-1] + (instruction.__class__ is str and instruction in _STORE_OPERATIONS))
+        for position, consumer in self.loads:
+            if self.targets.any_between(position, consumer) or stores[consumer] != stores[position + 1]:
+                raise _Unresolvable
+
+    def check_definitions(self):
+        """
+        Находит чтения переменных, которые при выполнении могут оказаться
+        неопределенными (LOAD_INIT), и проверяет, что их перенос на место
+        имени не меняет порядок, в котором переменные заводятся.
+
+        Returns:
+            set: Позиции имен, требующих LOAD_INIT
+        """
+        rpn = self.rpn
+        length = len(rpn)
+        definitions = {}  # Позиция команды -> слоты, которые она определяет
+        for index, operands in self.operands.items():
+            if operands[0] in ("STORE", "STORE_LIST", "DECL_ARR", "INPUT"):
+                definitions.setdefault(index, []).append(operands[1])
+        for position, consumer in self.loads:
+            definitions.setdefault(consumer, []).append(self.slot(rpn[position]))
+
+        # Линейные участки: [начало, конец) и следующие за ними участки
+        leaders = sorted(leader for leader in self.leaders if leader < length and self.reachable[leader])
+        blocks = {}
+        for number, start in enumerate(leaders):
+            end = leaders[number + 1] if number + 1 < len(leaders) else length
+            generated = set()
+            successors = []
+            index = start
+            falls_through = True
+            while index < end:
+                generated.update(definitions.get(index, ()))
+                instruction = rpn[index]
+                if instruction.__class__ is str and instruction in JUMP_OPERATIONS:
+                    successors.append(rpn[index + 1])
+                    if instruction == "$J":
+                        falls_through = False
+                    index += 2
+                else:
+                    index += 1
+            if falls_through and end < length:
+                successors.append(end)
+            blocks[start] = (end, generated, successors)
+
+        # Переменные, определенные на всех путях к началу участка
+        defined = {0: frozenset()}
+        changed = True
+        while changed:
+            changed = False
+            for start in leaders:
+                entry = defined.get(start)
+                if entry is None:
+                    continue
+                _, generated, successors = blocks[start]
+                leaving = entry | generated
+                for successor in successors:
+                    if successor >= length:
+                        continue
+                    known = defined.get(successor)
+                    updated = leaving if known is None else known & leaving
+                    if updated != known:
+                        defined[successor] = updated
+                        changed = True
+
+        maybe_undefined = set()
+        for start in leaders:
+            current = set(defined[start])
+            end = blocks[start][0]
+            for index in range(start, end):
+                if self.uses.get(index) == "load" and self.slot(rpn[index]) not in current:
+                    maybe_undefined.add(index)
+                current.update(definitions.get(index, ()))
+
+        # Неопределенная переменная заводится при снятии имени, а в
+        # SlotProgram - при чтении: порядок сохраняется, если одновременно
+        # на стеке нет имен двух разных возможно неопределенных переменных
+        intervals = sorted((position, consumer, self.slot(rpn[position]))
+                           for position, consumer in self.loads if position in maybe_undefined)
+        group_end = -1
+        group_slot = None
+        for position, consumer, slot in intervals:
+            if position < group_end:
+                if slot != group_slot:
+                    raise _Unresolvable
+                group_end = max(group_end, consumer)
+            else:
+                group_end, group_slot = consumer, slot
+        return maybe_undefined
+
+    def emit(self, maybe_undefined):
+        rpn = self.rpn
+        length = len(rpn)
+        code = []
+        new_addresses = [0] * (length + 1)
+        index = 0
+        while index < length:
+            new_addresses[index] = len(code)
+            instruction = rpn[index]
+            is_jump = instruction.__class__ is str and instruction in JUMP_OPERATIONS
+            if not self.reachable[index]:
+                pass  # Недостижимые команды не переносятся
+            elif is_jump:
+                code.append(instruction)
+                code.append(rpn[index + 1])
+            elif isinstance(instruction, (int, float)):
+                code.append("PUSH")
+                code.append(instruction)
+            elif index in self.operands:
+                code.extend(self.operands[index])
+            elif is_variable(instruction):
+                kind = self.uses.get(index)
+                if kind == "load":
+                    code.append("LOAD_INIT" if index in maybe_undefined else "LOAD")
+                    code.append(self.slot(instruction))
+                elif kind == "strict":
+                    code.append("LOAD_DEFINED")
+                    code.append(self.slot(instruction))
+                # Имя, которое снимает команда над слотом, отдельной команды не дает
+            else:
+                code.append(instruction)
+            index += 2 if is_jump else 1
+        new_addresses[length] = len(code)
+        return remap_jumps(code, new_addresses)
@@ -0,0 +1,206 @@
+import contextlib
+import io
+import sys
+from collections import Counter
+
+from .slot_interpreter import SlotInterpreter
+from .slot_resolution import OPERAND_COUNTS, SlotProgram
+
+
+# Суперкоманды SlotProgram: одна команда вместо частой последовательности
+#   INC_VAR s c          - LOAD s PUSH c PLUS STORE s (i = i + 1)
+#   LT_JF a, GT_JF a,
+#   NEQ_JF a             - сравнение и $JF a
+#   LT_JT a, GT_JT a,
+#   NEQ_JT a             - сравнение и $JT a (проверка в конце цикла)
+#   LOAD_ELEM_VAR s i    - LOAD i LOAD_ELEM s (arr[j])
+#   LOAD_ELEM_VAR_UNCHECKED s i - LOAD i LOAD_ELEM_UNCHECKED s
+FUSED_OPERAND_COUNTS = {"INC_VAR": 2, "LT_JF": 1, "GT_JF": 1, "NEQ_JF": 1, "LOAD_ELEM_VAR": 2,
+                        "LOAD_ELEM_VAR_UNCHECKED": 2, "LT_JT": 1, "GT_JT": 1, "NEQ_JT": 1}
+
+# Команды перехода SlotProgram: первый операнд - адрес
+BRANCH_OPERATIONS = frozenset(("$J", "$JF", "$JT", "LT_JF", "GT_JF", "NEQ_JF", "LT_JT", "GT_JT", "NEQ_JT"))
+
+
+def _increment(operands):
+    (slot,), (constant,), (), (target,) = operands
+    # Слот, прочитанный LOAD, определен: запись не меняет порядок определения
+    if slot != target:
+        return None
+    return ["INC_VAR", slot, constant]
+
+
+def _compare_and_jump(name):
+    def fuse(operands):
+        return [name, operands[1][0]]
+    return fuse
+
+
+def _load_element(name):
+    def fuse(operands):
+        (index,), (array,) = operands
+        return [name, array, index]
+    return fuse
+
+
+# Правила слияния: последовательность команд и функция, которая по их
+# операндам строит суперкоманду (или возвращает None, если не подходит).
+# Правила проверяются по порядку; набор выбран по счетчикам ngram_profile
+SUPERINSTRUCTIONS = (
+    (("LOAD", "PUSH", "PLUS", "STORE"), _increment),
+    (("LT", "$JF"), _compare_and_jump("LT_JF")),
+    (("GT", "$JF"), _compare_and_jump("GT_JF")),
+    (("NEQ", "$JF"), _compare_and_jump("NEQ_JF")),
+    # То же для команд с типами (см. type_inference): значения те же
+    (("LOAD", "PUSH", "I_ADD", "STORE"), _increment),
+    (("LOAD", "PUSH", "F_ADD", "STORE"), _increment),
+    (("ICMP_LT", "$JF"), _compare_and_jump("LT_JF")),
+    (("FCMP_LT", "$JF"), _compare_and_jump("LT_JF")),
+    (("ICMP_GT", "$JF"), _compare_and_jump("GT_JF")),
+    (("FCMP_GT", "$JF"), _compare_and_jump("GT_JF")),
+    (("ICMP_NE", "$JF"), _compare_and_jump("NEQ_JF")),
+    (("FCMP_NE", "$JF"), _compare_and_jump("NEQ_JF")),
+    (("LOAD", "LOAD_ELEM"), _load_element("LOAD_ELEM_VAR")),
+    (("LOAD", "LOAD_ELEM_UNCHECKED"), _load_element("LOAD_ELEM_VAR_UNCHECKED")),
+    # Условие в конце повернутого цикла (см. rpn_generator.rotate_loops)
+    (("LT", "$JT"), _compare_and_jump("LT_JT")),
+    (("GT", "$JT"), _compare_and_jump("GT_JT")),
+    (("NEQ", "$JT"), _compare_and_jump("NEQ_JT")),
+    (("ICMP_LT", "$JT"), _compare_and_jump("LT_JT")),
+    (("FCMP_LT", "$JT"), _compare_and_jump("LT_JT")),
+    (("ICMP_GT", "$JT"), _compare_and_jump("GT_JT")),
+    (("FCMP_GT", "$JT"), _compare_and_jump("GT_JT")),
+    (("ICMP_NE", "$JT"), _compare_and_jump("NEQ_JT")),
+    (("FCMP_NE", "$JT"), _compare_and_jump("NEQ_JT")),
+)
+
+
+def operand_count(opcode):
+    """Число операндов команды SlotProgram, в том числе суперкоманды"""
+    return OPERAND_COUNTS.get(opcode) or FUSED_OPERAND_COUNTS.get(opcode, 0)
+
+
+def instruction_starts(code):
+    """Позиции начала команд в SlotProgram.code"""
+    starts = []
+    position = 0
+    while position < len(code):
+        starts.append(position)
+        position += 1 + operand_count(code[position])
+    return starts
+
+
+def _block_boundaries(code, starts):
+    """
+    Для каждой команды (по номеру в starts): начинается ли с нее новый
+    линейный участок - на нее есть переход или перед ней стоит переход.
+    """
+    targets = {code[position + 1] for position in starts if code[position] in BRANCH_OPERATIONS}
+    boundaries = [position in targets for position in starts]
+    for number, position in enumerate(starts[:-1]):
+        if code[position] in BRANCH_OPERATIONS:
+            boundaries[number + 1] = True
+    return boundaries
+
+
+def fuse_superinstructions(program, rules=SUPERINSTRUCTIONS):
+    """
+    Заменяет в SlotProgram последовательности команд из rules
+    суперкомандами. Последовательность сливается, только если внутрь нее
+    нет переходов; адреса переходов пересчитываются.
+
+    Returns:
+        SlotProgram: Новая программа (исходная не изменяется)
+    """
+    code = program.code
+    starts = instruction_starts(code)
+    boundaries = _block_boundaries(code, starts)
+    opcodes = [code[position] for position in starts]
+    fused = []
+    new_addresses = {}
+    addresses = []  # Позиции адресов переходов в fused
+
+    number = 0
+    while number < len(starts):
+        position = starts[number]
+        new_addresses[position] = len(fused)
+        for pattern, build in rules:
+            end = number + len(pattern)
+            if (tuple(opcodes[number:end]) != pattern or
+                    any(boundaries[inner] for inner in range(number + 1, end))):
+                continue
+            operands = [tuple(code[start + 1:start + 1 + operand_count(code[start])]) for start in starts[number:end]]
+            instruction = build(operands)
+            if instruction is not None:
+                break
+        else:
+            end = number + 1
+            instruction = code[position:position + 1 + operand_count(code[position])]
+        if instruction[0] in BRANCH_OPERATIONS:
+            addresses.append(len(fused) + 1)
+        fused.extend(instruction)
+        number = end
+
+    new_addresses[len(code)] = len(fused)
+    for address in addresses:
+        fused[address] = new_addresses[fused[address]]
+    return SlotProgram(fused, program.names)
+
+
+class _CountingCode(list):
+    """Код, считающий чтения каждой позиции: команда читается при каждом выполнении"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.reads = [0] * len(code)
+
+    def __getitem__(self, position):
+        self.reads[position] += 1
+        return list.__getitem__(self, position)
+
+
+def execution_counts(program, input_values=()):
+    """
+    Выполняет SlotProgram (ввод - из input_values, вывод подавляется) и
+    возвращает число выполнений команды в каждой позиции кода.
+    Интерпретатор не меняется: счет ведет список кода, поэтому обычное
+    выполнение ничего за него не платит.
+    """
+    counting = _CountingCode(program.code)
+    interpreter = SlotInterpreter()
+    interpreter.set_input_values(list(input_values))
+    stdin = sys.stdin
+    sys.stdin = io.StringIO("")  # input() сразу получает EOF
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.interpret(SlotProgram(counting, program.names))
+    except Exception:
+        pass  # Счетчики до ошибки выполнения тоже показательны
+    finally:
+        sys.stdin = stdin
+    return counting.reads
+
+
+def ngram_profile(program, counts, lengths=(2, 3, 4)):
+    """
+    Динамические частоты последовательностей команд: для каждой
+    последовательности длины из lengths внутри линейного участка -
+    сколько раз она выполнилась (по counts из execution_counts).
+
+    Returns:
+        Counter: {(команда, ...): число выполнений}
+    """
+    code = program.code
+    starts = instruction_starts(code)
+    boundaries = _block_boundaries(code, starts)
+    profile = Counter()
+    for number, position in enumerate(starts):
+        count = counts[position]
+        if not count:
+            continue
+        for length in lengths:
+            end = number + length
+            if end > len(starts) or any(boundaries[inner] for inner in range(number + 1, end)):
+                continue
+            profile[tuple(code[start] for start in starts[number:end])] += count
+    return profile
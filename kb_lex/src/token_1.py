@@ -1,5 +1,7 @@
 from .token_type import TokenType
 class Token:
+    __slots__ = ('token_type', 'value', 'line', 'position')
+
     def __init__(self, token_type, value, line, position):
         self.token_type = token_type
         if token_type == TokenType.INTEGER_CONST:
@@ -11,55 +13,64 @@ class Token:
         self.line = line
         self.position = position
 
+    @classmethod
+    def from_parts(cls, token_type, value, line, position):
+        """
+        Создает лексему из уже преобразованного значения без разбора строки.
+        Используется для ленивых представлений лексем из TokenStream.
+        """
+        token = cls.__new__(cls)
+        token.token_type = token_type
+        token.value = value
+        token.line = line
+        token.position = position
+        return token
+
     def __str__(self):
         if self.value:
             return f"{self.token_type}: {self.value}"
         return f"{self.token_type}"
         
     def str_to_int(self, string):
-        if not string:
-            return 0
-            
-        result = 0
-        
-        for char in string:
-            if not ('0' <= char <= '9'):
-                raise ValueError(f"Недопустимый символ '{char}' в целом числе")
-            
-            digit = ord(char) - ord('0')  
-            result = result * 10 + digit
-            
-        return result
+        return parse_int_literal(string)
     
     def str_to_float(self, string):
+        return parse_float_literal(string)
 
-        if not string:
-            return 0.0
-            
-        if '.' in string:
-            whole_part, frac_part = string.split('.')
-        else:
-            whole_part, frac_part = string, "0"
-            
 
-        whole_value = self.str_to_int(whole_part)
-        
+def parse_int_literal(string):
+    """
+    Преобразует целую константу из цифр 0-9 в int.
+    Проверка ASCII нужна потому, что int() принимает и другие цифры Юникода.
+    """
+    if not string:
+        return 0
+    if string.isascii() and string.isdigit():
+        try:
+            return int(string)
+        except ValueError:
+            pass  # Длиннее sys.get_int_max_str_digits(): собираем число по частям
+        result = 0
+        for start in range(0, len(string), 1000):
+            part = string[start:start + 1000]
+            result = result * 10 ** len(part) + int(part)
+        return result
+    char = next(char for char in string if not ('0' <= char <= '9'))
+    raise ValueError(f"Недопустимый символ '{char}' в целом числе")
 
-        frac_value = 0
-        for char in frac_part:
-            if not ('0' <= char <= '9'):
-                raise ValueError(f"Недопустимый символ '{char}' в дробной части числа")
-                
-            digit = ord(char) - ord('0')
-            frac_value = frac_value * 10 + digit
-            
-        frac_digits = len(frac_part)
-        frac_multiplier = 0.1
-        for _ in range(1, frac_digits):
-            frac_multiplier *= 0.1
-            
-        frac_value = frac_value * frac_multiplier
-        
-        result = whole_value + frac_value
-        
-        return result
\ No newline at end of file
+
+def parse_float_literal(string):
+    """
+    Преобразует вещественную константу вида 123.456 в float с корректным
+    округлением (как float()), без накопления погрешности по разрядам.
+    """
+    if not string:
+        return 0.0
+    whole_part, _, frac_part = string.partition('.')
+    if whole_part.isascii() and whole_part.isdigit() and (not frac_part or (frac_part.isascii() and frac_part.isdigit())):
+        return float(string)
+    parse_int_literal(whole_part)
+    for char in frac_part:
+        if not ('0' <= char <= '9'):
+            raise ValueError(f"Недопустимый символ '{char}' в дробной части числа")
+    return float(string)
@@ -0,0 +1,114 @@
+from array import array
+
+from .token_1 import Token
+from .token_type import TokenType
+
+
+# TokenType по числовому коду: индексирование списка быстрее вызова TokenType(code)
+_TYPES_BY_CODE = [None] * 256
+for _token_type in TokenType:
+    _TYPES_BY_CODE[_token_type.value] = _token_type
+
+# Общие для всех потоков значения ключевых слов и операторов (приспособленцы)
+_FLYWEIGHT_VALUES = ("", "int", "float", "if", "else", "while", "output", "input",
+                     "+", "-", "*", "/", "=", "<", ">", "!", "?", "&", "|", "~",
+                     "(", ")", "[", "]", "{", "}", ";", ",")
+
+
+class TokenStream:
+    """
+    Компактное хранилище лексем в виде структуры массивов.
+
+    Типы лексем хранятся в array('B'), строки и позиции - в array('i'),
+    значения - в таблице интернированных значений, на которую ссылается
+    array('I'). Объекты Token создаются лениво при обращении по индексу
+    или при итерации и нужны только для печати и отладки.
+    """
+
+    __slots__ = ('types', 'lines', 'positions', 'value_ids', 'values', '_value_ids_by_key')
+
+    def __init__(self):
+        self.types = array('B')
+        self.lines = array('i')
+        self.positions = array('i')
+        self.value_ids = array('I')
+        self.values = list(_FLYWEIGHT_VALUES)
+        # Ключ включает тип значения, чтобы 1 и 1.0 не склеивались
+        self._value_ids_by_key = {(str, value): index for index, value in enumerate(self.values)}
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """Строит поток из последовательности объектов Token"""
+        stream = cls()
+        for token in tokens:
+            stream.append_value(token.token_type, token.value, token.line, token.position)
+        return stream
+
+    def append(self, token_type, value, line, position):
+        """
+        Добавляет лексему по строковому значению из лексера.
+        Константы преобразуются так же, как в Token.
+        """
+        if token_type == TokenType.INTEGER_CONST or token_type == TokenType.FLOAT_CONST:
+            value = Token(token_type, value, line, position).value
+        self.append_value(token_type, value, line, position)
+
+    def append_value(self, token_type, value, line, position):
+        """Добавляет лексему с уже преобразованным значением"""
+        key = (value.__class__, value)
+        value_id = self._value_ids_by_key.get(key)
+        if value_id is None:
+            value_id = len(self.values)
+            self.values.append(value)
+            self._value_ids_by_key[key] = value_id
+        self.types.append(token_type)
+        self.lines.append(line)
+        self.positions.append(position)
+        self.value_ids.append(value_id)
+
+    def extend(self, other):
+        """Добавляет в конец все лексемы другого потока (значения переинтернируются)"""
+        remap = []
+        for value in other.values:
+            key = (value.__class__, value)
+            value_id = self._value_ids_by_key.get(key)
+            if value_id is None:
+                value_id = len(self.values)
+                self.values.append(value)
+                self._value_ids_by_key[key] = value_id
+            remap.append(value_id)
+        self.types.extend(other.types)
+        self.lines.extend(other.lines)
+        self.positions.extend(other.positions)
+        self.value_ids.extend(array('I', [remap[value_id] for value_id in other.value_ids]))
+
+    def __len__(self):
+        return len(self.types)
+
+    def token_type(self, index):
+        """Тип лексемы по индексу без создания объекта Token"""
+        return _TYPES_BY_CODE[self.types[index]]
+
+    def value(self, index):
+        """Значение лексемы по индексу без создания объекта Token"""
+        return self.values[self.value_ids[index]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Token.from_parts(_TYPES_BY_CODE[self.types[index]],
+                                self.values[self.value_ids[index]],
+                                self.lines[index],
+                                self.positions[index])
+
+    def __iter__(self):
+        values = self.values
+        from_parts = Token.from_parts
+        for code, value_id, line, position in zip(self.types, self.value_ids, self.lines, self.positions):
+            yield from_parts(_TYPES_BY_CODE[code], values[value_id], line, position)
+
+    def memory_usage(self):
+        """Приблизительный объем памяти массивов и таблицы значений в байтах"""
+        arrays = (self.types, self.lines, self.positions, self.value_ids)
+        size = sum(a.itemsize * len(a) for a in arrays)
+        return size + sum(value.__sizeof__() for value in self.values)
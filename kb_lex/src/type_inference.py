@@ -0,0 +1,212 @@
+from .control_flow import ControlFlowGraph, DataflowProblem, solve_dataflow, variable_accesses
+from .rpn_analysis import JUMP_OPERATIONS, TYPED_OPERATIONS, UNCHECKED_OPERATIONS, is_variable
+
+
+# Типы значений - биты маски: тип значения в точке программы - объединение
+# типов на всех путях. OTHER - список или значение ввода (тип неизвестен)
+INT = 1
+FLOAT = 2
+OTHER = 4
+ANY = INT | FLOAT | OTHER
+
+_WIDTH = 3  # Бит на переменную в упакованном состоянии
+
+# Команды с типами: (общая команда, тип обоих операндов) -> команда
+_SPECIALIZED = {(generic, INT if typed[0] == "I" else FLOAT): typed for typed, generic in TYPED_OPERATIONS.items()}
+
+_ARITHMETIC_OPERATIONS = frozenset(("PLUS", "MINUS", "MULTIPLY"))
+_INTEGER_RESULT_OPERATIONS = frozenset(("EQUALS", "NEQ", "LT", "GT", "AND", "OR"))
+
+
+def specialize_types(rpn, specialized=None):
+    """
+    Вывод типов int/float и замена общих команд командами с типами:
+    PLUS двух int -> I_ADD, LT двух float -> FCMP_LT, DIVIDE двух int ->
+    IDIV_TO_FLOAT и т.д. (см. rpn_analysis.TYPED_OPERATIONS). Их
+    обработчики в интерпретаторах не проверяют операнды.
+
+    Типы выводятся прямой задачей потока данных по графу (control_flow):
+    состояние - маска типов каждой переменной, на входе все переменные
+    int (чтение неопределенной переменной дает 0). Объявленные в тексте
+    типы не используются: интерпретатор их не проверяет, и переменной
+    int можно присвоить 2.5. Тип элементов - один на все массивы
+    (массив можно присвоить другой переменной): int нулей DECL_ARR и
+    типы всех записанных в элементы значений. Ввод ($r, r_array) дает
+    неизвестный тип.
+
+    Команда заменяется, только если тип обоих операндов известен и
+    одинаков на всех путях; иначе остается общая команда. Если стек не
+    пуст на границе участков или ОПС нельзя промоделировать, ОПС не
+    меняется. Если задан список specialized, в него добавляется каждая
+    поставленная команда с типами.
+
+    Returns:
+        list: Новая ОПС (исходная не изменяется)
+    """
+    try:
+        cfg = ControlFlowGraph(rpn)
+    except ValueError:
+        return rpn
+    accesses = variable_accesses(cfg)
+    if accesses is None:
+        return rpn
+    names = sorted({instruction for instruction in rpn if is_variable(instruction)})  # И в недостижимых участках
+    problem = _TypeProblem(cfg, {name: index * _WIDTH for index, name in enumerate(names)})
+    try:
+        while True:
+            elements = problem.elements
+            incoming, _ = solve_dataflow(cfg, problem)
+            if problem.elements == elements:
+                break  # Типы элементов массивов не расширились: решение устойчиво
+    except _Unsimulated:
+        return rpn
+
+    result = list(rpn)
+    changed = False
+    for block in cfg.blocks:
+        if block.start is None:
+            continue
+        for index, instruction, left, right in problem.operands(block.number, incoming[block.number]):
+            typed = _SPECIALIZED.get((instruction, left)) if left == right else None
+            if typed is not None:
+                result[block.start + index] = typed
+                changed = True
+                if specialized is not None:
+                    specialized.append(typed)
+    return result if changed else rpn
+
+
+class _Unsimulated(Exception):
+    """Значение переходит на стеке из участка в участок, или команду нельзя промоделировать"""
+
+
+class _TypeProblem(DataflowProblem):
+    """Прямая задача: маски типов переменных, упакованные в int по _WIDTH бит"""
+
+    def __init__(self, cfg, offsets):
+        self.cfg = cfg
+        self.offsets = offsets
+        self.all_int = sum(INT << offset for offset in offsets.values())
+        self.elements = INT  # Тип элементов массивов: DECL_ARR заполняет их нулями
+
+    def boundary(self):
+        return self.all_int
+
+    def top(self):
+        return 0
+
+    def meet(self, left, right):
+        return left | right
+
+    def transfer(self, number, value):
+        return self._simulate(number, value, None)
+
+    def operands(self, number, value):
+        """Типы операндов бинарных команд участка: (номер в code, команда, левый, правый)"""
+        found = []
+        self._simulate(number, value, found)
+        return found
+
+    def _simulate(self, number, state, found):
+        offsets = self.offsets
+        stack = []
+
+        def pop():
+            if not stack:
+                raise _Unsimulated
+            return stack.pop()
+
+        def pop_name():
+            if not stack or stack[-1].__class__ is not str:
+                raise _Unsimulated
+            return stack.pop()
+
+        def type_of(entry):
+            # Имя разыменовывается, когда его снимает команда
+            if entry.__class__ is str:
+                return state >> offsets[entry] & ANY
+            return entry
+
+        def assign(name, value_type):
+            nonlocal state
+            offset = offsets[name]
+            state = state & ~(ANY << offset) | value_type << offset
+
+        code = self.cfg.blocks[number].code
+        index = 0
+        while index < len(code):
+            instruction = UNCHECKED_OPERATIONS.get(code[index], code[index])
+            if instruction.__class__ is int:
+                stack.append(INT)
+            elif instruction.__class__ is float:
+                stack.append(FLOAT)
+            elif instruction in JUMP_OPERATIONS:
+                if instruction != "$J":
+                    pop()
+                index += 1
+            elif is_variable(instruction):
+                stack.append(instruction)
+            elif instruction == "UNARY_MINUS":
+                operand = type_of(pop())
+                stack.append(ANY if operand & OTHER else operand)
+            elif instruction in _ARITHMETIC_OPERATIONS or instruction in _INTEGER_RESULT_OPERATIONS \
+                    or instruction == "DIVIDE" or instruction in TYPED_OPERATIONS:
+                instruction = TYPED_OPERATIONS.get(instruction, instruction)  # Повторный проход
+                right = type_of(pop())
+                left = type_of(pop())
+                if found is not None:
+                    found.append((index, instruction, left, right))
+                stack.append(_result_type(instruction, left, right))
+            elif instruction == "ASSIGN":
+                values = []
+                while stack and stack[-1].__class__ is not str:
+                    values.append(stack.pop())
+                name = pop_name()
+                if len(values) == 1:
+                    assign(name, values[0])
+                else:
+                    assign(name, OTHER)  # Список значений
+                    for value_type in values:
+                        self.elements |= value_type
+            elif instruction == "DECL_ARR":
+                name = pop_name()
+                pop()
+                assign(name, OTHER)
+            elif instruction == "$r":
+                assign(pop_name(), ANY)
+            elif instruction == "$w":
+                pop()
+            elif instruction == "ARRAY_INDEX":
+                pop()
+                pop()
+                stack.append(self.elements)
+            elif instruction == "ARRAY_ASSIGN":
+                self.elements |= type_of(pop())
+                pop()
+                pop()
+            elif instruction == "r_array":
+                pop()
+                pop()
+                self.elements = ANY
+            else:
+                raise _Unsimulated
+            index += 1
+        if stack:
+            raise _Unsimulated
+        return state
+
+
+def _result_type(instruction, left, right):
+    """Маска типов результата бинарной команды по маскам операндов"""
+    if instruction in _INTEGER_RESULT_OPERATIONS:
+        return INT
+    if (left | right) & OTHER:
+        return ANY
+    if instruction == "DIVIDE":
+        return FLOAT
+    result = 0
+    if left & INT and right & INT:
+        result |= INT
+    if left & FLOAT and right or right & FLOAT and left:
+        result |= FLOAT
+    return result
@@ -0,0 +1,235 @@
+import io
+import os
+import sys
+import tempfile
+
+from src.bytecode import FORMAT_VERSION, HEADER, dump_bytecode, load_bytecode
+from src.compiler import Compiler, OPTIMIZATION_LEVELS
+from src.control_flow import ControlFlowGraph
+from src.register_ir import lower_to_registers
+from src.register_vm import RegisterVM
+from src.rpn_interpreter import RPNInterpreter
+from src.slot_interpreter import SlotInterpreter
+from src.slot_resolution import resolve_slots
+from src.superinstructions import fuse_superinstructions
+from benchmark import (branching_loop_program, generate_program, load_samples, nested_loop_program, run_rpn,
+                       sort_program)
+
+PROGRAMS = 20
+
+
+def test_sources():
+    """Примеры .kb, сгенерированные программы и программы с циклами и массивами"""
+    sources = dict(load_samples())
+    sources.update((f"generated{seed}", generate_program(40, seed)) for seed in range(PROGRAMS))
+    sources.update({
+        "sort": sort_program(10),
+        "nested_loops": nested_loop_program(5),
+        "branching_loops": branching_loop_program(5),
+    })
+    return sources
+
+
+def compile_programs(sources):
+    """
+    Список (имя, уровень, ОПС) для каждой программы на каждом уровне
+    оптимизации и признак того, что все программы скомпилированы
+    """
+    programs = []
+    success = True
+    for name, source in sources.items():
+        for level in OPTIMIZATION_LEVELS:
+            try:
+                programs.append((name, level, Compiler(optimization_level=level).compile(source)))
+            except Exception as e:
+                print(f"{name}, уровень {level}: ошибка компиляции: {e!r}")
+                success = False
+    return programs, success
+
+
+def check_slots(programs):
+    """SlotInterpreter выполняет программу по слотам так же, как RPNInterpreter - ОПС"""
+    success = True
+    resolved = 0
+    for name, level, rpn in programs:
+        program = resolve_slots(rpn)
+        if program is None:
+            continue
+        resolved += 1
+        if run_rpn(program, interpreter_class=SlotInterpreter) != run_rpn(rpn):
+            print(f"{name}, уровень {level}: выполнение по слотам отличается")
+            success = False
+    if not resolved:
+        print("Ни одна программа не переведена в слоты")
+        return False
+    return success
+
+
+def check_superinstructions(programs):
+    """Программа с суперкомандами выполняется так же, как без них и как ОПС"""
+    success = True
+    fused_count = 0
+    for name, level, rpn in programs:
+        program = resolve_slots(rpn)
+        if program is None:
+            continue
+        fused = fuse_superinstructions(program)
+        fused_count += fused.code != program.code
+        if run_rpn(fused, interpreter_class=SlotInterpreter) != run_rpn(rpn):
+            print(f"{name}, уровень {level}: суперкоманды меняют выполнение")
+            success = False
+    if not fused_count:
+        print("Суперкоманды не применены ни к одной программе")
+        return False
+    return success
+
+
+def check_registers(programs):
+    """Регистровая машина выполняет программу так же, как RPNInterpreter - ОПС"""
+    success = True
+    lowered = 0
+    for name, level, rpn in programs:
+        program = resolve_slots(rpn)
+        registers = program and lower_to_registers(program)
+        if registers is None:
+            continue
+        lowered += 1
+        if run_rpn(registers, interpreter_class=RegisterVM) != run_rpn(rpn):
+            print(f"{name}, уровень {level}: регистровая машина выполняет программу иначе")
+            success = False
+    if not lowered:
+        print("Ни одна программа не переведена в регистры")
+        return False
+    return success
+
+
+def check_control_flow(programs):
+    """
+    ОПС, собранная из графа потока управления, совпадает с исходной, а с
+    переставленными участками выполняется так же; вложенные циклы находятся
+    """
+    success = True
+    for name, level, rpn in programs:
+        cfg = ControlFlowGraph(rpn)
+        if cfg.to_rpn() != rpn:
+            print(f"{name}, уровень {level}: ОПС, собранная из графа, отличается от исходной")
+            success = False
+        # Участки в обратном порядке: все переходы и проходы пересчитываются
+        order = [cfg.entry] + list(range(cfg.exit - 1, cfg.entry, -1)) + [cfg.exit]
+        if run_rpn(cfg.to_rpn(order)) != run_rpn(rpn):
+            print(f"{name}, уровень {level}: ОПС с переставленными участками выполняется иначе")
+            success = False
+        if name in ("nested_loops", "branching_loops") and len(cfg.loops(cfg.dominators())) != 2:
+            print(f"{name}, уровень {level}: в графе не найдены два вложенных цикла")
+            success = False
+    return success
+
+
+def run_program(program):
+    """run_rpn для ОПС (список команд) или SlotProgram из байт-кода"""
+    return run_rpn(program, interpreter_class=RPNInterpreter if isinstance(program, list) else SlotInterpreter)
+
+
+def check_bytecode_roundtrip(sources):
+    """Программа, записанная в .kbc и загруженная обратно, выполняется так же"""
+    success = True
+    for name, source in sources.items():
+        for level in OPTIMIZATION_LEVELS:
+            buffer = io.BytesIO()
+            try:
+                rpn = Compiler(optimization_level=level).save_bytecode(source, buffer)
+            except Exception as e:
+                print(f"{name}, уровень {level}: ошибка записи байт-кода: {e!r}")
+                success = False
+                continue
+            buffer.seek(0)
+            program = Compiler().load_bytecode(buffer, source)
+            if run_program(program) != run_rpn(rpn):
+                print(f"{name}, уровень {level}: программа из байт-кода выполняется иначе")
+                success = False
+
+            # ОПС без перевода в слоты записывается и читается без изменений
+            buffer = io.BytesIO()
+            dump_bytecode(rpn, buffer, source)
+            if load_bytecode(buffer.getvalue())[0] != rpn:
+                print(f"{name}, уровень {level}: ОПС из байт-кода отличается от записанной")
+                success = False
+
+    # Файл на диске читается через mmap
+    source = sources["sort"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sort.kbc")
+        with open(path, 'wb') as file:
+            rpn = Compiler().save_bytecode(source, file)
+        with open(path, 'rb') as file:
+            program = Compiler().load_bytecode(file, source)
+        if run_program(program) != run_rpn(rpn):
+            print("sort.kbc: программа из файла байт-кода выполняется иначе")
+            success = False
+    return success
+
+
+def expect_rejected(title, load):
+    """load() должна отвергнуть байт-код с ValueError"""
+    try:
+        load()
+    except ValueError:
+        return True
+    print(f"{title}: байт-код принят, ожидалась ошибка ValueError")
+    return False
+
+
+def check_bytecode_rejected(sources):
+    """Байт-код другой версии, устаревший или поврежденный не загружается"""
+    source = sources["sort"]
+    buffer = io.BytesIO()
+    Compiler().save_bytecode(source, buffer)
+    data = buffer.getvalue()
+    wrong_version = bytearray(data)
+    wrong_version[4:6] = (FORMAT_VERSION + 1).to_bytes(2, 'little')
+    wrong_magic = b"XYZ\0" + data[4:]
+    checks = [
+        ("другая версия", lambda: load_bytecode(bytes(wrong_version))),
+        ("неверная сигнатура", lambda: load_bytecode(wrong_magic)),
+        ("обрезанный файл", lambda: load_bytecode(data[:-1])),
+        ("обрезанный заголовок", lambda: load_bytecode(data[:HEADER.size - 1])),
+        ("добавлен оператор", lambda: Compiler().load_bytecode(io.BytesIO(data), source + "output n;\n")),
+        ("изменена константа",
+         lambda: Compiler().load_bytecode(io.BytesIO(data), source.replace("n = 10;", "n = 11;"))),
+    ]
+    success = all([expect_rejected(title, load) for title, load in checks])
+    # С тем же исходным текстом байт-код загружается
+    try:
+        Compiler().load_bytecode(io.BytesIO(data), source)
+    except ValueError as e:
+        print(f"Байт-код отвергнут для того же исходного текста: {e}")
+        success = False
+    return success
+
+
+def run_backends_test():
+    print("=" * 50)
+    print("ТЕСТ: исполнители и байт-код совпадают с RPNInterpreter")
+    print("=" * 50)
+    sources = test_sources()
+    programs, compiled = compile_programs(sources)
+    checks = [
+        ("компиляция", compiled),
+        ("слоты переменных", check_slots(programs)),
+        ("суперкоманды", check_superinstructions(programs)),
+        ("регистровая машина", check_registers(programs)),
+        ("граф потока управления", check_control_flow(programs)),
+        ("байт-код: запись и загрузка", check_bytecode_roundtrip(sources)),
+        ("байт-код: отказ в загрузке", check_bytecode_rejected(sources)),
+    ]
+    for title, passed in checks:
+        print(f"{title}: {'OK' if passed else 'ОШИБКА'}")
+    success = all(passed for _, passed in checks)
+    print(f"\nПрограмм проверено: {len(sources)}")
+    print("Тест пройден" if success else "Тест НЕ пройден")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_backends_test()
+    sys.exit(0 if success else 1)
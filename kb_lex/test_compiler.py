@@ -6,19 +6,72 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 from src.compiler import Compiler
+from src.instrumentation import format_report
+
+def print_symbol_table(symbol_table):
+    print("--- Таблица символов после выполнения ---")
+    if symbol_table:
+        for var_name, value in symbol_table.items():
+            print(f"{var_name}: {value}")
+    else:
+        print("(пусто)")
+    print("-" * 30)
+
+
+def run_bytecode(filepath, input_values):
+    """Выполняет файл байт-кода .kbc без исходного текста и компиляции"""
+    compiler = Compiler()
+    if input_values:
+        compiler.set_input_values(input_values)
+    try:
+        with open(filepath, 'rb') as file:
+            program_output, final_symbol_table = compiler.execute_bytecode(file)
+    except FileNotFoundError:
+        print(f"Ошибка: Файл '{filepath}' не найден.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Произошла ошибка при загрузке или выполнении байт-кода: {e}")
+        sys.exit(1)
+
+    print("--- Вывод программы (Интерпретация байт-кода) ---")
+    if program_output:
+        for line in program_output:
+            print(line)
+    else:
+        print("(нет вывода)")
+    print("-" * 30)
+    print_symbol_table(final_symbol_table)
+
 
 def main():
-    if len(sys.argv) < 2:
-        print("Использование: python test_compiler.py <имя_файла> [входные_данные...]")
+    args = sys.argv[1:]
+    # --stats: напечатать счетчики лексического и синтаксического анализа
+    show_stats = "--stats" in args
+    if show_stats:
+        args.remove("--stats")
+    # --kbc: записать скомпилированную программу в байт-код <имя>.kbc
+    save_kbc = "--kbc" in args
+    if save_kbc:
+        args.remove("--kbc")
+    # --registers: выполнять программу регистровой машиной
+    use_registers = "--registers" in args
+    if use_registers:
+        args.remove("--registers")
+
+    if len(args) < 1:
+        print("Использование: python test_compiler.py [--stats] [--kbc] [--registers] <имя_файла> [входные_данные...]")
         print("Пример: python test_compiler.py test7.kb 3 1 2 3")
         print("Если входные данные не указаны, программа запросит их интерактивно.")
+        print("--stats печатает счетчики лексического и синтаксического анализа.")
+        print("--kbc записывает байт-код рядом с исходным файлом; файл .kbc выполняется без компиляции.")
+        print("--registers выполняет программу регистровой машиной вместо стековой.")
         sys.exit(1)
 
-    filepath = sys.argv[1]
+    filepath = args[0]
     input_values = []
     
-    if len(sys.argv) > 2:
-        for arg in sys.argv[2:]:
+    if len(args) > 1:
+        for arg in args[1:]:
             try:
                 input_values.append(int(arg))
             except ValueError:
@@ -28,6 +81,10 @@ def main():
     else:
         print("Программа будет запрашивать входные данные интерактивно.")
 
+    if filepath.endswith(".kbc"):
+        run_bytecode(filepath, input_values)
+        return
+
     try:
         with open(filepath, 'r', encoding='utf-8') as file:
             source_code = file.read()
@@ -38,7 +95,7 @@ def main():
         print(f"Ошибка при чтении файла '{filepath}': {e}")
         sys.exit(1)
 
-    compiler = Compiler()
+    compiler = Compiler(instrument=show_stats, execution_backend="register" if use_registers else "stack")
     
     if input_values:
         compiler.set_input_values(input_values)
@@ -67,7 +124,15 @@ def main():
                 print(f"{i}: {item}")
         else:
             print("ОПЗ не сгенерирована (возможно, ошибка синтаксического анализа).")
+        pool_stats = compiler.get_constant_pool_stats()
+        print(f"Пул констант: {pool_stats['constants']} констант, {pool_stats['unique']} различных, "
+              f"{pool_stats['deduplicated']} повторов")
         print("-" * 30)
+
+        if show_stats:
+            print("--- Счетчики анализа ---")
+            print(format_report(compiler.get_instrumentation_report()))
+            print("-" * 30)
         
         if program_output is not None:
             print("--- Вывод программы (Интерпретация ОПЗ) ---")
@@ -78,13 +143,13 @@ def main():
                 print("(нет вывода)")
             print("-" * 30)
 
-            print("--- Таблица символов после выполнения ---")
-            if final_symbol_table:
-                for var_name, value in final_symbol_table.items():
-                    print(f"{var_name}: {value}")
-            else:
-                print("(пусто)")
-            print("-" * 30)
+            print_symbol_table(final_symbol_table)
+
+            if save_kbc:
+                kbc_path = os.path.splitext(filepath)[0] + ".kbc"
+                with open(kbc_path, 'wb') as kbc_file:
+                    compiler.save_bytecode(source_code, kbc_file)
+                print(f"Байт-код записан в '{kbc_path}'")
         else:
             print("Компиляция или выполнение не удалось. Подробности см. выше.")
             sys.exit(1)
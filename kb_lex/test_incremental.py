@@ -0,0 +1,77 @@
+import random
+import sys
+
+from src.compiler import Compiler
+from benchmark import generate_source, random_edit, token_tuples
+
+SOURCE_SIZE = 2048
+EDITS = 150
+SEED = 0
+# Столько правок подряд с ошибкой - и текст возвращается к последнему корректному
+MAX_FAILED_IN_ROW = 3
+
+
+def compile_outcome(function, *args):
+    """Результат компиляции для сравнения: токены, ОПС и таблица символов или текст ошибки"""
+    try:
+        compiler = function(*args)
+    except (RuntimeError, SyntaxError, ValueError) as e:
+        return repr(e)
+    return (token_tuples(compiler.get_tokens()), compiler.get_rpn(),
+            compiler.symbol_table_after_parsing.symbols)
+
+
+def run_incremental_test(optimization_level):
+    """Сверяет compile_edit с полной перекомпиляцией на случайных правках"""
+    rnd = random.Random(SEED)
+    source = generate_source(SOURCE_SIZE, SEED)
+    compiler = Compiler(optimization_level=optimization_level)
+    compiler.compile(source)
+
+    def edit(start, end, text):
+        compiler.compile_edit(start, end, text)
+        return compiler
+
+    def full(text):
+        fresh = Compiler(optimization_level=optimization_level)
+        fresh.compile(text)
+        return fresh
+
+    failed = failed_in_row = 0
+    valid_source = source
+    undo = None
+    for number in range(EDITS):
+        # Правка, сделавшая текст некорректным, обычно отменяется следующей
+        if failed_in_row >= MAX_FAILED_IN_ROW:
+            undo = (0, len(source), valid_source)
+        start, end, text = undo or random_edit(source, rnd)
+        undo = None
+        removed = source[start:end]
+        source = source[:start] + text + source[end:]
+        got = compile_outcome(edit, start, end, text)
+        expected = compile_outcome(full, source)
+        if got != expected:
+            print(f"Ошибка: правка №{number} ({start}, {end}, {text[:40]!r}) дала результат, "
+                  f"отличный от полной перекомпиляции")
+            return False
+        if not isinstance(expected, str):
+            valid_source = source
+            failed_in_row = 0
+            continue
+        failed += 1
+        failed_in_row += 1
+        if rnd.random() < 0.7:
+            undo = (start, start + len(text), removed)
+
+    print(f"Уровень оптимизации {optimization_level}: правок {EDITS}, "
+          f"из них с ошибкой {failed} - совпадает с полной перекомпиляцией")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("ТЕСТ: инкрементальная перекомпиляция compile_edit")
+    print("=" * 50)
+    success = all([run_incremental_test(level) for level in (0, 3)])
+    print("\n" + ("Тест пройден" if success else "Тест НЕ пройден"))
+    sys.exit(0 if success else 1)
@@ -0,0 +1,336 @@
+import sys
+
+from collections import Counter
+
+from src.bounds_checks import UNCHECKED_OPERATIONS, eliminate_bounds_checks
+from src.compiler import Compiler
+from src.dead_stores import eliminate_dead_stores
+from src.loop_invariants import hoist_loop_invariants
+from src.optimizer import (OPTIMIZATION_LEVELS, fold_constant_condition, fold_constants, optimize, peephole,
+                           remove_unreachable, thread_jumps)
+from src.rpn_analysis import JumpTargets
+from benchmark import (backend_runs, bubble_sort_program, executed_count, generate_expression_program,
+                       generate_program, load_samples, run_rpn, sort_program, template_program, visible_result)
+
+PROGRAMS = 20
+
+# (исходная ОПС, ожидаемая ОПС после fold_constants)
+FOLDING_CASES = [
+    # Свертка внутри условия цикла: адреса $JF и $J пересчитываются
+    (['a', 0, 'ASSIGN', 'a', 2, 3, 'MULTIPLY', 'LT', '$JF', 17, 'a', 'a', 1, 'PLUS', 'ASSIGN', '$J', 3, 'a', '$w'],
+     ['a', 0, 'ASSIGN', 'a', 6, 'LT', '$JF', 15, 'a', 'a', 1, 'PLUS', 'ASSIGN', '$J', 3, 'a', '$w']),
+    # Унарный минус и цепочка операций
+    (['a', 5, 'UNARY_MINUS', 2, 'PLUS', 4, 'MULTIPLY', 'ASSIGN'], ['a', -12, 'ASSIGN']),
+    # На второй операнд есть переход: операция не сворачивается
+    ([0, '$JF', 4, 2, 3, 'PLUS', '$w'], [0, '$JF', 4, 2, 3, 'PLUS', '$w']),
+    # Деление на ноль остается до выполнения
+    (['a', 1, 0, 'DIVIDE', 'ASSIGN'], ['a', 1, 0, 'DIVIDE', 'ASSIGN']),
+]
+
+
+# (правило, ОПС, индекс команды, ожидаемый результат правила)
+PEEPHOLE_RULE_CASES = [
+    # Цепочка переходов: $JF на $J продолжается сразу по адресу этого $J
+    (thread_jumps, [1, '$JF', 5, 'a', '$w', '$J', 9, 'b', '$w', 'c', '$w'], 1, (3, ['$JF', 9])),
+    # Цикл из $J: продвижение останавливается, а не зацикливается
+    (thread_jumps, ['$J', 2, '$J', 0], 0, (2, ['$J', 0])),
+    (thread_jumps, ['$J', 2, '$J', 2], 0, None),
+    # После $J удаляется только код до ближайшего адреса перехода
+    (remove_unreachable, ['$J', 8, 'a', '$w', 'b', '$w', '$J', 4, 'c', '$w'], 2, (4, [])),
+    (remove_unreachable, ['$J', 8, 'a', '$w', 'b', '$w', '$J', 4, 'c', '$w'], 4, None),
+    (remove_unreachable, ['$J', 4, 'a', '$w'], 2, (4, [])),
+    # Условный переход по константе
+    (fold_constant_condition, [1, '$JF', 5, 'a', '$w'], 0, (3, [])),
+    (fold_constant_condition, [0, '$JF', 5, 'a', '$w'], 0, (3, ['$J', 5])),
+    (fold_constant_condition, [0, '$JT', 5, 'a', '$w'], 0, (3, [])),
+    (fold_constant_condition, [2.5, '$JT', 5, 'a', '$w'], 0, (3, ['$J', 5])),
+    # На сам переход ведет другой переход: константа может прийти не из этой команды
+    (fold_constant_condition, [1, '$JF', 5, '$J', 1, 'a'], 0, None),
+]
+
+# (ОПС, ожидаемая ОПС после peephole)
+PEEPHOLE_CASES = [
+    # Цикл из переходов остается бесконечным циклом (каждый $J - на себя), оптимизация завершается
+    (['$J', 2, '$J', 0], ['$J', 0, '$J', 2]),
+    # while (0) {...}: тело и переход удалены
+    (['a', 0, 'ASSIGN', 0, '$JF', 13, 'a', 'a', 1, 'PLUS', 'ASSIGN', '$J', 3, 'a', '$w'],
+     ['a', 0, 'ASSIGN', 'a', '$w']),
+    # Повернутый цикл с ложным условием: $JT по константе 0 не выполняется
+    (['a', '$w', 0, '$JT', 0, 'a', '$w'], ['a', '$w', 'a', '$w']),
+]
+
+# (имя, исходный текст, выражения, которые должны быть вынесены из циклов)
+LOOP_INVARIANT_CASES = [
+    # Границы циклов сортировки пузырьком: n - 1 и n - i - 1 во внутреннем цикле
+    ("bubble_sort", bubble_sort_program(10), [('n', 1, 'MINUS'), ('n', 'i', 'MINUS', 1, 'MINUS')]),
+    # n записывается в цикле: n - 1 меняется между итерациями
+    ("запись в цикле", """int n;
+int i;
+n = 5;
+i = 0;
+while (i < n - 1) {
+    n = n - 1;
+    i = i + 1;
+}
+output i;
+""", []),
+    # Деление на ноль не выносится: ошибка должна остаться в теле цикла
+    ("деление", """int n;
+int i;
+int s;
+n = 0;
+i = 0;
+s = 0;
+while (i < 3) {
+    s = s + 6 / n;
+    i = i + 1;
+}
+output s;
+""", []),
+]
+
+# (имя, исходный текст (None - пример .kb), сколько обращений к массивам должно остаться с проверкой
+# границ, выходит ли программа за границы массива)
+BOUNDS_CASES = [
+    # Индексы ограничены условиями циклов: проверки снимаются все
+    ("sort", sort_program(10), 0, False),
+    ("bubble_sort", bubble_sort_program(10), 0, False),
+    # Длина массивов задается вводом: проверки остаются
+    ("test7.kb", None, 1, False),
+    ("test8.kb", None, 7, False),
+    # Индекс из ввода выходит за массив
+    ("индекс из ввода", """int [3] a;
+int k;
+input k;
+output a[k];
+""", 1, True),
+    # Цикл до n включительно: a[n] выходит за массив, a[0] - нет
+    ("цикл до n", """int n;
+n = 3;
+int [n] a;
+int i;
+i = 0;
+while (i < n + 1) {
+    a[i] = i;
+    i = i + 1;
+}
+output a[0];
+""", 1, True),
+    # Отрицательный индекс
+    ("индекс i - 1", """int n;
+n = 3;
+int [n] a;
+int i;
+i = 0;
+while (i < n) {
+    output a[i - 1];
+    i = i + 1;
+}
+""", 1, True),
+    # Размер массива задан до изменения n: граница цикла больше длины
+    ("n изменено после объявления", """int n;
+n = 3;
+int [n] a;
+int i;
+i = 0;
+n = 5;
+while (i < n) {
+    a[i] = i;
+    i = i + 1;
+}
+""", 1, True),
+]
+
+
+def test_sources():
+    """Примеры .kb и сгенерированные программы"""
+    sources = dict(load_samples())
+    sources.update((f"generated{seed}", generate_program(40, seed)) for seed in range(PROGRAMS))
+    sources.update((f"expressions{seed}", generate_expression_program(20, seed)) for seed in range(PROGRAMS))
+    return sources
+
+
+def check_folding_cases():
+    success = True
+    for rpn, expected in FOLDING_CASES:
+        folded = fold_constants(list(rpn))
+        if folded != expected:
+            print(f"fold_constants({rpn}) = {folded}, ожидалось {expected}")
+            success = False
+    return success
+
+
+def check_peephole_rules():
+    success = True
+    for rule, rpn, index, expected in PEEPHOLE_RULE_CASES:
+        result = rule(rpn, index, JumpTargets(rpn))
+        if result != expected:
+            print(f"{rule.__name__}({rpn}, {index}) = {result}, ожидалось {expected}")
+            success = False
+    for rpn, expected in PEEPHOLE_CASES:
+        optimized = peephole(list(rpn))
+        if optimized != expected:
+            print(f"peephole({rpn}) = {optimized}, ожидалось {expected}")
+            success = False
+    return success
+
+
+def check_loop_invariants(sources):
+    """
+    Вынесены ожидаемые выражения, поведение программы не меняется, а
+    с вынесенными выражениями выполняется меньше команд
+    """
+    success = True
+    cases = [(name, source, None) for name, source in sources.items()] + LOOP_INVARIANT_CASES
+    for name, source, expected in cases:
+        try:
+            rpn = fold_constants(Compiler().compile(source))
+        except Exception:
+            continue
+        hoisted = []
+        optimized = hoist_loop_invariants(rpn, hoisted)
+        if visible_result(run_rpn(optimized)) != run_rpn(rpn):
+            print(f"{name}: вынос инвариантов изменил поведение программы")
+            success = False
+        if expected is None:
+            continue
+        if hoisted != expected:
+            print(f"{name}: вынесено {hoisted}, ожидалось {expected}")
+            success = False
+        elif hoisted and executed_count(optimized) >= executed_count(rpn):
+            print(f"{name}: после выноса инвариантов выполнено не меньше команд")
+            success = False
+    return success
+
+
+def output_of(result):
+    """Вывод программы из результата run_rpn или текст ошибки выполнения"""
+    return result if isinstance(result, str) else result[0]
+
+
+def output_variables(source, symbol_table):
+    """
+    source с выводом в конце всех переменных таблицы символов (у массивов -
+    первых элементов): записи, которые видны только в таблице, становятся
+    наблюдаемыми
+    """
+    lines = [source]
+    for name, value in symbol_table.items():
+        if isinstance(value, list):
+            lines.extend(f"output {name}[{index}];" for index in range(min(len(value), 10)))
+        else:
+            lines.append(f"output {name};")
+    return "\n".join(lines) + "\n"
+
+
+def check_dead_stores(sources):
+    """
+    С keep_symbol_table поведение совпадает полностью, без него - вывод и
+    ошибки выполнения. Удаляются только ненаблюдаемые записи: если в конце
+    программы вывести все переменные, удаленные записи видны в выводе и
+    должны остаться
+    """
+    success = True
+    sources = dict(sources)
+    sources.update((f"template{seed}", template_program(40, seed)) for seed in range(PROGRAMS))
+    removed = Counter()
+    for name, source in sources.items():
+        try:
+            rpn = fold_constants(Compiler().compile(source))
+        except Exception:
+            continue
+        expected = run_rpn(rpn)
+        if run_rpn(eliminate_dead_stores(rpn)) != expected:
+            print(f"{name}: удаление записей изменило поведение (с таблицей символов)")
+            success = False
+        if output_of(run_rpn(eliminate_dead_stores(rpn, keep_symbol_table=False, removed=removed))) != \
+                output_of(expected):
+            print(f"{name}: удаление записей изменило вывод программы")
+            success = False
+        if isinstance(expected, str):
+            continue
+        observed = fold_constants(Compiler().compile(output_variables(source, expected[1])))
+        if output_of(run_rpn(eliminate_dead_stores(observed, keep_symbol_table=False))) != \
+                output_of(run_rpn(observed)):
+            print(f"{name}: удалена запись переменной, которая выводится")
+            success = False
+    if not removed:
+        print("Без keep_symbol_table не удалено ни одной записи")
+        return False
+    return success
+
+
+def check_bounds_checks(sources):
+    """
+    Проверки границ снимаются только с обращений, которые не выходят за
+    массив: обращения с индексом, который может выйти за границы, остаются
+    ARRAY_INDEX и ARRAY_ASSIGN, и программа на всех исполнителях завершается
+    с той же ошибкой
+    """
+    success = True
+    for name, source, checked, out_of_range in BOUNDS_CASES:
+        rpn = optimize(Compiler().compile(source or sources[name]), 2)
+        unchecked = eliminate_bounds_checks(rpn)
+        remaining = sum(instruction in UNCHECKED_OPERATIONS.values() for instruction in unchecked)
+        if remaining != checked:
+            print(f"{name}: с проверкой границ осталось {remaining} обращений, ожидалось {checked}")
+            success = False
+        expected = visible_result(run_rpn(rpn))
+        if out_of_range and "IndexError" not in str(expected):
+            print(f"{name}: ожидался выход за границы массива, получено {expected}")
+            success = False
+        if any(result != expected for result, _ in backend_runs(unchecked)):
+            print(f"{name}: после снятия проверок границ поведение программы изменилось")
+            success = False
+    return success
+
+
+def check_levels(sources):
+    """Оптимизированная ОПС каждого уровня ведет себя как неоптимизированная"""
+    success = True
+    for name, source in sources.items():
+        for rotate_loops in (False, True):
+            try:
+                rpn = Compiler(rotate_loops=rotate_loops).compile(source)
+            except Exception as e:
+                print(f"{name}: ошибка компиляции: {e!r}")
+                success = False
+                break
+            expected = run_rpn(rpn)
+            for level in OPTIMIZATION_LEVELS:
+                try:
+                    optimized = optimize(rpn, level)
+                except Exception as e:
+                    print(f"{name}, уровень {level}, rotate_loops={rotate_loops}: ошибка оптимизации: {e!r}")
+                    success = False
+                    continue
+                if visible_result(run_rpn(optimized)) != expected:
+                    print(f"{name}, уровень {level}, rotate_loops={rotate_loops}: поведение программы изменилось")
+                    success = False
+    return success
+
+
+def run_optimizer_test():
+    print("=" * 50)
+    print("ТЕСТ: оптимизация ОПС сохраняет поведение программ")
+    print("=" * 50)
+    sources = test_sources()
+    checks = [
+        ("свертка констант", check_folding_cases()),
+        ("правила оконной оптимизации", check_peephole_rules()),
+        ("вынос инвариантов циклов", check_loop_invariants(sources)),
+        ("удаление мертвых записей", check_dead_stores(sources)),
+        ("снятие проверок границ", check_bounds_checks(sources)),
+        ("уровни оптимизации", check_levels(sources)),
+    ]
+    for title, passed in checks:
+        print(f"{title}: {'OK' if passed else 'ОШИБКА'}")
+    success = all(passed for _, passed in checks)
+    print(f"\nПрограмм проверено: {len(sources)}")
+    print("Тест пройден" if success else "Тест НЕ пройден")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_optimizer_test()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,105 @@
+import random
+import sys
+
+from src.compiler import Compiler
+from src.lexer import analyze
+from src.parser import Parser
+from generate_parser import OUTPUT_PATH, generate
+from benchmark import generate_expression_program, generate_program, load_samples, random_edit
+
+PROGRAMS = 20
+EDITED_PROGRAMS = 60
+SEED = 0
+
+
+def test_sources():
+    """
+    Примеры .kb, сгенерированные программы и программы со случайными
+    правками: с ошибками парсеры должны выдавать те же сообщения
+    """
+    sources = dict(load_samples())
+    sources.update((f"generated{seed}", generate_program(30, seed)) for seed in range(PROGRAMS))
+    sources.update((f"expressions{seed}", generate_expression_program(20, seed)) for seed in range(PROGRAMS))
+    rnd = random.Random(SEED)
+    for number in range(EDITED_PROGRAMS):
+        source = generate_program(10, number)
+        start, end, text = random_edit(source, rnd)
+        sources[f"edited{number}"] = source[:start] + text + source[end:]
+    return sources
+
+
+def compile_outcome(source, **options):
+    """ОПС и таблица символов после разбора или текст ошибки"""
+    try:
+        compiler = Compiler(**options)
+        return compiler.compile(source), compiler.symbol_table_after_parsing.symbols
+    except Exception as e:
+        return repr(e)
+
+
+def compare_backends(sources, variants):
+    """Сверяет результат каждого варианта параметров Compiler с табличным парсером"""
+    success = True
+    for name, source in sources.items():
+        expected = compile_outcome(source)
+        for options in variants:
+            if compile_outcome(source, **options) != expected:
+                print(f"{name}: {options} дает результат, отличный от табличного парсера")
+                success = False
+    return success
+
+
+def compare_expression_parsing(sources):
+    """Сортировочная станция (ExpressionParser) против раскрытия выражений по таблице"""
+    success = True
+    for name, source in sources.items():
+        try:
+            tokens = analyze(source)
+        except Exception:
+            continue  # Ошибка лексического анализа: до разбора выражений дело не доходит
+        outcomes = []
+        for fast in (False, True):
+            try:
+                rpn, symbol_table = Parser(tokens, fast_expressions=fast).parse()
+                outcomes.append((rpn, symbol_table.symbols))
+            except Exception as e:
+                outcomes.append(repr(e))
+        if outcomes[0] != outcomes[1]:
+            print(f"{name}: разбор выражений по таблице и сортировочной станцией различается")
+            success = False
+    return success
+
+
+def check_generated_module():
+    """src/generated_parser.py должен совпадать с выводом generate_parser.py"""
+    with open(OUTPUT_PATH, 'r', encoding='utf-8') as file:
+        current = file.read()
+    if current != generate():
+        print(f"{OUTPUT_PATH} устарел: выполните python generate_parser.py")
+        return False
+    return True
+
+
+def run_parser_backends_test():
+    print("=" * 50)
+    print("ТЕСТ: реализации парсера дают одинаковую ОПС")
+    print("=" * 50)
+    sources = test_sources()
+    checks = [
+        ("сгенерированный парсер актуален", check_generated_module()),
+        ("сгенерированный парсер", compare_backends(sources, [{"parser_backend": "generated"}])),
+        ("разбор выражений", compare_expression_parsing(sources)),
+        ("ОПС из дерева разбора", compare_backends(sources, [{"build_ast": True},
+                                                             {"build_ast": True, "parser_backend": "generated"}])),
+    ]
+    for title, passed in checks:
+        print(f"{title}: {'OK' if passed else 'ОШИБКА'}")
+    success = all(passed for _, passed in checks)
+    print(f"\nПрограмм проверено: {len(sources)}")
+    print("Тест пройден" if success else "Тест НЕ пройден")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_parser_backends_test()
+    sys.exit(0 if success else 1)
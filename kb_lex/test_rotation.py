@@ -0,0 +1,98 @@
+import sys
+
+from src.compiler import Compiler, OPTIMIZATION_LEVELS
+from benchmark import backend_runs, branching_loop_program, nested_loop_program
+
+BACKENDS = ("ОПС", "слоты", "регистры")
+
+# Циклы, в которых поворот обязан уменьшить число выполненных команд
+LOOP_PROGRAMS = {
+    "вложенные циклы": nested_loop_program(6),
+    "циклы с if": branching_loop_program(6),
+}
+
+# Крайние случаи: поведение должно совпадать, выигрыша может не быть
+EDGE_PROGRAMS = {
+    "цикл без итераций": """int i;
+int s;
+i = 5;
+s = 1;
+while (i < 3) {
+    s = s + i;
+    i = i + 1;
+}
+output s;
+""",
+    "цикл внутри if-else": """int i;
+int j;
+int s;
+i = 0;
+s = 0;
+while (i < 4) {
+    if (i > 1) {
+        j = 0;
+        while (j < i) {
+            s = s + j;
+            j = j + 1;
+        }
+    } else {
+        while (s > 100) {
+            s = s - 1;
+        }
+        s = s + 10;
+    }
+    i = i + 1;
+}
+output s;
+output j;
+""",
+}
+
+
+def compare_rotation(name, source, level, expect_fewer):
+    """Сравнивает обычную и повернутую компиляцию source на всех исполнителях"""
+    try:
+        plain = backend_runs(Compiler(optimization_level=level).compile(source))
+        rotated = backend_runs(Compiler(optimization_level=level, rotate_loops=True).compile(source))
+    except Exception as e:
+        print(f"{name}, уровень {level}: ошибка компиляции: {e!r}")
+        return False
+    if len(plain) != len(BACKENDS) or len(rotated) != len(BACKENDS):
+        print(f"{name}, уровень {level}: программа выполнена не всеми исполнителями")
+        return False
+
+    success = True
+    expected = plain[0][0]
+    if isinstance(expected, str):
+        print(f"{name}, уровень {level}: ошибка выполнения: {expected}")
+        return False
+    for backend, (plain_result, before), (rotated_result, after) in zip(BACKENDS, plain, rotated):
+        if plain_result != expected or rotated_result != expected:
+            print(f"{name}, уровень {level}, {backend}: результат {rotated_result} вместо {expected}")
+            success = False
+        elif expect_fewer and after >= before:
+            print(f"{name}, уровень {level}, {backend}: выполнено команд {after}, без поворота {before}")
+            success = False
+    if success:
+        print(f"{name}, уровень {level}: OK, выполнено команд " +
+              ", ".join(f"{backend} {before}->{after}"
+                        for backend, (_, before), (_, after) in zip(BACKENDS, plain, rotated)))
+    return success
+
+
+def run_rotation_test():
+    print("=" * 50)
+    print("ТЕСТ: поворот циклов while (rotate_loops)")
+    print("=" * 50)
+    success = True
+    for programs, expect_fewer in ((LOOP_PROGRAMS, True), (EDGE_PROGRAMS, False)):
+        for name, source in programs.items():
+            for level in OPTIMIZATION_LEVELS:
+                success = compare_rotation(name, source, level, expect_fewer) and success
+    print("\n" + ("Тест пройден" if success else "Тест НЕ пройден"))
+    return success
+
+
+if __name__ == "__main__":
+    success = run_rotation_test()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,80 @@
+import sys
+
+from src.compiler import Compiler, OPTIMIZATION_LEVELS
+from src.lexer import analyze
+from src.rpn_analysis import SPECIALIZED_OPERATIONS
+
+# Переменные названы как команды с типами в прежнем написании: такие
+# идентификаторы допустимы в исходном тексте и не должны приниматься за команды
+OPCODE_NAMES_PROGRAM = """
+int IADD; int ISUB; int IMUL; int FADD; int FSUB; int FMUL; int FDIV; int i;
+IADD = 0;
+i = 0;
+while (i < 5) {
+    IADD = IADD + i;
+    ISUB = IADD - i;
+    IMUL = ISUB * 2;
+    i = i + 1;
+}
+FDIV = IMUL / 4;
+FADD = FDIV + FDIV;
+FSUB = FADD - FDIV;
+FMUL = FSUB * FDIV;
+output IADD; output ISUB; output IMUL;
+output FADD; output FSUB; output FMUL; output FDIV;
+"""
+
+EXPECTED_OUTPUT = [10, 6, 12, 6.0, 3.0, 9.0, 3.0]
+EXECUTION_BACKENDS = ("stack", "register")
+
+
+def check_opcode_spelling():
+    """Имена специализированных команд не должны получаться у лексера как идентификаторы"""
+    success = True
+    for name in SPECIALIZED_OPERATIONS:
+        try:
+            analyze(f"int {name};")
+        except RuntimeError:
+            continue
+        print(f"Ошибка: команда {name} допустима как имя переменной")
+        success = False
+    return success
+
+
+def run_typed_operations_test():
+    print("=" * 50)
+    print("ТЕСТ: переменные с именами команд с типами")
+    print("=" * 50)
+
+    success = check_opcode_spelling()
+    for backend in EXECUTION_BACKENDS:
+        for level in OPTIMIZATION_LEVELS:
+            compiler = Compiler(optimization_level=level, execution_backend=backend)
+            try:
+                output, symbol_table = compiler.execute(OPCODE_NAMES_PROGRAM)
+            except Exception as e:
+                print(f"{backend}, уровень {level}: ошибка выполнения: {e!r}")
+                success = False
+                continue
+            if output != EXPECTED_OUTPUT or symbol_table["IADD"] != 10 or symbol_table["FDIV"] != 3.0:
+                print(f"{backend}, уровень {level}: неверный результат {output} {symbol_table}")
+                success = False
+            else:
+                print(f"{backend}, уровень {level}: OK")
+
+    # На уровне 3 вывод типов должен заменить общие команды командами с типами
+    compiler = Compiler(optimization_level=3)
+    compiler.compile(OPCODE_NAMES_PROGRAM)
+    typed = sorted({item for item in compiler.get_rpn() if item in SPECIALIZED_OPERATIONS})
+    print(f"Команды с типами в ОПС: {typed}")
+    if not typed:
+        print("Ошибка: в ОПС нет команд с типами")
+        success = False
+
+    print("\n" + ("Тест пройден" if success else "Тест НЕ пройден"))
+    return success
+
+
+if __name__ == "__main__":
+    success = run_typed_operations_test()
+    sys.exit(0 if success else 1)